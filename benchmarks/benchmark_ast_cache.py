@@ -0,0 +1,48 @@
+"""
+Startup benchmark of the on-disk AST cache: cold start (lex, parse and store) vs warm start (load from the cache)
+of the same source code. Interpretation is not measured, it is the same in both cases.
+Run from the repository root: python -m benchmarks.benchmark_ast_cache
+"""
+import tempfile
+import time
+from benchmarks.benchmark_lazy_functions import build_source_code
+from src.ast_cache import AstCache
+from src.lexer_regex import RegexLexer
+from src.logger import Logger
+from src.parser import Parser
+
+LIBRARY_SIZES = (100, 500, 2000)
+
+REPEATS = 5
+
+
+def cold_start(cache, source_code):
+    statements = Parser(RegexLexer(source_code).scan()).parse()
+    cache.store(source_code, statements)
+    return statements
+
+
+def measure(function, *args):
+    best = None
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    Logger.PARSER_LOGGER_ENABLED = False
+    for functions in LIBRARY_SIZES:
+        source_code = build_source_code(functions, called=0)
+        with tempfile.TemporaryDirectory() as directory:
+            cache = AstCache(directory)
+            cold_time = measure(cold_start, cache, source_code)
+            warm_time = measure(cache.load, source_code)
+        print('{} functions ({:.1f} KB): cold {:>8.4f} s, warm {:>8.4f} s ({:.1f}x)'.format(
+            functions, len(source_code) / 1024, cold_time, warm_time, cold_time / warm_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark of the memory used by the AST: node objects vs compact AstArena (built statement by statement
+from the StreamingParser, so the object nodes of only one statement exist at a time).
+Memory held by the statements includes the tokens they reference.
+Run from the repository root: python -m benchmarks.benchmark_ast_memory [--expressions N]
+"""
+import argparse
+import gc
+import tracemalloc
+from benchmarks.benchmark_parser import build_expressions_source_code
+from src.ast_arena import AstArena
+from src.lexer_regex import RegexLexer
+from src.logger import Logger
+from src.parser import Parser
+from src.parser_streaming import StreamingParser
+
+
+def parse_to_objects(source_code):
+    return Parser(RegexLexer(source_code).scan()).parse()
+
+
+def parse_to_arena(source_code):
+    return AstArena.from_statements(StreamingParser(RegexLexer(source_code).scan_iter()).parse_iter())
+
+
+def measure(parse, source_code):
+    """
+    Return (statements, bytes held by the statements, peak bytes allocated while parsing)
+    """
+    gc.collect()
+    tracemalloc.start()
+    statements = parse(source_code)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statements, current, peak
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='AST memory benchmark')
+    arg_parser.add_argument('--expressions', type=int, default=20000, help='number of generated expression statements')
+    args = arg_parser.parse_args()
+
+    Logger.PARSER_LOGGER_ENABLED = False
+    source_code = build_expressions_source_code(args.expressions)
+    print('Source code: {:.1f} KB'.format(len(source_code) / 1024))
+
+    results = {}
+    for name, parse in (('node objects', parse_to_objects), ('AstArena', parse_to_arena)):
+        statements, current, peak = measure(parse, source_code)
+        results[name] = current
+        print('{:<13} {:>8.1f} MB held {:>8.1f} MB peak'.format(name, current / 2 ** 20, peak / 2 ** 20))
+        del statements
+
+    print('AstArena uses {:.1f}x less memory'.format(results['node objects'] / results['AstArena']))
+
+
+if __name__ == '__main__':
+    main()
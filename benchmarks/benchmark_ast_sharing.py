@@ -0,0 +1,57 @@
+"""
+Benchmark of the memory held by the AST of generated code repeating the same expressions, with and without
+sharing of the identical expression subtrees (Parser(share_expressions=True)). Without sharing the memory grows
+with the size of the source code, with sharing only the statements themselves do.
+Run from the repository root: python -m benchmarks.benchmark_ast_sharing
+"""
+import gc
+import tracemalloc
+from benchmarks.program_generator import variable_name
+from src.lexer_regex import RegexLexer
+from src.logger import Logger
+from src.parser import Parser
+
+STATEMENT_COUNTS = (1000, 4000, 16000)
+
+STATEMENT_TEMPLATES = (
+    'if ({name} % 15 == 0) print "FizzBuzz"; else print {name} + 1;\n',
+    'while ({name} < 100 && {name} % 3 != 0) {name} = {name} * 2 + 1;\n',
+)
+
+
+def build_source_code(statements):
+    return ''.join(
+        STATEMENT_TEMPLATES[index % len(STATEMENT_TEMPLATES)].format(name=variable_name(index % 10))
+        for index in range(statements)
+    )
+
+
+def measure(tokens, share_expressions):
+    """
+    Return (bytes held by the statements, number of shared expression nodes)
+    """
+    gc.collect()
+    tracemalloc.start()
+    parser = Parser(tokens, share_expressions=share_expressions)
+    statements = parser.parse()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del statements
+    return current, len(parser.intern_table) if share_expressions else None
+
+
+def main():
+    Logger.PARSER_LOGGER_ENABLED = False
+    for statement_count in STATEMENT_COUNTS:
+        source_code = build_source_code(statement_count)
+        tokens = RegexLexer(source_code).scan()
+        plain_memory, _ = measure(tokens, False)
+        shared_memory, shared_nodes = measure(tokens, True)
+        print('{:>6} statements ({:>6.1f} KB): {:>7.2f} MB without sharing, {:>7.2f} MB shared '
+              '({} distinct expression nodes)'.format(
+                  statement_count, len(source_code) / 1024, plain_memory / 2 ** 20, shared_memory / 2 ** 20,
+                  shared_nodes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Benchmark of printing and evaluating long expressions (a + a + ... + a), which are walked with an explicit stack
+(ast_walker) instead of recursion. Both grow linearly with the number of terms, the recursive visitors stopped
+with RecursionError at about a thousand of them.
+Run from the repository root: python -m benchmarks.benchmark_ast_walker
+"""
+import time
+from src.interpreter import Interpreter
+from src.interpreter_runtime import RuntimeValue, RuntimeDataType
+from src.lexer_regex import RegexLexer
+from src.logger import Logger
+from src.parser import Parser
+
+TERM_COUNTS = (10 ** 3, 10 ** 4, 10 ** 5)
+
+
+def main():
+    Logger.PARSER_LOGGER_ENABLED = Logger.INTERPRETER_LOGGER_ENABLED = Logger.ENVIRONEMNT_LOGGER_ENABLED = False
+    for term_count in TERM_COUNTS:
+        source_code = 'a' + ' + a' * (term_count - 1) + ';'
+        expression = Parser(RegexLexer(source_code).scan()).parse()[0].expression
+
+        started = time.perf_counter()
+        text = str(expression)
+        printed = time.perf_counter()
+
+        interpreter = Interpreter()
+        interpreter.environment.define('a', RuntimeValue(1, RuntimeDataType.INT))
+        value = interpreter.evaluate_expression(expression)
+        evaluated = time.perf_counter()
+
+        print('{:>6} terms: printed in {:>7.1f} ms ({} characters), evaluated in {:>7.1f} ms (= {})'.format(
+            term_count, (printed - started) * 1000, len(text), (evaluated - printed) * 1000, value.value))
+
+
+if __name__ == '__main__':
+    main()
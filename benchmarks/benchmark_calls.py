@@ -0,0 +1,148 @@
+"""
+Benchmark of the function calls of the Interpreter: calls per second of small functions which return from the top
+of their body, from an if statement and from a loop nested in blocks. return hands a Return completion back through
+the enclosing statements to the call. The baseline is the 'raising' Interpreter, whose return raises an exception
+caught by the call (the way returns were executed before).
+Run from the repository root: python -m benchmarks.benchmark_calls [--calls N] [--repeat N]
+"""
+import argparse
+import io
+import time
+from contextlib import redirect_stdout
+from src.interpreter import Interpreter
+from src.interpreter_runtime import Function
+from src.lexer_regex import RegexLexer
+from src.logger import Logger
+from src.parser import Parser
+from src.specializing_interpreter import SpecializingInterpreter
+
+DIRECT_RETURN_PROGRAM = '''
+function add(a, b) {{
+    return a + b;
+}}
+var total = 0;
+for (var i = 0; i < {calls}; i = i + 1) {{
+    total = add(total, i);
+}}
+print total;
+'''
+
+BRANCH_RETURN_PROGRAM = '''
+function sign(x) {{
+    if (x < 0) {{
+        return -1;
+    }} else {{
+        if (x == 0) {{ return 0; }}
+    }}
+    return 1;
+}}
+var total = 0;
+for (var i = 0; i < {calls}; i = i + 1) {{
+    total = total + sign(i % 3 - 1);
+}}
+print total;
+'''
+
+LOOP_RETURN_PROGRAM = '''
+function first_multiple(n, divisor) {{
+    var candidate = n;
+    while (TRUE) {{
+        {{
+            if (candidate % divisor == 0) {{
+                return candidate;
+            }}
+        }}
+        candidate = candidate + 1;
+    }}
+}}
+var total = 0;
+for (var i = 0; i < {calls}; i = i + 1) {{
+    total = total + first_multiple(i, 3);
+}}
+print total;
+'''
+
+PROGRAMS = (
+    ('direct', DIRECT_RETURN_PROGRAM),
+    ('branch', BRANCH_RETURN_PROGRAM),
+    ('loop', LOOP_RETURN_PROGRAM),
+)
+
+
+class ReturnException(Exception):
+    def __init__(self, value):
+        self.value = value
+
+
+class RaisingFunction(Function):
+    """
+    Function which catches the ReturnException raised by its return statement
+    """
+    def call(self, interpreter, arguments):
+        try:
+            super().call(interpreter, arguments)
+        except ReturnException as _return:
+            return _return.value
+        return None
+
+
+class RaisingInterpreter(Interpreter):
+    """
+    Interpreter whose return statement raises a ReturnException
+    """
+    def visit_return_statement(self, return_statement):
+        value = None
+        if return_statement.value:
+            value = self.evaluate_expression(return_statement.value)
+        raise ReturnException(value)
+
+    def visit_function_statement(self, function_statement):
+        self._define(function_statement, function_statement.name.lexeme,
+                     RaisingFunction(function_statement, self.environment))
+
+
+ENGINES = (
+    ('raising', RaisingInterpreter),
+    ('interpreter', Interpreter),
+    ('specializing', SpecializingInterpreter),
+)
+
+
+def measure(engine_class, statements, repeat):
+    """
+    Return best time in seconds of executing the statements and their output
+    """
+    best_time, output = None, None
+    for _ in range(repeat):
+        output = io.StringIO()
+        started = time.perf_counter()
+        with redirect_stdout(output):
+            engine_class(statements).interpret()
+        elapsed = time.perf_counter() - started
+        best_time = elapsed if best_time is None else min(best_time, elapsed)
+    return best_time, output.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Function calls benchmark')
+    arg_parser.add_argument('--calls', type=int, default=20000, help='calls of the function per program')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='number of runs (best one is reported)')
+    args = arg_parser.parse_args()
+    Logger.PARSER_LOGGER_ENABLED = Logger.INTERPRETER_LOGGER_ENABLED = Logger.ENVIRONEMNT_LOGGER_ENABLED = False
+
+    print('{:<10}'.format('program') + ''.join('{:>20}'.format(name) for name, _ in ENGINES) + '{:>9}'.format('speedup'))
+    for program_name, template in PROGRAMS:
+        source_code = template.format(calls=args.calls)
+        results = []
+        for _, engine_class in ENGINES:
+            results.append(measure(engine_class, Parser(RegexLexer(source_code).scan()).parse(), args.repeat))
+        if any(output != results[0][1] for _, output in results):
+            raise AssertionError('engines disagree on the output of ' + program_name)
+
+        print('{:<10}'.format(program_name) + ''.join(
+            '{:>11.0f} calls/s'.format(args.calls / elapsed) for elapsed, _ in results) +
+            '{:>8.2f}x'.format(results[0][0] / results[1][0]))
+
+
+if __name__ == '__main__':
+    main()
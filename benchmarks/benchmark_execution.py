@@ -0,0 +1,136 @@
+"""
+Benchmark of the execution engines on CPU-bound programs: a tight loop, function calls in a loop, recursive calls
+(functions do not see themselves, the function gets itself as an argument) and the fibonacci function of the fibonacci
+sample. Parsing is not measured, times of the VirtualMachine, the ClosureInterpreter and the CompiledInterpreter
+include compiling the program.
+Run from the repository root: python -m benchmarks.benchmark_execution [--iterations N] [--repeat N]
+"""
+import argparse
+import io
+import time
+from contextlib import redirect_stdout
+from src.interpreter import Interpreter
+from src.lexer_regex import RegexLexer
+from src.logger import Logger
+from src.parser import Parser
+from src.virtual_machine import VirtualMachine
+from src.closure_compiler import ClosureInterpreter
+from src.transpiler import CompiledInterpreter
+from src.specializing_interpreter import SpecializingInterpreter
+
+ENGINES = (
+    ('interpreter', Interpreter),
+    ('specializing', SpecializingInterpreter),
+    ('vm', VirtualMachine),
+    ('closures', ClosureInterpreter),
+    ('python', CompiledInterpreter),
+)
+
+LOOP_PROGRAM = '''
+var total = 0;
+var counter = 0;
+while (counter < {iterations}) {{
+    total = total + counter % 7 * 2;
+    counter = counter + 1;
+}}
+print total;
+'''
+
+CALLS_PROGRAM = '''
+function is_leap_year(year) {{
+    return year % 400 == 0 || year % 4 == 0 && year % 100 != 0;
+}}
+var leap_years = 0;
+for (var year = 0; year < {iterations}; year = year + 1) {{
+    if (is_leap_year(year)) leap_years = leap_years + 1;
+}}
+print leap_years;
+'''
+
+RECURSION_PROGRAM = '''
+function fib(self, n) {{
+    if (n < 2) return n;
+    return self(self, n - 1) + self(self, n - 2);
+}}
+print fib(fib, {depth});
+'''
+
+FIBONACCI_PROGRAM = '''
+function fib(n) {{
+    if (n < 2) return n;
+    var first_number = 0;
+    var second_number = 1;
+    var third_number = 0;
+    var counter = 0;
+    while (counter + 1 < n) {{
+        third_number = first_number + second_number;
+        first_number = second_number;
+        second_number = third_number;
+        counter = counter + 1;
+    }}
+    return third_number;
+}}
+var index = 0;
+while (index < {iterations} / 50) {{
+    print fib(index % 50);
+    index = index + 1;
+}}
+'''
+
+PROGRAMS = (
+    ('loop', LOOP_PROGRAM),
+    ('calls', CALLS_PROGRAM),
+    ('recursion', RECURSION_PROGRAM),
+    ('fibonacci', FIBONACCI_PROGRAM),
+)
+
+
+def recursion_depth(calls):
+    """
+    Return the smallest n for which fib(fib, n) of the RECURSION_PROGRAM makes at least the given number of calls
+    """
+    # calls(n) = calls(n - 1) + calls(n - 2) + 1, calls(0) = calls(1) = 1
+    depth, depth_calls, previous_calls = 0, 1, -1
+    while depth_calls < calls:
+        depth, depth_calls, previous_calls = depth + 1, depth_calls + previous_calls + 1, depth_calls
+    return depth
+
+
+def measure(engine_class, statements, repeat):
+    """
+    Return best time in seconds of executing the statements and their output
+    """
+    best_time, output = None, None
+    for _ in range(repeat):
+        output = io.StringIO()
+        started = time.perf_counter()
+        with redirect_stdout(output):
+            engine_class(statements).interpret()
+        elapsed = time.perf_counter() - started
+        best_time = elapsed if best_time is None else min(best_time, elapsed)
+    return best_time, output.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Execution engines benchmark')
+    arg_parser.add_argument('--iterations', type=int, default=20000, help='iterations of the loops of the programs')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='number of runs (best one is reported)')
+    args = arg_parser.parse_args()
+    Logger.PARSER_LOGGER_ENABLED = Logger.INTERPRETER_LOGGER_ENABLED = Logger.ENVIRONEMNT_LOGGER_ENABLED = False
+
+    print('{:<12}'.format('program') + ''.join('{:>20}'.format(name) for name, _ in ENGINES))
+    for program_name, template in PROGRAMS:
+        source_code = template.format(iterations=args.iterations, depth=recursion_depth(args.iterations))
+        statements = Parser(RegexLexer(source_code).scan()).parse()
+        results = [measure(engine_class, statements, args.repeat) for _, engine_class in ENGINES]
+        if any(output != results[0][1] for _, output in results):
+            raise AssertionError('engines disagree on the output of ' + program_name)
+
+        # speedup relative to the first engine
+        baseline = results[0][0]
+        print('{:<12}'.format(program_name) + ''.join(
+            '{:>11.1f} ms (x{:.1f})'.format(elapsed * 1000, baseline / elapsed) for elapsed, _ in results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Scaling benchmark of the phases of Orchestrator.execute (lex, parse, interpret) and of printing the AST,
+run on synthetic programs of growing size (see program_generator). For every size and phase it records time,
+tokens/sec, statements/sec (top-level statements) and peak memory allocated by the phase, writes the results
+as JSON and flags phases which scale non-linearly (time or memory growing faster than the size of the program).
+Interpreting is measured with --interpret.
+Run from the repository root:
+python -m benchmarks.benchmark_frontend [--sizes-kb N ...] [--interpret] [--output FILE] [--seed N] ...
+"""
+import argparse
+import io
+import json
+import math
+import os
+import runpy
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from benchmarks.program_generator import ProgramGenerator, STATEMENT_KINDS
+from src.abstract_syntax_tree import AbstractSyntaxTree
+from src.logger import Logger
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# olc is a script (no .py extension) - its definitions are taken without running its main block
+OLC = runpy.run_path(os.path.join(ROOT_DIRECTORY, 'olc'))
+
+# phase scales non-linearly if its time or memory grows with exponent over this between two sizes
+# (time per byte doubling when the size doubles is exponent 2)
+NON_LINEAR_EXPONENT = 1.25
+
+# scaling of shorter phases (or phases allocating less) is dominated by noise, it is not flagged
+MIN_FLAGGED_SECONDS = 0.01
+MIN_FLAGGED_BYTES = 2 ** 16
+
+
+def lex(orchestrator, state):
+    lexer = orchestrator.lexer_class(state['source_code'], compact=orchestrator.compact_tokens)
+    lexer.scan()
+    state['tokens'] = lexer.get_tokens()
+
+
+def parse(orchestrator, state):
+    state['statements'] = orchestrator.parse_tokens(state['tokens'])
+    assert state['statements'] is not None, 'generated program has parse errors'
+
+
+def print_ast(orchestrator, state):
+    for statement in state['statements']:
+        str(AbstractSyntaxTree(statement))
+
+
+def interpret(orchestrator, state):
+    with redirect_stdout(io.StringIO()):
+        orchestrator.execute_statements(state['statements'])
+
+
+PHASES = (('lex', lex), ('parse', parse), ('print_ast', print_ast), ('interpret', interpret))
+
+
+def measure(orchestrator, source_code, phases):
+    """
+    Return {phase name: (seconds, peak bytes)} of running the phases on the source code. Phases run twice -
+    timed without tracing memory, then traced (tracemalloc slows them down several times)
+    """
+    results = {}
+    for trace_memory in (False, True):
+        state = {'source_code': source_code}
+        for name, phase in phases:
+            if trace_memory:
+                tracemalloc.start()
+            started = time.perf_counter()
+            phase(orchestrator, state)
+            elapsed = time.perf_counter() - started
+            if trace_memory:
+                results[name] = (results[name], tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            else:
+                results[name] = elapsed
+        token_count, statement_count = len(state['tokens']), len(state['statements'])
+    return token_count, statement_count, results
+
+
+def scaling_exponent(smaller_size, smaller_value, size, value, min_value):
+    if smaller_value < min_value or value <= 0:
+        return None
+    return math.log(value / smaller_value) / math.log(size / smaller_size)
+
+
+def flag_non_linear(runs, phase_names):
+    """
+    Return descriptions of the phases scaling non-linearly between consecutive sizes of the runs
+    """
+    flags = []
+    for smaller, run in zip(runs, runs[1:]):
+        for name in phase_names:
+            for metric, min_value in (('seconds', MIN_FLAGGED_SECONDS), ('peak_memory_bytes', MIN_FLAGGED_BYTES)):
+                exponent = scaling_exponent(smaller['size_bytes'], smaller['phases'][name][metric],
+                                            run['size_bytes'], run['phases'][name][metric], min_value)
+                if exponent is not None and exponent > NON_LINEAR_EXPONENT:
+                    flags.append({
+                        'phase': name,
+                        'metric': metric,
+                        'from_size_bytes': smaller['size_bytes'],
+                        'to_size_bytes': run['size_bytes'],
+                        'exponent': round(exponent, 2),
+                    })
+    return flags
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Front end scaling benchmark')
+    arg_parser.add_argument('--sizes-kb', type=int, nargs='+', default=[64, 256, 1024],
+                            help='sizes of the generated programs')
+    arg_parser.add_argument('--seed', type=int, default=0, help='seed of the program generator')
+    for kind in STATEMENT_KINDS:
+        arg_parser.add_argument('--' + kind, type=float, default=1, help='weight of the {}'.format(kind))
+    arg_parser.add_argument('--lexer', choices=sorted(OLC['LEXER_ENGINES']), default='serial', help='lexer engine')
+    arg_parser.add_argument('--parser', choices=sorted(OLC['PARSER_ENGINES']), default='recursive',
+                            help='parser engine')
+    arg_parser.add_argument('--interpret', action='store_true', help='measure interpreting too')
+    arg_parser.add_argument('--output', default='benchmark_frontend.json', help='file the results are written to')
+    args = arg_parser.parse_args()
+    Logger.PARSER_LOGGER_ENABLED = Logger.INTERPRETER_LOGGER_ENABLED = Logger.ENVIRONEMNT_LOGGER_ENABLED = False
+
+    orchestrator = OLC['Orchestrator'](lexer_class=OLC['LEXER_ENGINES'][args.lexer], parser_engine=args.parser)
+    phases = PHASES if args.interpret else PHASES[:-1]
+    weights = {kind: getattr(args, kind) for kind in STATEMENT_KINDS}
+
+    runs = []
+    for size_kb in sorted(args.sizes_kb):
+        source_code = ProgramGenerator(seed=args.seed, **weights).generate(size_kb * 1024)
+        token_count, statement_count, results = measure(orchestrator, source_code, phases)
+        runs.append({
+            'size_bytes': len(source_code),
+            'tokens': token_count,
+            'statements': statement_count,
+            'phases': {
+                name: {
+                    'seconds': seconds,
+                    'tokens_per_second': token_count / seconds,
+                    'statements_per_second': statement_count / seconds,
+                    'peak_memory_bytes': peak,
+                } for name, (seconds, peak) in results.items()
+            },
+        })
+        print('{:>8} KB, {:>9} tokens, {:>7} statements'.format(size_kb, token_count, statement_count))
+        for name, (seconds, peak) in results.items():
+            print('    {:<10} {:>8.3f} s {:>11.0f} tokens/s {:>9.0f} statements/s {:>8.1f} MB peak'.format(
+                name, seconds, token_count / seconds, statement_count / seconds, peak / 2 ** 20))
+
+    flags = flag_non_linear(runs, [name for name, _ in phases])
+    for flag in flags:
+        print('NON-LINEAR: {phase} {metric} from {from_size_bytes} to {to_size_bytes} bytes '
+              '(exponent {exponent})'.format(**flag))
+
+    with open(args.output, 'w') as file:
+        json.dump({
+            'lexer': args.lexer,
+            'parser': args.parser,
+            'seed': args.seed,
+            'weights': weights,
+            'runs': runs,
+            'non_linear': flags,
+        }, file, indent=2)
+    print('Results written to {}'.format(args.output))
+
+
+if __name__ == '__main__':
+    main()
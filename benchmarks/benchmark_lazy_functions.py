@@ -0,0 +1,69 @@
+"""
+Startup benchmark of the lazy function-body parsing: a library of many functions, of which only a few get called.
+Front end cost is measured - parsing of the library plus parsing of the bodies of the called functions
+(the function definitions are not executed).
+Run from the repository root: python -m benchmarks.benchmark_lazy_functions [--called N]
+"""
+import argparse
+import time
+from benchmarks.program_generator import variable_name
+from src.lexer_regex import RegexLexer
+from src.logger import Logger
+from src.parser import Parser
+
+FUNCTION_TEMPLATE = '''function {name}(first, second) {{
+    var result = first * second + 1;
+    if (result > 100) {{
+        result = result - first * (second + 2) / 3;
+    }} else {{
+        result = result + (first - second) ** 2;
+    }}
+    var counter = 0;
+    while (counter < 3) {{
+        result = result + counter * first - second % 7;
+        counter = counter + 1;
+    }}
+    return result;
+}}
+'''
+
+
+LIBRARY_SIZES = (100, 500, 2000)
+
+
+def build_source_code(functions, called):
+    names = ['library_' + variable_name(index) for index in range(functions)]
+    library = ''.join(FUNCTION_TEMPLATE.format(name=name) for name in names)
+    calls = ''.join('print {}(3, 4);\n'.format(name) for name in names[:called])
+    return library + calls
+
+
+def measure(tokens, lazy, called):
+    """
+    Return (parse time, time of parsing plus getting the statements of the called functions) in seconds
+    """
+    started = time.perf_counter()
+    statements = Parser(tokens, lazy_function_bodies=lazy).parse()
+    parsed = time.perf_counter()
+    for function_statement in statements[:called]:
+        function_statement.body.statements
+    return parsed - started, time.perf_counter() - started
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Lazy function bodies benchmark')
+    arg_parser.add_argument('--called', type=int, default=5, help='number of functions called by the program')
+    args = arg_parser.parse_args()
+
+    Logger.PARSER_LOGGER_ENABLED = False
+    for functions in LIBRARY_SIZES:
+        source_code = build_source_code(functions, args.called)
+        tokens = RegexLexer(source_code).scan()
+        print('{} functions ({:.1f} KB), {} called:'.format(functions, len(source_code) / 1024, args.called))
+        for name, lazy in (('eager', False), ('lazy', True)):
+            parse_time, total_time = measure(tokens, lazy, args.called)
+            print('    {:<6} parse {:>8.4f} s, with called bodies {:>8.4f} s'.format(name, parse_time, total_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark comparing the character-by-character Lexer with the RegexLexer.
+Run from the repository root: python -m benchmarks.benchmark_lexer [--size-kb N] [--repeat N]
+"""
+import argparse
+import glob
+import os
+import time
+from src.lexer import Lexer
+from src.lexer_regex import RegexLexer
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_source_code(size_kb):
+    """
+    Return source code of (approximately) given size, built by repeating the sample programs
+    """
+    sample_files = sorted(glob.glob(os.path.join(ROOT_DIRECTORY, 'sample_programs', '*.olc')))
+    samples = []
+    for filename in sample_files:
+        with open(filename) as file:
+            samples.append(file.read())
+    chunk = '\n'.join(samples) + '\n'
+    return chunk * max(1, size_kb * 1024 // len(chunk))
+
+
+def measure(lexer_class, source_code, repeat):
+    """
+    Return (number of tokens, best time in seconds) of scanning the source code
+    """
+    best_time = None
+    token_count = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        token_count = len(lexer_class(source_code).scan())
+        elapsed = time.perf_counter() - started
+        best_time = elapsed if best_time is None else min(best_time, elapsed)
+    return token_count, best_time
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Lexer engines benchmark')
+    arg_parser.add_argument('--size-kb', type=int, default=1024, help='size of the generated source code')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='number of runs (best one is reported)')
+    args = arg_parser.parse_args()
+
+    source_code = build_source_code(args.size_kb)
+    print('Source code: {:.1f} KB, {} lines'.format(len(source_code) / 1024, source_code.count('\n')))
+
+    results = {}
+    for lexer_class in (Lexer, RegexLexer):
+        token_count, elapsed = measure(lexer_class, source_code, args.repeat)
+        results[lexer_class.__name__] = elapsed
+        print('{:<12} {:>9} tokens {:>8.3f} s {:>12,.0f} tokens/s'.format(
+            lexer_class.__name__, token_count, elapsed, token_count / elapsed))
+
+    print('Speedup: {:.2f}x'.format(results['Lexer'] / results['RegexLexer']))
+
+
+if __name__ == '__main__':
+    main()
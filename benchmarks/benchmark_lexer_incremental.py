@@ -0,0 +1,50 @@
+"""
+Latency of re-lexing after a small edit with the IncrementalLexer, compared with scanning the whole file again.
+Run from the repository root: python -m benchmarks.benchmark_lexer_incremental [--edits N]
+"""
+import argparse
+import random
+import time
+from benchmarks.benchmark_lexer import build_source_code
+from src.lexer_incremental import IncrementalLexer
+from src.lexer_regex import RegexLexer
+
+SIZES_KB = (64, 256, 1024, 4096)
+
+
+def measure_edits(source_code, edit_count):
+    """
+    Return average time in seconds of one edit (one character typed and deleted again at random places)
+    """
+    lexer = IncrementalLexer(source_code)
+    lexer.scan()
+    offsets = [random.randrange(len(source_code)) for _ in range(edit_count)]
+    started = time.perf_counter()
+    for offset in offsets:
+        lexer.edit(offset, 0, 'x')
+        lexer.edit(offset, 1, '')
+    return (time.perf_counter() - started) / (2 * edit_count)
+
+
+def measure_full_scan(source_code):
+    started = time.perf_counter()
+    RegexLexer(source_code, compact=True).scan()
+    return time.perf_counter() - started
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Incremental lexer benchmark')
+    arg_parser.add_argument('--edits', type=int, default=200, help='number of edits per source code size')
+    args = arg_parser.parse_args()
+    random.seed(0)
+
+    for size_kb in SIZES_KB:
+        source_code = build_source_code(size_kb)
+        edit_time = measure_edits(source_code, args.edits)
+        scan_time = measure_full_scan(source_code)
+        print('{:>6} KB   edit {:>8.3f} ms   full scan {:>9.3f} ms {:>9.0f}x'.format(
+            size_kb, edit_time * 1000, scan_time * 1000, scan_time / edit_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Scaling benchmark of the ParallelLexer across 1, 2, 4 and 8 worker processes.
+Run from the repository root: python -m benchmarks.benchmark_lexer_parallel [--size-kb N] [--compact]
+"""
+import argparse
+import os
+import time
+from benchmarks.benchmark_lexer import build_source_code
+from src.lexer_parallel import ParallelLexer
+from src.lexer_regex import RegexLexer
+
+
+def measure(create_lexer, repeat):
+    best_time = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        token_count = len(create_lexer().scan())
+        elapsed = time.perf_counter() - started
+        best_time = elapsed if best_time is None else min(best_time, elapsed)
+    return token_count, best_time
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Parallel lexer scaling benchmark')
+    arg_parser.add_argument('--size-kb', type=int, default=8192, help='size of the generated source code')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='number of runs (best one is reported)')
+    arg_parser.add_argument('--compact', action='store_true', help='keep tokens in TokenBuffer (no TokenOsu objects)')
+    args = arg_parser.parse_args()
+
+    source_code = build_source_code(args.size_kb)
+    print('Source code: {:.1f} MB, CPUs available: {}, compact: {}'.format(
+        len(source_code) / 2 ** 20, os.cpu_count(), args.compact))
+
+    token_count, serial_time = measure(lambda: RegexLexer(source_code, compact=args.compact), args.repeat)
+    print('{:<18} {:>9} tokens {:>8.3f} s'.format('serial RegexLexer', token_count, serial_time))
+
+    for workers in (1, 2, 4, 8):
+        token_count, elapsed = measure(
+            lambda: ParallelLexer(source_code, compact=args.compact, workers=workers), args.repeat)
+        print('{:<18} {:>9} tokens {:>8.3f} s {:>6.2f}x'.format(
+            '{} worker(s)'.format(workers), token_count, elapsed, serial_time / elapsed))
+
+
+if __name__ == '__main__':
+    main()
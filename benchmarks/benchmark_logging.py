@@ -0,0 +1,60 @@
+"""
+Benchmark of interpreting the fibonacci sample with logging on, with the environment subsystem raised to the INFO
+level (no dumps of the scope chain on every write), and off. Messages are formatted only when they are emitted,
+so with logging off the interpreter does not print any statement or environment.
+Run from the repository root: python -m benchmarks.benchmark_logging [--repeat N]
+(python -O -m benchmarks.benchmark_logging compiles the logging calls out)
+"""
+import argparse
+import io
+import os
+import time
+from contextlib import redirect_stdout
+from src.constants import AppType
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.logger import Logger
+from src.parser import Parser
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (subsystems enabled, levels of the subsystems)
+SETTINGS = (
+    ('logging on', True, {}),
+    ('environment at INFO', True, {AppType.ENVIRONMENT: Logger.INFO}),
+    ('logging off', False, {}),
+)
+
+
+def measure(statements, repeat):
+    """
+    Return best time in seconds of interpreting the statements (log and output are discarded)
+    """
+    best_time = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            Interpreter(statements).interpret()
+        elapsed = time.perf_counter() - started
+        best_time = elapsed if best_time is None else min(best_time, elapsed)
+    return best_time
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Logging overhead benchmark')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='number of runs (best one is reported)')
+    args = arg_parser.parse_args()
+
+    with open(os.path.join(ROOT_DIRECTORY, 'sample_programs', 'fibonacci.olc')) as file:
+        source_code = file.read()
+    Logger.PARSER_LOGGER_ENABLED = False
+    statements = Parser(Lexer(source_code).scan()).parse()
+
+    for name, enabled, levels in SETTINGS:
+        Logger.INTERPRETER_LOGGER_ENABLED = Logger.ENVIRONEMNT_LOGGER_ENABLED = enabled
+        Logger.LEVELS = levels
+        print('{:<20} {:>8.2f} ms'.format(name, measure(statements, args.repeat) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark of scanning a large source file: reading it into a string vs scanning the memory-mapped file.
+Run from the repository root: python -m benchmarks.benchmark_mmap [--size-kb N]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from benchmarks.benchmark_lexer import build_source_code
+from src.lexer_bytes import BytesLexer, map_source_file
+from src.lexer_regex import RegexLexer
+
+
+def scan_text_file(filename):
+    with open(filename) as file:
+        return len(RegexLexer(file.read()).scan())
+
+
+def scan_text_file_compact(filename):
+    with open(filename) as file:
+        return len(RegexLexer(file.read(), compact=True).scan())
+
+
+def scan_mapped_file(filename):
+    with open(filename, 'rb') as file:
+        source_code = map_source_file(file)
+        token_count = len(BytesLexer(source_code).scan())
+        source_code.close()
+        return token_count
+
+
+def measure(scan, filename):
+    """
+    Return (number of tokens, elapsed seconds, peak of the Python heap in bytes).
+    Time and memory are measured in separate runs, as tracing memory allocations slows everything down
+    """
+    started = time.perf_counter()
+    token_count = scan(filename)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    scan(filename)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return token_count, elapsed, peak
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Memory-mapped lexer benchmark')
+    arg_parser.add_argument('--size-kb', type=int, default=8192, help='size of the generated source file')
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'large_program.olc')
+        with open(filename, 'w') as file:
+            file.write(build_source_code(args.size_kb))
+        print('Source file: {:.1f} MB'.format(os.path.getsize(filename) / 2 ** 20))
+
+        for name, scan in (
+            ('read + TokenOsu list', scan_text_file),
+            ('read + TokenBuffer', scan_text_file_compact),
+            ('mmap + BytesLexer', scan_mapped_file),
+        ):
+            token_count, elapsed, peak = measure(scan, filename)
+            print('{:<22} {:>9} tokens {:>7.3f} s, peak heap {:>7.1f} MB'.format(
+                name, token_count, elapsed, peak / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
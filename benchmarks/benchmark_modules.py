@@ -0,0 +1,69 @@
+"""
+Benchmark of a program including a large shared library (include "library_N.olc";). The library is compiled
+(lexed and parsed) on the first include only - later programs of the same process take it from the ModuleCache,
+new processes from the on-disk AstCache. Independent libraries are compiled in parallel (--workers).
+Run from the repository root: python -m benchmarks.benchmark_modules [--libraries N] [--workers N]
+"""
+import argparse
+import os
+import tempfile
+import time
+from benchmarks.benchmark_lazy_functions import FUNCTION_TEMPLATE
+from benchmarks.program_generator import variable_name
+from src.ast_cache import AstCache
+from src.lexer_regex import RegexLexer
+from src.logger import Logger
+from src.module_cache import ModuleCache, ModuleCompiler
+from src.parser import Parser
+
+FUNCTIONS_PER_LIBRARY = 500
+
+
+def write_libraries(directory, libraries):
+    for library in range(libraries):
+        names = ['library_{}_{}'.format(variable_name(library), variable_name(index))
+                 for index in range(FUNCTIONS_PER_LIBRARY)]
+        with open(os.path.join(directory, 'library_{}.olc'.format(library)), 'w') as file:
+            file.write(''.join(FUNCTION_TEMPLATE.format(name=name) for name in names))
+
+
+def measure(modules, statements, directory):
+    """
+    Return seconds spent compiling the includes of the program
+    """
+    started = time.perf_counter()
+    failed_modules = modules.compile_includes(statements, directory)
+    assert not failed_modules, failed_modules[0].errors
+    return time.perf_counter() - started
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--libraries', type=int, default=4, help='number of included libraries')
+    arg_parser.add_argument('--workers', type=int, default=os.cpu_count(), help='worker processes')
+    args = arg_parser.parse_args()
+    Logger.PARSER_LOGGER_ENABLED = False
+
+    with tempfile.TemporaryDirectory() as directory, tempfile.TemporaryDirectory() as cache_directory:
+        write_libraries(directory, args.libraries)
+        program = ''.join('include "library_{}.olc";\n'.format(library) for library in range(args.libraries))
+        statements = Parser(RegexLexer(program).scan()).parse()
+        compiler = ModuleCompiler(lexer_class=RegexLexer)
+        cached_compiler = ModuleCompiler(lexer_class=RegexLexer, ast_cache=AstCache(cache_directory))
+
+        print('{} libraries of {} functions ({:.0f} KB each)'.format(
+            args.libraries, FUNCTIONS_PER_LIBRARY, os.path.getsize(os.path.join(directory, 'library_0.olc')) / 1024))
+        print('compiled serially:        {:8.1f} ms'.format(
+            measure(ModuleCache(compiler, workers=1), statements, directory) * 1000))
+        print('compiled by {} workers:    {:8.1f} ms'.format(
+            args.workers, measure(ModuleCache(compiler, workers=args.workers), statements, directory) * 1000))
+
+        modules = ModuleCache(cached_compiler, workers=args.workers)
+        measure(modules, statements, directory)
+        print('again in the same process: {:7.3f} ms'.format(measure(modules, statements, directory) * 1000))
+        print('new process, AstCache hit: {:7.1f} ms'.format(
+            measure(ModuleCache(cached_compiler, workers=args.workers), statements, directory) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark of the Optimizer on template-generated code: the settings of the template are literals, so the program
+is full of constant sub-expressions and if (FALSE) debug branches inside its loops. Reports the folded expressions
+and removed statements, and the execution times of the engines on the original and the optimized statements
+(parsing and optimizing are not measured, the time of the Optimizer is reported separately).
+Run from the repository root: python -m benchmarks.benchmark_optimizer [--iterations N] [--repeat N]
+"""
+import argparse
+import time
+from benchmarks.benchmark_execution import ENGINES, measure
+from src.lexer_regex import RegexLexer
+from src.logger import Logger
+from src.optimizer import Optimizer
+from src.parser import Parser
+from src.resolver import Resolver
+
+SETTINGS = {
+    'debug': 'FALSE',
+    'verbose': 'FALSE',
+    'width': 640,
+    'height': 480,
+    'modulus': 7,
+    'label': '"total"',
+}
+
+TEMPLATE_PROGRAM = '''
+function scale(value) {{
+    return value * ({width} * {height}) / ({width} + {height} * 2);
+    print "unreachable";
+}}
+var total = 0;
+var counter = 0;
+while (counter < {iterations}) {{
+    if ({debug}) {{
+        print "counter " + counter;
+    }}
+    total = total + counter % ({modulus} + 1) * (({width} - {height}) / 16 - 9);
+    if ({debug} && {verbose}) print total;
+    if ({debug} || counter % ({modulus} * 3) == 0) total = total + scale(counter) - {width} / 2 + {height} / 2;
+    if ({width} < {height}) total = total - 1;
+    counter = counter + 1;
+}}
+if ({debug}) print "done";
+print {label} + ": " + "";
+print total;
+'''
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Optimizer benchmark')
+    arg_parser.add_argument('--iterations', type=int, default=20000, help='iterations of the loop of the program')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='number of runs (best one is reported)')
+    args = arg_parser.parse_args()
+    Logger.PARSER_LOGGER_ENABLED = Logger.INTERPRETER_LOGGER_ENABLED = Logger.ENVIRONEMNT_LOGGER_ENABLED = False
+
+    source_code = TEMPLATE_PROGRAM.format(iterations=args.iterations, **SETTINGS)
+    statements = Parser(RegexLexer(source_code).scan()).parse()
+    resolver = Resolver()
+    resolver.resolve(statements)
+    if resolver.error_handler.has_errors():
+        raise AssertionError('template program does not resolve')
+
+    optimizer = Optimizer()
+    started = time.perf_counter()
+    optimized_statements = optimizer.optimize(statements)
+    elapsed = time.perf_counter() - started
+    print('optimizer folded {} expressions and removed {} statements in {:.2f} ms'.format(
+        optimizer.folded_expressions, optimizer.removed_statements, elapsed * 1000))
+
+    print('{:<12}{:>12}{:>12}{:>10}'.format('engine', 'original', 'optimized', 'speedup'))
+    for name, engine_class in ENGINES:
+        original_time, original_output = measure(engine_class, statements, args.repeat)
+        optimized_time, optimized_output = measure(engine_class, optimized_statements, args.repeat)
+        if optimized_output != original_output:
+            raise AssertionError('optimized program prints different output on ' + name)
+        print('{:<12}{:>9.1f} ms{:>9.1f} ms{:>9.2f}x'.format(
+            name, original_time * 1000, optimized_time * 1000, original_time / optimized_time))
+
+
+if __name__ == '__main__':
+    main()
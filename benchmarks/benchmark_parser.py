@@ -0,0 +1,90 @@
+"""
+Benchmark comparing the recursive descent expression parsing of Parser with the PrattParser,
+on the tests/olc_programs and on generated expression-heavy source code.
+Run from the repository root: python -m benchmarks.benchmark_parser [--repeat N] [--expressions N]
+"""
+import argparse
+import glob
+import os
+import random
+import time
+from src.lexer_regex import RegexLexer
+from src.logger import Logger
+from src.parser import Parser
+from src.parser_pratt import PrattParser
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# '^' is left out - the lexer scans it as NOT
+OPERATORS = ('+', '-', '*', '/', '%', '**', '<', '<=', '>', '>=', '==', '!=', '&&', '||')
+
+OPERANDS = ('alpha', 'beta', '1', '2.5', '"text"', 'true', 'null')
+
+
+def build_expression(depth):
+    """
+    Return random expression with (at most) given depth of nesting
+    """
+    choice = random.random()
+    if depth == 0 or choice < 0.2:
+        return random.choice(OPERANDS)
+    if choice < 0.3:
+        return random.choice(('-', '!')) + build_expression(depth - 1)
+    if choice < 0.4:
+        return '(' + build_expression(depth - 1) + ')'
+    if choice < 0.45:
+        return 'func(' + build_expression(depth - 1) + ', ' + build_expression(depth - 1) + ')'
+    return build_expression(depth - 1) + ' ' + random.choice(OPERATORS) + ' ' + build_expression(depth - 1)
+
+
+def build_expressions_source_code(expressions):
+    random.seed(0)
+    return ''.join('result = {};\n'.format(build_expression(6)) for _ in range(expressions))
+
+
+def read_test_programs():
+    source_code = ''
+    for filename in sorted(glob.glob(os.path.join(ROOT_DIRECTORY, 'tests', 'olc_programs', '*.olc'))):
+        with open(filename) as file:
+            source_code += file.read() + '\n'
+    return source_code
+
+
+def measure(parser_class, tokens, repeat):
+    """
+    Return (number of statements, best time in seconds) of parsing the tokens
+    """
+    best_time = None
+    statement_count = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        statement_count = len(parser_class(tokens).parse())
+        elapsed = time.perf_counter() - started
+        best_time = elapsed if best_time is None else min(best_time, elapsed)
+    return statement_count, best_time
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Expression parser benchmark')
+    arg_parser.add_argument('--repeat', type=int, default=20, help='number of runs (best one is reported)')
+    arg_parser.add_argument('--expressions', type=int, default=2000, help='number of generated expressions')
+    args = arg_parser.parse_args()
+
+    Logger.PARSER_LOGGER_ENABLED = False
+    inputs = (
+        ('tests/olc_programs', read_test_programs()),
+        ('synthetic expressions', build_expressions_source_code(args.expressions)),
+    )
+    for name, source_code in inputs:
+        tokens = RegexLexer(source_code).scan()
+        print('{} ({} tokens):'.format(name, len(tokens)))
+        results = {}
+        for parser_class in (Parser, PrattParser):
+            statement_count, elapsed = measure(parser_class, tokens, args.repeat)
+            results[parser_class] = elapsed
+            print('    {:<12} {:>6} statements {:>9.4f} s'.format(parser_class.__name__, statement_count, elapsed))
+        print('    Speedup: {:.2f}x'.format(results[Parser] / results[PrattParser]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Re-parse time of the IncrementalParser after an edit of 1 to 100 functions of a library, compared with parsing
+the whole library again. Parsing work follows the number of edited functions, what grows with the size of the library
+is the comparison of the unchanged statements with their previous tokens (a fraction of the cost of parsing them).
+Tokens are scanned in advance, only the parsing is measured.
+Run from the repository root: python -m benchmarks.benchmark_parser_incremental
+"""
+import time
+from benchmarks.benchmark_lazy_functions import build_source_code
+from src.lexer_regex import RegexLexer
+from src.logger import Logger
+from src.parser import Parser
+from src.parser_incremental import IncrementalParser
+
+LIBRARY_SIZES = (500, 2000)
+
+EDITED_FUNCTIONS = (1, 10, 100)
+
+REPEATS = 4
+
+ORIGINAL_TEXT = 'first * second + 1'
+
+EDITED_TEXT = 'first * second + 2'
+
+
+def edit_functions(source_code, edited_functions):
+    """
+    Return the source code with the bodies of given number of functions in the middle of the library edited
+    """
+    middle = len(source_code) // 2
+    edited_part = source_code[middle:].replace(ORIGINAL_TEXT, EDITED_TEXT, edited_functions)
+    return source_code[:middle] + edited_part
+
+
+def measure_reparse(source_code, edited_source_code):
+    tokens, edited_tokens = RegexLexer(source_code).scan(), RegexLexer(edited_source_code).scan()
+    parser = IncrementalParser(tokens)
+    parser.parse()
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        parser.reparse(edited_tokens)
+        parser.reparse(tokens)
+    return (time.perf_counter() - started) / (2 * REPEATS)
+
+
+def measure_full_parse(source_code):
+    tokens = RegexLexer(source_code).scan()
+    started = time.perf_counter()
+    Parser(tokens).parse()
+    return time.perf_counter() - started
+
+
+def main():
+    Logger.PARSER_LOGGER_ENABLED = False
+    for functions in LIBRARY_SIZES:
+        source_code = build_source_code(functions, called=0)
+        parse_time = measure_full_parse(source_code)
+        print('{} functions ({:.1f} KB): full parse {:>8.1f} ms'.format(
+            functions, len(source_code) / 1024, parse_time * 1000))
+        for edited_functions in EDITED_FUNCTIONS:
+            reparse_time = measure_reparse(source_code, edit_functions(source_code, edited_functions))
+            print('    {:>3} edited functions: reparse {:>8.1f} ms {:>6.1f}x'.format(
+                edited_functions, reparse_time * 1000, parse_time / reparse_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark of variable access in a tight while loop nested in blocks of growing depth. The Resolver binds
+the variables to their slots, globals are looked up in one dict, so the time does not grow with the depth
+(environments used to be searched by name one by one from the innermost).
+Run from the repository root: python -m benchmarks.benchmark_resolver [--iterations N]
+"""
+import argparse
+import io
+import time
+from contextlib import redirect_stdout
+from src.interpreter import Interpreter
+from src.lexer_regex import RegexLexer
+from src.logger import Logger
+from src.parser import Parser
+
+DEPTHS = (1, 10, 50, 100)
+
+
+def build_source_code(depth, iterations):
+    loop = (
+        'var counter = 0;\n'
+        'while (counter < {}) {{\n'
+        '    total = total + counter;\n'
+        '    counter = counter + 1;\n'
+        '}}\n'
+    ).format(iterations)
+    return 'var total = 0;\n' + '{\n' * depth + loop + '}\n' * depth + 'print total;\n'
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Variable access benchmark')
+    arg_parser.add_argument('--iterations', type=int, default=20000, help='iterations of the loop')
+    args = arg_parser.parse_args()
+    Logger.PARSER_LOGGER_ENABLED = Logger.INTERPRETER_LOGGER_ENABLED = Logger.ENVIRONEMNT_LOGGER_ENABLED = False
+
+    for depth in DEPTHS:
+        statements = Parser(RegexLexer(build_source_code(depth, args.iterations)).scan()).parse()
+        started = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            Interpreter(statements).interpret()
+        print('loop nested in {:>3} blocks: {:>8.1f} ms'.format(depth, (time.perf_counter() - started) * 1000))
+
+
+if __name__ == '__main__':
+    main()
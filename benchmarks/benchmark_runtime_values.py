@@ -0,0 +1,101 @@
+"""
+Benchmark of the RuntimeValue allocations on the loop-heavy programs of benchmark_execution. Values of the literals
+are cached on the Literal nodes and TRUE, FALSE, NULL and the small INTs are shared singletons. The baseline is
+the 'allocating' Interpreter, which builds a new value for every evaluated literal and every operator result.
+Reports allocated RuntimeValues (counted in a separate run) and the best time of the engines.
+Run from the repository root: python -m benchmarks.benchmark_runtime_values [--iterations N] [--repeat N]
+"""
+import argparse
+import io
+from contextlib import contextmanager, redirect_stdout
+from benchmarks.benchmark_execution import PROGRAMS, measure, recursion_depth
+from src import interpreter_runtime
+from src.closure_compiler import ClosureInterpreter
+from src.interpreter import Interpreter
+from src.interpreter_runtime import RuntimeDataType, RuntimeOperators, RuntimeValue
+from src.lexer_regex import RegexLexer
+from src.logger import Logger
+from src.parser import Parser
+from src.virtual_machine import VirtualMachine
+
+
+class AllocatingInterpreter(Interpreter):
+    """
+    Interpreter which does not cache the values of the literals
+    """
+    def visit_literal_expression(self, literal_expression):
+        return RuntimeOperators.get_runtime_value_for_literal_token(token=literal_expression.value)
+
+
+@contextmanager
+def allocating_operators(enabled=True):
+    """
+    RuntimeOperators (and the literal tokens) return new INT and BOOL values instead of the singletons
+    """
+    if not enabled:
+        yield
+        return
+    int_value, bool_value = interpreter_runtime.int_value, interpreter_runtime.bool_value
+    interpreter_runtime.int_value = lambda value: RuntimeValue(value, RuntimeDataType.INT)
+    interpreter_runtime.bool_value = lambda value: RuntimeValue(value, RuntimeDataType.BOOL)
+    try:
+        yield
+    finally:
+        interpreter_runtime.int_value, interpreter_runtime.bool_value = int_value, bool_value
+
+
+# name, engine class, True if it runs with the allocating RuntimeOperators
+ENGINES = (
+    ('allocating', AllocatingInterpreter, True),
+    ('interpreter', Interpreter, False),
+    ('vm', VirtualMachine, False),
+    ('closures', ClosureInterpreter, False),
+)
+
+
+def count_allocations(engine_class, statements):
+    """
+    Return number of RuntimeValues allocated while executing the statements
+    """
+    allocations = [0]
+    original_init = RuntimeValue.__init__
+
+    def counting_init(self, *args, **kwargs):
+        allocations[0] += 1
+        original_init(self, *args, **kwargs)
+
+    RuntimeValue.__init__ = counting_init
+    try:
+        with redirect_stdout(io.StringIO()):
+            engine_class(statements).interpret()
+    finally:
+        RuntimeValue.__init__ = original_init
+    return allocations[0]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='RuntimeValue allocations benchmark')
+    arg_parser.add_argument('--iterations', type=int, default=20000, help='iterations of the loops of the programs')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='number of runs (best one is reported)')
+    args = arg_parser.parse_args()
+    Logger.PARSER_LOGGER_ENABLED = Logger.INTERPRETER_LOGGER_ENABLED = Logger.ENVIRONEMNT_LOGGER_ENABLED = False
+
+    print('{:<12}'.format('program') + ''.join('{:>28}'.format(name) for name, _, _ in ENGINES))
+    for program_name, template in PROGRAMS:
+        source_code = template.format(iterations=args.iterations, depth=recursion_depth(args.iterations))
+        results = []
+        for _, engine_class, allocating in ENGINES:
+            statements = Parser(RegexLexer(source_code).scan()).parse()
+            with allocating_operators(allocating):
+                allocations = count_allocations(engine_class, statements)
+                elapsed, output = measure(engine_class, statements, args.repeat)
+            results.append((allocations, elapsed, output))
+        if any(output != results[0][2] for _, _, output in results):
+            raise AssertionError('engines disagree on the output of ' + program_name)
+
+        print('{:<12}'.format(program_name) + ''.join(
+            '{:>10} values {:>8.1f} ms'.format(allocations, elapsed * 1000) for allocations, elapsed, _ in results))
+
+
+if __name__ == '__main__':
+    main()
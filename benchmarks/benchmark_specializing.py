@@ -0,0 +1,77 @@
+"""
+Benchmark of the SpecializingInterpreter on the sample programs: execution time against the Interpreter and hit rates
+of the inline caches of the operator, variable and call sites. Programs are executed --runs times per measurement
+(the inline caches stay on the nodes between the runs), hit rates are the ones of the first run.
+Parsing is not measured.
+Run from the repository root: python -m benchmarks.benchmark_specializing [--runs N] [--repeat N]
+"""
+import argparse
+import glob
+import io
+import os
+import time
+from contextlib import redirect_stdout
+from src.interpreter import Interpreter
+from src.lexer_regex import RegexLexer
+from src.logger import Logger
+from src.parser import Parser
+from src.specializing_interpreter import SITE_NAMES, SpecializingInterpreter
+
+PROGRAMS_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample_programs')
+
+
+def measure(engine_class, statements, runs, repeat):
+    """
+    Return best time in seconds of executing the statements runs times and the output of one run
+    """
+    best_time, output = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(runs):
+            output = io.StringIO()
+            with redirect_stdout(output):
+                engine_class(statements).interpret()
+        elapsed = time.perf_counter() - started
+        best_time = elapsed if best_time is None else min(best_time, elapsed)
+    return best_time, output.getvalue()
+
+
+def hit_rates(statements):
+    """
+    Return site kind name -> percentage of the evaluations of its sites which hit the inline cache (None if none)
+    """
+    engine = SpecializingInterpreter(statements)
+    with redirect_stdout(io.StringIO()):
+        engine.interpret()
+    return {name: 100.0 * hits / (hits + misses) if hits + misses else None
+            for name, (hits, misses) in engine.cache_statistics().items()}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Specializing interpreter benchmark')
+    arg_parser.add_argument('--runs', type=int, default=50, help='executions of a program per measurement')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='number of measurements (best one is reported)')
+    args = arg_parser.parse_args()
+    Logger.PARSER_LOGGER_ENABLED = Logger.INTERPRETER_LOGGER_ENABLED = Logger.ENVIRONEMNT_LOGGER_ENABLED = False
+
+    print('{:<16}{:>14}{:>14}{:>9}'.format('program', 'interpreter', 'specializing', 'speedup') +
+          ''.join('{:>10}'.format(name) for name in SITE_NAMES))
+    for path in sorted(glob.glob(os.path.join(PROGRAMS_DIRECTORY, '*.olc'))):
+        with open(path) as file:
+            source_code = file.read()
+        rates = hit_rates(Parser(RegexLexer(source_code).scan()).parse())
+        interpreter_time, interpreter_output = measure(
+            Interpreter, Parser(RegexLexer(source_code).scan()).parse(), args.runs, args.repeat)
+        specializing_time, specializing_output = measure(
+            SpecializingInterpreter, Parser(RegexLexer(source_code).scan()).parse(), args.runs, args.repeat)
+        if specializing_output != interpreter_output:
+            raise AssertionError('engines disagree on the output of ' + path)
+
+        print('{:<16}{:>11.1f} ms{:>11.1f} ms{:>8.2f}x'.format(
+            os.path.basename(path), interpreter_time * 1000, specializing_time * 1000,
+            interpreter_time / specializing_time) +
+            ''.join('{:>10}'.format('-' if rates[name] is None else '{:.1f}%'.format(rates[name])) for name in SITE_NAMES))
+
+
+if __name__ == '__main__':
+    main()
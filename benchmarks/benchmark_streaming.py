@@ -0,0 +1,82 @@
+"""
+Benchmark of the streaming front end: time to the first output and peak memory, batch vs streaming execution.
+Run from the repository root: python -m benchmarks.benchmark_streaming [--statements N]
+"""
+import argparse
+import io
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from benchmarks.program_generator import variable_name
+from src.interpreter import Interpreter
+from src.lexer_regex import RegexLexer
+from src.logger import Logger
+from src.parser import Parser
+from src.parser_streaming import StreamingParser
+
+
+class FirstWriteRecorder(io.StringIO):
+    """
+    Output stream remembering when the first output was written
+    """
+    def __init__(self):
+        super().__init__()
+        self.first_write_time = None
+
+    def write(self, text):
+        if self.first_write_time is None:
+            self.first_write_time = time.perf_counter()
+        return super().write(text)
+
+
+def build_source_code(statements):
+    lines = []
+    for index in range(statements):
+        lines.append('var {} = {} * 2 + 1; // statement {}'.format(variable_name(index % 50), index, index))
+        lines.append('print {} - 1;'.format(variable_name(index % 50)))
+    return '\n'.join(lines) + '\n'
+
+
+def run_batch(source_code):
+    tokens = RegexLexer(source_code).scan()
+    statements = Parser(tokens).parse()
+    Interpreter(statements).interpret()
+
+
+def run_streaming(source_code):
+    parser = StreamingParser(RegexLexer(source_code).scan_iter())
+    Interpreter().interpret(parser.parse_iter())
+
+
+def measure(run, source_code, trace_memory):
+    output = FirstWriteRecorder()
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with redirect_stdout(output):
+        run(source_code)
+    finished = time.perf_counter()
+    peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+    if trace_memory:
+        tracemalloc.stop()
+    return output.first_write_time - started, finished - started, peak
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Streaming front end benchmark')
+    arg_parser.add_argument('--statements', type=int, default=5000, help='number of generated statement pairs')
+    args = arg_parser.parse_args()
+
+    Logger.PARSER_LOGGER_ENABLED = Logger.INTERPRETER_LOGGER_ENABLED = Logger.ENVIRONEMNT_LOGGER_ENABLED = False
+    source_code = build_source_code(args.statements)
+    print('Source code: {:.1f} KB, {} statements'.format(len(source_code) / 1024, 2 * args.statements))
+
+    for name, run in (('batch', run_batch), ('streaming', run_streaming)):
+        first_output, total, _ = measure(run, source_code, trace_memory=False)
+        _, _, peak = measure(run, source_code, trace_memory=True)
+        print('{:<10} first output after {:>8.4f} s, total {:>7.3f} s, peak memory {:>7.1f} MB'.format(
+            name, first_output, total, peak / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark of the memory used by the scanned tokens: list of TokenOsu objects vs compact TokenBuffer.
+Run from the repository root: python -m benchmarks.benchmark_token_memory [--size-kb N]
+"""
+import argparse
+import gc
+import tracemalloc
+from benchmarks.benchmark_lexer import build_source_code
+from src.lexer_regex import RegexLexer
+
+
+def measure(source_code, compact):
+    """
+    Return (number of tokens, bytes held by the tokens, peak bytes allocated while scanning)
+    """
+    gc.collect()
+    tracemalloc.start()
+    tokens = RegexLexer(source_code, compact=compact).scan()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(tokens), current, peak
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Token storage memory benchmark')
+    arg_parser.add_argument('--size-kb', type=int, default=1024, help='size of the generated source code')
+    args = arg_parser.parse_args()
+
+    source_code = build_source_code(args.size_kb)
+    print('Source code: {:.1f} KB'.format(len(source_code) / 1024))
+
+    results = {}
+    for name, compact in (('TokenOsu list', False), ('TokenBuffer', True)):
+        token_count, current, peak = measure(source_code, compact)
+        results[name] = current / token_count
+        print('{:<14} {:>9} tokens {:>8.1f} MB held {:>8.1f} MB peak {:>7.1f} bytes/token'.format(
+            name, token_count, current / 2 ** 20, peak / 2 ** 20, current / token_count))
+
+    saved = results['TokenOsu list'] - results['TokenBuffer']
+    print('Saved: {:.1f} bytes/token ({:.1f}x less memory)'.format(
+        saved, results['TokenOsu list'] / results['TokenBuffer']))
+
+
+if __name__ == '__main__':
+    main()
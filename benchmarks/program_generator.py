@@ -0,0 +1,199 @@
+"""
+Seeded generator of synthetic OLC programs of any size (from KB to hundreds of MB), used by the scaling benchmarks.
+The same seed and settings always give the same program. The mix of generated statements is set by weights
+of the statement kinds (functions, loops, deep expressions, long strings and comments).
+Run from the repository root: python -m benchmarks.program_generator OUTPUT_FILE [--size-kb N] [--seed N] ...
+"""
+import argparse
+import random
+
+STATEMENT_KINDS = ('functions', 'loops', 'expressions', 'strings', 'comments')
+
+# seed variables are defined at the start of the program and never reassigned - expressions read only them,
+# so their values stay bounded however long the program is
+SEED_VARIABLES = 16
+
+# result variables written by the generated statements (they are reused, the environment does not grow)
+RESULT_VARIABLES = 64
+
+ARITHMETIC_OPERATORS = ('+', '-', '*')
+
+WORDS = ('lorem', 'ipsum', 'dolor', 'sit', 'amet', 'compiler', 'token', 'parser', 'tree', 'node', 'scope',
+         'value', 'closure', 'environment', 'statement', 'expression')
+
+
+def variable_name(index):
+    # OLC identifiers can not contain digits
+    return 'value_' + ''.join(chr(ord('a') + int(digit)) for digit in str(index))
+
+
+class ProgramGenerator:
+    """
+    Generator of valid (lexically, syntactically and at runtime) OLC programs. Generated loops are bounded,
+    every called function is defined before, and there is no division, so programs terminate without errors.
+    expression_depth bounds nesting of the generated expressions (the parser recurses on nested groups)
+    """
+    def __init__(self, seed=0, functions=1, loops=1, expressions=1, strings=1, comments=1,
+                 expression_depth=12, string_length=256, loop_iterations=4):
+        self.random = random.Random(seed)
+        self.weights = [functions, loops, expressions, strings, comments]
+        if not any(self.weights):
+            raise ValueError('At least one kind of statements must have nonzero weight')
+        self.expression_depth = expression_depth
+        self.string_length = string_length
+        self.loop_iterations = loop_iterations
+        self.function_count = 0
+        self.kind_generators = [
+            self._function, self._loop, self._expression_statement, self._string, self._comment]
+
+    def generate(self, size):
+        """
+        Return program of (at least) size characters
+        """
+        return ''.join(self.chunks(size))
+
+    def write(self, file, size):
+        """
+        Write program of (at least) size characters into the open file - the program is never held in memory
+        """
+        for chunk in self.chunks(size):
+            file.write(chunk)
+
+    def chunks(self, size):
+        """
+        Yield pieces of the program (each of them a whole statement) until they have size characters together
+        """
+        written = 0
+        for index in range(SEED_VARIABLES):
+            chunk = 'var {} = {};\n'.format(self._seed_variable(index), self.random.randint(1, 9))
+            written += len(chunk)
+            yield chunk
+        for index in range(RESULT_VARIABLES):
+            chunk = 'var {} = 0;\n'.format(self._result_variable(index))
+            written += len(chunk)
+            yield chunk
+
+        while written < size:
+            kind_generator = self.random.choices(self.kind_generators, self.weights)[0]
+            chunk = kind_generator()
+            written += len(chunk)
+            yield chunk
+
+    @staticmethod
+    def _seed_variable(index):
+        return 'seed_' + variable_name(index)
+
+    @staticmethod
+    def _result_variable(index):
+        return 'result_' + variable_name(index)
+
+    def _any_seed_variable(self):
+        return self._seed_variable(self.random.randrange(SEED_VARIABLES))
+
+    def _any_result_variable(self):
+        return self._result_variable(self.random.randrange(RESULT_VARIABLES))
+
+    def _operand(self, variables):
+        if self.random.random() < 0.5:
+            return self.random.choice(variables)
+        return str(self.random.randint(1, 99))
+
+    def _expression(self, variables, depth):
+        """
+        Return arithmetic expression over the variables, nested depth levels (only its first term is nested
+        that deep, so the size of the expression grows linearly with the depth)
+        """
+        if depth <= 0:
+            return self._operand(variables)
+        terms = [self._expression(variables, depth - 1 if index == 0 else self.random.randrange(min(depth, 2)))
+                 for index in range(self.random.randint(2, 4))]
+        expression = terms[0]
+        for term in terms[1:]:
+            expression += ' {} {}'.format(self.random.choice(ARITHMETIC_OPERATORS), term)
+        # remainder keeps the values small
+        return '({}) % {}'.format(expression, self.random.randint(2, 997))
+
+    def _seed_expression(self, depth):
+        return self._expression([self._any_seed_variable() for _ in range(4)], depth)
+
+    def _function(self):
+        self.function_count += 1
+        name = 'function_' + variable_name(self.function_count)
+        body = self._expression(['left', 'right'], self.random.randint(1, 3))
+        return (
+            'function {name}(left, right) {{\n'
+            '    var total = {body};\n'
+            '    if (total > {limit}) {{\n'
+            '        return total % {limit};\n'
+            '    }}\n'
+            '    return total + 1;\n'
+            '}}\n'
+            'var {result} = {name}({first}, {second});\n'
+        ).format(name=name, body=body, limit=self.random.randint(10, 500), result=self._any_result_variable(),
+                 first=self._any_seed_variable(), second=self._any_seed_variable())
+
+    def _loop(self):
+        result = self._any_result_variable()
+        if self.random.random() < 0.5:
+            return (
+                'var counter = 0;\n'
+                'while (counter < {iterations}) {{\n'
+                '    {result} = ({result} + counter * {seed}) % 1000;\n'
+                '    counter = counter + 1;\n'
+                '}}\n'
+            ).format(iterations=self.random.randint(1, self.loop_iterations), result=result,
+                     seed=self._any_seed_variable())
+        return (
+            'for (var index = 0; index < {iterations}; index = index + 1) {{\n'
+            '    {result} = ({result} + {expression}) % 1000;\n'
+            '}}\n'
+        ).format(iterations=self.random.randint(1, self.loop_iterations), result=result,
+                 expression=self._seed_expression(2))
+
+    def _expression_statement(self):
+        return '{} = {};\n'.format(
+            self._any_result_variable(), self._seed_expression(self.random.randint(1, self.expression_depth)))
+
+    def _text(self, length):
+        words = []
+        while length > 0:
+            word = self.random.choice(WORDS)
+            words.append(word)
+            length -= len(word) + 1
+        return ' '.join(words)
+
+    def _string(self):
+        return 'var text = "{}";\n'.format(self._text(self.random.randint(1, self.string_length)))
+
+    def _comment(self):
+        return ''.join('// {}\n'.format(self._text(self.random.randint(10, 100)))
+                       for _ in range(self.random.randint(1, 5)))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Synthetic OLC program generator')
+    arg_parser.add_argument('output', help='file the program is written to')
+    arg_parser.add_argument('--size-kb', type=int, default=1024, help='size of the generated program')
+    arg_parser.add_argument('--seed', type=int, default=0, help='seed of the random generator')
+    for kind in STATEMENT_KINDS:
+        arg_parser.add_argument('--' + kind, type=float, default=1, help='weight of the {}'.format(kind))
+    arg_parser.add_argument('--expression-depth', type=int, default=12, help='maximal nesting of expressions')
+    arg_parser.add_argument('--string-length', type=int, default=256, help='maximal length of the strings')
+    args = arg_parser.parse_args()
+
+    generator = ProgramGenerator(
+        seed=args.seed,
+        functions=args.functions,
+        loops=args.loops,
+        expressions=args.expressions,
+        strings=args.strings,
+        comments=args.comments,
+        expression_depth=args.expression_depth,
+        string_length=args.string_length,
+    )
+    with open(args.output, 'w') as file:
+        generator.write(file, args.size_kb * 1024)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,24 +1,58 @@
-class AbstractSyntaxTree:
+from src.ast_walker import AstFolder
+
+# texts of the subtrees longer than this are not joined until the whole tree is printed
+LONG_TEXT = 1024
+
+
+class AbstractSyntaxTree(AstFolder):
+    """
+    Text form of the AST. It is built bottom-up by AstFolder, so that arbitrarily deep trees can be printed.
+    visit_* methods get the text of the child nodes in self.children_values. Long texts are kept as tuples
+    of pieces and joined only once at the end, joining them at every level of a deep tree is quadratic
+    """
     def __init__(self, ast_root):
         self.root = ast_root
 
     def __str__(self):
-        return self.root.accept(self) if self.root else ''
+        if not self.root:
+            return ''
+        text = self.fold(self.root)
+        return text if isinstance(text, str) else ''.join(self.text_pieces(text))
 
     def __eq__(self, other):
-        return isinstance(other, self.__class__) and self.__dict__ == other.__dict__
+        return isinstance(other, self.__class__) and self.root == other.root
+
+    @staticmethod
+    def text(*pieces):
+        """
+        Return the pieces joined, or a tuple of them if some of them is a long text
+        """
+        try:
+            text = ''.join(pieces)
+        except TypeError:
+            # long text (or None of a node which is not printed)
+            return pieces
+        return text if len(text) < LONG_TEXT else (text,)
+
+    @staticmethod
+    def text_pieces(text):
+        """
+        Generate the strings of the (nested) tuple of text pieces in their order
+        """
+        stack = [text]
+        while stack:
+            piece = stack.pop()
+            if isinstance(piece, tuple):
+                stack.extend(reversed(piece))
+            else:
+                yield str(piece)
 
     def visit_binary_expression(self, binary_expression):
-        return '[{} {} {}]'.format(
-            binary_expression.left_operand.accept(self),
-            binary_expression.operator.lexeme,
-            binary_expression.right_operand.accept(self),
-        )
+        left_operand, right_operand = self.children_values
+        return self.text('[', left_operand, ' {} '.format(binary_expression.operator.lexeme), right_operand, ']')
 
     def visit_group_expression(self, group_expression):
-        return '( {} )'.format(
-            group_expression.expression.accept(self),
-        )
+        return self.text('( ', self.children_values[0], ' )')
 
     def visit_literal_expression(self, literal_expression):
         return '{}'.format(
@@ -26,16 +60,10 @@ class AbstractSyntaxTree:
         )
 
     def visit_unary_expression(self, unary_expression):
-        return '[{}{}]'.format(
-            unary_expression.operator.lexeme,
-            unary_expression.operand.accept(self),
-        )
+        return self.text('[{}'.format(unary_expression.operator.lexeme), self.children_values[0], ']')
 
     def visit_assign_expression(self, assign_expression):
-        return '[{} = {}]'.format(
-            assign_expression.name.lexeme,
-            assign_expression.value.accept(self),
-        )
+        return self.text('[{} = '.format(assign_expression.name.lexeme), self.children_values[0], ']')
 
     def visit_variable_expression(self, variable_expression):
         return '{}'.format(
@@ -43,13 +71,15 @@ class AbstractSyntaxTree:
         )
 
     def visit_call_expression(self, call_expression):
-        args = ', '.join(map(lambda x: str(x), call_expression.arguments))
-        return str(call_expression.callee.name) + '(' + args + ')'
+        args = []
+        for arg in self.children_values[1:]:
+            args += [', ', arg] if args else [arg]
+        return self.text(str(call_expression.callee.name) + '(', *args, ')')
 
     def visit_get_expression(self, get_expression):
         pass
 
-    def visit_this_exression(self, this_expression):
+    def visit_this_expression(self, this_expression):
         pass
 
     def visit_set_expression(self, set_expression):
@@ -58,54 +88,45 @@ class AbstractSyntaxTree:
     def visit_super_expression(self, super_expression):
         pass
 
-    def visit_var_statement(self, var_statement) -> str:
-        return 'VAR {} = {} ;'.format(
-            var_statement.name.lexeme, var_statement.initializer.accept(self)
-        )
+    def visit_var_statement(self, var_statement):
+        initializer = self.children_values[0] if self.children_values else 'None'
+        return self.text('VAR {} = '.format(var_statement.name.lexeme), initializer, ' ;')
 
     def visit_expression_statement(self, expression_statement):
-        return 'EXPRESSION {} ;'.format(
-            expression_statement.expression.accept(self)
-        )
+        return self.text('EXPRESSION ', self.children_values[0], ' ;')
 
     def visit_print_statement(self, print_statement):
-        return 'PRINT {} ;'.format(
-            print_statement.expression.accept(self)
-        )
+        return self.text('PRINT ', self.children_values[0], ' ;')
 
     def visit_block_statement(self, block_statement):
-        return 'BLOCK [{}] '.format(
-            ' '.join([statement.accept(self) for statement in block_statement.statements])
-        )
+        statements = []
+        for statement in self.children_values:
+            statements += [' ', statement] if statements else [statement]
+        return self.text('BLOCK [', *statements, '] ')
 
     def visit_if_statement(self, if_statement):
-        out = 'IF [{}] THEN [{}]'.format(
-            if_statement.condition.accept(self),
-            if_statement.then_branch.accept(self),
-        )
-        if if_statement.else_branch:
-            out += ' ELSE [{}]'.format(
-                if_statement.else_branch.accept(self),
-            )
-        return out
+        condition, then_branch, *else_branch = self.children_values
+        out = 'IF [', condition, '] THEN [', then_branch, ']'
+        if else_branch:
+            out += ' ELSE [', else_branch[0], ']'
+        return self.text(*out)
 
     def visit_while_statement(self, while_statement):
-        return 'WHILE [{}] DO [{}]'.format(
-            while_statement.condition.accept(self),
-            while_statement.body.accept(self),
-        )
+        condition, body = self.children_values
+        return self.text('WHILE [', condition, '] DO [', body, ']')
 
     def visit_function_statement(self, function_statement):
         args = map(lambda x: x.lexeme, function_statement.parameters)
         args = ', '.join(args)
-        return 'FUNCTION DEFINITION [{}({}) [{}]]'.format(
-            function_statement.name.lexeme,
-            args,
-            function_statement.body.accept(self)
-        )
+        return self.text(
+            'FUNCTION DEFINITION [{}({}) ['.format(function_statement.name.lexeme, args), self.children_values[0], ']]')
 
     def visit_return_statement(self, return_statement):
-        return 'RETURN [{}]'.format(return_statement.value)
+        value = self.children_values[0] if self.children_values else 'None'
+        return self.text('RETURN [', value, ']')
+
+    def visit_include_statement(self, include_statement):
+        return 'INCLUDE [{}] ;'.format(include_statement.path.literal)
 
     def visit_class_statement(self, class_statement):
         pass
@@ -0,0 +1,458 @@
+from array import array
+from src.ast_node_expression import ParserExpression, Binary, Group, Literal, Unary, Assign, Variable, Call
+from src.ast_node_statement import ParserStatement, VarStatement, ExpressionStatement, PrintStatement, \
+    BlockStatement, IfStatement, WhileStatement, FunctionStatement, ReturnStatement
+from src.ast_walker import child_nodes, fold
+from src.token_buffer import TOKEN_TYPES
+from src.tokens import TokenOsu
+
+# index of a missing node (or token)
+NO_NODE = -1
+
+# node kinds (codes of the view classes in NODE_VIEWS)
+OBJECT, BINARY, GROUP, LITERAL, UNARY, ASSIGN, VARIABLE, CALL, \
+    VAR, EXPRESSION, PRINT, BLOCK, IF, WHILE, FUNCTION, RETURN = range(16)
+
+
+class AstArena:
+    """
+    Compact storage of the AST (struct of arrays, like TokenBuffer for the tokens).
+    For every node only its kind, index of its token and up to three operands are stored. Operands are indices
+    of the child nodes, lists of children are stored in child_lists (operands are then start and length of the list).
+    Tokens referenced by the nodes are stored as arrays too. Nodes are accessed through NodeView objects,
+    which are built on demand (and kept, so the interpreter walking the same nodes again does not rebuild them),
+    have the same attributes as the node classes and accept the same visitors.
+    Nodes of other classes (e.g. LazyBlockStatement) are kept as they are. Bindings set by the Resolver
+    are kept in a dict indexed by the nodes (only the variables and declarations have them), values of the literals
+cached by the Interpreter and the inline caches of the SpecializingInterpreter too
+    """
+    def __init__(self):
+        self.kinds = array('B')
+        self.tokens = array('i')
+        self.first = array('i')
+        self.second = array('i')
+        self.third = array('i')
+        self.child_lists = array('i')
+        self.objects = []
+        self.bindings = {}
+        self.literal_values = {}
+        self.inline_caches = {}
+        # views of the nodes which were accessed, indexed by the nodes
+        self.views = {}
+        # lists of the child views (e.g. statements of a block), indexed by their start in child_lists
+        self.view_lists = {}
+
+        self.token_types = array('B')
+        self.token_lines = array('i')
+        self.token_lexemes = []
+        self.token_literals = []
+        self.materialized_tokens = {}
+        # equal lexemes and literals are stored only once
+        self.shared_values = {}
+        # id of the token object -> its index (only while a statement is being added)
+        self.token_indices = {}
+
+    def __len__(self):
+        return len(self.kinds)
+
+    @classmethod
+    def from_statements(cls, statements):
+        """
+        Return views of the statements stored in a new arena. Statements can come from an iterator
+        (e.g. StreamingParser.parse_iter), so that only one statement is built as objects at a time
+        """
+        arena = cls()
+        return [arena.add_statement(statement) for statement in statements]
+
+    def add_statement(self, statement):
+        """
+        Store the statement (with all its nodes) and return its view
+        """
+        try:
+            return self.node(self.add(statement))
+        finally:
+            self.token_indices = {}
+
+    def add(self, node):
+        """
+        Store the node (children first, without recursion) and return its index
+        """
+        if node is None:
+            return NO_NODE
+        return fold(node, self._encode, children=encoded_children)
+
+    def _encode(self, node, children):
+        """
+        Store the node whose children are already stored at the given indices
+        """
+        add_node = NODE_ENCODERS.get(type(node))
+        if add_node is None:
+            self.objects.append(node)
+            return self._add_node(OBJECT, first=len(self.objects) - 1)
+        return add_node(self, node, children)
+
+    def node(self, index):
+        """
+        Return view of the node (or the node itself if it is not stored in the arrays)
+        """
+        view = self.views.get(index)
+        if view is None:
+            if index == NO_NODE:
+                return None
+            kind = self.kinds[index]
+            if kind == OBJECT:
+                return self.objects[self.first[index]]
+            view = self.views[index] = NODE_VIEWS[kind](self, index)
+        return view
+
+    def nodes(self, start, length):
+        """
+        Return tuple of the views of the nodes of the list stored at start (see _add_list)
+        """
+        if not length:
+            # empty list takes no place in child_lists, its start is the start of the next list
+            return ()
+        views = self.view_lists.get(start)
+        if views is None:
+            views = self.view_lists[start] = tuple(self.node(index) for index in self.child_lists[start: start + length])
+        return views
+
+    def token(self, index):
+        """
+        Return TokenOsu view of the token. Views are cached, so the same object is returned every time
+        """
+        if index == NO_NODE:
+            return None
+        token = self.materialized_tokens.get(index)
+        if token is None:
+            token = TokenOsu(
+                TOKEN_TYPES[self.token_types[index]], self.token_lexemes[index],
+                self.token_literals[index], self.token_lines[index],
+            )
+            self.materialized_tokens[index] = token
+        return token
+
+    def add_token(self, token):
+        if token is None:
+            return NO_NODE
+        index = self.token_indices.get(id(token))
+        if index is None:
+            index = len(self.token_types)
+            self.token_types.append(token.token_type.code)
+            self.token_lines.append(token.source_file_line_number)
+            self.token_lexemes.append(self.shared_values.setdefault((str, token.lexeme), token.lexeme))
+            self.token_literals.append(self.shared_values.setdefault((type(token.literal), token.literal), token.literal))
+            self.token_indices[id(token)] = index
+        return index
+
+    def _add_node(self, kind, token=None, first=NO_NODE, second=NO_NODE, third=NO_NODE):
+        self.kinds.append(kind)
+        self.tokens.append(self.add_token(token))
+        self.first.append(first)
+        self.second.append(second)
+        self.third.append(third)
+        return len(self.kinds) - 1
+
+    def _add_list(self, indices):
+        """
+        Store list of node (or token) indices and return its start and length
+        """
+        start = len(self.child_lists)
+        self.child_lists.extend(indices)
+        return start, len(indices)
+
+    # ENCODING OF THE NODE CLASSES ---------------------------------------------------------------------
+
+    def _add_binary(self, binary, children):
+        left_operand, right_operand = children
+        return self._add_node(BINARY, binary.operator, left_operand, right_operand)
+
+    def _add_group(self, group, children):
+        return self._add_node(GROUP, first=children[0])
+
+    def _add_literal(self, literal, children):
+        return self._add_node(LITERAL, literal.value)
+
+    def _add_unary(self, unary, children):
+        return self._add_node(UNARY, unary.operator, children[0])
+
+    def _add_assign(self, assign, children):
+        return self._add_node(ASSIGN, assign.name, children[0])
+
+    def _add_variable(self, variable, children):
+        return self._add_node(VARIABLE, variable.name)
+
+    def _add_call(self, call, children):
+        callee, *arguments = children
+        return self._add_node(CALL, call.paren, callee, *self._add_list(arguments))
+
+    def _add_var_statement(self, var_statement, children):
+        return self._add_node(VAR, var_statement.name, children[0] if children else NO_NODE)
+
+    def _add_expression_statement(self, expression_statement, children):
+        return self._add_node(EXPRESSION, first=children[0])
+
+    def _add_print_statement(self, print_statement, children):
+        return self._add_node(PRINT, first=children[0])
+
+    def _add_block_statement(self, block_statement, children):
+        return self._add_node(BLOCK, None, NO_NODE, *self._add_list(children))
+
+    def _add_if_statement(self, if_statement, children):
+        condition, then_branch, *else_branch = children
+        return self._add_node(IF, None, condition, then_branch, else_branch[0] if else_branch else NO_NODE)
+
+    def _add_while_statement(self, while_statement, children):
+        condition, body = children
+        return self._add_node(WHILE, None, condition, body)
+
+    def _add_function_statement(self, function_statement, children):
+        parameters = self._add_list([self.add_token(parameter) for parameter in function_statement.parameters])
+        return self._add_node(FUNCTION, function_statement.name, children[0], *parameters)
+
+    def _add_return_statement(self, return_statement, children):
+        return self._add_node(RETURN, return_statement.keyword, children[0] if children else NO_NODE)
+
+
+NODE_ENCODERS = {
+    Binary: AstArena._add_binary,
+    Group: AstArena._add_group,
+    Literal: AstArena._add_literal,
+    Unary: AstArena._add_unary,
+    Assign: AstArena._add_assign,
+    Variable: AstArena._add_variable,
+    Call: AstArena._add_call,
+    VarStatement: AstArena._add_var_statement,
+    ExpressionStatement: AstArena._add_expression_statement,
+    PrintStatement: AstArena._add_print_statement,
+    BlockStatement: AstArena._add_block_statement,
+    IfStatement: AstArena._add_if_statement,
+    WhileStatement: AstArena._add_while_statement,
+    FunctionStatement: AstArena._add_function_statement,
+    ReturnStatement: AstArena._add_return_statement,
+}
+
+
+def encoded_children(node):
+    """
+    Return the children of the node to be stored in the arrays (nodes kept as objects are stored as they are)
+    """
+    return child_nodes(node) if type(node) in NODE_ENCODERS else []
+
+
+# VIEWS OF THE NODES -------------------------------------------------------------------------------------
+
+class NodeView:
+    """
+    Lightweight view of one node of the AstArena
+    """
+    __slots__ = ('arena', 'index')
+
+    def __init__(self, arena, index):
+        self.arena = arena
+        self.index = index
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.arena is self.arena and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.arena), self.index))
+
+    def __deepcopy__(self, memo):
+        # nodes are never modified - function closures are deep-copied, the arena must not be
+        return self
+
+
+def token_property():
+    def get_token(view):
+        arena = view.arena
+        index = arena.tokens[view.index]
+        return arena.materialized_tokens.get(index) or arena.token(index)
+    return property(get_token)
+
+
+def operand_property(operand):
+    """
+    Return property with the view of the child node stored in the given operand array ('first', 'second', 'third')
+    """
+    def get_operand(view):
+        arena = view.arena
+        index = getattr(arena, operand)[view.index]
+        return arena.views.get(index) or arena.node(index)
+    return property(get_operand)
+
+
+def binding_property():
+    def set_binding(view, binding):
+        view.arena.bindings[view.index] = binding
+    return property(lambda view: view.arena.bindings.get(view.index), set_binding)
+
+
+def node_data_property(table):
+    """
+    Return property stored in the dict of the arena of the given name ('literal_values', 'inline_caches')
+    """
+    def set_node_data(view, value):
+        getattr(view.arena, table)[view.index] = value
+    return property(lambda view: getattr(view.arena, table).get(view.index), set_node_data)
+
+
+def node_list_property():
+    return property(lambda view: view.arena.nodes(view.arena.second[view.index], view.arena.third[view.index]))
+
+
+def token_list_property():
+    def get_tokens(view):
+        start, length = view.arena.second[view.index], view.arena.third[view.index]
+        return [view.arena.token(index) for index in view.arena.child_lists[start: start + length]]
+    return property(get_tokens)
+
+
+class BinaryView(NodeView, ParserExpression):
+    __slots__ = ()
+    left_operand = operand_property('first')
+    operator = token_property()
+    right_operand = operand_property('second')
+    inline_cache = node_data_property('inline_caches')
+
+    def accept(self, visitor):
+        return visitor.visit_binary_expression(self)
+
+
+class GroupView(NodeView, ParserExpression):
+    __slots__ = ()
+    expression = operand_property('first')
+
+    def accept(self, visitor):
+        return visitor.visit_group_expression(self)
+
+
+class LiteralView(NodeView, ParserExpression):
+    __slots__ = ()
+    value = token_property()
+    runtime_value = node_data_property('literal_values')
+
+    def accept(self, visitor):
+        return visitor.visit_literal_expression(self)
+
+
+class UnaryView(NodeView, ParserExpression):
+    __slots__ = ()
+    operator = token_property()
+    operand = operand_property('first')
+    inline_cache = node_data_property('inline_caches')
+
+    def accept(self, visitor):
+        return visitor.visit_unary_expression(self)
+
+
+class AssignView(NodeView, ParserExpression):
+    __slots__ = ()
+    name = token_property()
+    value = operand_property('first')
+    binding = binding_property()
+
+    def accept(self, visitor):
+        return visitor.visit_assign_expression(self)
+
+
+class VariableView(NodeView, ParserExpression):
+    __slots__ = ()
+    name = token_property()
+    binding = binding_property()
+    inline_cache = node_data_property('inline_caches')
+
+    def accept(self, visitor):
+        return visitor.visit_variable_expression(self)
+
+
+class CallView(NodeView, ParserExpression):
+    __slots__ = ()
+    callee = operand_property('first')
+    paren = token_property()
+    arguments = node_list_property()
+    inline_cache = node_data_property('inline_caches')
+
+    def accept(self, visitor):
+        return visitor.visit_call_expression(self)
+
+
+class VarStatementView(NodeView, ParserStatement):
+    __slots__ = ()
+    name = token_property()
+    initializer = operand_property('first')
+    binding = binding_property()
+
+    def accept(self, visitor):
+        return visitor.visit_var_statement(self)
+
+
+class ExpressionStatementView(NodeView, ParserStatement):
+    __slots__ = ()
+    expression = operand_property('first')
+
+    def accept(self, visitor):
+        return visitor.visit_expression_statement(self)
+
+
+class PrintStatementView(NodeView, ParserStatement):
+    __slots__ = ()
+    expression = operand_property('first')
+
+    def accept(self, visitor):
+        return visitor.visit_print_statement(self)
+
+
+class BlockStatementView(NodeView, ParserStatement):
+    __slots__ = ()
+    statements = node_list_property()
+
+    def accept(self, visitor):
+        return visitor.visit_block_statement(self)
+
+
+class IfStatementView(NodeView, ParserStatement):
+    __slots__ = ()
+    condition = operand_property('first')
+    then_branch = operand_property('second')
+    else_branch = operand_property('third')
+
+    def accept(self, visitor):
+        return visitor.visit_if_statement(self)
+
+
+class WhileStatementView(NodeView, ParserStatement):
+    __slots__ = ()
+    condition = operand_property('first')
+    body = operand_property('second')
+
+    def accept(self, visitor):
+        return visitor.visit_while_statement(self)
+
+
+class FunctionStatementView(NodeView, ParserStatement):
+    __slots__ = ()
+    name = token_property()
+    body = operand_property('first')
+    parameters = token_list_property()
+    binding = binding_property()
+
+    def accept(self, visitor):
+        return visitor.visit_function_statement(self)
+
+
+class ReturnStatementView(NodeView, ParserStatement):
+    __slots__ = ()
+    keyword = token_property()
+    value = operand_property('first')
+
+    def accept(self, visitor):
+        return visitor.visit_return_statement(self)
+
+
+# view classes indexed by the node kinds
+NODE_VIEWS = (
+    None, BinaryView, GroupView, LiteralView, UnaryView, AssignView, VariableView, CallView,
+    VarStatementView, ExpressionStatementView, PrintStatementView, BlockStatementView, IfStatementView,
+    WhileStatementView, FunctionStatementView, ReturnStatementView,
+)
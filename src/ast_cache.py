@@ -0,0 +1,104 @@
+import gc
+import hashlib
+import os
+import pickle
+import tempfile
+from src.constants import INTERPRETER_VERSION
+
+DEFAULT_CACHE_DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'olc')
+
+DEFAULT_MAX_CACHE_SIZE = 64 * 2 ** 20
+
+CACHE_FILE_EXTENSION = '.ast'
+
+
+class AstCache:
+    """
+    On-disk cache of the parsed statements, keyed by the hash of the source code and the interpreter version.
+    Statements (AST nodes with their tokens) are stored pickled, one file per source code. Files are written
+    to a temporary file and atomically renamed, so concurrent writers never expose a partially written entry.
+    Least recently used entries (by modification time, refreshed on every hit) are evicted when the cache
+    grows over max_size bytes. Only use a cache directory which is not writable by others - entries are unpickled.
+    Variant distinguishes differently built ASTs of the same source code (e.g. with lazily parsed function bodies)
+    """
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_CACHE_SIZE, variant=''):
+        self.directory = directory or os.environ.get('OLC_CACHE_DIR') or DEFAULT_CACHE_DIRECTORY
+        self.max_size = max_size
+        self.variant = variant
+
+    def get_key(self, source_code):
+        digest = hashlib.sha256('{}\0{}\0'.format(INTERPRETER_VERSION, self.variant).encode('utf-8'))
+        digest.update(source_code.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def get_path(self, source_code):
+        return os.path.join(self.directory, self.get_key(source_code) + CACHE_FILE_EXTENSION)
+
+    def load(self, source_code):
+        """
+        Return cached statements of the source code, or None if they are not cached
+        """
+        path = self.get_path(source_code)
+        try:
+            with open(path, 'rb') as file:
+                statements = self._unpickle(file)
+            os.utime(path)
+            return statements
+        except Exception:
+            # missing, corrupted or incompatible entry -> miss (the entry gets overwritten by the next store)
+            return None
+
+    @staticmethod
+    def _unpickle(file):
+        # unpickling creates lots of objects and no garbage, collections triggered by them take most of the time
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return pickle.load(file)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def store(self, source_code, statements):
+        """
+        Store statements of the source code and evict the least recently used entries over the size limit.
+        Returns False if the statements could not be stored (cache is only an optimization)
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(file_descriptor, 'wb') as file:
+                    pickle.dump(statements, file, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temporary_path, self.get_path(source_code))
+            except BaseException:
+                os.unlink(temporary_path)
+                raise
+        except (OSError, pickle.PicklingError, RecursionError):
+            return False
+        self.evict()
+        return True
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits into max_size bytes
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(CACHE_FILE_EXTENSION):
+                try:
+                    status = entry.stat()
+                except FileNotFoundError:
+                    # removed by another process in the meantime
+                    continue
+                entries.append((status.st_mtime, status.st_size, entry.path))
+
+        cache_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if cache_size <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            cache_size -= size
@@ -0,0 +1,120 @@
+from src.ast_node_expression import ParserExpression
+from src.ast_node_statement import BlockStatement, IfStatement, WhileStatement, FunctionStatement, LazyBlockStatement
+from src.ast_walker import fold, walk_preorder
+from src.tokens import TokenOsu
+
+# attributes of the statements holding their expression (every statement holds at most one)
+STATEMENT_EXPRESSIONS = ('initializer', 'expression', 'condition', 'value')
+
+
+class SharedToken(TokenOsu):
+    """
+    Token of a shared expression subtree. Its line number is relative to the first line of the expression,
+    the absolute line is known to the statement holding the expression (see ExpressionInternTable)
+    """
+    def at_line(self, first_line):
+        return TokenOsu(self.token_type, self.lexeme, self.literal, first_line + self.source_file_line_number)
+
+
+def absolute_token(token, expression_line):
+    """
+    Return the token with its absolute line. Token of a shared expression knows only its line relative
+    to the statement holding the expression, expression_line is the line of that statement's expression
+    (None for a statement which holds no shared expression - its tokens know their lines)
+    """
+    if expression_line is not None and isinstance(token, SharedToken):
+        return token.at_line(expression_line)
+    return token
+
+
+def relocate_error(error, expression_line):
+    """
+    Give the error raised by the expression of a statement the absolute line of its token (see absolute_token).
+    Every pass reporting errors of the expressions has to do it, or the errors of shared expressions report
+    relative lines
+    """
+    error.token = absolute_token(error.token, expression_line)
+    return error
+
+
+class ExpressionInternTable:
+    """
+    Hash-consing of the expressions: structurally identical expression subtrees are replaced by one shared
+    instance, so the memory (and any per-node analysis) scales with the number of distinct subtrees.
+    Subtrees are keyed on node class, interned children and types, lexemes and lines of the tokens.
+    Lines are relative to the first line of the statement's expression, so that the same expression on different
+    lines is shared too. The statement gets the absolute line as expression_line and the Interpreter uses it
+    to report the absolute line of the errors (SharedToken.at_line). Expressions are never modified
+    after parsing, so sharing them is safe. Lazily parsed function bodies are left as they are
+    """
+    def __init__(self):
+        self.nodes = {}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def intern_statement(self, statement):
+        """
+        Replace expressions of the statement (and of all nested statements) by the shared ones
+        """
+        for nested_statement in walk_preorder(statement, self._nested_statements):
+            for name in STATEMENT_EXPRESSIONS:
+                expression = getattr(nested_statement, name, None)
+                if isinstance(expression, ParserExpression):
+                    first_line = min(token.source_file_line_number for token in self._tokens(expression))
+                    setattr(nested_statement, name, fold(
+                        expression, lambda node, children: self._intern(node, children, first_line)))
+                    nested_statement.expression_line = first_line
+        return statement
+
+    @staticmethod
+    def _nested_statements(statement):
+        if isinstance(statement, LazyBlockStatement):
+            return []
+        if isinstance(statement, BlockStatement):
+            return statement.statements
+        if isinstance(statement, IfStatement):
+            return [statement.then_branch, statement.else_branch] if statement.else_branch else [statement.then_branch]
+        if isinstance(statement, (WhileStatement, FunctionStatement)):
+            return [statement.body]
+        return []
+
+    def _intern(self, node, children, first_line):
+        """
+        Return the shared node for the node whose children are already interned (children are in the order
+        of the node's attributes)
+        """
+        fields = dict(vars(node))
+        children = iter(children)
+        key = [type(node)]
+        for name, value in fields.items():
+            if isinstance(value, ParserExpression):
+                fields[name] = next(children)
+                key.append(id(fields[name]))
+            elif isinstance(value, list):
+                fields[name] = [next(children) for _ in value]
+                key.append(tuple(map(id, fields[name])))
+            elif isinstance(value, TokenOsu):
+                key.append((value.token_type, value.lexeme, value.source_file_line_number - first_line))
+            else:
+                key.append(value)
+
+        key = tuple(key)
+        shared_node = self.nodes.get(key)
+        if shared_node is None:
+            for name, value in fields.items():
+                if isinstance(value, TokenOsu):
+                    fields[name] = SharedToken(
+                        value.token_type, value.lexeme, value.literal, value.source_file_line_number - first_line)
+            shared_node = object.__new__(type(node))
+            shared_node.__dict__.update(fields)
+            # children are referenced by id in the keys, the table keeps them alive
+            self.nodes[key] = shared_node
+        return shared_node
+
+    @staticmethod
+    def _tokens(expression):
+        for node in walk_preorder(expression):
+            for value in vars(node).values():
+                if isinstance(value, TokenOsu):
+                    yield value
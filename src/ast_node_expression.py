@@ -3,6 +3,9 @@ from src.abstract_syntax_tree import AbstractSyntaxTree
 
 
 class ParserExpression:
+    # no instance attributes here, so that the __slots__ of the subclasses (see ast_arena) take effect
+    __slots__ = ()
+
     def __eq__(self, other):
         return isinstance(other, self.__class__) and self.__dict__ == other.__dict__
 
@@ -15,6 +18,8 @@ class Binary(ParserExpression):
         self.left_operand = left_operand
         self.operator = operator
         self.right_operand = right_operand
+        # specialisation of the site (see specializing_interpreter)
+        self.inline_cache = None
 
     def accept(self, visitor):
         return visitor.visit_binary_expression(self)
@@ -31,6 +36,8 @@ class Group(ParserExpression):
 class Literal(ParserExpression):
     def __init__(self, token: TokenOsu):
         self.value = token
+        # RuntimeValue of the token, computed at the first evaluation (see interpreter)
+        self.runtime_value = None
 
     def accept(self, visitor):
         return visitor.visit_literal_expression(self)
@@ -40,6 +47,8 @@ class Unary(ParserExpression):
     def __init__(self, operator: TokenOsu, operand: ParserExpression):
         self.operator = operator
         self.operand = operand
+        # specialisation of the site (see specializing_interpreter)
+        self.inline_cache = None
 
     def accept(self, visitor):
         return visitor.visit_unary_expression(self)
@@ -49,6 +58,8 @@ class Assign(ParserExpression):
     def __init__(self, name: TokenOsu, value: ParserExpression):
         self.name = name
         self.value = value
+        # declaration of the variable (see resolver)
+        self.binding = None
 
     def accept(self, visitor):
         return visitor.visit_assign_expression(self)
@@ -57,6 +68,10 @@ class Assign(ParserExpression):
 class Variable(ParserExpression):
     def __init__(self, name: TokenOsu):
         self.name = name
+        # declaration of the variable (see resolver)
+        self.binding = None
+        # specialisation of the site (see specializing_interpreter)
+        self.inline_cache = None
 
     def accept(self, visitor):
         return visitor.visit_variable_expression(self)
@@ -67,6 +82,8 @@ class Call(ParserExpression):
         self.callee = callee
         self.paren = paren
         self.arguments = arguments
+        # specialisation of the site (see specializing_interpreter)
+        self.inline_cache = None
 
     def accept(self, visitor):
         return visitor.visit_call_expression(self)
@@ -4,6 +4,9 @@ from src.abstract_syntax_tree import AbstractSyntaxTree
 
 
 class ParserStatement:
+    # no instance attributes here, so that the __slots__ of the subclasses (see ast_arena) take effect
+    __slots__ = ()
+
     def __eq__(self, other):
         # TODO: Do we need deep compare here?
         return isinstance(other, self.__class__) and self.__dict__ == other.__dict__
@@ -19,6 +22,8 @@ class VarStatement(ParserStatement):
     def __init__(self, name: TokenOsu, initializer: ParserExpression):
         self.name = name
         self.initializer = initializer
+        # slot of the variable (see resolver)
+        self.binding = None
 
     def accept(self, visitor):
         return visitor.visit_var_statement(self)
@@ -42,12 +47,46 @@ class PrintStatement(ParserStatement):
 
 class BlockStatement(ParserStatement):
     def __init__(self, statements: [ParserStatement]):
-        self.statements = statements.copy()  # TODO need this copy or mutable is OK?
+        # parser builds a new list for every block, no need to copy it
+        self.statements = statements
 
     def accept(self, visitor):
         return visitor.visit_block_statement(self)
 
 
+class LazyBlockStatement(BlockStatement):
+    """
+    Block (function body) kept as a list of tokens until its statements are needed for the first time.
+    Statements are parsed by parse_block (ParseError is raised at that point), resolved by resolve_block
+    if the Resolver has set it (ResolveError is raised at that point) and cached
+    """
+    def __init__(self, tokens: [TokenOsu], parse_block):
+        self.tokens = tokens
+        self.parse_block = parse_block
+        self.parsed_statements = None
+        self.resolve_block = None
+
+    @property
+    def statements(self):
+        if self.parsed_statements is None:
+            statements = self.parse_block(self.tokens)
+            if self.resolve_block is not None:
+                self.resolve_block(statements)
+            self.parsed_statements = statements
+            self.tokens = None
+        return self.parsed_statements
+
+    def __deepcopy__(self, memo):
+        # all copies share one (lazily parsed) body
+        return self
+
+    def __getstate__(self):
+        # resolution belongs to one run of the program, it is not cached with the statements
+        state = dict(vars(self))
+        state['resolve_block'] = None
+        return state
+
+
 class IfStatement(ParserStatement):
     def __init__(self, condition: ParserExpression, then_branch: ParserStatement, else_branch: ParserStatement):
         self.condition = condition
@@ -70,8 +109,10 @@ class WhileStatement(ParserStatement):
 class FunctionStatement(ParserStatement):
     def __init__(self, name: TokenOsu, parameters: [TokenOsu], body: [ParserStatement]):
         self.name = name
-        self.parameters = parameters.copy()  # TODO: Need copy?
+        self.parameters = parameters
         self.body = body
+        # slot of the function (see resolver)
+        self.binding = None
 
     def accept(self, visitor):
         return visitor.visit_function_statement(self)
@@ -86,11 +127,23 @@ class ReturnStatement(ParserStatement):
         return visitor.visit_return_statement(self)
 
 
+class IncludeStatement(ParserStatement):
+    """
+    Execute the module (source file) at the given path, relative to the directory of the including file
+    """
+    def __init__(self, keyword: TokenOsu, path: TokenOsu):
+        self.keyword = keyword
+        self.path = path
+
+    def accept(self, visitor):
+        return visitor.visit_include_statement(self)
+
+
 class ClassStatement(ParserStatement):
     def __init__(self, name: TokenOsu, super_class: Variable, methods: [FunctionStatement]):
         self.name = name
         self.super_class = super_class
-        self.methods = methods.copy()  # TODO: copy() or mutable?
+        self.methods = methods
 
     def accept(self, visitor):
         return visitor.visit_class_statement(self)
@@ -0,0 +1,187 @@
+"""
+Traversal of the AST (ast_node_expression and ast_node_statement nodes, or their AstArena views) with an explicit
+stack instead of recursion, so that the depth of the tree is not limited by the Python recursion limit
+"""
+from types import GeneratorType
+
+
+class ChildCollector:
+    """
+    Visitor returning the child nodes of a node (in the order of the node's attributes, missing ones left out)
+    """
+    def visit_binary_expression(self, binary_expression):
+        return [binary_expression.left_operand, binary_expression.right_operand]
+
+    def visit_group_expression(self, group_expression):
+        return [group_expression.expression]
+
+    def visit_literal_expression(self, literal_expression):
+        return []
+
+    def visit_unary_expression(self, unary_expression):
+        return [unary_expression.operand]
+
+    def visit_assign_expression(self, assign_expression):
+        return [assign_expression.value]
+
+    def visit_variable_expression(self, variable_expression):
+        return []
+
+    def visit_call_expression(self, call_expression):
+        return [call_expression.callee] + list(call_expression.arguments)
+
+    def visit_get_expression(self, get_expression):
+        return [get_expression.object]
+
+    def visit_this_expression(self, this_expression):
+        return []
+
+    def visit_set_expression(self, set_expression):
+        return [set_expression.object, set_expression.value]
+
+    def visit_super_expression(self, super_expression):
+        return []
+
+    def visit_var_statement(self, var_statement):
+        return [var_statement.initializer] if var_statement.initializer is not None else []
+
+    def visit_expression_statement(self, expression_statement):
+        return [expression_statement.expression]
+
+    def visit_print_statement(self, print_statement):
+        return [print_statement.expression]
+
+    def visit_block_statement(self, block_statement):
+        return list(block_statement.statements)
+
+    def visit_if_statement(self, if_statement):
+        children = [if_statement.condition, if_statement.then_branch]
+        return children + [if_statement.else_branch] if if_statement.else_branch is not None else children
+
+    def visit_while_statement(self, while_statement):
+        return [while_statement.condition, while_statement.body]
+
+    def visit_function_statement(self, function_statement):
+        return [function_statement.body]
+
+    def visit_return_statement(self, return_statement):
+        return [return_statement.value] if return_statement.value is not None else []
+
+    def visit_include_statement(self, include_statement):
+        return []
+
+    def visit_class_statement(self, class_statement):
+        return list(class_statement.methods)
+
+
+CHILD_COLLECTOR = ChildCollector()
+
+
+def child_nodes(node):
+    """
+    Return child nodes of the node. Statements of a lazily parsed function body are parsed at this point
+    """
+    return node.accept(CHILD_COLLECTOR)
+
+
+def walk_preorder(root, children=child_nodes):
+    """
+    Generate the nodes of the tree, every node before its children
+    """
+    stack = [root] if root is not None else []
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(children(node)))
+
+
+def walk_postorder(root, children=child_nodes):
+    """
+    Generate the nodes of the tree, every node after its children
+    """
+    stack = [(root, False)] if root is not None else []
+    while stack:
+        node, children_done = stack.pop()
+        if children_done:
+            yield node
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children(node)))
+
+
+def fold(root, combine, children=child_nodes):
+    """
+    Return combine(root, values of its children), where the value of every node is computed the same way
+    (bottom-up, children in their order)
+    """
+    # pre-order with the children visited from the last one, reversed it is post-order with them from the first one
+    order = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        node_children = children(node)
+        order.append((node, len(node_children)))
+        stack.extend(node_children)
+
+    values = []
+    for node, child_count in reversed(order):
+        if child_count:
+            child_values = values[-child_count:]
+            del values[-child_count:]
+            values.append(combine(node, child_values))
+        else:
+            values.append(combine(node, []))
+    return values[0]
+
+
+class AstFolder:
+    """
+    Base of the visitors computing a value of every node from the values of its children without recursion.
+    visit_* methods find the values of the children of the visited node in self.children_values
+    """
+    def fold(self, root):
+        return fold(root, self._combine)
+
+    def _combine(self, node, children_values):
+        self.children_values = children_values
+        return node.accept(self)
+
+
+def evaluate(root, visitor):
+    """
+    Return the value of the root computed by the visitor whose visit_* methods are generators: they yield the child
+    nodes whose values they need (in any order, only when needed), receive the values and return the value of
+    the node. Methods of the nodes without children can return the value directly. Exceptions raised while
+    computing a value are thrown into the generator which asked for it
+    """
+    result = root.accept(visitor)
+    if type(result) is not GeneratorType:
+        return result
+
+    stack = [result]
+    value, error = None, None
+    while stack:
+        try:
+            child = stack[-1].throw(error) if error is not None else stack[-1].send(value)
+        except StopIteration as stop:
+            stack.pop()
+            value, error = stop.value, None
+            continue
+        except Exception as raised_error:
+            stack.pop()
+            if not stack:
+                raise
+            value, error = None, raised_error
+            continue
+
+        try:
+            result = child.accept(visitor)
+        except Exception as raised_error:
+            value, error = None, raised_error
+            continue
+        if type(result) is GeneratorType:
+            stack.append(result)
+            value, error = None, None
+        else:
+            value, error = result, None
+    return value
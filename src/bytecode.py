@@ -0,0 +1,326 @@
+"""
+Bytecode of the VirtualMachine and its compiler. Instructions are pairs of ints (opcode, argument) stored in one
+flat array, the argument is an index of the constant pool, a jump target (offset of the instruction) or unused.
+Every statement list (program, included module, function body) is compiled to one CodeObject ending with RETURN
+"""
+from array import array
+from enum import IntEnum
+from src.ast_walker import evaluate
+from src.interpreter_runtime import RuntimeOperators, UNARY_OPERATORS, BINARY_OPERATORS, NULL_VALUE, bool_value
+from src.resolver import GLOBAL, DYNAMIC
+from src.tokens import TokenType
+
+
+class OpCode(IntEnum):
+    LOAD_CONST = 0          # push constants[argument]
+    LOAD_GLOBAL = 1         # push global variable, constants[argument] is its name token
+    LOAD_LOCAL = 2          # push local variable, constants[argument] is (depth, slot, name token)
+    LOAD_NAME = 3           # push variable looked up by name (not resolved), constants[argument] is its name token
+    STORE_GLOBAL = 4        # assign top of the stack (it stays there) to a variable, arguments as in LOAD_*
+    STORE_LOCAL = 5
+    STORE_NAME = 6
+    DEFINE_NAME = 7         # pop the value and define variable constants[argument] (name) in the current environment
+    DEFINE_LOCAL = 8        # pop the value and define variable constants[argument] (slot, name)
+    POP = 9
+    PRINT = 10              # pop the value and print it
+    UNARY = 11              # apply constants[argument] (operator function, operator token) to the top of the stack
+    BINARY = 12             # pop the right operand and apply constants[argument] to the left one and the right one
+    TRUTH = 13              # replace the top of the stack with BOOL of its truthiness
+    JUMP = 14               # continue at the argument
+    JUMP_IF_FALSE = 15      # pop the value and continue at the argument if it is not truthy
+    JUMP_IF_TRUE = 16       # pop the value and continue at the argument if it is truthy
+    PUSH_ENVIRONMENT = 17   # enter a block - new environment enclosed by the current one
+    POP_ENVIRONMENT = 18    # leave the block
+    MAKE_FUNCTION = 19      # push function of constants[argument] (FunctionPrototype) closed over the environment
+    CALL = 20               # pop the arguments and the callee, constants[argument] is (argument count, callee)
+    RETURN = 21             # pop the value, leave the code and push the value to the caller
+    INCLUDE = 22            # execute the module at the path (constants[argument] is the path token) once
+
+
+class CodeObject:
+    """
+    Compiled statements - instructions, constant pool and lines of the expressions of the statements
+    holding a shared expression (instruction offset -> expression_line, see SharedToken)
+    """
+    def __init__(self, name):
+        self.name = name
+        self.instructions = array('i')
+        self.constants = []
+        self.expression_lines = {}
+
+    def __len__(self):
+        """
+        Return number of the instructions
+        """
+        return len(self.instructions) // 2
+
+    def __str__(self):
+        return disassemble(self, nested=False)
+
+
+class FunctionPrototype:
+    """
+    Constant of MAKE_FUNCTION - declaration of the function and its compiled body. Body is compiled on the first
+    call of the function (a lazily parsed body gets parsed at that point) and shared by all its closures
+    """
+    def __init__(self, declaration):
+        self.declaration = declaration
+        self.code = None
+
+    def __str__(self):
+        return '<function {}>'.format(self.declaration.name.lexeme)
+
+    def compile(self):
+        if self.code is None:
+            self.code = BytecodeCompiler(str(self)).compile_function(self.declaration)
+        return self.code
+
+
+class BytecodeCompiler:
+    """
+    Compiler of the resolved statements (see Resolver) to a CodeObject. Statements are compiled recursively,
+    expressions without recursion (visit_* methods of the expressions are generators run by ast_walker.evaluate)
+    """
+    def __init__(self, name='<program>'):
+        self.code = CodeObject(name)
+        # expression_line of the statement being compiled (shared expressions only)
+        self.expression_line = None
+
+    def compile(self, statements):
+        """
+        Return CodeObject of the statements
+        """
+        for statement in statements:
+            self.compile_statement(statement)
+        # return at the top level (program or module) ends its execution
+        self.emit(OpCode.LOAD_CONST, self.add_constant(None))
+        self.emit(OpCode.RETURN)
+        return self.code
+
+    def compile_function(self, declaration):
+        """
+        Return CodeObject of the function body - parameters and the top-level declarations of the body share
+        the environment of the call (see Function.call)
+        """
+        return self.compile(declaration.body.statements)
+
+    def compile_statement(self, statement):
+        old_expression_line = self.expression_line
+        try:
+            self.expression_line = getattr(statement, 'expression_line', None)
+            statement.accept(self)
+        finally:
+            self.expression_line = old_expression_line
+
+    def compile_expression(self, expression):
+        evaluate(expression, self)
+
+    def emit(self, opcode, argument=0):
+        """
+        Append the instruction and return its offset
+        """
+        offset = len(self.code.instructions)
+        self.code.instructions.extend((opcode, argument))
+        if self.expression_line is not None:
+            self.code.expression_lines[offset] = self.expression_line
+        return offset
+
+    def add_constant(self, value):
+        self.code.constants.append(value)
+        return len(self.code.constants) - 1
+
+    def patch_jump(self, offset):
+        """
+        Point the jump instruction at the offset to the next instruction
+        """
+        self.code.instructions[offset + 1] = len(self.code.instructions)
+
+    def _emit_variable(self, opcodes, node):
+        # opcodes are (global, local, by name) variant of the instruction
+        binding = node.binding
+        if binding is GLOBAL:
+            self.emit(opcodes[0], self.add_constant(node.name))
+        elif binding is None or binding is DYNAMIC:
+            self.emit(opcodes[2], self.add_constant(node.name))
+        else:
+            self.emit(opcodes[1], self.add_constant((binding[0], binding[1], node.name)))
+
+    def _emit_definition(self, declaration, name):
+        slot = declaration.binding
+        if slot is None or slot is GLOBAL:
+            self.emit(OpCode.DEFINE_NAME, self.add_constant(name))
+        else:
+            self.emit(OpCode.DEFINE_LOCAL, self.add_constant((slot, name)))
+
+    # VISITOR INTERFACE FOR STATEMENTS ----------------------------------------------
+
+    def visit_var_statement(self, var_statement):
+        if var_statement.initializer:
+            self.compile_expression(var_statement.initializer)
+        else:
+            self.emit(OpCode.LOAD_CONST, self.add_constant(NULL_VALUE))
+        self._emit_definition(var_statement, var_statement.name.lexeme)
+
+    def visit_expression_statement(self, expression_statement):
+        self.compile_expression(expression_statement.expression)
+        self.emit(OpCode.POP)
+
+    def visit_print_statement(self, print_statement):
+        self.compile_expression(print_statement.expression)
+        self.emit(OpCode.PRINT)
+
+    def visit_block_statement(self, block_statement):
+        self.emit(OpCode.PUSH_ENVIRONMENT)
+        for statement in block_statement.statements:
+            self.compile_statement(statement)
+        self.emit(OpCode.POP_ENVIRONMENT)
+
+    def visit_if_statement(self, if_statement):
+        self.compile_expression(if_statement.condition)
+        else_jump = self.emit(OpCode.JUMP_IF_FALSE)
+        self.compile_statement(if_statement.then_branch)
+        if if_statement.else_branch:
+            end_jump = self.emit(OpCode.JUMP)
+            self.patch_jump(else_jump)
+            self.compile_statement(if_statement.else_branch)
+            self.patch_jump(end_jump)
+        else:
+            self.patch_jump(else_jump)
+
+    def visit_while_statement(self, while_statement):
+        # for loops are parsed to while loops
+        loop_start = len(self.code.instructions)
+        self.compile_expression(while_statement.condition)
+        exit_jump = self.emit(OpCode.JUMP_IF_FALSE)
+        self.compile_statement(while_statement.body)
+        self.emit(OpCode.JUMP, loop_start)
+        self.patch_jump(exit_jump)
+
+    def visit_function_statement(self, function_statement):
+        self.emit(OpCode.MAKE_FUNCTION, self.add_constant(FunctionPrototype(function_statement)))
+        self._emit_definition(function_statement, function_statement.name.lexeme)
+
+    def visit_return_statement(self, return_statement):
+        if return_statement.value:
+            self.compile_expression(return_statement.value)
+        else:
+            self.emit(OpCode.LOAD_CONST, self.add_constant(None))
+        self.emit(OpCode.RETURN)
+
+    def visit_include_statement(self, include_statement):
+        self.emit(OpCode.INCLUDE, self.add_constant(include_statement.path))
+
+    def visit_class_statement(self, class_statement):
+        pass
+
+    # VISITOR INTERFACE FOR EXPRESSIONS ---------------------------------------------
+    # every expression leaves its value on the stack
+
+    def visit_binary_expression(self, binary_expression):
+        operator = binary_expression.operator
+        yield binary_expression.left_operand
+        if operator.token_type in (TokenType.AND, TokenType.OR):
+            # short-circuit - the right operand is evaluated only if the left one does not decide
+            is_and = operator.token_type == TokenType.AND
+            short_circuit_jump = self.emit(OpCode.JUMP_IF_FALSE if is_and else OpCode.JUMP_IF_TRUE)
+            yield binary_expression.right_operand
+            self.emit(OpCode.TRUTH)
+            end_jump = self.emit(OpCode.JUMP)
+            self.patch_jump(short_circuit_jump)
+            self.emit(OpCode.LOAD_CONST, self.add_constant(bool_value(not is_and)))
+            self.patch_jump(end_jump)
+            return
+
+        yield binary_expression.right_operand
+        binary_operator = (
+            BINARY_OPERATORS[operator.token_type.code] or RuntimeOperators.get_runtime_value_for_binary_operator)
+        self.emit(OpCode.BINARY, self.add_constant((binary_operator, operator)))
+
+    def visit_group_expression(self, group_expression):
+        yield group_expression.expression
+
+    def visit_literal_expression(self, literal_expression):
+        # literals are immutable, one value serves every evaluation
+        self.emit(OpCode.LOAD_CONST, self.add_constant(
+            RuntimeOperators.get_runtime_value_for_literal_token(token=literal_expression.value)))
+
+    def visit_unary_expression(self, unary_expression):
+        operator = unary_expression.operator
+        yield unary_expression.operand
+        unary_operator = UNARY_OPERATORS[operator.token_type.code] or RuntimeOperators.get_runtime_value_for_unary_operator
+        self.emit(OpCode.UNARY, self.add_constant((unary_operator, operator)))
+
+    def visit_assign_expression(self, assign_expression):
+        yield assign_expression.value
+        self._emit_variable((OpCode.STORE_GLOBAL, OpCode.STORE_LOCAL, OpCode.STORE_NAME), assign_expression)
+
+    def visit_variable_expression(self, variable_expression):
+        self._emit_variable((OpCode.LOAD_GLOBAL, OpCode.LOAD_LOCAL, OpCode.LOAD_NAME), variable_expression)
+
+    def visit_call_expression(self, call_expression):
+        yield call_expression.callee
+        for argument in call_expression.arguments:
+            yield argument
+        self.emit(OpCode.CALL, self.add_constant((len(call_expression.arguments), call_expression.callee)))
+
+    # objects are not implemented yet, their expressions evaluate to None (as in the Interpreter)
+
+    def visit_get_expression(self, get_expression):
+        self.emit(OpCode.LOAD_CONST, self.add_constant(None))
+
+    def visit_this_expression(self, this_expression):
+        self.emit(OpCode.LOAD_CONST, self.add_constant(None))
+
+    def visit_set_expression(self, set_expression):
+        self.emit(OpCode.LOAD_CONST, self.add_constant(None))
+
+    def visit_super_expression(self, super_expression):
+        self.emit(OpCode.LOAD_CONST, self.add_constant(None))
+
+
+# text of the arguments in the listing of the instructions (opcodes not listed have no argument)
+ARGUMENT_FORMATS = {
+    OpCode.LOAD_CONST: lambda constant: str(constant),
+    OpCode.LOAD_GLOBAL: lambda name: name.lexeme,
+    OpCode.LOAD_LOCAL: lambda local: '{} (depth {}, slot {})'.format(local[2].lexeme, local[0], local[1]),
+    OpCode.LOAD_NAME: lambda name: name.lexeme,
+    OpCode.STORE_GLOBAL: lambda name: name.lexeme,
+    OpCode.STORE_LOCAL: lambda local: '{} (depth {}, slot {})'.format(local[2].lexeme, local[0], local[1]),
+    OpCode.STORE_NAME: lambda name: name.lexeme,
+    OpCode.DEFINE_NAME: lambda name: name,
+    OpCode.DEFINE_LOCAL: lambda local: '{} (slot {})'.format(local[1], local[0]),
+    OpCode.UNARY: lambda operator: operator[1].lexeme,
+    OpCode.BINARY: lambda operator: operator[1].lexeme,
+    OpCode.MAKE_FUNCTION: lambda prototype: str(prototype),
+    OpCode.CALL: lambda call: '{} arguments'.format(call[0]),
+    OpCode.INCLUDE: lambda path: path.lexeme,
+}
+
+JUMP_OPCODES = (OpCode.JUMP, OpCode.JUMP_IF_FALSE, OpCode.JUMP_IF_TRUE)
+
+
+def disassemble(code, nested=True):
+    """
+    Return listing of the instructions of the code (offset, opcode, argument and its meaning). With nested,
+    bodies of the functions declared in the code follow, compiled (and lazily parsed bodies parsed) if needed
+    """
+    lines = ['== {} =='.format(code.name)]
+    prototypes = []
+    instructions = code.instructions
+    for offset in range(0, len(instructions), 2):
+        opcode, argument = OpCode(instructions[offset]), instructions[offset + 1]
+        line = '{:>6}  {:<18}'.format(offset, opcode.name)
+        if opcode in JUMP_OPCODES:
+            line += '{:>5}'.format(argument)
+        elif opcode in ARGUMENT_FORMATS:
+            constant = code.constants[argument]
+            line += '{:>5}  {}'.format(argument, ARGUMENT_FORMATS[opcode](constant))
+            if opcode == OpCode.MAKE_FUNCTION:
+                prototypes.append(constant)
+        lines.append(line.rstrip())
+
+    if nested:
+        for prototype in prototypes:
+            lines.append('')
+            lines.append(disassemble(prototype.compile()))
+    return '\n'.join(lines)
@@ -0,0 +1,479 @@
+"""
+Execution engine compiling the AST to nested Python closures ahead of the execution. Every node becomes a closure
+specialised for it (operator function, literal value and variable binding are looked up once, at compile time),
+executing a program is calling the closures of its statements with the environment
+"""
+import os
+from src.ast_intern import relocate_error
+from src.ast_walker import AstFolder
+from src.error_handler import ErrorHandler, InterpretError, ParseError, ResolveError
+from src.interpreter_runtime import Function, RuntimeOperators, Environment, NULL_VALUE, TRUE_VALUE, FALSE_VALUE
+from src.interpreter_runtime import GlobalEnvironment, UNARY_OPERATORS, BINARY_OPERATORS, UNDEFINED, bool_value
+from src.module_cache import ModuleCache, resolve_module_path
+from src.resolver import Resolver, GLOBAL, DYNAMIC
+from src.tokens import TokenType
+
+
+def run_statements(statements, environment):
+    """
+    Execute the compiled statements. Closures of the statements return None, or (value,) when a return statement
+    was executed - the rest of the statements is skipped and the completion is returned
+    """
+    for statement in statements:
+        completion = statement(environment)
+        if completion is not None:
+            return completion
+    return None
+
+
+class FunctionBody:
+    """
+    Body of a function, compiled on its first call (a lazily parsed body gets parsed at that point) and shared
+    by all closures of the function
+    """
+    def __init__(self, compiler, declaration):
+        self.compiler = compiler
+        self.declaration = declaration
+        self.statements = None
+
+    def __call__(self, environment):
+        if self.statements is None:
+            self.statements = [self.compiler.compile_statement(statement)
+                               for statement in self.declaration.body.statements]
+        completion = run_statements(self.statements, environment)
+        return completion[0] if completion is not None else None
+
+
+class ClosureFunction(Function):
+    """
+    Function value of the ClosureInterpreter - its body is the compiled FunctionBody
+    """
+    def __init__(self, body, closure):
+        super().__init__(body.declaration, closure)
+        self.body = body
+
+    def call(self, interpreter, arguments):
+        # parameters are the first slots of the environment of the call
+        environment = Environment(self.closure)
+        environment.values = arguments
+        environment.names = list(self.parameter_names)
+        return self.body(environment)
+
+
+# left-associative chains of binary operators longer than this are compiled to binary_chain (shorter ones are nested
+# closures, which are faster)
+MAX_NESTED_BINARY_DEPTH = 16
+
+
+def binary_chain(first, steps):
+    """
+    Return closure of a left-associative chain of binary operators: value of the first operand passed through
+    the steps (see ClosureCompiler._binary_step)
+    """
+    def chain(environment):
+        value = first(environment)
+        for step in steps:
+            value = step(value, environment)
+        return value
+    chain.first, chain.steps = first, steps
+    return chain
+
+
+class ClosureCompiler(AstFolder):
+    """
+    Compiler of the resolved statements (see Resolver) to closures taking the environment. Statement closures
+    return the completion (see run_statements), expression closures return the value. Expressions are compiled
+    bottom-up without recursion (see AstFolder), statements recursively
+    """
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+
+    def compile(self, statements):
+        """
+        Return closure executing the statements in the given environment
+        """
+        compiled_statements = [self.compile_statement(statement) for statement in statements]
+
+        def program(environment):
+            run_statements(compiled_statements, environment)
+        return program
+
+    def compile_statement(self, statement):
+        compiled_statement = statement.accept(self)
+        expression_line = getattr(statement, 'expression_line', None)
+        if expression_line is None:
+            return compiled_statement
+
+        def statement_with_shared_expression(environment):
+            try:
+                return compiled_statement(environment)
+            except InterpretError as error:
+                relocate_error(error, expression_line)
+                raise
+        return statement_with_shared_expression
+
+    def compile_expression(self, expression):
+        return self.fold(expression)
+
+    # VISITOR INTERFACE FOR STATEMENTS ----------------------------------------------
+
+    def visit_var_statement(self, var_statement):
+        if var_statement.initializer:
+            initializer = self.compile_expression(var_statement.initializer)
+        else:
+            def initializer(environment):
+                return NULL_VALUE
+        define = self._definition(var_statement, var_statement.name.lexeme)
+
+        def var_statement_closure(environment):
+            define(environment, initializer(environment))
+        return var_statement_closure
+
+    def visit_expression_statement(self, expression_statement):
+        expression = self.compile_expression(expression_statement.expression)
+
+        def expression_statement_closure(environment):
+            expression(environment)
+        return expression_statement_closure
+
+    def visit_print_statement(self, print_statement):
+        expression = self.compile_expression(print_statement.expression)
+
+        def print_statement_closure(environment):
+            print(expression(environment).value)
+        return print_statement_closure
+
+    def visit_block_statement(self, block_statement):
+        statements = [self.compile_statement(statement) for statement in block_statement.statements]
+
+        def block_statement_closure(environment):
+            return run_statements(statements, Environment(enclosing_environment=environment))
+        return block_statement_closure
+
+    def visit_if_statement(self, if_statement):
+        condition = self.compile_expression(if_statement.condition)
+        then_branch = self.compile_statement(if_statement.then_branch)
+        if not if_statement.else_branch:
+            def if_statement_closure(environment):
+                if condition(environment).is_truthy():
+                    return then_branch(environment)
+            return if_statement_closure
+
+        else_branch = self.compile_statement(if_statement.else_branch)
+
+        def if_else_statement_closure(environment):
+            if condition(environment).is_truthy():
+                return then_branch(environment)
+            return else_branch(environment)
+        return if_else_statement_closure
+
+    def visit_while_statement(self, while_statement):
+        condition = self.compile_expression(while_statement.condition)
+        body = self.compile_statement(while_statement.body)
+
+        def while_statement_closure(environment):
+            while condition(environment).is_truthy():
+                completion = body(environment)
+                if completion is not None:
+                    return completion
+        return while_statement_closure
+
+    def visit_function_statement(self, function_statement):
+        body = FunctionBody(self, function_statement)
+        define = self._definition(function_statement, function_statement.name.lexeme)
+
+        def function_statement_closure(environment):
+            define(environment, ClosureFunction(body, environment))
+        return function_statement_closure
+
+    def visit_return_statement(self, return_statement):
+        if not return_statement.value:
+            return lambda environment: (None,)
+        value = self.compile_expression(return_statement.value)
+
+        def return_statement_closure(environment):
+            return (value(environment),)
+        return return_statement_closure
+
+    def visit_include_statement(self, include_statement):
+        path_token = include_statement.path
+        interpreter = self.interpreter
+
+        def include_statement_closure(environment):
+            interpreter.include(path_token)
+        return include_statement_closure
+
+    def visit_class_statement(self, class_statement):
+        return lambda environment: None
+
+    @staticmethod
+    def _definition(declaration, name):
+        """
+        Return function defining the variable of the declaration in the environment
+        """
+        slot = declaration.binding
+        if slot is None or slot is GLOBAL:
+            return lambda environment, value: environment.define(name, value)
+        return lambda environment, value: environment.define_at(slot, name, value)
+
+    # VISITOR INTERFACE FOR EXPRESSIONS ---------------------------------------------
+    # closures of the child nodes are in self.children_values
+
+    def visit_binary_expression(self, binary_expression):
+        left, right = self.children_values
+        operator = binary_expression.operator
+        step = self._binary_step(operator, right)
+
+        # long left-associative chains (a + b + c ...) are one loop over the steps, nested closures would call each
+        # other once per operator. The closure of the left operand is used only by this node, its steps are taken over
+        steps = getattr(left, 'steps', None)
+        if steps is not None:
+            steps.append(step)
+            return binary_chain(left.first, steps)
+        depth = getattr(left, 'depth', 0) + 1
+        if depth > MAX_NESTED_BINARY_DEPTH:
+            steps = [step]
+            while depth > 1:
+                steps.append(left.step)
+                left, depth = left.first, depth - 1
+            steps.reverse()
+            return binary_chain(left, steps)
+
+        binary = self._binary(left, operator, right)
+        binary.first, binary.step, binary.depth = left, step, depth
+        return binary
+
+    @staticmethod
+    def _binary(left, operator, right):
+        """
+        Return closure of one binary operator
+        """
+        # short-circuit of the logical operators
+        if operator.token_type == TokenType.AND:
+            def logical_and(environment):
+                if not left(environment).is_truthy():
+                    return FALSE_VALUE
+                return bool_value(right(environment).is_truthy())
+            return logical_and
+
+        if operator.token_type == TokenType.OR:
+            def logical_or(environment):
+                if left(environment).is_truthy():
+                    return TRUE_VALUE
+                return bool_value(right(environment).is_truthy())
+            return logical_or
+
+        binary_operator = (
+            BINARY_OPERATORS[operator.token_type.code] or RuntimeOperators.get_runtime_value_for_binary_operator)
+
+        def binary(environment):
+            return binary_operator(left(environment), operator, right(environment))
+        return binary
+
+    @staticmethod
+    def _binary_step(operator, right):
+        """
+        Return function computing the value of the binary operator from the value of the left operand
+        and the environment (the right operand is evaluated by the function) - a step of binary_chain
+        """
+        if operator.token_type == TokenType.AND:
+            def logical_and(left_value, environment):
+                if not left_value.is_truthy():
+                    return FALSE_VALUE
+                return bool_value(right(environment).is_truthy())
+            return logical_and
+
+        if operator.token_type == TokenType.OR:
+            def logical_or(left_value, environment):
+                if left_value.is_truthy():
+                    return TRUE_VALUE
+                return bool_value(right(environment).is_truthy())
+            return logical_or
+
+        binary_operator = (
+            BINARY_OPERATORS[operator.token_type.code] or RuntimeOperators.get_runtime_value_for_binary_operator)
+
+        def binary_step(left_value, environment):
+            return binary_operator(left_value, operator, right(environment))
+        return binary_step
+
+    def visit_group_expression(self, group_expression):
+        return self.children_values[0]
+
+    def visit_literal_expression(self, literal_expression):
+        # literals are immutable, one value serves every evaluation
+        value = RuntimeOperators.get_runtime_value_for_literal_token(token=literal_expression.value)
+        return lambda environment: value
+
+    def visit_unary_expression(self, unary_expression):
+        operand = self.children_values[0]
+        operator = unary_expression.operator
+        unary_operator = UNARY_OPERATORS[operator.token_type.code] or RuntimeOperators.get_runtime_value_for_unary_operator
+
+        def unary(environment):
+            return unary_operator(operator, operand(environment))
+        return unary
+
+    def visit_assign_expression(self, assign_expression):
+        value = self.children_values[0]
+        name = assign_expression.name
+        binding = assign_expression.binding
+        if binding is GLOBAL:
+            def assign_global(environment):
+                result = value(environment)
+                environment.globals.assign(name, result)
+                return result
+            return assign_global
+
+        if binding is None or binding is DYNAMIC:
+            def assign_by_name(environment):
+                result = value(environment)
+                environment.assign(name, result)
+                return result
+            return assign_by_name
+
+        depth, slot = binding
+
+        def assign_local(environment):
+            result = value(environment)
+            environment.assign_at(depth, slot, name, result)
+            return result
+        return assign_local
+
+    def visit_variable_expression(self, variable_expression):
+        name = variable_expression.name
+        binding = variable_expression.binding
+        if binding is GLOBAL:
+            lexeme = name.lexeme
+
+            def global_variable(environment):
+                try:
+                    return environment.globals.values[lexeme]
+                except KeyError:
+                    return environment.globals.get(name)
+            return global_variable
+
+        if binding is None or binding is DYNAMIC:
+            return lambda environment: environment.get(name)
+
+        depth, slot = binding
+        if depth:
+            return lambda environment: environment.get_at(depth, slot, name)
+
+        def local_variable(environment):
+            values = environment.values
+            if slot < len(values) and values[slot] is not UNDEFINED:
+                return values[slot]
+            return environment.get_at(0, slot, name)
+        return local_variable
+
+    def visit_call_expression(self, call_expression):
+        callee_expression = call_expression.callee
+        callee, arguments = self.children_values[0], self.children_values[1:]
+        interpreter = self.interpreter
+
+        def call(environment):
+            function = callee(environment)
+            values = [argument(environment) for argument in arguments]
+            if not function.is_function():
+                raise InterpretError(function, "Expected the callee to be callable")
+
+            if len(values) != function.get_arity():
+                raise InterpretError(
+                    callee_expression,
+                    'Expected {} arguments but got {}'.format(function.get_arity(), len(values))
+                )
+
+            return function.call(interpreter, values)
+        return call
+
+    # objects are not implemented yet, their expressions evaluate to None (as in the Interpreter)
+
+    def visit_get_expression(self, get_expression):
+        return lambda environment: None
+
+    def visit_this_expression(self, this_expression):
+        return lambda environment: None
+
+    def visit_set_expression(self, set_expression):
+        return lambda environment: None
+
+    def visit_super_expression(self, super_expression):
+        return lambda environment: None
+
+
+class ClosureInterpreter:
+    """
+    Alternative to the Interpreter - statements are resolved, compiled to closures (see ClosureCompiler) and
+    executed by calling them. Values, environments and operators are the ones of the Interpreter
+    (interpreter_runtime), so the output and the errors are the same
+    """
+    def __init__(self, statements=None, modules=None, source_file=None):
+        """
+        Included modules are taken from the ModuleCache modules, their paths are relative to the directory
+        of the source_file (current directory if there is no source file)
+        """
+        self.modules = modules if modules is not None else ModuleCache()
+        self.source_file = source_file
+        self.upload_statements(statements)
+
+    def upload_statements(self, statements):
+        self.statements = statements or []
+        self.global_environment = GlobalEnvironment()
+        self.error_handler = ErrorHandler()
+        self.directory = os.path.dirname(os.path.abspath(self.source_file)) if self.source_file else os.getcwd()
+        # every module is executed only once, the first time it is included
+        self.included_modules = {os.path.abspath(self.source_file)} if self.source_file else set()
+        self.resolver = Resolver(self.modules, self.directory, self.included_modules)
+
+    def interpret(self, statements=None):
+        """
+        Resolve, compile and execute the statements. Nothing is executed if the Resolver finds errors, statements
+        coming from an iterator (e.g. StreamingParser.parse_iter) are resolved, compiled and executed one by one
+        """
+        if statements:
+            self.upload_statements(statements)
+
+        try:
+            if isinstance(self.statements, list):
+                self.compile(self.statements)(self.global_environment)
+            else:
+                for statement in self.statements:
+                    self.compile([statement])(self.global_environment)
+        except (InterpretError, ParseError, ResolveError) as error:
+            # ParseError and ResolveError come from a lazily parsed function body
+            self.error_handler.add_error(error)
+
+    def compile(self, statements):
+        """
+        Return closure of the statements, ResolveError is raised if they do not resolve (the other errors
+        are added to the error_handler)
+        """
+        self.resolver.resolve(statements)
+        errors = self.resolver.error_handler.errors
+        if errors:
+            for error in errors[:-1]:
+                self.error_handler.add_error(error)
+            raise errors[-1]
+        return ClosureCompiler(self).compile(statements)
+
+    def include(self, path_token):
+        """
+        Execute the module at the path (relative to the directory of the including code), if it was not included yet
+        """
+        path = resolve_module_path(path_token.literal, self.directory)
+        if path in self.included_modules:
+            return
+        self.included_modules.add(path)
+
+        module = self.modules.get(path)
+        if module.errors:
+            raise module.include_error(path_token)
+
+        # definitions of the module are global, as if its code was at the top level of the program
+        old_directory = self.directory
+        try:
+            self.directory = os.path.dirname(path)
+            ClosureCompiler(self).compile(module.statements)(self.global_environment)
+        finally:
+            self.directory = old_directory
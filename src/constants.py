@@ -18,3 +18,7 @@ class AppType(Enum):
     PARSER = 'Parser class'
     INTERPRETER = 'Interpreter class'
     ENVIRONMENT = 'Storage for variable name - value bindings'
+
+
+# has to be changed whenever the tokens or the AST nodes change (cached ASTs of older versions are not used)
+INTERPRETER_VERSION = '0.4.1'
@@ -1,4 +1,6 @@
 from src.logger import Logger as log
+from src.tokens import TokenType
+from src.token_buffer import TokenBuffer
 
 
 class ErrorHandler:
@@ -11,7 +13,26 @@ class ErrorHandler:
     def add_error(self, error):
         self.errors.append(error)
 
-    def log_errors(self):
+    def log_errors(self, tokens=None):
+        """
+        Log all collected errors. If scanned tokens (list of TokenOsu or TokenBuffer) are given,
+        lexical errors (ERROR tokens) are logged first
+        """
+        for message in self.get_messages(tokens):
+            log.error(message)
+
+    def get_messages(self, tokens=None):
+        """
+        Return messages of all collected errors (see log_errors)
+        """
+        messages = []
+        for token in self._get_error_tokens(tokens):
+            messages.append('LexicalError: {} (line {}, around {})'.format(
+                token.literal or 'Unexpected token',
+                token.source_file_line_number,
+                token.lexeme,
+            ))
+
         for error in self.errors:
             msg = '{}: {}'.format(
                 type(error).__name__,
@@ -22,7 +43,15 @@ class ErrorHandler:
                     error.token.source_file_line_number,
                     error.token.lexeme,
                 )
-            log.error(msg)
+            messages.append(msg)
+        return messages
+
+    @staticmethod
+    def _get_error_tokens(tokens):
+        if isinstance(tokens, TokenBuffer):
+            # only ERROR tokens get materialized
+            return tokens.tokens_of_types(TokenType.ERROR.bit)
+        return [token for token in tokens or [] if token.token_type == TokenType.ERROR]
 
 
 class ParseError(Exception):
@@ -31,6 +60,12 @@ class ParseError(Exception):
         self.message = message
 
 
+class ResolveError(Exception):
+    def __init__(self, token, message):
+        self.token = token
+        self.message = message
+
+
 class InterpretError(Exception):
     def __init__(self, token, message):
         self.token = token
@@ -1,146 +1,263 @@
+import os
+from src.ast_intern import relocate_error
+from src.ast_walker import evaluate
 from src.constants import AppType
-from src.error_handler import ErrorHandler, InterpretError
-from src.interpreter_runtime import Function, Return
-from src.interpreter_runtime import RuntimeValue, RuntimeDataType, RuntimeOperators, Environment
+from src.error_handler import ErrorHandler, InterpretError, ParseError, ResolveError
+from src.interpreter_runtime import Function, Return, NULL_VALUE, TRUE_VALUE, FALSE_VALUE
+from src.interpreter_runtime import RuntimeValue, RuntimeOperators, Environment, GlobalEnvironment
 from src.logger import Logger as log
+from src.module_cache import ModuleCache, resolve_module_path
+from src.resolver import Resolver, GLOBAL, DYNAMIC
 from src.tokens import TokenType
 
 
 class Interpreter:
-    def __init__(self, statements=None):
+    def __init__(self, statements=None, modules=None, source_file=None):
+        """
+        Included modules are taken from the ModuleCache modules, their paths are relative to the directory
+        of the source_file (current directory if there is no source file)
+        """
+        self.modules = modules if modules is not None else ModuleCache()
+        self.source_file = source_file
         self.upload_statements(statements)
 
     def upload_statements(self, statements):
         self.statements = statements or []
         # TODO: May need deep copy to avoid side effects
-        self.environment = Environment()
+        self.environment = self.global_environment = GlobalEnvironment()
         self.error_handler = ErrorHandler()
+        self.directory = os.path.dirname(os.path.abspath(self.source_file)) if self.source_file else os.getcwd()
+        # every module is executed only once, the first time it is included
+        self.included_modules = {os.path.abspath(self.source_file)} if self.source_file else set()
+        self.resolver = Resolver(self.modules, self.directory, self.included_modules)
 
     def interpret(self, statements=None):
+        """
+        Resolve and execute the statements. Nothing is executed if the Resolver finds errors, statements coming
+        from an iterator (e.g. StreamingParser.parse_iter) are resolved and executed one by one
+        """
         if statements:
             self.upload_statements(statements)
 
         try:
+            if isinstance(self.statements, list):
+                self.resolver.resolve(self.statements)
+                self._raise_resolve_errors()
             for statement in self.statements:
-                self.execute_statement(statement)
-        except InterpretError as error:
+                if not isinstance(self.statements, list):
+                    self.resolver.resolve_statement(statement)
+                    self._raise_resolve_errors()
+                if self.execute_statement(statement) is not None:
+                    # return at the top level ends the program
+                    break
+        except (InterpretError, ParseError, ResolveError) as error:
+            # ParseError and ResolveError come from a lazily parsed function body
             self.error_handler.add_error(error)
 
+    def _raise_resolve_errors(self):
+        errors = self.resolver.error_handler.errors
+        if errors:
+            for error in errors[:-1]:
+                self.error_handler.add_error(error)
+            raise errors[-1]
+
     def execute_block(self, statements, environment):
+        """
+        Execute the statements in the environment. Return the Return completion of a return statement executed
+        in the statements (the statements after it are not executed), None if they complete normally
+        """
         old_environment = self.environment
         try:
             self.environment = environment
             for statement in statements:
-                self.execute_statement(statement)
+                completion = self.execute_statement(statement)
+                if completion is not None:
+                    return completion
         finally:
             self.environment = old_environment
+        return None
 
-    def execute_statement(self, statement) -> None:
-        statement.accept(self)
+    def execute_statement(self, statement):
+        """
+        Execute the statement, return its completion - Return if a return statement was executed, else None
+        """
+        try:
+            return statement.accept(self)
+        except InterpretError as error:
+            relocate_error(error, getattr(statement, 'expression_line', None))
+            raise
 
     def evaluate_expression(self, expression) -> RuntimeValue:
-        return expression.accept(self)
+        return evaluate(expression, self)
 
     # VISITOR INTERFACE FOR STATEMENTS ----------------------------------------------
+    # Methods return the completion of the statement: None, or Return propagated to the enclosing statements
+    # up to the function call (returning does not raise an exception, which would unwind every enclosing block)
 
     def visit_var_statement(self, var_statement) -> None:
-        log.info(AppType.INTERPRETER, f'visit_var_statement: {var_statement}')
+        if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+            log.info(AppType.INTERPRETER, 'visit_var_statement: {}', var_statement)
         if var_statement.initializer:
             value = self.evaluate_expression(var_statement.initializer)
         else:
-            value = RuntimeValue(value=None, data_type=RuntimeDataType.NULL)
-        self.environment.define(name=var_statement.name.lexeme, value=value)
+            value = NULL_VALUE
+        self._define(var_statement, var_statement.name.lexeme, value)
 
     def visit_expression_statement(self, expression_statement) -> None:
-        log.info(AppType.INTERPRETER, f'visit_expression_statement: {expression_statement}')
+        if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+            log.info(AppType.INTERPRETER, 'visit_expression_statement: {}', expression_statement)
         self.evaluate_expression(expression_statement.expression)
 
     def visit_print_statement(self, print_statement) -> None:
-        log.info(AppType.INTERPRETER, f'visit_print_statement: {print_statement}')
+        if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+            log.info(AppType.INTERPRETER, 'visit_print_statement: {}', print_statement)
         print_value = self.evaluate_expression(print_statement.expression)
         print(print_value.value)
 
-    def visit_block_statement(self, block_statement) -> None:
-        log.info(AppType.INTERPRETER, f'visit_block_statement: {block_statement}')
-        self.execute_block(block_statement.statements, Environment(enclosing_environment=self.environment))
-        log.info(AppType.INTERPRETER, f'finished visit_block_statement {block_statement}')
-
-    def visit_if_statement(self, if_statement) -> None:
-        log.info(AppType.INTERPRETER, f'visit_if_statement: {if_statement}')
+    def visit_block_statement(self, block_statement):
+        if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+            log.info(AppType.INTERPRETER, 'visit_block_statement: {}', block_statement)
+        completion = self.execute_block(block_statement.statements, Environment(enclosing_environment=self.environment))
+        if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+            log.info(AppType.INTERPRETER, 'finished visit_block_statement {}', block_statement)
+        return completion
+
+    def visit_if_statement(self, if_statement):
+        if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+            log.info(AppType.INTERPRETER, 'visit_if_statement: {}', if_statement)
         if self.evaluate_expression(if_statement.condition).is_truthy():
-            self.execute_statement(if_statement.then_branch)
-        elif if_statement.else_branch:
-            self.execute_statement(if_statement.else_branch)
-
-    def visit_while_statement(self, while_statement) -> None:
-        log.info(AppType.INTERPRETER, f'visit_while_statement: {while_statement}')
+            return self.execute_statement(if_statement.then_branch)
+        if if_statement.else_branch:
+            return self.execute_statement(if_statement.else_branch)
+        return None
+
+    def visit_while_statement(self, while_statement):
+        if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+            log.info(AppType.INTERPRETER, 'visit_while_statement: {}', while_statement)
         while self.evaluate_expression(while_statement.condition).is_truthy():
-            self.execute_statement(while_statement.body)
+            completion = self.execute_statement(while_statement.body)
+            if completion is not None:
+                return completion
+        return None
 
     def visit_function_statement(self, function_statement) -> None:
-        log.info(AppType.INTERPRETER, f'visit_function_statement: {function_statement}')
+        if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+            # only the signature is logged - printing the body would parse a lazily parsed body before its first call
+            parameters = ', '.join(parameter.lexeme for parameter in function_statement.parameters)
+            log.info(AppType.INTERPRETER, 'visit_function_statement: {}({})', function_statement.name.lexeme, parameters)
         function = Function(function_statement, self.environment)
-        self.environment.define(function_statement.name.lexeme, function)
+        self._define(function_statement, function_statement.name.lexeme, function)
+
+    def _define(self, declaration, name, value):
+        slot = declaration.binding
+        if slot is None or slot is GLOBAL:
+            self.environment.define(name, value)
+        else:
+            self.environment.define_at(slot, name, value)
 
-    def visit_return_statement(self, return_statement) -> None:
-        log.info(AppType.INTERPRETER, f'visit_return_statement: {return_statement}')
+    def visit_return_statement(self, return_statement):
+        if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+            log.info(AppType.INTERPRETER, 'visit_return_statement: {}', return_statement)
         value = None
         if return_statement.value:
             value = self.evaluate_expression(return_statement.value)
 
-        raise Return(value)
+        return Return(value)
+
+    def visit_include_statement(self, include_statement) -> None:
+        path = resolve_module_path(include_statement.path.literal, self.directory)
+        if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+            log.info(AppType.INTERPRETER, 'visit_include_statement: {}', path)
+        if path in self.included_modules:
+            return
+        self.included_modules.add(path)
+
+        module = self.modules.get(path)
+        if module.errors:
+            raise module.include_error(include_statement.path)
+
+        # definitions of the module are global, as if its code was at the top level of the program
+        old_directory = self.directory
+        try:
+            self.directory = os.path.dirname(path)
+            # return at the top level of the module ends the module only
+            self.execute_block(module.statements, self.global_environment)
+        finally:
+            self.directory = old_directory
 
     def visit_class_statement(self, class_statement) -> None:
-        log.info(AppType.INTERPRETER, f'visit_class_statement: {class_statement}')
+        if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+            log.info(AppType.INTERPRETER, 'visit_class_statement: {}', class_statement)
         pass
 
     # VISITOR INTERFACE FOR EXPRESSIONS ---------------------------------------------
+    # Methods of the expressions with operands are generators run by ast_walker.evaluate: they yield the operand
+    # to be evaluated and receive its value, so that deep expressions do not recurse in Python
 
-    def visit_binary_expression(self, binary_expression) -> RuntimeValue:
-        left = self.evaluate_expression(binary_expression.left_operand)
+    def visit_binary_expression(self, binary_expression):
+        left = yield binary_expression.left_operand
         operator = binary_expression.operator
 
         # short-circuit of the logical AND operator
         if operator.token_type == TokenType.AND and not left.is_truthy():
-            log.info(AppType.INTERPRETER, 'Logical AND evaluation short-circuited. Returning FALSE')
-            return RuntimeValue(False, RuntimeDataType.BOOL)
+            if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+                log.info(AppType.INTERPRETER, 'Logical AND evaluation short-circuited. Returning FALSE')
+            return FALSE_VALUE
 
         # short-circuit of the logical OR operator
         if operator.token_type == TokenType.OR and left.is_truthy():
-            log.info(AppType.INTERPRETER, 'Logical OR evaluation short-circuited. Returning TRUE')
-            return RuntimeValue(True, RuntimeDataType.BOOL)
+            if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+                log.info(AppType.INTERPRETER, 'Logical OR evaluation short-circuited. Returning TRUE')
+            return TRUE_VALUE
 
         return RuntimeOperators.get_runtime_value_for_binary_operator(
             left=left,
             operator=operator,
-            right=self.evaluate_expression(binary_expression.right_operand)
+            right=(yield binary_expression.right_operand)
         )
 
-    def visit_group_expression(self, group_expression) -> RuntimeValue:
-        return self.evaluate_expression(group_expression.expression)
+    def visit_group_expression(self, group_expression):
+        return (yield group_expression.expression)
 
     def visit_literal_expression(self, literal_expression) -> RuntimeValue:
-        return RuntimeOperators.get_runtime_value_for_literal_token(
-            token=literal_expression.value
-        )
+        # literals are immutable, their value is computed once and cached on the node
+        value = literal_expression.runtime_value
+        if value is None:
+            value = literal_expression.runtime_value = RuntimeOperators.get_runtime_value_for_literal_token(
+                token=literal_expression.value
+            )
+        return value
 
-    def visit_unary_expression(self, unary_expression) -> RuntimeValue:
+    def visit_unary_expression(self, unary_expression):
         return RuntimeOperators.get_runtime_value_for_unary_operator(
             operator=unary_expression.operator,
-            operand=self.evaluate_expression(unary_expression.operand)
+            operand=(yield unary_expression.operand)
         )
 
-    def visit_assign_expression(self, assign_expression) -> RuntimeValue:
-        value = self.evaluate_expression(assign_expression.value)
-        self.environment.assign(assign_expression.name, value)
+    def visit_assign_expression(self, assign_expression):
+        value = yield assign_expression.value
+        binding = assign_expression.binding
+        if binding is GLOBAL:
+            self.environment.globals.assign(assign_expression.name, value)
+        elif binding is None or binding is DYNAMIC:
+            self.environment.assign(assign_expression.name, value)
+        else:
+            self.environment.assign_at(*binding, assign_expression.name, value)
         return value
 
     def visit_variable_expression(self, variable_expression) -> RuntimeValue:
-        return self.environment.get(variable_expression.name)
-
-    def visit_call_expression(self, call_expression) -> RuntimeValue:
-        callee = self.evaluate_expression(call_expression.callee)
-        arguments = [self.evaluate_expression(arg) for arg in call_expression.arguments]
+        binding = variable_expression.binding
+        if binding is GLOBAL:
+            return self.environment.globals.get(variable_expression.name)
+        if binding is None or binding is DYNAMIC:
+            return self.environment.get(variable_expression.name)
+        return self.environment.get_at(*binding, variable_expression.name)
+
+    def visit_call_expression(self, call_expression):
+        callee = yield call_expression.callee
+        arguments = []
+        for arg in call_expression.arguments:
+            arguments.append((yield arg))
 
         if not callee.is_function():
             raise InterpretError(callee, "Expected the callee to be callable")
@@ -1,8 +1,7 @@
-from copy import deepcopy
 from enum import Enum
 from src.constants import Color, AppType
 from src.logger import Logger as log
-from src.tokens import TokenType, TokenOsu
+from src.tokens import TokenType, TokenOsu, token_table
 from src.error_handler import InterpretError
 
 
@@ -74,30 +73,65 @@ class RuntimeValue:
         return self.data_type in (RuntimeDataType.FUNCTION,)
 
 
+# RuntimeValues are never modified, so the common values are shared immutable singletons instead of being
+# allocated by every evaluation (like the small ints of Python, the range is the one of CPython)
+NULL_VALUE = RuntimeValue(None, RuntimeDataType.NULL)
+TRUE_VALUE = RuntimeValue(True, RuntimeDataType.BOOL)
+FALSE_VALUE = RuntimeValue(False, RuntimeDataType.BOOL)
+SMALL_INT_MIN = -5
+SMALL_INT_MAX = 256
+SMALL_INT_VALUES = [RuntimeValue(value, RuntimeDataType.INT) for value in range(SMALL_INT_MIN, SMALL_INT_MAX + 1)]
+
+
+def bool_value(value):
+    """
+    Return BOOL RuntimeValue of the Python bool
+    """
+    return TRUE_VALUE if value else FALSE_VALUE
+
+
+def int_value(value):
+    """
+    Return INT RuntimeValue of the value (shared one for small ints). Value of an INT is not always an int
+    (e.g. 2 ** -1), only ints are shared - 1.0 must not become 1
+    """
+    if value.__class__ is int and SMALL_INT_MIN <= value <= SMALL_INT_MAX:
+        return SMALL_INT_VALUES[value - SMALL_INT_MIN]
+    return RuntimeValue(value, RuntimeDataType.INT)
+
+
 class Function(RuntimeValue):
     def __init__(self, declaration, closure):
         super().__init__(data_type=RuntimeDataType.FUNCTION)
         self.declaration = declaration
-        self.closure = deepcopy(closure)
+        self.closure = closure.snapshot()
+        self.parameter_names = [parameter.lexeme for parameter in declaration.parameters]
 
     def get_arity(self):
         return len(self.declaration.parameters)
 
     def call(self, interpreter, arguments):
+        # parameters are the first slots of the environment of the call
         environment = Environment(self.closure)
-        for i in range(len(self.declaration.parameters)):
-            environment.define(self.declaration.parameters[i].lexeme, arguments[i])
+        environment.values = list(arguments)
+        environment.names = list(self.parameter_names)
 
-        try:
-            interpreter.execute_block(self.declaration.body.statements, environment)
-        except Return as _return:
-            return _return.value
+        completion = interpreter.execute_block(self.declaration.body.statements, environment)
+        if completion is not None:
+            return completion.value
+        return None
 
     def __str__(self):
         return '<function ' + self.declaration.name.lexeme + '>'
 
 
-class Return(Exception):
+class Return:
+    """
+    Completion of a return statement - the Interpreter returns it from the statements up to the function call
+    (see Interpreter.execute_block), it is not raised
+    """
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
@@ -111,15 +145,9 @@ class RuntimeOperators:
         """
         Return RuntimeValue object for a literal token
         """
-        LITERAL_TOKENS = {
-            TokenType.INT: lambda token: RuntimeValue(int(token.lexeme), RuntimeDataType.INT),
-            TokenType.FLOAT: lambda token: RuntimeValue(float(token.lexeme), RuntimeDataType.FLOAT),
-            TokenType.STRING: lambda token: RuntimeValue(token.lexeme[1: -1], RuntimeDataType.STRING),
-            TokenType.BOOL: lambda token: RuntimeValue(token.lexeme == 'TRUE', RuntimeDataType.BOOL),
-            TokenType.NULL: lambda token: RuntimeValue(None, RuntimeDataType.NULL),
-        }
-        if token.token_type in LITERAL_TOKENS:
-            return LITERAL_TOKENS[token.token_type](token)
+        runtime_value_for_literal = LITERAL_VALUES[token.token_type.code]
+        if runtime_value_for_literal:
+            return runtime_value_for_literal(token)
         raise InterpretError(token=token, message='Literal value is expected')
 
     @staticmethod
@@ -127,12 +155,9 @@ class RuntimeOperators:
         """
         Return RuntimeValue object for a unary operator
         """
-        UNARY_OPERATORS = {
-            TokenType.MINUS: RuntimeOperators._unary_minus,
-            TokenType.NOT: RuntimeOperators._unary_not,
-        }
-        if operator.token_type in UNARY_OPERATORS:
-            return UNARY_OPERATORS[operator.token_type](operator, operand)
+        unary_operator = UNARY_OPERATORS[operator.token_type.code]
+        if unary_operator:
+            return unary_operator(operator, operand)
         raise InterpretError(token=operator, message='Unary operator is exprected')
 
     @staticmethod
@@ -140,31 +165,17 @@ class RuntimeOperators:
         """
         Return RuntimeValue object for a binary operator
         """
-        BINARY_OPERATORS = {
-            TokenType.MINUS: RuntimeOperators._binary_minus,
-            TokenType.ASTERISK: RuntimeOperators._binary_asterisk,
-            TokenType.DIV: RuntimeOperators._binary_div,
-            TokenType.PLUS: RuntimeOperators._binary_plus,
-            TokenType.EXPONENT: RuntimeOperators._binary_exponent,
-            TokenType.REMAINDER: RuntimeOperators._binary_remainder,
-            TokenType.GTE: RuntimeOperators._binary_gte,
-            TokenType.GT: RuntimeOperators._binary_gt,
-            TokenType.LTE: RuntimeOperators._binary_lte,
-            TokenType.LT: RuntimeOperators._binary_lt,
-            TokenType.EQUALITY: RuntimeOperators._binary_equality,
-            TokenType.INEQUALITY: RuntimeOperators._binary_inequality,
-            TokenType.OR: RuntimeOperators._binary_logical_and_or,
-            TokenType.AND: RuntimeOperators._binary_logical_and_or,
-            TokenType.XOR: RuntimeOperators._binary_logical_xor,
-        }
-        if operator.token_type in BINARY_OPERATORS:
-            return BINARY_OPERATORS[operator.token_type](left, operator, right)
+        binary_operator = BINARY_OPERATORS[operator.token_type.code]
+        if binary_operator:
+            return binary_operator(left, operator, right)
         raise InterpretError(token=operator, message='Binary operator is expected')
 
     # IMPLEMENTATION OF UNARY OPERATORS -----------------------------------------------------------
 
     @staticmethod
     def _unary_minus(operator: TokenOsu, operand: RuntimeValue):
+        if operand.is_int():
+            return int_value(-operand.value)
         if operand.is_number():
             return RuntimeValue(-operand.value, operand.data_type)
         raise InterpretError(token=operator, message='Minus operator is only implemented for numbers')
@@ -184,11 +195,11 @@ class RuntimeOperators:
         INT - BOOL -> INT (BOOL is interpreted as 0 / 1 for TRUE / FALSE)
         """
         if left.is_int() and right.is_int():
-            return RuntimeValue(left.value - right.value, RuntimeDataType.INT)
+            return int_value(left.value - right.value)
         if left.is_number() and right.is_number():
             return RuntimeValue(left.value - right.value, RuntimeDataType.FLOAT)
         if left.is_int() and right.is_bool():
-            return RuntimeValue(left.value - right.value, RuntimeDataType.INT)
+            return int_value(left.value - right.value)
         raise InterpretError(token=operator, message='Not implemented for given datatypes')
 
     @staticmethod
@@ -205,7 +216,7 @@ class RuntimeOperators:
         if left.is_string() and right.is_int():
             return RuntimeValue(left.value * right.value, RuntimeDataType.STRING)
         if left.is_int() and right.is_int():
-            return RuntimeValue(left.value * right.value, RuntimeDataType.INT)
+            return int_value(left.value * right.value)
         if left.is_number() and right.is_number():
             return RuntimeValue(left.value * right.value, RuntimeDataType.FLOAT)
         raise InterpretError(token=operator, message='Not implemented for given datatypes')
@@ -218,7 +229,7 @@ class RuntimeOperators:
         """
         if left.is_int() and right.is_int():
             try:
-                return RuntimeValue(left.value // right.value, RuntimeDataType.INT)
+                return int_value(left.value // right.value)
             except Exception:
                 raise InterpretError(token=operator, message='Invalid operands for the division')
 
@@ -240,11 +251,11 @@ class RuntimeOperators:
         if left.is_string() and right.is_string():
             return RuntimeValue(left.value + right.value, RuntimeDataType.STRING)
         if left.is_int() and right.is_int():
-            return RuntimeValue(left.value + right.value, RuntimeDataType.INT)
+            return int_value(left.value + right.value)
         if left.is_number() and right.is_number():
             return RuntimeValue(left.value + right.value, RuntimeDataType.FLOAT)
         if left.is_int() and right.is_bool():
-            return RuntimeValue(left.value + right.value, RuntimeDataType.INT)
+            return int_value(left.value + right.value)
         raise InterpretError(token=operator, message='Not implemented for given datatypes')
 
     @staticmethod
@@ -253,6 +264,8 @@ class RuntimeOperators:
         INT ** INT -> INT
         FLOAT ** INT -> FLOAT
         """
+        if left.is_int() and right.is_int():
+            return int_value(left.value ** right.value)
         if left.is_number() and right.is_int():
             return RuntimeValue(left.value ** right.value, left.data_type)
         raise InterpretError(token=operator, message='Not implemented for given datatypes')
@@ -263,7 +276,7 @@ class RuntimeOperators:
         INT % INT -> INT
         """
         if left.is_int() and right.is_int():
-            return RuntimeValue(left.value % right.value, RuntimeDataType.INT)
+            return int_value(left.value % right.value)
         raise InterpretError(token=operator, message='Not implemented for given datatypes')
 
     @staticmethod
@@ -272,9 +285,9 @@ class RuntimeOperators:
         Strings can only be compared with strings. Numbers and bools can be compared among themselves
         """
         if (left.is_string() and right.is_string()):
-            return RuntimeValue(comparator(left.value, right.value), RuntimeDataType.BOOL)
+            return bool_value(comparator(left.value, right.value))
         if (left.is_number() or left.is_bool()) and (right.is_number() or right.is_bool()):
-            return RuntimeValue(comparator(left.value, right.value), RuntimeDataType.BOOL)
+            return bool_value(comparator(left.value, right.value))
         raise InterpretError(token=operator, message='Not implemented for given datatypes')
 
     @staticmethod
@@ -295,11 +308,11 @@ class RuntimeOperators:
 
     @staticmethod
     def _binary_equality(left: RuntimeValue, operator: TokenOsu, right: RuntimeValue):
-        return RuntimeValue(left.is_strictly_equal(right), RuntimeDataType.BOOL)
+        return bool_value(left.is_strictly_equal(right))
 
     @staticmethod
     def _binary_inequality(left: RuntimeValue, operator: TokenOsu, right: RuntimeValue):
-        return RuntimeValue(not left.is_strictly_equal(right), RuntimeDataType.BOOL)
+        return bool_value(not left.is_strictly_equal(right))
 
     @staticmethod
     def _binary_logical_and_or(left: RuntimeValue, operator: TokenOsu, right: RuntimeValue):
@@ -307,64 +320,190 @@ class RuntimeOperators:
         Logical AND and OR evaluation are short-circuited. This is done in the interpreter's visitor method
         At this point left_operand has already evaluated to TRUE for logical AND and to FALSE for logical OR
         """
-        return RuntimeValue(right.is_truthy(), RuntimeDataType.BOOL)
+        return bool_value(right.is_truthy())
 
     @staticmethod
     def _binary_logical_xor(left: RuntimeValue, operator: TokenOsu, right: RuntimeValue):
         a = left.is_truthy()
         b = right.is_truthy()
-        return RuntimeValue(a and not b or not a and b, RuntimeDataType.BOOL)
+        return bool_value(a and not b or not a and b)
+
+
+# dispatch tables of the RuntimeOperators, indexed by the token type codes (built once at import)
+
+LITERAL_VALUES = token_table({
+    TokenType.INT: lambda token: int_value(int(token.lexeme)),
+    TokenType.FLOAT: lambda token: RuntimeValue(float(token.lexeme), RuntimeDataType.FLOAT),
+    TokenType.STRING: lambda token: RuntimeValue(token.lexeme[1: -1], RuntimeDataType.STRING),
+    TokenType.BOOL: lambda token: bool_value(token.lexeme == 'TRUE'),
+    TokenType.NULL: lambda token: NULL_VALUE,
+})
+
+UNARY_OPERATORS = token_table({
+    TokenType.MINUS: RuntimeOperators._unary_minus,
+    TokenType.NOT: RuntimeOperators._unary_not,
+})
+
+BINARY_OPERATORS = token_table({
+    TokenType.MINUS: RuntimeOperators._binary_minus,
+    TokenType.ASTERISK: RuntimeOperators._binary_asterisk,
+    TokenType.DIV: RuntimeOperators._binary_div,
+    TokenType.PLUS: RuntimeOperators._binary_plus,
+    TokenType.EXPONENT: RuntimeOperators._binary_exponent,
+    TokenType.REMAINDER: RuntimeOperators._binary_remainder,
+    TokenType.GTE: RuntimeOperators._binary_gte,
+    TokenType.GT: RuntimeOperators._binary_gt,
+    TokenType.LTE: RuntimeOperators._binary_lte,
+    TokenType.LT: RuntimeOperators._binary_lt,
+    TokenType.EQUALITY: RuntimeOperators._binary_equality,
+    TokenType.INEQUALITY: RuntimeOperators._binary_inequality,
+    TokenType.OR: RuntimeOperators._binary_logical_and_or,
+    TokenType.AND: RuntimeOperators._binary_logical_and_or,
+    TokenType.XOR: RuntimeOperators._binary_logical_xor,
+})
+
+
+# value of a slot whose declaration has not been executed (e.g. var statement in a branch which was not taken)
+UNDEFINED = object()
 
 
 class Environment:
     """
-    Binding of variable names and their values (for a given scope)
+    Values of the variables of a local scope (block or function call), stored in a list indexed by the slots
+    the Resolver assigned to their declarations. Names of the slots are kept for the lookups by name
+    (variables which are not resolved, see resolver.DYNAMIC). The chain of the enclosing environments ends
+    with the GlobalEnvironment (globals)
     """
-    def __init__(self, enclosing_environment=None):
-        """
-        Store bindings between variable name and its value
-        """
+    def __init__(self, enclosing_environment):
         self.enclosing_environment = enclosing_environment
-        self.bindings = {}
-        log.info(AppType.ENVIRONMENT, f'Created new environment: {str(self)}')
+        self.globals = enclosing_environment.globals
+        self.values = []
+        self.names = []
+        if __debug__ and log.ENVIRONEMNT_LOGGER_ENABLED:
+            log.debug(AppType.ENVIRONMENT, 'Created new environment: {}', self)
 
     def __del__(self):
-        current = '[' + ';'.join([f'{name} = {value}' for name, value in self.bindings.items()]) + ']'
-        out = f'{Color.BrightRed}{current}{Color.Reset}'
-        if self.enclosing_environment:
+        if __debug__ and log.ENVIRONEMNT_LOGGER_ENABLED and log.is_enabled(AppType.ENVIRONMENT, log.DEBUG):
+            out = f'{Color.BrightRed}{self._bindings_text()}{Color.Reset}'
             out += ' -> ' + str(self.enclosing_environment)
-        log.info(AppType.ENVIRONMENT, f'Deleting current environment: {out}')
+            log.debug(AppType.ENVIRONMENT, 'Deleting current environment: {}', out)
 
     def __str__(self):
-        out = '[' + ';'.join([f'{name} = {value}' for name, value in self.bindings.items()]) + ']'
-        if self.enclosing_environment:
-            out += ' -> ' + str(self.enclosing_environment)
-        return out
+        return self._bindings_text() + ' -> ' + str(self.enclosing_environment)
+
+    def _bindings_text(self):
+        return '[' + ';'.join([
+            f'{name} = {value}' for name, value in zip(self.names, self.values) if value is not UNDEFINED]) + ']'
+
+    def snapshot(self):
+        """
+        Return copy of the environment chain - closure of a function is a copy of the environment where
+        the function is declared. Values are never modified, so only the bindings are copied
+        """
+        copy = Environment(self.enclosing_environment.snapshot())
+        copy.values = list(self.values)
+        copy.names = list(self.names)
+        return copy
 
     def define(self, name: str, value: RuntimeValue):
-        # TODO: Should name be TokenOsu ???
-        # TODO: Explore preventing redefinition of existing variables
-        self.bindings[name] = value
-        log.info(AppType.ENVIRONMENT, f'Variable {name} defined. Updated environemnt: {str(self)}')
+        slot = self._slot(name)
+        self.define_at(len(self.values) if slot is None else slot, name, value)
+
+    def define_at(self, slot, name: str, value: RuntimeValue):
+        values = self.values
+        if slot < len(values):
+            values[slot] = value
+            self.names[slot] = name
+        else:
+            while len(values) < slot:
+                values.append(UNDEFINED)
+                self.names.append(None)
+            values.append(value)
+            self.names.append(name)
+        if __debug__ and log.ENVIRONEMNT_LOGGER_ENABLED:
+            log.debug(AppType.ENVIRONMENT, 'Variable {} defined. Updated environemnt: {}', name, self)
+
+    def _slot(self, name: str):
+        """
+        Return slot of the defined variable of the name, or None
+        """
+        try:
+            slot = self.names.index(name)
+        except ValueError:
+            return None
+        return slot if self.values[slot] is not UNDEFINED else None
 
     def get(self, name: TokenOsu):
-        if name and (name.lexeme in self.bindings):
-            return self.bindings[name.lexeme]
+        slot = self._slot(name.lexeme)
+        if slot is not None:
+            return self.values[slot]
+        return self.enclosing_environment.get(name)
+
+    def get_at(self, depth, slot, name: TokenOsu):
+        environment = self
+        for _ in range(depth):
+            environment = environment.enclosing_environment
+        values = environment.values
+        if slot < len(values) and values[slot] is not UNDEFINED:
+            return values[slot]
+        # declaration was not executed - it is a variable of the same name from the enclosing scopes
+        return environment.enclosing_environment.get(name)
 
-        if self.enclosing_environment:
-            return self.enclosing_environment.get(name)
+    def assign(self, name: TokenOsu, value: RuntimeValue):
+        slot = self._slot(name.lexeme)
+        if slot is None:
+            self.enclosing_environment.assign(name, value)
+        else:
+            self.values[slot] = value
+        if __debug__ and log.ENVIRONEMNT_LOGGER_ENABLED:
+            log.debug(AppType.ENVIRONMENT, 'Variable {} assigned. Updated environemnt: {}', name.lexeme, self)
+
+    def assign_at(self, depth, slot, name: TokenOsu, value: RuntimeValue):
+        environment = self
+        for _ in range(depth):
+            environment = environment.enclosing_environment
+        values = environment.values
+        if slot < len(values) and values[slot] is not UNDEFINED:
+            values[slot] = value
+        else:
+            environment.enclosing_environment.assign(name, value)
+        if __debug__ and log.ENVIRONEMNT_LOGGER_ENABLED:
+            log.debug(AppType.ENVIRONMENT, 'Variable {} assigned. Updated environemnt: {}', name.lexeme, self)
+
+
+class GlobalEnvironment:
+    """
+    Global variables (top-level declarations of the program and of the included modules) - the global table,
+    variables are looked up by name in one dict
+    """
+    def __init__(self):
+        self.enclosing_environment = None
+        self.globals = self
+        self.values = {}
 
-        raise InterpretError(token=name, message='Undefined variable {}.'.format(name.lexeme))
+    def __str__(self):
+        return '[' + ';'.join([f'{name} = {value}' for name, value in self.values.items()]) + ']'
 
-    def assign(self, name: TokenOsu, value: RuntimeValue):
-        if name.lexeme in self.bindings:
-            self.bindings[name.lexeme] = value
-            log.info(AppType.ENVIRONMENT, f'Variable {name.lexeme} assigned. Updated environemnt: {str(self)}')
-            return
+    def snapshot(self):
+        copy = GlobalEnvironment()
+        copy.values = dict(self.values)
+        return copy
 
-        elif self.enclosing_environment:
-            self.enclosing_environment.assign(name, value)
-            log.info(AppType.ENVIRONMENT, f'Variable {name.lexeme} assigned. Updated environemnt: {str(self)}')
-            return
+    def define(self, name: str, value: RuntimeValue):
+        # TODO: Explore preventing redefinition of existing variables
+        self.values[name] = value
+        if __debug__ and log.ENVIRONEMNT_LOGGER_ENABLED:
+            log.debug(AppType.ENVIRONMENT, 'Variable {} defined. Updated environemnt: {}', name, self)
 
-        raise InterpretError(token=name, message='Undefined variable {}.'.format(name.lexeme))
+    def get(self, name: TokenOsu):
+        try:
+            return self.values[name.lexeme]
+        except KeyError:
+            raise InterpretError(token=name, message='Undefined variable {}.'.format(name.lexeme)) from None
+
+    def assign(self, name: TokenOsu, value: RuntimeValue):
+        if name.lexeme not in self.values:
+            raise InterpretError(token=name, message='Undefined variable {}.'.format(name.lexeme))
+        self.values[name.lexeme] = value
+        if __debug__ and log.ENVIRONEMNT_LOGGER_ENABLED:
+            log.debug(AppType.ENVIRONMENT, 'Variable {} assigned. Updated environemnt: {}', name.lexeme, self)
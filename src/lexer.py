@@ -1,15 +1,20 @@
 from src.tokens import TokenOsu, TokenType
+from src.token_buffer import TokenBuffer
 from src.lexer_constants import SINGLE_TOKENS, DOUBLE_TOKENS, DISREGARDED_WHITESPACES, RESERVED_WORDS, \
     END_OF_LINE, STRING_LITERALS, NUMBER_LITERALS, IDENTIFIER_LITERALS
 
 
 class Lexer:
-    def __init__(self, source_code=None):
+    def __init__(self, source_code=None, compact=False):
+        """
+        With compact=True the tokens are stored in a TokenBuffer instead of a list of TokenOsu objects
+        """
+        self.compact = compact
         self.upload_source_code(source_code)
 
     def upload_source_code(self, source_code):
         self.source = source_code
-        self.tokens = []
+        self.tokens = TokenBuffer(source_code) if self.compact else []
         self.current_source_line = 1
         self.start = 0
         self.current = 0
@@ -33,6 +38,34 @@ class Lexer:
 
         return self.tokens
 
+    def scan_iter(self, source_code=None):
+        """
+        Generator version of scan() - yields tokens as soon as they are scanned.
+        Only the most recently scanned token is kept in self.tokens (an ERROR token may still be extended)
+        """
+        if source_code:
+            self.upload_source_code(source_code)
+        self._check_streaming_supported()
+
+        self.start = self.current = 0
+        while not self._is_at_end():
+            self.start = self.current
+            self._scan_token()
+            if len(self.tokens) > 1:
+                yield self.tokens.pop(0)
+        self.start = self.current
+        self._add_token(TokenType.EOF)
+
+        yield from self._release_tokens()
+
+    def _check_streaming_supported(self):
+        if self.compact:
+            raise ValueError('Streaming scan yields TokenOsu objects, it can not be used with compact token storage')
+
+    def _release_tokens(self):
+        tokens, self.tokens = self.tokens, []
+        return tokens
+
     def _scan_token(self):
         char = self._advance()
         self.current_source_line += char == END_OF_LINE
@@ -55,13 +88,24 @@ class Lexer:
             self._add_unexpected_token_error()
 
     def _add_token(self, token_type, literal=None):
+        if self.compact:
+            self.tokens.add(token_type, self.start, self.current, self.current_source_line, literal)
+            return
         lexeme = self.source[self.start: self.current]
         self.tokens.append(TokenOsu(token_type, lexeme, literal, self.current_source_line))
 
+    def _last_token_type(self):
+        if not self.tokens:
+            return None
+        return self.tokens.token_type_at(-1) if self.compact else self.tokens[-1].token_type
+
     def _add_unexpected_token_error(self):
-        if self.tokens and self.tokens[-1].token_type == TokenType.ERROR:
+        if self._last_token_type() == TokenType.ERROR:
             # if last token is ERROR -> extend its lexeme
-            self.tokens[-1].lexeme += self.source[self.start: self.current]
+            if self.compact:
+                self.tokens.extend_lexeme(-1, self.source[self.start: self.current])
+            else:
+                self.tokens[-1].lexeme += self.source[self.start: self.current]
         else:
             # otherwise -> start new ERROR token
             self._add_token(TokenType.ERROR, 'Unexpected token')
@@ -98,7 +142,7 @@ class Lexer:
         while self._peek() and self._peek().isdigit():
             self._advance()
 
-        if self._peek() == '.' and self._peek_next().isdigit():
+        if self._peek() == '.' and self._peek_next() and self._peek_next().isdigit():
             self._advance()
             while self._peek() and self._peek().isdigit():
                 self._advance()
@@ -140,7 +184,7 @@ class Lexer:
         Return source code character from the position immedeately after the current cursor
         without advancing the cursor
         """
-        return self.source[self.current + 1] if not self.current + 1 > len(self.source) else None
+        return self.source[self.current + 1] if self.current + 1 < len(self.source) else None
 
     def _advance(self):
         """
@@ -0,0 +1,105 @@
+import mmap
+import os
+import re
+from src.tokens import TokenType
+from src.token_buffer import TokenBuffer
+from src.lexer_constants import RESERVED_WORDS, SINGLE_TOKENS, END_OF_LINE
+from src.lexer_regex import OPERATOR_TOKENS, build_master_pattern
+
+SOURCE_ENCODING = 'utf-8'
+
+# single UTF-8 encoded character (so that unexpected characters are never split in the middle)
+UTF8_CHARACTER = '[\\x00-\\x7f]|[\\xc0-\\xff][\\x80-\\xbf]*|.'
+
+BYTES_MASTER_PATTERN = re.compile(build_master_pattern(UTF8_CHARACTER).encode('latin-1'), re.DOTALL)
+
+BYTES_RESERVED_WORDS = {word.encode(SOURCE_ENCODING): token_type for word, token_type in RESERVED_WORDS.items()}
+
+BYTES_OPERATOR_TOKENS = {lexeme.encode(SOURCE_ENCODING): token_type for lexeme, token_type in OPERATOR_TOKENS.items()}
+
+BYTES_END_OF_LINE = END_OF_LINE.encode(SOURCE_ENCODING)
+
+
+class BytesTokenBuffer(TokenBuffer):
+    """
+    TokenBuffer over an encoded (bytes-like) source code, e.g. memory-mapped file.
+    Offsets are byte offsets and lexemes are decoded only when a token is materialized
+    """
+    def _get_source_text(self, start, end):
+        return bytes(self.source[start: end]).decode(SOURCE_ENCODING, 'replace')
+
+
+class BytesLexer:
+    """
+    Lexer scanning an encoded source code (bytes, memoryview or mmap) without decoding it.
+    Tokens are stored in the BytesTokenBuffer as offsets into the source. Comments and whitespaces
+    are never decoded, other lexemes are decoded when the parser asks for the token
+    """
+    def __init__(self, source_code=None):
+        self.upload_source_code(source_code)
+
+    def upload_source_code(self, source_code):
+        self.source = source_code if source_code is not None else b''
+        self.tokens = BytesTokenBuffer(self.source)
+        self.current_source_line = 1
+
+    def get_tokens(self):
+        return self.tokens
+
+    def scan(self, source_code=None):
+        if source_code is not None:
+            self.upload_source_code(source_code)
+
+        tokens = self.tokens
+        line = self.current_source_line
+        for match in BYTES_MASTER_PATTERN.finditer(self.source):
+            kind = match.lastgroup
+            if kind == 'whitespace':
+                continue
+            if kind == 'identifier':
+                token_type = BYTES_RESERVED_WORDS.get(match.group(), TokenType.IDENTIFIER)
+                tokens.add(token_type, match.start(), match.end(), line)
+            elif kind == 'operator':
+                tokens.add(BYTES_OPERATOR_TOKENS[match.group()], match.start(), match.end(), line)
+            elif kind == 'eol':
+                line += 1
+                tokens.add(SINGLE_TOKENS[END_OF_LINE], match.start(), match.end(), line)
+            else:
+                line = self._add_literal_or_error(kind, match, line)
+
+        self.current_source_line = line
+        tokens.add(TokenType.EOF, len(self.source), len(self.source), line)
+        return tokens
+
+    def _add_literal_or_error(self, kind, match, line):
+        """
+        Add token for the less frequent kinds of lexemes and return updated source line number.
+        Values of the literals are derived from their lexemes by the BytesTokenBuffer when needed
+        """
+        start, end = match.span()
+        if kind == 'comment':
+            self.tokens.add(TokenType.COMMENT, start, end, line)
+        elif kind == 'number':
+            self.tokens.add(TokenType.FLOAT if b'.' in match.group() else TokenType.INT, start, end, line)
+        elif kind == 'string':
+            line += match.group().count(BYTES_END_OF_LINE)
+            self.tokens.add(TokenType.STRING, start, end, line)
+        elif kind == 'unterminated':
+            line += match.group().count(BYTES_END_OF_LINE)
+            self.tokens.add(TokenType.ERROR, start, end, line, 'Unterminated string')
+        elif len(self.tokens) and self.tokens.token_type_at(-1) == TokenType.ERROR:
+            # if last token is ERROR -> extend its lexeme
+            self.tokens.extend_lexeme(-1, match.group().decode(SOURCE_ENCODING, 'replace'))
+        else:
+            # otherwise -> start new ERROR token
+            self.tokens.add(TokenType.ERROR, start, end, line, 'Unexpected token')
+        return line
+
+
+def map_source_file(file):
+    """
+    Return read-only memory mapping of the (binary) file object, or empty bytes for an empty file
+    """
+    if os.fstat(file.fileno()).st_size == 0:
+        return b''
+    return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
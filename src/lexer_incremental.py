@@ -0,0 +1,159 @@
+from bisect import bisect_right
+from src.lexer import Lexer
+from src.lexer_constants import END_OF_LINE
+from src.lexer_parallel import find_split_points
+from src.lexer_regex import RegexLexer
+from src.tokens import TokenOsu, TokenType
+
+BLOCK_SIZE = 4 * 1024
+
+
+class SourceBlock:
+    """
+    Part of the source code starting right after a newline (outside of string literals) together with its tokens.
+    Token offsets and line numbers are relative to the block, so the block stays untouched when the text
+    before it is edited - only its start and first line get shifted
+    """
+    def __init__(self, text):
+        self.text = text
+        self.line_count = text.count(END_OF_LINE)
+        self.start = 0
+        self.first_line = 1
+
+        lexer = RegexLexer(text, compact=True)
+        lexer._scan_into_buffer()
+        self.tokens = lexer.tokens
+
+    def ends_at_split_point(self):
+        """
+        Return True if the block ends with a newline token (i.e. not inside of a string literal),
+        so the following block can be scanned independently of this one
+        """
+        return len(self.tokens) > 0 and self.tokens.token_type_at(-1) == TokenType.EOL and \
+            self.tokens.ends[-1] == len(self.text)
+
+    def materialize_tokens(self):
+        line_offset = self.first_line - 1
+        tokens = self.tokens.to_token_list()
+        for token in tokens:
+            token.source_file_line_number += line_offset
+        return tokens
+
+
+class IncrementalTokens:
+    """
+    Read-only sequence of the tokens of all the source blocks (followed by the EOF token).
+    TokenOsu objects with absolute line numbers are built only when the tokens are iterated
+    """
+    def __init__(self, blocks):
+        self.blocks = blocks
+
+    def __len__(self):
+        return sum(len(block.tokens) for block in self.blocks) + 1
+
+    def __iter__(self):
+        for block in self.blocks:
+            yield from block.materialize_tokens()
+        yield self._eof_token()
+
+    def _eof_token(self):
+        last_line = self.blocks[-1].first_line + self.blocks[-1].line_count if self.blocks else 1
+        return TokenOsu(TokenType.EOF, '', None, last_line)
+
+    @property
+    def source(self):
+        return ''.join(block.text for block in self.blocks)
+
+
+class IncrementalLexer(Lexer):
+    """
+    Lexer keeping the source code split into blocks (see SourceBlock), so that the tokens can be updated
+    after an edit of the source code. Only the blocks touched by the edit are scanned again (extended with
+    the following blocks until the token boundaries re-synchronise), tokens of all the other blocks are reused.
+    Tokens are always identical to the tokens of Lexer scanning the whole edited source code
+    """
+    def __init__(self, source_code=None, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self.blocks = []
+        super().__init__(source_code)
+
+    @property
+    def source(self):
+        """
+        Current (edited) source code - blocks are only joined when somebody asks for it
+        """
+        if isinstance(self.tokens, IncrementalTokens):
+            return self.tokens.source
+        return self.uploaded_source
+
+    @source.setter
+    def source(self, source_code):
+        self.uploaded_source = source_code
+
+    def scan(self, source_code=None):
+        if source_code:
+            self.upload_source_code(source_code)
+
+        self.blocks = self._scan_blocks(self.source or '')
+        self._update_positions(0)
+        self.tokens = IncrementalTokens(self.blocks)
+        return self.tokens
+
+    def edit(self, offset, removed_length, inserted_text):
+        """
+        Replace removed_length characters at given offset of the source code with inserted_text
+        and return updated tokens
+        """
+        if not isinstance(self.tokens, IncrementalTokens):
+            self.scan()
+
+        first, last = self._damaged_blocks(offset, removed_length)
+        region_start = self.blocks[first].start if self.blocks else 0
+        text = ''.join(block.text for block in self.blocks[first: last + 1])
+        relative_offset = offset - region_start
+        new_blocks = self._scan_blocks(text[:relative_offset] + inserted_text + text[relative_offset + removed_length:])
+
+        # string literal opened (or line joined) by the edit -> keep scanning into the following blocks
+        while new_blocks and not new_blocks[-1].ends_at_split_point() and last + 1 < len(self.blocks):
+            last += 1
+            new_blocks.extend(self._scan_blocks(new_blocks.pop().text + self.blocks[last].text))
+
+        self.blocks[first: last + 1] = new_blocks
+        self._update_positions(first)
+        return self.tokens
+
+    def _damaged_blocks(self, offset, removed_length):
+        """
+        Return indices of the first and the last block containing the edited part of the source code
+        """
+        if not self.blocks:
+            return 0, -1
+        block_starts = [block.start for block in self.blocks]
+        first = max(0, bisect_right(block_starts, offset) - 1)
+        last = max(first, bisect_right(block_starts, offset + removed_length - 1) - 1)
+        return first, last
+
+    def _scan_blocks(self, text):
+        """
+        Return scanned blocks of the text. Text is only split when it grew over twice the block size,
+        so small edits do not fragment the blocks
+        """
+        if len(text) <= 2 * self.block_size:
+            return [SourceBlock(text)] if text else []
+        split_points = find_split_points(text, self.block_size)
+        return [SourceBlock(text[start: end]) for start, end in zip(split_points, split_points[1:]) if start < end]
+
+    def _update_positions(self, first_index):
+        """
+        Shift starts and first lines of the blocks from the given one till the end (tokens are not touched)
+        """
+        if first_index:
+            previous_block = self.blocks[first_index - 1]
+            start = previous_block.start + len(previous_block.text)
+            line = previous_block.first_line + previous_block.line_count
+        else:
+            start, line = 0, 1
+        for block in self.blocks[first_index:]:
+            block.start, block.first_line = start, line
+            start += len(block.text)
+            line += block.line_count
@@ -0,0 +1,120 @@
+import os
+import re
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from src.lexer import Lexer
+from src.lexer_constants import END_OF_LINE, STRING_LITERALS
+from src.lexer_regex import RegexLexer
+from src.token_buffer import TokenBuffer
+
+MINIMAL_CHUNK_SIZE = 64 * 1024
+
+CHUNKS_PER_WORKER = 4
+
+
+def _build_prepass_pattern():
+    """
+    Return compiled regular expression matching string literals (terminated or not) and comments.
+    Scanning the source code with it finds the same strings as the lexer, so newlines inside the
+    strings can be told apart from the newlines between the tokens
+    """
+    quotes = sorted(STRING_LITERALS)
+    strings = ['{0}[^{0}]*{0}'.format(re.escape(quote)) for quote in quotes]
+    comment = '//[^{}]*'.format(re.escape(END_OF_LINE))
+    unterminated_string = '[{}].*'.format(''.join(re.escape(quote) for quote in quotes))
+    return re.compile('|'.join(strings + [comment, unterminated_string]), re.DOTALL)
+
+
+PREPASS_PATTERN = _build_prepass_pattern()
+
+
+def find_split_points(source, chunk_size):
+    """
+    Return offsets at which the source code can be split into chunks of approximately given size.
+    Chunks always start right after a newline which is not inside a (multi-line) string literal
+    """
+    multiline_strings = [
+        match.span() for match in PREPASS_PATTERN.finditer(source)
+        if source.find(END_OF_LINE, match.start(), match.end()) != -1
+    ]
+    string_starts = [start for start, _ in multiline_strings]
+
+    split_points = [0]
+    target = chunk_size
+    while target < len(source):
+        newline = source.find(END_OF_LINE, target)
+        if newline == -1 or newline + 1 >= len(source):
+            break
+        string_index = bisect_right(string_starts, newline) - 1
+        if string_index >= 0 and multiline_strings[string_index][1] > newline:
+            # newline is inside of a string literal -> look for the next one after the string
+            target = multiline_strings[string_index][1]
+            continue
+        split_points.append(newline + 1)
+        target = newline + 1 + chunk_size
+    split_points.append(len(source))
+    return split_points
+
+
+def scan_chunk(chunk_description):
+    """
+    Scan one chunk of the source code (runs in the worker process) and return its TokenBuffer
+    with offsets and line numbers relative to the whole source code
+    """
+    chunk, start_offset, first_line, is_last_chunk = chunk_description
+    lexer = RegexLexer(chunk, compact=True)
+    lexer.current_source_line = first_line
+    tokens = lexer.scan()
+
+    if not is_last_chunk:
+        # EOF belongs only to the very last chunk
+        for token_array in (tokens.types, tokens.starts, tokens.ends, tokens.lines):
+            token_array.pop()
+    if start_offset:
+        tokens.starts = array(tokens.starts.typecode, (offset + start_offset for offset in tokens.starts))
+        tokens.ends = array(tokens.ends.typecode, (offset + start_offset for offset in tokens.ends))
+    # the source code is not sent back, parent process has all of it
+    tokens.source = None
+    return tokens
+
+
+class ParallelLexer(Lexer):
+    """
+    Lexer splitting one large source code into chunks (at newlines outside of string literals)
+    and scanning them in a pool of worker processes. Produces exactly the same tokens as Lexer
+    """
+    def __init__(self, source_code=None, compact=False, workers=None, chunk_size=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        super().__init__(source_code, compact)
+
+    def scan(self, source_code=None):
+        if source_code:
+            self.upload_source_code(source_code)
+
+        tokens = TokenBuffer(self.source)
+        for chunk_tokens in self._scan_chunks(self._split_source()):
+            tokens.extend(chunk_tokens)
+
+        self.current_source_line = tokens.lines[-1]
+        self.start = self.current = len(self.source)
+        self.tokens = tokens if self.compact else tokens.to_token_list()
+        return self.tokens
+
+    def _split_source(self):
+        chunk_size = self.chunk_size or max(MINIMAL_CHUNK_SIZE, len(self.source) // (self.workers * CHUNKS_PER_WORKER))
+        split_points = find_split_points(self.source, chunk_size)
+
+        chunks = []
+        first_line = 1
+        for start, end in zip(split_points, split_points[1:]):
+            chunks.append((self.source[start: end], start, first_line, end == len(self.source)))
+            first_line += self.source.count(END_OF_LINE, start, end)
+        return chunks or [('', 0, 1, True)]
+
+    def _scan_chunks(self, chunks):
+        if self.workers == 1 or len(chunks) == 1:
+            return [scan_chunk(chunk) for chunk in chunks]
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(scan_chunk, chunks))
@@ -0,0 +1,151 @@
+import re
+from src.tokens import TokenOsu, TokenType
+from src.lexer import Lexer
+from src.lexer_constants import SINGLE_TOKENS, DOUBLE_TOKENS, DISREGARDED_WHITESPACES, RESERVED_WORDS, \
+    END_OF_LINE, STRING_LITERALS, NUMBER_LITERALS, IDENTIFIER_LITERALS
+
+
+def _character_class(characters):
+    return '[{}]'.format(''.join(re.escape(char) for char in sorted(characters)))
+
+
+def _build_operator_tokens():
+    """
+    Return mapping of operator lexemes to token types, combining single and double tokens
+    """
+    operator_tokens = {char: token_type for char, token_type in SINGLE_TOKENS.items() if char != END_OF_LINE}
+    for char, double_token in DOUBLE_TOKENS.items():
+        operator_tokens[char + double_token['match']] = double_token['yes']
+        operator_tokens[char] = double_token['no']
+    # '/' is not a single token - it is either DIV or start of the COMMENT
+    operator_tokens['/'] = TokenType.DIV
+    return operator_tokens
+
+
+def build_master_pattern(unexpected_character='.'):
+    """
+    Return one regular expression (as a string) matching any token of the OLC language.
+    Name of the matched group (match.lastgroup) tells the kind of the token.
+    Order of the alternatives follows the order of the checks in Lexer._scan_token
+    """
+    digit = _character_class(NUMBER_LITERALS)
+    # longer operators have to be tried first, so '**' is not scanned as two '*'
+    operators = sorted(OPERATOR_TOKENS, key=lambda lexeme: -len(lexeme))
+    strings = '|'.join('{0}[^{0}]*{0}'.format(re.escape(quote)) for quote in sorted(STRING_LITERALS))
+    alternatives = (
+        ('whitespace', _character_class(DISREGARDED_WHITESPACES) + '+'),
+        ('eol', re.escape(END_OF_LINE)),
+        ('comment', '//[^{}]*'.format(re.escape(END_OF_LINE))),
+        ('operator', '|'.join(re.escape(operator) for operator in operators)),
+        ('string', strings),
+        ('unterminated', _character_class(STRING_LITERALS) + '.*'),
+        ('number', '{0}+(?:\\.{0}+)?'.format(digit)),
+        ('identifier', _character_class(IDENTIFIER_LITERALS) + '+'),
+        ('error', unexpected_character),
+    )
+    return '|'.join('(?P<{}>{})'.format(name, regex) for name, regex in alternatives)
+
+
+OPERATOR_TOKENS = _build_operator_tokens()
+
+MASTER_PATTERN = re.compile(build_master_pattern(), re.DOTALL)
+
+
+class RegexLexer(Lexer):
+    """
+    Lexer engine driven by a single master regular expression (see MASTER_PATTERN).
+    Produces exactly the same stream of tokens as Lexer, but does not inspect
+    the source code one character at a time
+    """
+    def scan(self, source_code=None):
+        if source_code:
+            self.upload_source_code(source_code)
+
+        if self.compact:
+            self._scan_into_buffer()
+        else:
+            for _ in self._scan_into_list():
+                pass
+
+        self.start = self.current = len(self.source or '')
+        self._add_token(TokenType.EOF)
+
+        return self.tokens
+
+    def scan_iter(self, source_code=None):
+        if source_code:
+            self.upload_source_code(source_code)
+        self._check_streaming_supported()
+
+        for _ in self._scan_into_list():
+            if len(self.tokens) > 1:
+                yield self.tokens.pop(0)
+        self.start = self.current = len(self.source or '')
+        self._add_token(TokenType.EOF)
+
+        yield from self._release_tokens()
+
+    def _scan_into_list(self):
+        """
+        Append scanned tokens to self.tokens. Generator yields after each scanned lexeme, so the tokens can be streamed
+        """
+        tokens = self.tokens
+        line = self.current_source_line
+        for match in MASTER_PATTERN.finditer(self.source or ''):
+            kind = match.lastgroup
+            if kind == 'whitespace':
+                continue
+            lexeme = match.group()
+            if kind == 'identifier':
+                tokens.append(TokenOsu(RESERVED_WORDS.get(lexeme, TokenType.IDENTIFIER), lexeme, None, line))
+            elif kind == 'operator':
+                tokens.append(TokenOsu(OPERATOR_TOKENS[lexeme], lexeme, None, line))
+            elif kind == 'eol':
+                line += 1
+                tokens.append(TokenOsu(SINGLE_TOKENS[END_OF_LINE], lexeme, None, line))
+            else:
+                line = self._add_literal_or_error(kind, match, line)
+            self.current_source_line = line
+            yield
+
+    def _scan_into_buffer(self):
+        tokens = self.tokens
+        line = self.current_source_line
+        for match in MASTER_PATTERN.finditer(self.source or ''):
+            kind = match.lastgroup
+            if kind == 'whitespace':
+                continue
+            if kind == 'identifier':
+                token_type = RESERVED_WORDS.get(match.group(), TokenType.IDENTIFIER)
+                tokens.add(token_type, match.start(), match.end(), line)
+            elif kind == 'operator':
+                tokens.add(OPERATOR_TOKENS[match.group()], match.start(), match.end(), line)
+            elif kind == 'eol':
+                line += 1
+                tokens.add(SINGLE_TOKENS[END_OF_LINE], match.start(), match.end(), line)
+            else:
+                line = self._add_literal_or_error(kind, match, line)
+        self.current_source_line = line
+
+    def _add_literal_or_error(self, kind, match, line):
+        """
+        Add token for the less frequent kinds of lexemes and return updated source line number
+        """
+        self.start, self.current = match.span()
+        lexeme = match.group()
+        if kind in ('string', 'unterminated'):
+            line += lexeme.count(END_OF_LINE)
+        self.current_source_line = line
+
+        if kind == 'number':
+            is_float = '.' in lexeme
+            self._add_token(TokenType.FLOAT if is_float else TokenType.INT, float(lexeme) if is_float else int(lexeme))
+        elif kind == 'comment':
+            self._add_token(TokenType.COMMENT)
+        elif kind == 'string':
+            self._add_token(TokenType.STRING, lexeme[1: -1])
+        elif kind == 'unterminated':
+            self._add_token(TokenType.ERROR, 'Unterminated string')
+        else:
+            self._add_unexpected_token_error()
+        return line
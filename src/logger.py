@@ -2,23 +2,59 @@ from src.constants import Color, AppType
 
 
 class Logger:
+    """
+    Logger of the subsystems (parser, interpreter, environment). Messages are formatted lazily - message is
+    a format string and its arguments get formatted (str(statement), str(environment)...) only if the message
+    is emitted. A subsystem emits messages of the levels from its level up (see LEVELS), if it is enabled.
+    Calls on hot paths are guarded by `if __debug__ and Logger.<SUBSYSTEM>_LOGGER_ENABLED:` - the guard is
+    a single attribute lookup when logging is off, and `python -O` compiles the guarded calls out entirely
+    """
     PARSER_LOGGER_ENABLED = True
     INTERPRETER_LOGGER_ENABLED = True
     ENVIRONEMNT_LOGGER_ENABLED = True
 
+    DEBUG = 10
+    INFO = 20
+    OFF = 100
+
+    # level of every subsystem, subsystems not listed emit all the levels
+    LEVELS = {}
+
     @staticmethod
     def error(message, color=None):
         color = color or Color.BrightRed
         print(f'{color}{message}{Color.Reset}')
 
     @staticmethod
-    def info(caller, message, color=None):
+    def is_enabled(caller, level=INFO):
+        """
+        Return True if the messages of the level from the caller get emitted
+        """
         if caller == AppType.PARSER and not Logger.PARSER_LOGGER_ENABLED:
-            return
+            return False
         if caller == AppType.INTERPRETER and not Logger.INTERPRETER_LOGGER_ENABLED:
-            return
+            return False
         if caller == AppType.ENVIRONMENT and not Logger.ENVIRONEMNT_LOGGER_ENABLED:
+            return False
+        return level >= Logger.LEVELS.get(caller, Logger.DEBUG)
+
+    @staticmethod
+    def info(caller, message, *args, color=None):
+        Logger.log(caller, Logger.INFO, message, *args, color=color)
+
+    @staticmethod
+    def debug(caller, message, *args, color=None):
+        Logger.log(caller, Logger.DEBUG, message, *args, color=color)
+
+    @staticmethod
+    def log(caller, level, message, *args, color=None):
+        """
+        Emit the message (formatted with the args, if there are any) if the caller logs the level
+        """
+        if not Logger.is_enabled(caller, level):
             return
+        if args:
+            message = message.format(*args)
 
         APP_SPECIFIC_COLOR = {
             AppType.PARSER: Color.BrightYellow,
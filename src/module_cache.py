@@ -0,0 +1,176 @@
+import gc
+import os
+from concurrent.futures import ProcessPoolExecutor
+from src.ast_arena import AstArena
+from src.ast_node_statement import IncludeStatement
+from src.error_handler import InterpretError
+from src.lexer import Lexer
+from src.parser import Parser
+
+
+def resolve_module_path(path, directory):
+    """
+    Return absolute path of the module included from a file in the given directory
+    """
+    return os.path.normpath(os.path.join(directory, path))
+
+
+def module_includes(statements, directory):
+    """
+    Return (absolute path, path token) of the modules included by the top-level statements (in their order)
+    """
+    return [
+        (resolve_module_path(statement.path.literal, directory), statement.path)
+        for statement in statements if isinstance(statement, IncludeStatement)
+    ]
+
+
+class Module:
+    """
+    Compiled source file - its statements (None if it has errors), error messages and its includes
+    (see module_includes)
+    """
+    def __init__(self, path, statements=None, errors=None, includes=None):
+        self.path = path
+        self.statements = statements
+        self.errors = errors or []
+        self.includes = includes or []
+
+    def include_error(self, path_token):
+        """
+        Return error of including the module with errors by the include statement with the path token
+        """
+        return InterpretError(path_token, 'Cannot include {}. {}'.format(self.path, self.errors[0]))
+
+
+class ModuleCompiler:
+    """
+    Lexer and parser of the modules. It is sent to the worker processes of the ModuleCache, so it holds
+    only classes and settings. Statements are taken from (and stored to) the on-disk AstCache if it is given
+    """
+    def __init__(self, lexer_class=Lexer, parser_class=Parser, compact_tokens=False, lazy_function_bodies=False,
+                 share_expressions=False, compact_ast=False, ast_cache=None):
+        self.lexer_class = lexer_class
+        self.compact_tokens = compact_tokens
+        self.parser_class = parser_class
+        self.lazy_function_bodies = lazy_function_bodies
+        self.share_expressions = share_expressions
+        self.compact_ast = compact_ast
+        self.ast_cache = ast_cache
+
+    def __call__(self, path, cached_only=False):
+        """
+        Compile the module at the (absolute) path and return it. With cached_only=True a module which is not
+        in the AstCache is not compiled, None is returned instead
+        """
+        try:
+            with open(path) as file:
+                source_code = file.read()
+        except OSError as error:
+            return Module(path, errors=['Cannot read module: {}'.format(error.strerror)])
+
+        statements = self.ast_cache.load(source_code) if self.ast_cache else None
+        if statements is None:
+            if cached_only:
+                return None
+            statements, errors = self.compile(source_code)
+            if errors:
+                return Module(path, errors=errors)
+            if self.ast_cache:
+                self.ast_cache.store(source_code, statements)
+        return Module(path, statements, includes=module_includes(statements, os.path.dirname(path)))
+
+    def compile(self, source_code):
+        """
+        Return (statements, error messages) of the source code
+        """
+        lexer = self.lexer_class(source_code, compact=self.compact_tokens)
+        lexer.scan()
+        return self.parse_tokens(lexer.get_tokens())
+
+    def parse_tokens(self, tokens):
+        """
+        Return (statements, error messages) of the scanned tokens
+        """
+        parser = self.parser_class(
+            tokens, lazy_function_bodies=self.lazy_function_bodies, share_expressions=self.share_expressions)
+        parser.parse()
+        if parser.error_handler.has_errors():
+            return None, parser.error_handler.get_messages(tokens)
+        if self.compact_ast:
+            return AstArena.from_statements(parser.get_statements()), []
+        return parser.get_statements(), []
+
+
+class ModuleCache:
+    """
+    Compiled modules (included source files) of the process, keyed by their absolute path, so every module
+    is lexed and parsed at most once per process (and, with the AstCache of the compiler, once per its content).
+    compile_includes compiles everything the program includes before it runs - the includes are compiled level
+    by level (modules included by the program, modules included by them...), modules of one level in parallel
+    in a pool of worker processes
+    """
+    def __init__(self, compiler=None, workers=None):
+        self.compiler = compiler or ModuleCompiler()
+        self.workers = workers or os.cpu_count() or 1
+        self.modules = {}
+
+    def __len__(self):
+        return len(self.modules)
+
+    def get(self, path):
+        """
+        Return the module at the (absolute) path, compiling it if it is not compiled yet
+        """
+        module = self.modules.get(path)
+        if module is None:
+            module = self.modules[path] = self.compiler(path)
+        return module
+
+    def compile_includes(self, statements, directory, error_handler=None):
+        """
+        Compile all modules included (directly or indirectly) by the top-level statements of the code
+        in the directory and return the modules with errors. Errors of including them (see Module.include_error)
+        are added to the error_handler, against the first include statement of each module
+        """
+        failed_modules = []
+        includes = module_includes(statements, directory)
+        while includes:
+            path_tokens = {}
+            for path, path_token in includes:
+                if path not in self.modules:
+                    path_tokens.setdefault(path, path_token)
+            modules = self._compile(list(path_tokens))
+            for module in modules:
+                self.modules[module.path] = module
+                if module.errors:
+                    failed_modules.append(module)
+                    if error_handler is not None:
+                        error_handler.add_error(module.include_error(path_tokens[module.path]))
+            includes = [include for module in modules for include in module.includes]
+        return failed_modules
+
+    def _compile(self, paths):
+        if self.workers == 1 or len(paths) < 2:
+            return [self.compiler(path) for path in paths]
+        modules = {}
+        if self.compiler.ast_cache:
+            # a cached module is only loaded, a worker would load it and pickle it once more to send it back
+            modules = {path: self.compiler(path, cached_only=True) for path in paths}
+        missing_paths = [path for path in paths if modules.get(path) is None]
+        if len(missing_paths) < 2:
+            modules.update((path, self.compiler(path)) for path in missing_paths)
+        else:
+            modules.update(zip(missing_paths, self._compile_in_workers(missing_paths)))
+        return [modules[path] for path in paths]
+
+    def _compile_in_workers(self, paths):
+        # modules come back pickled, collections triggered while unpickling them would take most of the time
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(paths))) as executor:
+                return list(executor.map(self.compiler, paths))
+        finally:
+            if gc_enabled:
+                gc.enable()
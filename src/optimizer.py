@@ -0,0 +1,331 @@
+"""
+Optimizer pass over the parsed statements: constant folding of the operators applied to literals and removal
+of the code which is never executed. Optimized statements behave as the original ones, including their errors
+"""
+from src.ast_arena import FunctionStatementView, VarStatementView
+from src.ast_node_expression import Assign, Binary, Call, Group, Literal, Unary
+from src.ast_node_statement import BlockStatement, ExpressionStatement, FunctionStatement, IfStatement, \
+    IncludeStatement, LazyBlockStatement, PrintStatement, ReturnStatement, VarStatement, WhileStatement
+from src.ast_walker import AstFolder, child_nodes, walk_preorder
+from src.interpreter_runtime import RuntimeOperators, RuntimeDataType, bool_value
+from src.tokens import TokenOsu, TokenType
+
+# folded INT and STRING literals are limited, so that the optimizer does not build values the program may never need
+MAX_FOLDED_BITS = 4096
+MAX_FOLDED_LENGTH = 4096
+
+# statements declaring a variable in the scope they are in
+DECLARATIONS = (VarStatement, FunctionStatement, VarStatementView, FunctionStatementView)
+
+# data type of the folded value -> (Python type its value must have to be written as a literal, token type of it)
+LITERAL_TYPES = {
+    RuntimeDataType.INT: (int, TokenType.INT),
+    RuntimeDataType.FLOAT: (float, TokenType.FLOAT),
+    RuntimeDataType.STRING: (str, TokenType.STRING),
+    RuntimeDataType.BOOL: (bool, TokenType.BOOL),
+    RuntimeDataType.NULL: (type(None), TokenType.NULL),
+}
+
+
+def literal_node(value, line):
+    """
+    Return Literal node of the RuntimeValue, or None if no literal evaluates to it (e.g. INT value 0.5 of 2 ** -1)
+    """
+    python_type, token_type = LITERAL_TYPES.get(value.data_type, (None, None))
+    if value.value.__class__ is not python_type:
+        return None
+    if token_type == TokenType.STRING:
+        lexeme = '"{}"'.format(value.value)
+    elif token_type == TokenType.BOOL:
+        lexeme = 'TRUE' if value.value else 'FALSE'
+    elif token_type == TokenType.NULL:
+        lexeme = 'NULL'
+    else:
+        lexeme = repr(value.value)
+    literal = value.value if token_type in (TokenType.INT, TokenType.FLOAT, TokenType.STRING) else None
+    node = Literal(TokenOsu(token_type, lexeme, literal, line))
+    node.runtime_value = value
+    return node
+
+
+def _too_large(left, operator, right):
+    """
+    Return True if the result of the operator would be a too large INT or STRING to be folded
+    """
+    left_value, right_value = left.value, right.value
+    if operator.token_type == TokenType.EXPONENT and left.is_int() and right.is_int():
+        return right_value > 0 and abs(left_value).bit_length() * right_value > MAX_FOLDED_BITS
+    if operator.token_type == TokenType.ASTERISK:
+        if left.is_string() and right.is_int():
+            return len(left_value) * right_value > MAX_FOLDED_LENGTH
+        if left.is_int() and right.is_int():
+            return abs(left_value).bit_length() + abs(right_value).bit_length() > MAX_FOLDED_BITS
+    if operator.token_type == TokenType.PLUS and left.is_string() and right.is_string():
+        return len(left_value) + len(right_value) > MAX_FOLDED_LENGTH
+    return False
+
+
+def declares_globals(statement):
+    """
+    Return True if the statement includes a module (or it can not be known - lazily parsed function body),
+    the Resolver declares the globals of an included module even if the include is never executed
+    """
+    for node in walk_preorder(statement, child_nodes):
+        if isinstance(node, IncludeStatement):
+            return True
+        if isinstance(node, LazyBlockStatement) and node.parsed_statements is None:
+            return True
+    return False
+
+
+class Optimizer(AstFolder):
+    """
+    Rewrites the statements - operators applied to literals are replaced by the literal of their value (computed
+    by the RuntimeOperators, operators raising an error are left in place), if and while statements with a literal
+    condition are replaced by the branch which is executed and the statements after a return in a block are removed.
+    Removed code must not declare variables seen by the remaining code: branches which are declarations and
+    statements including modules are kept. Nodes are not modified (expressions can be shared), changed nodes
+    are replaced by new ones. Lazily parsed function bodies are left as they are.
+    Statements should be optimized only if they resolve - removed code could hide ResolveErrors
+    """
+    def __init__(self):
+        self.folded_expressions = 0
+        self.removed_statements = 0
+
+    def optimize(self, statements):
+        """
+        Return optimized top-level statements
+        """
+        optimized_statements = []
+        for statement in statements:
+            if statement is None:
+                # statement which failed to parse is left to the engine
+                optimized_statements.append(statement)
+                continue
+            optimized_statement, _ = self.optimize_statement(statement)
+            if optimized_statement is not None:
+                optimized_statements.append(optimized_statement)
+        return optimized_statements
+
+    def optimize_statement(self, statement):
+        """
+        Return (optimized statement or None if it is removed, True if the statement always returns)
+        """
+        optimized_statement, returns = statement.accept(self)
+        expression_line = getattr(statement, 'expression_line', None)
+        if optimized_statement is not None and optimized_statement is not statement and expression_line is not None:
+            optimized_statement.expression_line = expression_line
+        return optimized_statement, returns
+
+    def optimize_block(self, statements):
+        """
+        Return (optimized statements of a block, True if they always return)
+        """
+        optimized_statements = []
+        returns = False
+        for statement in statements:
+            if statement is None:
+                optimized_statements.append(statement)
+                continue
+            if returns:
+                # unreachable
+                if declares_globals(statement):
+                    optimized_statements.append(statement)
+                else:
+                    self.removed_statements += 1
+                continue
+            optimized_statement, returns = self.optimize_statement(statement)
+            if optimized_statement is not None:
+                optimized_statements.append(optimized_statement)
+        return optimized_statements, returns
+
+    def optimize_expression(self, expression):
+        """
+        Return (optimized expression, RuntimeValue of it if it is a literal, else None)
+        """
+        return self.fold(expression)
+
+    def _branch(self, statement):
+        """
+        Return (optimized branch of an if or while statement, True if it always returns)
+        """
+        optimized_statement, returns = self.optimize_statement(statement)
+        # a branch can not be missing
+        return optimized_statement if optimized_statement is not None else BlockStatement([]), returns
+
+    def _removable(self, statement):
+        return not isinstance(statement, DECLARATIONS) and not declares_globals(statement)
+
+    # VISITOR INTERFACE FOR STATEMENTS ----------------------------------------------
+
+    def visit_var_statement(self, var_statement):
+        if var_statement.initializer is None:
+            return var_statement, False
+        initializer, _ = self.optimize_expression(var_statement.initializer)
+        if initializer is var_statement.initializer:
+            return var_statement, False
+        return VarStatement(var_statement.name, initializer), False
+
+    def visit_expression_statement(self, expression_statement):
+        expression, value = self.optimize_expression(expression_statement.expression)
+        if value is not None:
+            # literal has no effect
+            self.removed_statements += 1
+            return None, False
+        if expression is expression_statement.expression:
+            return expression_statement, False
+        return ExpressionStatement(expression), False
+
+    def visit_print_statement(self, print_statement):
+        expression, _ = self.optimize_expression(print_statement.expression)
+        if expression is print_statement.expression:
+            return print_statement, False
+        return PrintStatement(expression), False
+
+    def visit_block_statement(self, block_statement):
+        statements, returns = self.optimize_block(block_statement.statements)
+        if not statements:
+            self.removed_statements += 1
+            return None, False
+        return BlockStatement(statements), returns
+
+    def visit_if_statement(self, if_statement):
+        condition, value = self.optimize_expression(if_statement.condition)
+        if value is not None:
+            branch, dead_branch = if_statement.then_branch, if_statement.else_branch
+            if not value.is_truthy():
+                branch, dead_branch = dead_branch, branch
+            if dead_branch is None or self._removable(dead_branch):
+                self.removed_statements += 1
+                return self.optimize_statement(branch) if branch is not None else (None, False)
+
+        then_branch, then_returns = self._branch(if_statement.then_branch)
+        if if_statement.else_branch is None:
+            return IfStatement(condition, then_branch, None), False
+        else_branch, else_returns = self._branch(if_statement.else_branch)
+        return IfStatement(condition, then_branch, else_branch), then_returns and else_returns
+
+    def visit_while_statement(self, while_statement):
+        condition, value = self.optimize_expression(while_statement.condition)
+        if value is not None and not value.is_truthy() and self._removable(while_statement.body):
+            self.removed_statements += 1
+            return None, False
+        body, _ = self._branch(while_statement.body)
+        return WhileStatement(condition, body), False
+
+    def visit_function_statement(self, function_statement):
+        body = function_statement.body
+        if isinstance(body, LazyBlockStatement):
+            return function_statement, False
+        statements, _ = self.optimize_block(body.statements)
+        return FunctionStatement(function_statement.name, function_statement.parameters, BlockStatement(statements)), False
+
+    def visit_return_statement(self, return_statement):
+        if return_statement.value is None:
+            return return_statement, True
+        value, _ = self.optimize_expression(return_statement.value)
+        if value is return_statement.value:
+            return return_statement, True
+        return ReturnStatement(return_statement.keyword, value), True
+
+    def visit_include_statement(self, include_statement):
+        return include_statement, False
+
+    def visit_class_statement(self, class_statement):
+        return class_statement, False
+
+    # VISITOR INTERFACE FOR EXPRESSIONS ---------------------------------------------
+    # values of the child nodes (see optimize_expression) are in self.children_values
+
+    def _folded(self, value, operator):
+        """
+        Return value of the folded expression - its literal (and value), or None if the value has no literal
+        """
+        node = literal_node(value, operator.source_file_line_number)
+        if node is None:
+            return None
+        self.folded_expressions += 1
+        return node, value
+
+    def visit_binary_expression(self, binary_expression):
+        (left, left_value), (right, right_value) = self.children_values
+        operator = binary_expression.operator
+        folded = None
+        if operator.token_type in (TokenType.AND, TokenType.OR) and left_value is not None:
+            # short-circuit: the right operand is not evaluated, or the result is its truthiness
+            is_and = operator.token_type == TokenType.AND
+            if left_value.is_truthy() != is_and:
+                folded = self._folded(bool_value(not is_and), operator)
+            elif right_value is not None:
+                folded = self._folded(bool_value(right_value.is_truthy()), operator)
+        elif left_value is not None and right_value is not None and not _too_large(left_value, operator, right_value):
+            try:
+                value = RuntimeOperators.get_runtime_value_for_binary_operator(left_value, operator, right_value)
+            except Exception:
+                # the error is raised when the expression is executed
+                value = None
+            folded = self._folded(value, operator) if value is not None else None
+
+        if folded is not None:
+            return folded
+        if left is binary_expression.left_operand and right is binary_expression.right_operand:
+            return binary_expression, None
+        return Binary(left, operator, right), None
+
+    def visit_group_expression(self, group_expression):
+        expression, value = self.children_values[0]
+        if value is not None:
+            return expression, value
+        if expression is group_expression.expression:
+            return group_expression, None
+        return Group(expression), None
+
+    def visit_literal_expression(self, literal_expression):
+        try:
+            return literal_expression, RuntimeOperators.get_runtime_value_for_literal_token(literal_expression.value)
+        except Exception:
+            return literal_expression, None
+
+    def visit_unary_expression(self, unary_expression):
+        operand, value = self.children_values[0]
+        operator = unary_expression.operator
+        if value is not None:
+            try:
+                folded = self._folded(RuntimeOperators.get_runtime_value_for_unary_operator(operator, value), operator)
+            except Exception:
+                folded = None
+            if folded is not None:
+                return folded
+        if operand is unary_expression.operand:
+            return unary_expression, None
+        return Unary(operator, operand), None
+
+    def visit_assign_expression(self, assign_expression):
+        value, _ = self.children_values[0]
+        if value is assign_expression.value:
+            return assign_expression, None
+        return Assign(assign_expression.name, value), None
+
+    def visit_variable_expression(self, variable_expression):
+        return variable_expression, None
+
+    def visit_call_expression(self, call_expression):
+        nodes = [node for node, _ in self.children_values]
+        original_nodes = [call_expression.callee] + list(call_expression.arguments)
+        if all(node is original_node for node, original_node in zip(nodes, original_nodes)):
+            return call_expression, None
+        return Call(nodes[0], call_expression.paren, nodes[1:]), None
+
+    # objects are not implemented yet, their expressions are left as they are
+
+    def visit_get_expression(self, get_expression):
+        return get_expression, None
+
+    def visit_this_expression(self, this_expression):
+        return this_expression, None
+
+    def visit_set_expression(self, set_expression):
+        return set_expression, None
+
+    def visit_super_expression(self, super_expression):
+        return super_expression, None
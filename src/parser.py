@@ -2,25 +2,41 @@ from src.constants import AppType
 from src.logger import Logger as log
 from src.tokens import TokenType, TokenOsu
 from src.error_handler import ErrorHandler, ParseError
+from src.token_buffer import TokenBuffer
+from src.ast_intern import ExpressionInternTable
+from src.parser_syntax_check import is_valid_block
 
 from src.ast_node_expression import Binary, Group, Literal, Unary, Variable, Assign, Call
 
 from src.ast_node_statement import VarStatement, ExpressionStatement, PrintStatement, \
-    BlockStatement, IfStatement, WhileStatement, FunctionStatement, ReturnStatement, \
-    ClassStatement
+    BlockStatement, LazyBlockStatement, IfStatement, WhileStatement, FunctionStatement, ReturnStatement, \
+    IncludeStatement, ClassStatement
 from src.parser_constants import EQUALITY_TOKENS, COMPARISON_TOKENS, TERM_TOKENS, FACTOR_TOKENS, \
     UNARY_TOKENS, LITERAL_TOKENS, IGNORED_TOKENS, GROUP_OPENING_TOKENS, GROUP_CLOSING_TOKENS, \
     STATEMENT_START_TOKENS, STATEMENT_END_TOKENS, IDENTIFIER_TOKENS, EQUALS_TOKENS, \
     BLOCK_OPENING_TOKENS, BLOCK_CLOSING_TOKENS, VAR_STATEMENT_TOKENS, FUNCTION_STATEMENT_TOKENS, DELIMITER_TOKENS, \
-    RETURN_TOKENS
+    RETURN_TOKENS, INCLUDE_STATEMENT_TOKENS, INCLUDE_PATH_TOKENS
 
 
 class Parser:
-    def __init__(self, tokens=None):
+    def __init__(self, tokens=None, lazy_function_bodies=False, share_expressions=False):
+        """
+        With lazy_function_bodies=True the function bodies are only brace-matched and syntax-checked
+        (see LazyBlockStatement) and parsed when the function is called for the first time.
+        With share_expressions=True identical expression subtrees are shared (see ExpressionInternTable)
+        """
+        self.lazy_function_bodies = lazy_function_bodies
+        # False in the parsers of the lazily parsed bodies - their nested bodies were checked with them
+        self.check_lazy_bodies = True
+        self.intern_table = ExpressionInternTable() if share_expressions else None
         self.upload_tokens(tokens)
 
     def upload_tokens(self, tokens):
-        self.tokens = [token for token in tokens if token.token_type not in IGNORED_TOKENS] if tokens else []
+        if isinstance(tokens, TokenBuffer):
+            # ignored tokens are left out without materializing any of the tokens
+            self.tokens = tokens.without_types(IGNORED_TOKENS)
+        else:
+            self.tokens = [token for token in tokens if not token.token_type.bit & IGNORED_TOKENS] if tokens else []
         # TODO: May need deep copy to avoid side effects
         self.index = 0
         self.error_handler = ErrorHandler()
@@ -36,17 +52,27 @@ class Parser:
         """
         if tokens:
             self.upload_tokens(tokens)
-
-        source_tokens = ' '.join([str(token) for token in self.tokens])
-        log.info(AppType.PARSER, f'Tokens: {source_tokens}')
+        self._log_tokens()
 
         self.statements = []
         while not self._end_of_code():
-            self.statements.append(self._parse_statement())
+            self.statements.append(self._parse_top_level_statement())
         return self.statements
 
+    def _log_tokens(self):
+        if __debug__ and log.PARSER_LOGGER_ENABLED and log.is_enabled(AppType.PARSER, log.DEBUG):
+            # printing all the tokens costs about as much as parsing them
+            source_tokens = ' '.join([str(token) for token in self.tokens])
+            log.debug(AppType.PARSER, 'Tokens: {}', source_tokens)
+
     # PARSING STATEMENTS -----------------------------------------------------------------------------
 
+    def _parse_top_level_statement(self):
+        statement = self._parse_statement()
+        if self.intern_table is not None:
+            return self.intern_table.intern_statement(statement)
+        return statement
+
     def _parse_statement(self):
         try:
             return self._parse_declaring_statement()
@@ -57,12 +83,14 @@ class Parser:
     def _parse_declaring_statement(self):
         """
         Find next declaring statememt and return its AST
-        (VAR, FUNCTION and CLASS are declaring statements)
+        (VAR, FUNCTION, INCLUDE and CLASS are declaring statements)
         """
         if self._is_one_of_types(FUNCTION_STATEMENT_TOKENS):
             return self._parse_function_statement()
         elif self._is_one_of_types(VAR_STATEMENT_TOKENS):
             return self._parse_var_statement()
+        elif self._is_one_of_types(INCLUDE_STATEMENT_TOKENS):
+            return self._parse_include_statement()
         return self._parse_nondeclaring_statement()
 
     def _parse_nondeclaring_statement(self):
@@ -70,13 +98,13 @@ class Parser:
         Find next non-declaring statememt and return its AST
         (IF, WHILE, PRINT, BLOCK are non-declaring statements)
         """
-        if self._is_one_of_types({TokenType.IF}):
+        if self._is_one_of_types(TokenType.IF.bit):
             return self._parse_if_statement()
-        if self._is_one_of_types({TokenType.WHILE}):
+        if self._is_one_of_types(TokenType.WHILE.bit):
             return self._parse_while_statement()
-        if self._is_one_of_types(({TokenType.FOR})):
+        if self._is_one_of_types(TokenType.FOR.bit):
             return self._parse_for_statement()
-        if self._is_one_of_types({TokenType.PRINT}):
+        if self._is_one_of_types(TokenType.PRINT.bit):
             return self._parse_print_statement()
         if self._is_one_of_types(BLOCK_OPENING_TOKENS):
             return self._parse_block_statement()
@@ -85,29 +113,41 @@ class Parser:
         return self._parse_expression_statement()
 
     def _parse_var_statement(self) -> VarStatement:
-        log.info(AppType.PARSER, 'Started parsing VarStatement')
+        if __debug__ and log.PARSER_LOGGER_ENABLED:
+            log.info(AppType.PARSER, 'Started parsing VarStatement')
         name = self._consume_or_raise(IDENTIFIER_TOKENS, 'Expect variable name')
         initializer = self._expression() if self._is_one_of_types(EQUALS_TOKENS) else None
         self._consume_or_raise(STATEMENT_END_TOKENS, 'Expect statement terminator after value')
         return VarStatement(name, initializer)
 
+    def _parse_include_statement(self) -> IncludeStatement:
+        if __debug__ and log.PARSER_LOGGER_ENABLED:
+            log.info(AppType.PARSER, 'Started parsing IncludeStatement')
+        keyword = self._peek_prev()
+        path = self._consume_or_raise(INCLUDE_PATH_TOKENS, "Expect path of the module after 'include'")
+        self._consume_or_raise(STATEMENT_END_TOKENS, 'Expect statement terminator after module path')
+        return IncludeStatement(keyword, path)
+
     def _parse_expression_statement(self) -> ExpressionStatement:
-        log.info(AppType.PARSER, 'Started parsing ExpressionStatement')
+        if __debug__ and log.PARSER_LOGGER_ENABLED:
+            log.info(AppType.PARSER, 'Started parsing ExpressionStatement')
         expression = self._expression()
         self._consume_or_raise(STATEMENT_END_TOKENS, 'Expect statement terminator after expression')
         return ExpressionStatement(expression)
 
     def _parse_print_statement(self) -> PrintStatement:
-        log.info(AppType.PARSER, 'Started parsing PrintStatement')
+        if __debug__ and log.PARSER_LOGGER_ENABLED:
+            log.info(AppType.PARSER, 'Started parsing PrintStatement')
         print_value = self._expression()
         self._consume_or_raise(STATEMENT_END_TOKENS, 'Expect statement terminator after value')
         return PrintStatement(print_value)
 
     def _parse_block_statement(self) -> BlockStatement:
-        log.info(AppType.PARSER, 'Started parsing BlockStatement')
+        if __debug__ and log.PARSER_LOGGER_ENABLED:
+            log.info(AppType.PARSER, 'Started parsing BlockStatement')
         block_start_token = self._peek()
         block_content = []
-        while self._peek() and not self._peek().token_type in BLOCK_CLOSING_TOKENS:
+        while self._peek() and not self._peek().token_type.bit & BLOCK_CLOSING_TOKENS:
             try:
                 block_content.append(self._parse_statement())
             except ParseError as error:
@@ -119,28 +159,71 @@ class Parser:
         )
         return BlockStatement(block_content)
 
+    def _pre_parse_block_statement(self):
+        """
+        Collect tokens of the block up to the matching closing curly brace and check their syntax without building
+        the statements (see parser_syntax_check). A block with syntax errors is parsed right away, so the errors
+        (and the statements) are the same as without the lazy parsing
+        """
+        position = self._position()
+        block_tokens = self._next_tokens_until_block_end()
+        if not self.check_lazy_bodies or is_valid_block(block_tokens):
+            return LazyBlockStatement(block_tokens, type(self).parse_block_tokens)
+        self._rewind(position, block_tokens)
+        return self._parse_block_statement()
+
+    def _next_tokens_until_block_end(self):
+        """
+        Consume and return the tokens up to (and including) the curly brace closing the current block
+        """
+        tokens = self.tokens
+        start = end = self.index
+        block_depth = 1
+        while block_depth and end < len(tokens) and tokens[end].token_type != TokenType.EOF:
+            token_bit = tokens[end].token_type.bit
+            block_depth += bool(token_bit & BLOCK_OPENING_TOKENS) - bool(token_bit & BLOCK_CLOSING_TOKENS)
+            end += 1
+        self.index = end
+        return [tokens[index] for index in range(start, end)]
+
+    @classmethod
+    def parse_block_tokens(cls, tokens):
+        """
+        Parse tokens of a lazily parsed block (everything after its opening curly brace) and return its statements.
+        The first syntax error found in the block is raised
+        """
+        parser = cls(tokens, lazy_function_bodies=True)
+        parser.check_lazy_bodies = False
+        block = parser._parse_block_statement()
+        if parser.error_handler.has_errors():
+            raise parser.error_handler.errors[0]
+        return block.statements
+
     def _parse_if_statement(self) -> IfStatement:
-        log.info(AppType.PARSER, 'Started parsing IfStatement')
-        self._consume_or_raise({TokenType.LEFT_PAREN}, "Expect ( after 'if'")
+        if __debug__ and log.PARSER_LOGGER_ENABLED:
+            log.info(AppType.PARSER, 'Started parsing IfStatement')
+        self._consume_or_raise(GROUP_OPENING_TOKENS, "Expect ( after 'if'")
         condition = self._expression()
-        self._consume_or_raise({TokenType.RIGHT_PAREN}, "Expect ) after 'if' condition")
+        self._consume_or_raise(GROUP_CLOSING_TOKENS, "Expect ) after 'if' condition")
 
         then_branch = self._parse_statement()
-        else_branch = self._parse_statement() if self._is_one_of_types({TokenType.ELSE}) else None
+        else_branch = self._parse_statement() if self._is_one_of_types(TokenType.ELSE.bit) else None
         return IfStatement(condition, then_branch, else_branch)
 
     def _parse_while_statement(self) -> WhileStatement:
-        log.info(AppType.PARSER, 'Started parsing WhileStatement')
-        self._consume_or_raise({TokenType.LEFT_PAREN}, "Expect ( after 'while'")
+        if __debug__ and log.PARSER_LOGGER_ENABLED:
+            log.info(AppType.PARSER, 'Started parsing WhileStatement')
+        self._consume_or_raise(GROUP_OPENING_TOKENS, "Expect ( after 'while'")
         condition = self._expression()
-        self._consume_or_raise({TokenType.RIGHT_PAREN}, "Expect ) after 'while' condition")
+        self._consume_or_raise(GROUP_CLOSING_TOKENS, "Expect ) after 'while' condition")
 
         loop_body = self._parse_statement()
         return WhileStatement(condition, loop_body)
 
     def _parse_for_statement(self):
-        log.info(AppType.PARSER, 'Started parsing ForStatement')
-        self._consume_or_raise({TokenType.LEFT_PAREN}, "Expected open paren after for keyword")
+        if __debug__ and log.PARSER_LOGGER_ENABLED:
+            log.info(AppType.PARSER, 'Started parsing ForStatement')
+        self._consume_or_raise(GROUP_OPENING_TOKENS, "Expected open paren after for keyword")
 
         initializer = None
         if self._is_one_of_types(STATEMENT_END_TOKENS):
@@ -154,12 +237,12 @@ class Parser:
         if not self._is_same_type(TokenType.SEMICOLON):
             condition = self._expression()
         condition_semicolon = self._consume_or_raise(
-            {TokenType.SEMICOLON}, 'Expected semicolon after loop condition')
+            STATEMENT_END_TOKENS, 'Expected semicolon after loop condition')
 
         increment = None
         if not self._is_same_type(TokenType.SEMICOLON):
             increment = self._expression()
-        self._consume_or_raise({TokenType.RIGHT_PAREN}, 'Expected closing paren in for loop')
+        self._consume_or_raise(GROUP_CLOSING_TOKENS, 'Expected closing paren in for loop')
 
         body = self._parse_statement()
 
@@ -178,7 +261,8 @@ class Parser:
         return body
 
     def _parse_function_statement(self) -> FunctionStatement:
-        log.info(AppType.PARSER, 'Started parsing FunctionStatement')
+        if __debug__ and log.PARSER_LOGGER_ENABLED:
+            log.info(AppType.PARSER, 'Started parsing FunctionStatement')
 
         # name
         name = self._consume_or_raise(IDENTIFIER_TOKENS, "Expected a function name")
@@ -212,12 +296,16 @@ class Parser:
 
         # body
         self._consume_or_raise(BLOCK_OPENING_TOKENS, "Expected opening curly brace before function body")
-        body = self._parse_block_statement()
+        body = self._parse_function_body()
 
         return FunctionStatement(name, parameters, body)
 
+    def _parse_function_body(self):
+        return self._pre_parse_block_statement() if self.lazy_function_bodies else self._parse_block_statement()
+
     def _parse_return_statement(self) -> ReturnStatement:
-        log.info(AppType.PARSER, 'Started parsing ReturnStatement')
+        if __debug__ and log.PARSER_LOGGER_ENABLED:
+            log.info(AppType.PARSER, 'Started parsing ReturnStatement')
         keyword = self._peek_prev()
         value = None
         if not self._is_same_type(TokenType.SEMICOLON):
@@ -226,7 +314,8 @@ class Parser:
         return ReturnStatement(keyword, value)
 
     def _parse_class_statement(self) -> ClassStatement:
-        log.info(AppType.PARSER, 'Started parsing ClassStatement')
+        if __debug__ and log.PARSER_LOGGER_ENABLED:
+            log.info(AppType.PARSER, 'Started parsing ClassStatement')
         pass
 
     # PARSING EXPRESSIONS -----------------------------------------------------------------------------
@@ -248,7 +337,7 @@ class Parser:
 
     def _logic_or(self):
         left_side = self._logic_xor()
-        while self._is_one_of_types({TokenType.OR}):
+        while self._is_one_of_types(TokenType.OR.bit):
             operator = self._peek_prev()
             right_side = self._logic_xor()
             left_side = Binary(left_side, operator, right_side)
@@ -256,7 +345,7 @@ class Parser:
 
     def _logic_xor(self):
         left_side = self._logic_and()
-        while self._is_one_of_types({TokenType.XOR}):
+        while self._is_one_of_types(TokenType.XOR.bit):
             operator = self._peek_prev()
             right_side = self._logic_and()
             left_side = Binary(left_side, operator, right_side)
@@ -264,7 +353,7 @@ class Parser:
 
     def _logic_and(self):
         left_side = self._equality()
-        while self._is_one_of_types({TokenType.AND}):
+        while self._is_one_of_types(TokenType.AND.bit):
             operator = self._peek_prev()
             right_side = self._equality()
             left_side = Binary(left_side, operator, right_side)
@@ -319,7 +408,7 @@ class Parser:
         Exponentiation
         """
         left_side = self._unary()
-        while self._is_one_of_types({TokenType.EXPONENT}):
+        while self._is_one_of_types(TokenType.EXPONENT.bit):
             operator = self._peek_prev()
             right_side = self._unary()
             left_side = Binary(left_side, operator, right_side)
@@ -342,7 +431,7 @@ class Parser:
         expression = self._primary()
 
         while True:
-            if self._is_one_of_types([TokenType.LEFT_PAREN]):
+            if self._is_one_of_types(GROUP_OPENING_TOKENS):
                 expression = self._function_call(expression)
             else:
                 break
@@ -368,6 +457,18 @@ class Parser:
 
     # HELPER METHODS -----------------------------------------------------------------------------------
 
+    def _position(self):
+        """
+        Return the position of the next token (see _rewind)
+        """
+        return self.index
+
+    def _rewind(self, position, consumed_tokens):
+        """
+        Go back to the position, consumed_tokens are the tokens consumed since then
+        """
+        self.index = position
+
     def _peek(self):
         """
         Look at the next token
@@ -412,20 +513,22 @@ class Parser:
 
     def _is_one_of_types(self, token_types):
         """
-        Advances the token pointer if token is one of given types
+        Advances the token pointer if token is one of given types (token_types is a mask, see token_mask)
         """
-        if self._peek() and self._peek().token_type in token_types:
+        token = self._peek()
+        if token is not None and token.token_type.bit & token_types:
             self._next_token()
             return True
         return False
 
     def _consume_or_raise(self, token_types, exception_description):
         """
-        Consumes the expected token or throws an error
+        Consumes the expected token (one of the types in the token_types mask) or throws an error
         """
-        if any([self._is_same_type(token_type) for token_type in token_types]):
+        token = self._peek()
+        if token is not None and token.token_type.bit & token_types:
             return self._next_token()
-        raise ParseError(token=self._peek(), message=exception_description)
+        raise ParseError(token=token, message=exception_description)
 
     def _function_call(self, function):
         """
@@ -459,8 +562,8 @@ class Parser:
         self._next_token()
 
         while not self._end_of_code():
-            if self._peek_prev().token_type in STATEMENT_END_TOKENS:
+            if self._peek_prev().token_type.bit & STATEMENT_END_TOKENS:
                 return
-            if self._peek().token_type in STATEMENT_START_TOKENS:
+            if self._peek().token_type.bit & STATEMENT_START_TOKENS:
                 return
             self._next_token()
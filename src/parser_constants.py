@@ -1,93 +1,103 @@
-from src.tokens import TokenType
+from src.tokens import TokenType, token_mask, token_table
 
-FUNCTION_STATEMENT_TOKENS = {
+# token classes are integer masks (see token_mask), membership test: token.token_type.bit & MASK
+
+FUNCTION_STATEMENT_TOKENS = token_mask({
     TokenType.FUNCTION
-}
+})
 
-VAR_STATEMENT_TOKENS = {
+VAR_STATEMENT_TOKENS = token_mask({
     TokenType.VAR
-}
+})
+
+INCLUDE_STATEMENT_TOKENS = token_mask({
+    TokenType.INCLUDE
+})
+
+INCLUDE_PATH_TOKENS = token_mask({
+    TokenType.STRING
+})
 
-IGNORED_TOKENS = {
+IGNORED_TOKENS = token_mask({
     TokenType.EOF,
     TokenType.EOL,
     TokenType.ERROR,
     TokenType.COMMENT,
-}
+})
 
-EQUALITY_TOKENS = {
+EQUALITY_TOKENS = token_mask({
     TokenType.EQUALITY,
     TokenType.INEQUALITY,
-}
+})
 
-COMPARISON_TOKENS = {
+COMPARISON_TOKENS = token_mask({
     TokenType.LT,
     TokenType.LTE,
     TokenType.GT,
     TokenType.GTE,
-}
+})
 
-TERM_TOKENS = {
+TERM_TOKENS = token_mask({
     TokenType.PLUS,
     TokenType.MINUS,
-}
+})
 
-FACTOR_TOKENS = {
+FACTOR_TOKENS = token_mask({
     TokenType.ASTERISK,
     TokenType.DIV,
     TokenType.REMAINDER,
-}
+})
 
-UNARY_TOKENS = {
+UNARY_TOKENS = token_mask({
     TokenType.NOT,
     TokenType.MINUS,
-}
+})
 
-LITERAL_TOKENS = {
+LITERAL_TOKENS = token_mask({
     TokenType.INT,
     TokenType.FLOAT,
     TokenType.STRING,
     TokenType.BOOL,
     TokenType.NULL,
-}
+})
 
-IDENTIFIER_TOKENS = {
+IDENTIFIER_TOKENS = token_mask({
     TokenType.IDENTIFIER
-}
+})
 
-EQUALS_TOKENS = {
+EQUALS_TOKENS = token_mask({
     TokenType.EQUALS
-}
+})
 
-GROUP_OPENING_TOKENS = {
+GROUP_OPENING_TOKENS = token_mask({
     TokenType.LEFT_PAREN,
-}
+})
 
-GROUP_CLOSING_TOKENS = {
+GROUP_CLOSING_TOKENS = token_mask({
     TokenType.RIGHT_PAREN,
-}
+})
 
-BLOCK_OPENING_TOKENS = {
+BLOCK_OPENING_TOKENS = token_mask({
     TokenType.LEFT_CURLY,
-}
+})
 
-BLOCK_CLOSING_TOKENS = {
+BLOCK_CLOSING_TOKENS = token_mask({
     TokenType.RIGHT_CURLY,
-}
+})
 
-DELIMITER_TOKENS = {
+DELIMITER_TOKENS = token_mask({
     TokenType.COMMA
-}
+})
 
-STATEMENT_END_TOKENS = {
+STATEMENT_END_TOKENS = token_mask({
     TokenType.SEMICOLON
-}
+})
 
-RETURN_TOKENS = {
+RETURN_TOKENS = token_mask({
     TokenType.RETURN
-}
+})
 
-STATEMENT_START_TOKENS = {
+STATEMENT_START_TOKENS = token_mask({
     TokenType.CLASS,
     TokenType.FUNCTION,
     TokenType.VAR,
@@ -96,4 +106,29 @@ STATEMENT_START_TOKENS = {
     TokenType.FOR,
     TokenType.PRINT,
     TokenType.RETURN,
-}
+    TokenType.INCLUDE,
+})
+
+# precedence levels of the binary operators (as token masks), from the loosest to the tightest binding one
+# (all binary operators are left associative, including the exponent)
+BINARY_PRECEDENCE_LEVELS = (
+    TokenType.OR.bit,
+    TokenType.XOR.bit,
+    TokenType.AND.bit,
+    EQUALITY_TOKENS,
+    COMPARISON_TOKENS,
+    TERM_TOKENS,
+    FACTOR_TOKENS,
+    TokenType.EXPONENT.bit,
+)
+
+# binding power of every token type indexed by its code (0 for the tokens which are not binary operators)
+BINARY_BINDING_POWERS = token_table({
+    token_type: binding_power
+    for binding_power, level_mask in enumerate(BINARY_PRECEDENCE_LEVELS, start=1)
+    for token_type in TokenType
+    if token_type.bit & level_mask
+}, default=0)
+
+# operand of an unary operator is another unary expression (or a call), it never takes a binary operator
+UNARY_BINDING_POWER = len(BINARY_PRECEDENCE_LEVELS) + 1
@@ -0,0 +1,202 @@
+import hashlib
+from array import array
+from itertools import repeat
+from operator import attrgetter, sub
+from src.parser import Parser
+from src.parser_constants import BLOCK_OPENING_TOKENS, BLOCK_CLOSING_TOKENS
+
+# tokens are compared (and hashed) in bulk, attributes are read by map without Python loops
+TOKEN_LEXEME = attrgetter('lexeme')
+
+TOKEN_TYPE = attrgetter('token_type')
+
+TOKEN_CODE = attrgetter('token_type.code')
+
+TOKEN_LINE = attrgetter('source_file_line_number')
+
+
+def token_digest(tokens, start, end):
+    """
+    Return content hash of the tokens[start: end] - types, lexemes and lines relative to the first token,
+    so moving the code to other lines (or changing the comments around it) does not change the hash
+    """
+    tokens = tokens[start: end]
+    first_line = tokens[0].source_file_line_number if tokens else 0
+    lexemes = list(map(TOKEN_LEXEME, tokens))
+    digest = hashlib.sha1(''.join(lexemes).encode('utf-8', 'surrogatepass'))
+    # lexeme lengths keep the joined lexemes unambiguous
+    digest.update(array('q', map(len, lexemes)).tobytes())
+    digest.update(array('q', map(TOKEN_CODE, tokens)).tobytes())
+    digest.update(array('q', map(sub, map(TOKEN_LINE, tokens), repeat(first_line))).tobytes())
+    return digest.hexdigest()
+
+
+def shift_lines(tokens, line_offset):
+    if line_offset:
+        for token in tokens:
+            token.source_file_line_number += line_offset
+
+
+class StatementRegion:
+    """
+    Top-level statement together with its tokens and their range in the token list (start inclusive, end exclusive).
+    Digest is the content hash of the tokens, it is None for a statement with syntax errors (such statement
+    is never reused). Type of the token following the statement is kept too, as the parser looks ahead (e.g. for ELSE).
+    Bodies are (digest, body, tokens) of the outermost function bodies parsed as a part of the statement
+    """
+    def __init__(self, statement, tokens, start, digest, following_type, bodies):
+        self.statement = statement
+        self.tokens = tokens
+        self.start = start
+        self.end = start + len(tokens)
+        self.digest = digest
+        self.following_type = following_type
+        self.bodies = bodies
+        self.reparsed = True
+
+
+class IncrementalParser(Parser):
+    """
+    Parser remembering content hash and token range of each top-level statement and function body.
+    reparse() of the edited tokens reuses the statements before and after the edited region whose hashes
+    did not change, and the function bodies of the re-parsed statements whose hashes did not change (e.g. after
+    renaming of the function). Only the rest is parsed again. Statements are the same as if parsed from scratch.
+
+    Reused statements keep their token objects, whose line numbers get shifted in place when the code moved
+    """
+    def upload_tokens(self, tokens):
+        super().upload_tokens(tokens)
+        # tokens are replaced by the tokens of the reused statements, so they have to be a list
+        self.tokens = list(self.tokens)
+        self.regions = []
+        self.reusable_bodies = {}
+        self.region_bodies = []
+        self.function_depth = 0
+
+    def parse(self, tokens=None):
+        if tokens:
+            self.upload_tokens(tokens)
+        self._log_tokens()
+
+        while not self._end_of_code():
+            self.regions.append(self._parse_region())
+        self.statements = [region.statement for region in self.regions]
+        return self.statements
+
+    def reparse(self, tokens):
+        """
+        Parse edited tokens reusing unchanged statements and function bodies of the previous parse
+        """
+        previous_regions, previous_token_count = self.regions, len(self.tokens)
+        self.upload_tokens(tokens)
+        self._log_tokens()
+
+        front = 0
+        while front < len(previous_regions) and self._is_unchanged(previous_regions[front], previous_regions[front].start):
+            self._reuse_region(previous_regions[front], previous_regions[front].start)
+            front += 1
+
+        offset = len(self.tokens) - previous_token_count
+        front_end = previous_regions[front - 1].end if front else 0
+        back = len(previous_regions)
+        while back > front and previous_regions[back - 1].start + offset >= front_end and \
+                self._is_unchanged(previous_regions[back - 1], previous_regions[back - 1].start + offset):
+            back -= 1
+
+        for region in previous_regions[front: back]:
+            for digest, body, body_tokens in region.bodies:
+                self.reusable_bodies.setdefault(digest, []).append((body, body_tokens))
+
+        self.index = front_end
+        following_regions = previous_regions[back:]
+        while not self._end_of_code():
+            while following_regions and following_regions[0].start + offset < self.index:
+                following_regions.pop(0)
+            if following_regions and following_regions[0].start + offset == self.index:
+                break
+            self.regions.append(self._parse_region())
+        for region in following_regions:
+            self._reuse_region(region, region.start + offset)
+
+        self.reusable_bodies = {}
+        self.statements = [region.statement for region in self.regions]
+        return self.statements
+
+    def get_reparsed_statements(self):
+        """
+        Return statements parsed by the last parse (or reparse) - all the other statements were reused
+        """
+        return [region.statement for region in self.regions if region.reparsed]
+
+    def _parse_region(self):
+        start, error_count = self.index, len(self.error_handler.errors)
+        self.region_bodies = []
+        statement = self._parse_statement()
+        has_errors = len(self.error_handler.errors) > error_count
+        digest = None if has_errors else token_digest(self.tokens, start, self.index)
+        return StatementRegion(
+            statement, self.tokens[start: self.index], start, digest, self._type_at(self.index), self.region_bodies)
+
+    def _is_unchanged(self, region, start):
+        """
+        Return True if the tokens from start are the tokens of the region (possibly moved to other lines).
+        Tokens are compared directly - digests are computed only for the parsed statements, not for the whole code
+        """
+        end = start + len(region.tokens)
+        if region.digest is None or end > len(self.tokens) or self._type_at(end) != region.following_type:
+            return False
+        tokens = self.tokens[start: end]
+        return list(map(TOKEN_TYPE, tokens)) == list(map(TOKEN_TYPE, region.tokens)) and \
+            list(map(TOKEN_LEXEME, tokens)) == list(map(TOKEN_LEXEME, region.tokens)) and \
+            len(set(map(sub, map(TOKEN_LINE, tokens), map(TOKEN_LINE, region.tokens)))) == 1
+
+    def _type_at(self, index):
+        return self.tokens[index].token_type if index < len(self.tokens) else None
+
+    def _reuse_region(self, region, start):
+        """
+        Put reused statement (and its tokens) at the given index of the current tokens
+        """
+        self._reuse_tokens(region.tokens, start)
+        region.start, region.end, region.reparsed = start, start + len(region.tokens), False
+        self.regions.append(region)
+
+    def _reuse_tokens(self, reused_tokens, start):
+        shift_lines(reused_tokens, self.tokens[start].source_file_line_number - reused_tokens[0].source_file_line_number)
+        self.tokens[start: start + len(reused_tokens)] = reused_tokens
+
+    def _parse_function_body(self):
+        start, error_count = self.index, len(self.error_handler.errors)
+        end = self._find_block_end()
+        digest = token_digest(self.tokens, start, end) if end else None
+
+        if self.reusable_bodies.get(digest):
+            body, body_tokens = self.reusable_bodies[digest].pop()
+            self._reuse_tokens(body_tokens, start)
+            self.index = end
+        else:
+            self.function_depth += 1
+            try:
+                body = super()._parse_function_body()
+            finally:
+                self.function_depth -= 1
+            body_tokens = self.tokens[start: self.index]
+            if len(self.error_handler.errors) > error_count or self.index != end:
+                digest = None
+
+        # nested bodies are reused as a part of their outermost body
+        if digest is not None and not self.function_depth:
+            self.region_bodies.append((digest, body, body_tokens))
+        return body
+
+    def _find_block_end(self):
+        """
+        Return index after the curly brace closing the current block (None if the block is not closed)
+        """
+        block_depth = 1
+        for index in range(self.index, len(self.tokens)):
+            token_bit = self.tokens[index].token_type.bit
+            block_depth += bool(token_bit & BLOCK_OPENING_TOKENS) - bool(token_bit & BLOCK_CLOSING_TOKENS)
+            if not block_depth:
+                return index + 1
+        return None
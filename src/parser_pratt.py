@@ -0,0 +1,72 @@
+from src.error_handler import ParseError
+from src.parser import Parser
+from src.parser_streaming import StreamingParser
+from src.ast_node_expression import Binary, Group, Literal, Unary, Variable, Assign
+from src.parser_constants import BINARY_BINDING_POWERS, UNARY_BINDING_POWER, UNARY_TOKENS, LITERAL_TOKENS, \
+    IDENTIFIER_TOKENS, GROUP_OPENING_TOKENS, GROUP_CLOSING_TOKENS, EQUALS_TOKENS
+
+
+class PrattParser(Parser):
+    """
+    Parser with the expressions parsed by precedence climbing (Pratt parser) driven by BINARY_BINDING_POWERS table.
+    One loop handles all the binary operators, so an operand costs a couple of calls instead of descending
+    through every precedence level. Produces exactly the same trees (and errors) as Parser
+    """
+    def _expression(self):
+        return self._binding_power_expression(0)
+
+    def _binding_power_expression(self, minimal_binding_power):
+        """
+        Parse an expression containing only the binary operators binding tighter than the minimal binding power
+        (assignment is only allowed at the top level, i.e. minimal binding power 0)
+        """
+        left_side = self._prefix_expression()
+        token = self._peek()
+        while token is not None:
+            if token.token_type.bit & GROUP_OPENING_TOKENS:
+                self._next_token()
+                left_side = self._function_call(left_side)
+            else:
+                binding_power = BINARY_BINDING_POWERS[token.token_type.code]
+                if binding_power <= minimal_binding_power:
+                    break
+                operator = self._next_token()
+                left_side = Binary(left_side, operator, self._binding_power_expression(binding_power))
+            token = self._peek()
+
+        if minimal_binding_power == 0 and token is not None and token.token_type.bit & EQUALS_TOKENS:
+            return self._assignment_to(left_side)
+        return left_side
+
+    def _assignment_to(self, target):
+        self._next_token()
+        if not isinstance(target, Variable):
+            raise ParseError(token=self._peek_prev(), message='Invalid assignment target.')
+        return Assign(target.name, self._expression())
+
+    def _prefix_expression(self):
+        """
+        Parse unary operators and primary expressions (literal, variable, group)
+        """
+        token = self._peek()
+        token_bit = token.token_type.bit if token is not None else 0
+        if token_bit & UNARY_TOKENS:
+            operator = self._next_token()
+            return Unary(operator, self._binding_power_expression(UNARY_BINDING_POWER))
+        if token_bit & LITERAL_TOKENS:
+            return Literal(self._next_token())
+        if token_bit & IDENTIFIER_TOKENS:
+            return Variable(self._next_token())
+        if token_bit & GROUP_OPENING_TOKENS:
+            self._next_token()
+            expression = self._expression()
+            self._consume_or_raise(GROUP_CLOSING_TOKENS, 'Expected closing paren')
+            return Group(expression)
+
+        raise ParseError(self._peek(), 'Expected start of expression')
+
+
+class StreamingPrattParser(StreamingParser, PrattParser):
+    """
+    StreamingParser with the expressions parsed by the PrattParser
+    """
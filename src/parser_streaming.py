@@ -0,0 +1,79 @@
+from itertools import chain
+from src.error_handler import ErrorHandler
+from src.parser import Parser
+from src.parser_constants import IGNORED_TOKENS, BLOCK_OPENING_TOKENS, BLOCK_CLOSING_TOKENS
+
+
+class StreamingParser(Parser):
+    """
+    Parser pulling the tokens on demand from an iterable (e.g. Lexer.scan_iter generator).
+    Only the current and the previous token are kept, ignored tokens are skipped as they arrive.
+    Statements are produced one at a time by parse_iter()
+    """
+    def upload_tokens(self, tokens):
+        self.token_iterator = iter(tokens or ())
+        self.previous_token = None
+        self.current_token = self._pull_token()
+        self.index = 0
+        self.error_handler = ErrorHandler()
+        self.statements = []
+
+    def parse(self, tokens=None):
+        if tokens:
+            self.upload_tokens(tokens)
+
+        self.statements = list(self.parse_iter())
+        return self.statements
+
+    def parse_iter(self):
+        """
+        Generator yielding top-level statements as soon as they are parsed
+        (None is yielded for a statement which could not be parsed)
+        """
+        while not self._end_of_code():
+            yield self._parse_top_level_statement()
+
+    def _pull_token(self):
+        for token in self.token_iterator:
+            if not token.token_type.bit & IGNORED_TOKENS:
+                return token
+        return None
+
+    # HELPER METHODS -----------------------------------------------------------------------------------
+
+    def _next_tokens_until_block_end(self):
+        block_tokens = []
+        block_depth = 1
+        while block_depth and not self._end_of_code():
+            token = self._next_token()
+            block_tokens.append(token)
+            token_bit = token.token_type.bit
+            block_depth += bool(token_bit & BLOCK_OPENING_TOKENS) - bool(token_bit & BLOCK_CLOSING_TOKENS)
+        return block_tokens
+
+    def _position(self):
+        return self.previous_token, self.index
+
+    def _rewind(self, position, consumed_tokens):
+        # consumed tokens are pulled again
+        if consumed_tokens:
+            next_tokens = [self.current_token] if self.current_token is not None else []
+            self.token_iterator = chain(consumed_tokens[1:], next_tokens, self.token_iterator)
+            self.current_token = consumed_tokens[0]
+        self.previous_token, self.index = position
+
+    def _peek(self):
+        return self.current_token
+
+    def _peek_prev(self):
+        return self.previous_token
+
+    def _out_of_bounds(self):
+        return self.current_token is None
+
+    def _next_token(self):
+        if not self._end_of_code():
+            self.previous_token = self.current_token
+            self.current_token = self._pull_token()
+            self.index += 1
+        return self.previous_token
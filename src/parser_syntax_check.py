@@ -0,0 +1,328 @@
+"""
+Syntax check of the lazily parsed function bodies (see Parser._pre_parse_block_statement). Tokens of the body are
+matched against the grammar of the Parser in one loop over the tokens, without building any nodes and without
+recursion (nesting is kept on a stack of frames). Precedence of the operators does not matter for the check.
+The check is conservative: every body it accepts is parsed by the Parser without errors. Rare constructs
+(more than 255 parameters or arguments) are rejected, the Parser parses them and reports their errors
+"""
+from src.parser_constants import UNARY_TOKENS, LITERAL_TOKENS, IDENTIFIER_TOKENS, EQUALS_TOKENS, \
+    GROUP_OPENING_TOKENS, GROUP_CLOSING_TOKENS, BLOCK_OPENING_TOKENS, BLOCK_CLOSING_TOKENS, DELIMITER_TOKENS, \
+    STATEMENT_END_TOKENS, INCLUDE_PATH_TOKENS, BINARY_PRECEDENCE_LEVELS
+from src.tokens import TokenType
+
+MAX_PARAMETERS = MAX_ARGUMENTS = 255
+
+OPERAND_TOKENS = LITERAL_TOKENS | IDENTIFIER_TOKENS
+
+BINARY_OPERATOR_TOKENS = 0
+for level_mask in BINARY_PRECEDENCE_LEVELS:
+    BINARY_OPERATOR_TOKENS |= level_mask
+
+# frames of the stack - what follows when the innermost construct ends: statements of a block, the else branch
+# of an if statement, the rest of an if, while or for statement after its branch or body, the condition
+# of a for loop after its initializer, the terminator of a statement, the closing paren of a condition or a group,
+# the next argument of a call. Assignment ends with the expression it is the value of
+BLOCK, IF_THEN, BRANCH, FOR_INITIALIZER, STATEMENT_END, IF_CONDITION, WHILE_CONDITION, FOR_CONDITION, \
+    FOR_INCREMENT, GROUP, CALL, ASSIGNMENT = range(12)
+
+
+def is_valid_block(tokens):
+    """
+    Return True if the tokens are statements of a block followed by its closing curly brace (the tokens
+    of a lazily parsed function body) which the Parser parses without errors
+    """
+    return BlockSyntaxChecker(tokens).check()
+
+
+class BlockSyntaxChecker:
+    """
+    Checker of the tokens of one block. Its states are methods returning the next state (None when the check
+    is over), self.index is the next token to check
+    """
+    def __init__(self, tokens):
+        self.token_count = len(tokens)
+        # bits of the token types (see token_mask), the trailing zeros match no token class
+        self.bits = [token.token_type.bit for token in tokens] + [0, 0]
+        self.index = 0
+        self.frames = [BLOCK]
+        self.argument_counts = []
+        # True when the expression being checked is one identifier so far (it can be assigned to)
+        self.assignable = False
+        self.block_required = False
+        self.valid = False
+
+    def check(self):
+        state = self._statement
+        while state is not None:
+            state = state()
+        return self.valid
+
+    def _reject(self):
+        self.valid = False
+        return None
+
+    # STATEMENTS ----------------------------------------------------------------------------------------
+
+    def _statement(self):
+        bit = self.bits[self.index]
+        if self.block_required:
+            self.block_required = False
+            if not bit & BLOCK_OPENING_TOKENS:
+                return self._reject()
+        if bit & BLOCK_CLOSING_TOKENS:
+            return self._block_end()
+        if bit & BLOCK_OPENING_TOKENS:
+            self.index += 1
+            self.frames.append(BLOCK)
+            return self._statement
+        keyword_statement = KEYWORD_STATEMENTS.get(bit)
+        if keyword_statement is not None:
+            return keyword_statement(self)
+        return self._expression_statement()
+
+    def _block_end(self):
+        if self.frames[-1] != BLOCK:
+            return self._reject()
+        self.index += 1
+        self.frames.pop()
+        if not self.frames:
+            self.valid = self.index == self.token_count
+            return None
+        return self._statement_end
+
+    def _statement_end(self):
+        """
+        Statement was checked, continue with the construct it belongs to
+        """
+        frame = self.frames[-1]
+        if frame == BLOCK:
+            return self._statement
+        self.frames.pop()
+        if frame == IF_THEN and self.bits[self.index] & TokenType.ELSE.bit:
+            self.index += 1
+            self.frames.append(BRANCH)
+            return self._statement
+        if frame == FOR_INITIALIZER:
+            return self._for_condition
+        return self._statement_end
+
+    def _expression_statement(self):
+        self.frames.append(STATEMENT_END)
+        return self._expression()
+
+    def _function_statement(self):
+        bits, index = self.bits, self.index + 1
+        if not bits[index] & IDENTIFIER_TOKENS or not bits[index + 1] & GROUP_OPENING_TOKENS:
+            return self._reject()
+        index += 2
+        if bits[index] & IDENTIFIER_TOKENS:
+            parameters = 1
+            index += 1
+            while bits[index] & DELIMITER_TOKENS and bits[index + 1] & IDENTIFIER_TOKENS:
+                parameters += 1
+                index += 2
+            if parameters > MAX_PARAMETERS:
+                return self._reject()
+        if not bits[index] & GROUP_CLOSING_TOKENS or not bits[index + 1] & BLOCK_OPENING_TOKENS:
+            return self._reject()
+        self.index = index + 2
+        self.frames.append(BLOCK)
+        return self._statement
+
+    def _var_statement(self):
+        bits, index = self.bits, self.index + 1
+        if not bits[index] & IDENTIFIER_TOKENS:
+            return self._reject()
+        self.index = index + 2
+        if bits[index + 1] & STATEMENT_END_TOKENS:
+            return self._statement_end
+        if bits[index + 1] & EQUALS_TOKENS:
+            self.frames.append(STATEMENT_END)
+            return self._expression()
+        return self._reject()
+
+    def _include_statement(self):
+        bits, index = self.bits, self.index + 1
+        if not bits[index] & INCLUDE_PATH_TOKENS or not bits[index + 1] & STATEMENT_END_TOKENS:
+            return self._reject()
+        self.index = index + 2
+        return self._statement_end
+
+    def _if_statement(self):
+        return self._condition(IF_CONDITION)
+
+    def _while_statement(self):
+        return self._condition(WHILE_CONDITION)
+
+    def _condition(self, frame):
+        if not self.bits[self.index + 1] & GROUP_OPENING_TOKENS:
+            return self._reject()
+        self.index += 2
+        self.frames.append(frame)
+        return self._expression()
+
+    def _for_statement(self):
+        bits, index = self.bits, self.index + 1
+        if not bits[index] & GROUP_OPENING_TOKENS:
+            return self._reject()
+        self.index = index + 1
+        if bits[index + 1] & STATEMENT_END_TOKENS:
+            self.index += 1
+            return self._for_condition
+        self.frames.append(FOR_INITIALIZER)
+        if bits[index + 1] & TokenType.VAR.bit:
+            return self._var_statement
+        return self._expression_statement
+
+    def _for_condition(self):
+        if self.bits[self.index] & STATEMENT_END_TOKENS:
+            self.index += 1
+            return self._for_increment
+        self.frames.append(FOR_CONDITION)
+        return self._expression()
+
+    def _for_increment(self):
+        # the Parser requires the increment
+        self.frames.append(FOR_INCREMENT)
+        return self._expression()
+
+    def _print_statement(self):
+        self.index += 1
+        return self._expression_statement()
+
+    def _return_statement(self):
+        self.index += 1
+        if self.bits[self.index] & STATEMENT_END_TOKENS:
+            self.index += 1
+            return self._statement_end
+        return self._expression_statement()
+
+    # EXPRESSIONS ---------------------------------------------------------------------------------------
+
+    def _expression(self):
+        """
+        Start of an expression (a statement's, a group's, an argument, a value of an assignment)
+        """
+        self.assignable = True
+        return self._operand
+
+    def _operand(self):
+        """
+        Operands (with their unary operators) and the binary operators between them, up to a group,
+        a call, an assignment or the end of the expression
+        """
+        bits, index, assignable = self.bits, self.index, self.assignable
+        while True:
+            bit = bits[index]
+            while bit & UNARY_TOKENS:
+                assignable = False
+                index += 1
+                bit = bits[index]
+            if not bit & OPERAND_TOKENS:
+                self.index = index
+                if bit & GROUP_OPENING_TOKENS:
+                    self.index += 1
+                    self.frames.append(GROUP)
+                    return self._expression()
+                return self._reject()
+            if bit & LITERAL_TOKENS:
+                assignable = False
+            index += 1
+            if not bits[index] & BINARY_OPERATOR_TOKENS:
+                self.index, self.assignable = index, assignable
+                return self._operator
+            assignable = False
+            index += 1
+
+    def _operator(self):
+        """
+        After an operand: a binary operator, a call, an assignment or the end of the expression
+        """
+        bit = self.bits[self.index]
+        if bit & BINARY_OPERATOR_TOKENS:
+            self.index += 1
+            self.assignable = False
+            return self._operand
+        if bit & GROUP_OPENING_TOKENS:
+            return self._call()
+        if bit & EQUALS_TOKENS:
+            if not self.assignable:
+                return self._reject()
+            self.index += 1
+            self.frames.append(ASSIGNMENT)
+            return self._expression()
+        return self._expression_end()
+
+    def _call(self):
+        self.index += 1
+        self.assignable = False
+        if self.bits[self.index] & GROUP_CLOSING_TOKENS:
+            self.index += 1
+            return self._operator
+        self.argument_counts.append(1)
+        self.frames.append(CALL)
+        return self._expression()
+
+    def _expression_end(self):
+        """
+        Expression was checked, the next token has to close the construct it belongs to
+        """
+        frame = self.frames.pop()
+        while frame == ASSIGNMENT:
+            frame = self.frames.pop()
+        expected_tokens, continuation = EXPRESSION_ENDS[frame]
+        if not self.bits[self.index] & expected_tokens:
+            return self._reject()
+        self.index += 1
+        return continuation(self)
+
+    def _group_end(self):
+        self.assignable = False
+        return self._operator
+
+    def _argument_end(self):
+        if self.bits[self.index - 1] & GROUP_CLOSING_TOKENS:
+            self.argument_counts.pop()
+            return self._group_end()
+        self.argument_counts[-1] += 1
+        if self.argument_counts[-1] > MAX_ARGUMENTS:
+            return self._reject()
+        self.frames.append(CALL)
+        return self._expression()
+
+    def _if_body(self):
+        self.frames.append(IF_THEN)
+        return self._statement
+
+    def _loop_body(self):
+        self.frames.append(BRANCH)
+        return self._statement
+
+    def _for_body(self):
+        # the increment is appended to the statements of the body
+        self.block_required = True
+        return self._loop_body()
+
+
+# statement checks by the bit of their first token
+KEYWORD_STATEMENTS = {
+    TokenType.FUNCTION.bit: BlockSyntaxChecker._function_statement,
+    TokenType.VAR.bit: BlockSyntaxChecker._var_statement,
+    TokenType.INCLUDE.bit: BlockSyntaxChecker._include_statement,
+    TokenType.IF.bit: BlockSyntaxChecker._if_statement,
+    TokenType.WHILE.bit: BlockSyntaxChecker._while_statement,
+    TokenType.FOR.bit: BlockSyntaxChecker._for_statement,
+    TokenType.PRINT.bit: BlockSyntaxChecker._print_statement,
+    TokenType.RETURN.bit: BlockSyntaxChecker._return_statement,
+}
+
+# frame -> (tokens which can follow the expression ending in it, check of what comes after them)
+EXPRESSION_ENDS = {
+    STATEMENT_END: (STATEMENT_END_TOKENS, BlockSyntaxChecker._statement_end),
+    IF_CONDITION: (GROUP_CLOSING_TOKENS, BlockSyntaxChecker._if_body),
+    WHILE_CONDITION: (GROUP_CLOSING_TOKENS, BlockSyntaxChecker._loop_body),
+    FOR_CONDITION: (STATEMENT_END_TOKENS, BlockSyntaxChecker._for_increment),
+    FOR_INCREMENT: (GROUP_CLOSING_TOKENS, BlockSyntaxChecker._for_body),
+    GROUP: (GROUP_CLOSING_TOKENS, BlockSyntaxChecker._group_end),
+    CALL: (GROUP_CLOSING_TOKENS | DELIMITER_TOKENS, BlockSyntaxChecker._argument_end),
+}
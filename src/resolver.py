@@ -0,0 +1,263 @@
+import os
+from src.ast_intern import relocate_error
+from src.ast_node_statement import LazyBlockStatement
+from src.ast_walker import walk_preorder
+from src.error_handler import ErrorHandler, ResolveError
+from src.module_cache import ModuleCache, resolve_module_path
+
+# Bindings of the variables (Variable and Assign nodes) are (depth, slot) of a local variable - number of the
+# environments between the reference and the declaring one and index of the variable in the declaring environment -
+# or GLOBAL (looked up by name in the global table). Declarations (VarStatement and FunctionStatement) are bound
+# to their slot, or GLOBAL at the top level. Nodes not resolved yet have binding None, DYNAMIC marks a shared
+# expression (see ExpressionInternTable) resolved differently at its occurrences. Both are looked up by name
+GLOBAL = 'global'
+DYNAMIC = 'dynamic'
+
+
+class Scope:
+    """
+    Local variables of one scope (block or function call) - their names mapped to their slots.
+    Slots are assigned in the order of the declarations, so the variables declared before some point are
+    the ones with slots under the number of slots at that point. Closures see the variables declared
+    before the function (they are copies of the environment at the function declaration), visible_slots
+    limits the scope to them
+    """
+    def __init__(self, names=None, visible_slots=None):
+        self.slots = {name: slot for slot, name in enumerate(names or [])}
+        self.slot_count = len(self.slots)
+        self.visible_slots = visible_slots
+
+    def declare(self, name):
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = self.slots[name] = self.slot_count
+            self.slot_count += 1
+        return slot
+
+    def lookup(self, name):
+        slot = self.slots.get(name)
+        if slot is None or (self.visible_slots is not None and slot >= self.visible_slots):
+            return None
+        return slot
+
+    def closure_view(self):
+        """
+        Return the scope as seen by a function declared at this point
+        """
+        view = Scope()
+        view.slots = self.slots
+        view.slot_count = self.slot_count
+        view.visible_slots = self.slot_count if self.visible_slots is None else self.visible_slots
+        return view
+
+
+class Resolver:
+    """
+    Static pass between the Parser and the Interpreter: binds every variable reference to its declaration
+    (see GLOBAL) and reports undefined variables before the code is executed. Statements are resolved
+    in the order of execution, so they can come one by one (e.g. from StreamingParser) - the global scope
+    is kept between the calls of resolve. Included modules are resolved (once) where they are included.
+    Lazily parsed function bodies are resolved when they are parsed, in the scopes seen by the function
+    """
+    def __init__(self, modules=None, directory='', included_modules=None):
+        self.modules = modules if modules is not None else ModuleCache()
+        self.directory = directory
+        self.included_modules = set(included_modules or [])
+        self.error_handler = ErrorHandler()
+        self.global_scope = self.program_global_scope = Scope()
+        # False once a module with errors is included - its globals are unknown, undefined globals are
+        # reported by the Interpreter then
+        self.globals_known = True
+        self.scopes = []
+        # expression_line of the statement being resolved (shared expressions only, see SharedToken)
+        self.expression_line = None
+
+    def resolve(self, statements):
+        """
+        Resolve the top-level statements, errors are collected in the error_handler
+        """
+        for statement in statements:
+            self.resolve_statement(statement)
+
+    def resolve_statement(self, statement):
+        if statement is None:
+            return
+        old_expression_line = self.expression_line
+        try:
+            self.expression_line = getattr(statement, 'expression_line', None)
+            statement.accept(self)
+        finally:
+            self.expression_line = old_expression_line
+
+    def resolve_expression(self, expression):
+        # expressions do not declare anything, their nodes are resolved in any order (without recursion)
+        for node in walk_preorder(expression):
+            node.accept(self)
+
+    def resolve_block(self, statements, scope):
+        old_scopes = self.scopes
+        try:
+            self.scopes = old_scopes + [scope]
+            for statement in statements:
+                self.resolve_statement(statement)
+        finally:
+            self.scopes = old_scopes
+
+    def _declare(self, declaration, name):
+        if self.scopes:
+            declaration.binding = self.scopes[-1].declare(name)
+        else:
+            self.global_scope.declare(name)
+            declaration.binding = GLOBAL
+
+    def _bind(self, node, name_token):
+        binding = self._lookup(name_token)
+        if node.binding is None:
+            node.binding = binding
+        elif node.binding != binding:
+            node.binding = DYNAMIC
+
+    def _lookup(self, name_token):
+        name = name_token.lexeme
+        for depth, scope in enumerate(reversed(self.scopes)):
+            slot = scope.lookup(name)
+            if slot is not None:
+                return depth, slot
+        if self.global_scope.lookup(name) is None and self.globals_known:
+            self.error_handler.add_error(relocate_error(
+                ResolveError(name_token, 'Undefined variable {}.'.format(name)), self.expression_line))
+        return GLOBAL
+
+    # VISITOR INTERFACE FOR STATEMENTS ----------------------------------------------
+
+    def visit_var_statement(self, var_statement):
+        if var_statement.initializer is not None:
+            self.resolve_expression(var_statement.initializer)
+        self._declare(var_statement, var_statement.name.lexeme)
+
+    def visit_expression_statement(self, expression_statement):
+        self.resolve_expression(expression_statement.expression)
+
+    def visit_print_statement(self, print_statement):
+        self.resolve_expression(print_statement.expression)
+
+    def visit_block_statement(self, block_statement):
+        self.resolve_block(block_statement.statements, Scope())
+
+    def visit_if_statement(self, if_statement):
+        self.resolve_expression(if_statement.condition)
+        self.resolve_statement(if_statement.then_branch)
+        self.resolve_statement(if_statement.else_branch)
+
+    def visit_while_statement(self, while_statement):
+        self.resolve_expression(while_statement.condition)
+        self.resolve_statement(while_statement.body)
+
+    def visit_function_statement(self, function_statement):
+        # the closure is a copy of the environment before the function is defined (it does not see itself)
+        closure_scopes = [scope.closure_view() for scope in self.scopes]
+        closure_globals = self.global_scope.closure_view()
+        parameters = [parameter.lexeme for parameter in function_statement.parameters]
+        body = function_statement.body
+        if isinstance(body, LazyBlockStatement):
+            body.resolve_block = LazyBodyResolution(self, closure_scopes, closure_globals, parameters)
+            if body.parsed_statements is not None:
+                body.resolve_block(body.parsed_statements)
+        else:
+            self._resolve_function_body(body.statements, closure_scopes, closure_globals, parameters)
+        self._declare(function_statement, function_statement.name.lexeme)
+
+    def _resolve_function_body(self, statements, closure_scopes, closure_globals, parameters):
+        # parameters and the top-level declarations of the body share one environment (see Function.call)
+        old_scopes, old_global_scope = self.scopes, self.global_scope
+        try:
+            self.scopes, self.global_scope = closure_scopes, closure_globals
+            self.resolve_block(statements, Scope(parameters))
+        finally:
+            self.scopes, self.global_scope = old_scopes, old_global_scope
+
+    def visit_return_statement(self, return_statement):
+        if return_statement.value is not None:
+            self.resolve_expression(return_statement.value)
+
+    def visit_include_statement(self, include_statement):
+        path = resolve_module_path(include_statement.path.literal, self.directory)
+        if path in self.included_modules:
+            return
+        self.included_modules.add(path)
+
+        module = self.modules.get(path)
+        if module.errors:
+            # the Interpreter reports the errors of the module when it gets to the include
+            self.globals_known = False
+            return
+
+        # definitions of the module are global, as if its code was at the top level of the program
+        old_state = self.directory, self.scopes, self.global_scope
+        try:
+            self.directory, self.scopes, self.global_scope = os.path.dirname(path), [], self.program_global_scope
+            self.resolve(module.statements)
+        finally:
+            self.directory, self.scopes, self.global_scope = old_state
+
+    def visit_class_statement(self, class_statement):
+        pass
+
+    # VISITOR INTERFACE FOR EXPRESSIONS ---------------------------------------------
+    # only the variables are resolved, resolve_expression walks the other nodes
+
+    def visit_binary_expression(self, binary_expression):
+        pass
+
+    def visit_group_expression(self, group_expression):
+        pass
+
+    def visit_literal_expression(self, literal_expression):
+        pass
+
+    def visit_unary_expression(self, unary_expression):
+        pass
+
+    def visit_assign_expression(self, assign_expression):
+        self._bind(assign_expression, assign_expression.name)
+
+    def visit_variable_expression(self, variable_expression):
+        self._bind(variable_expression, variable_expression.name)
+
+    def visit_call_expression(self, call_expression):
+        pass
+
+    def visit_get_expression(self, get_expression):
+        pass
+
+    def visit_this_expression(self, this_expression):
+        pass
+
+    def visit_set_expression(self, set_expression):
+        pass
+
+    def visit_super_expression(self, super_expression):
+        pass
+
+
+class LazyBodyResolution:
+    """
+    Resolution of a lazily parsed function body, run by the LazyBlockStatement when the body is parsed
+    """
+    def __init__(self, resolver, closure_scopes, closure_globals, parameters):
+        self.resolver = resolver
+        self.closure_scopes = closure_scopes
+        self.closure_globals = closure_globals
+        self.parameters = parameters
+
+    def __call__(self, statements):
+        """
+        Resolve the parsed statements of the body, the first error is raised (as ParseErrors of the body are)
+        """
+        errors = self.resolver.error_handler.errors
+        error_count = len(errors)
+        self.resolver._resolve_function_body(statements, self.closure_scopes, self.closure_globals, self.parameters)
+        if len(errors) > error_count:
+            body_errors = errors[error_count:]
+            del errors[error_count:]
+            raise body_errors[0]
@@ -0,0 +1,287 @@
+"""
+Adaptive specializing Interpreter (quickening): operator, variable and call sites keep an inline cache on their node.
+At the first evaluation the site is specialised for what it sees - an operator for the data types of its operands
+(e.g. INT + INT is one addition of the values), a variable for its binding and a call for its callee. A cheap guard
+checks the guess on every evaluation, the site falls back to the generic path of the Interpreter and specialises
+itself again when the guess is wrong. Sites which miss too often (megamorphic) stay generic
+"""
+from operator import add, eq, ge, gt, le, lt, mod, mul, ne, sub
+from src.constants import AppType
+from src.error_handler import InterpretError
+from src.interpreter import Interpreter
+from src.interpreter_runtime import RuntimeDataType, RuntimeOperators, RuntimeValue, BINARY_OPERATORS, UNARY_OPERATORS
+from src.interpreter_runtime import UNDEFINED, int_value, bool_value
+from src.logger import Logger as log
+from src.resolver import GLOBAL, DYNAMIC
+from src.tokens import TokenType
+
+# kinds of the sites (indices of the hit and miss counters)
+BINARY, UNARY, VARIABLE, CALL = range(4)
+SITE_NAMES = ('binary', 'unary', 'variable', 'call')
+
+# a site is specialised again only this many times, then it stays generic
+MAX_SPECIALIZATIONS = 4
+
+INT, FLOAT, STRING, BOOL = RuntimeDataType.INT, RuntimeDataType.FLOAT, RuntimeDataType.STRING, RuntimeDataType.BOOL
+
+# logical operators short-circuit, they are evaluated by the Interpreter
+LOGICAL_OPERATORS = (TokenType.AND, TokenType.OR)
+
+# target of a cache which is not specialised (None is a binding)
+NO_TARGET = object()
+
+
+class InlineCache:
+    """
+    Inline cache of one site: the specialised operation and the guard it was specialised for - data types
+    of the operands, binding of the variable or the callee
+    """
+    __slots__ = ('left_type', 'right_type', 'target', 'operation', 'specializations')
+
+    def __init__(self, operation=None):
+        self.left_type = None
+        self.right_type = None
+        self.target = NO_TARGET
+        self.operation = operation
+        self.specializations = 0
+
+
+# SPECIALISED OPERATIONS --------------------------------------------------------------------------------
+# they return the same values as the RuntimeOperators for the data types they are specialised for
+
+def _int_operation(function):
+    def int_operation(left, operator, right):
+        return int_value(function(left.value, right.value))
+    return int_operation
+
+
+def _float_operation(function):
+    def float_operation(left, operator, right):
+        return RuntimeValue(function(left.value, right.value), FLOAT)
+    return float_operation
+
+
+def _comparison(function):
+    def comparison(left, operator, right):
+        return bool_value(function(left.value, right.value))
+    return comparison
+
+
+def _int_division(left, operator, right):
+    if right.value:
+        return int_value(left.value // right.value)
+    return RuntimeOperators._binary_div(left, operator, right)
+
+
+def _string_concatenation(left, operator, right):
+    return RuntimeValue(left.value + right.value, STRING)
+
+
+def _int_negation(operator, operand):
+    return int_value(-operand.value)
+
+
+def _float_negation(operator, operand):
+    return RuntimeValue(-operand.value, FLOAT)
+
+
+def _specialized_binary_operations():
+    operations = {}
+    number_pairs = ((INT, INT), (INT, FLOAT), (FLOAT, INT), (FLOAT, FLOAT))
+    for token_type, function in ((TokenType.PLUS, add), (TokenType.MINUS, sub), (TokenType.ASTERISK, mul)):
+        operations[token_type, INT, INT] = _int_operation(function)
+        for left_type, right_type in number_pairs[1:]:
+            operations[token_type, left_type, right_type] = _float_operation(function)
+    operations[TokenType.REMAINDER, INT, INT] = _int_operation(mod)
+    operations[TokenType.DIV, INT, INT] = _int_division
+    operations[TokenType.PLUS, STRING, STRING] = _string_concatenation
+    for token_type, function in ((TokenType.LT, lt), (TokenType.LTE, le), (TokenType.GT, gt), (TokenType.GTE, ge)):
+        for left_type, right_type in number_pairs + ((STRING, STRING),):
+            operations[token_type, left_type, right_type] = _comparison(function)
+    # values of different data types are never equal (see RuntimeValue.is_strictly_equal)
+    for token_type, function in ((TokenType.EQUALITY, eq), (TokenType.INEQUALITY, ne)):
+        for data_type in (INT, FLOAT, STRING, BOOL):
+            operations[token_type, data_type, data_type] = _comparison(function)
+    return operations
+
+
+# (operator token type, data type of the left operand, data type of the right operand) -> operation
+SPECIALIZED_BINARY_OPERATIONS = _specialized_binary_operations()
+
+# (operator token type, data type of the operand) -> operation
+SPECIALIZED_UNARY_OPERATIONS = {
+    (TokenType.MINUS, INT): _int_negation,
+    (TokenType.MINUS, FLOAT): _float_negation,
+}
+
+
+# VARIABLE ACCESSORS ------------------------------------------------------------------------------------
+# return UNDEFINED if the value is not where the binding says (e.g. declaration which was not executed),
+# the Interpreter then looks the variable up
+
+def _global_value(environment, name):
+    return environment.globals.values.get(name, UNDEFINED)
+
+
+def _local_value(environment, slot):
+    values = environment.values
+    return values[slot] if slot < len(values) else UNDEFINED
+
+
+def _enclosing_value(environment, binding):
+    depth, slot = binding
+    for _ in range(depth):
+        environment = environment.enclosing_environment
+    values = environment.values
+    return values[slot] if slot < len(values) else UNDEFINED
+
+
+def _dynamic_value(environment, name):
+    return UNDEFINED
+
+
+class SpecializingInterpreter(Interpreter):
+    """
+    Interpreter whose Binary, Unary, Variable and Call nodes specialise themselves, cache_hits and cache_misses
+    count the evaluations of the sites (indexed by the site kind) whose guard held / failed
+    """
+    def upload_statements(self, statements):
+        super().upload_statements(statements)
+        self.cache_hits = [0] * len(SITE_NAMES)
+        self.cache_misses = [0] * len(SITE_NAMES)
+
+    def interpret(self, statements=None):
+        super().interpret(statements)
+        if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+            for name, (hits, misses) in self.cache_statistics().items():
+                log.info(AppType.INTERPRETER, 'Inline caches of {} sites: {} hits, {} misses', name, hits, misses)
+
+    def cache_statistics(self):
+        """
+        Return site kind name -> (hits, misses) of its inline caches
+        """
+        return {name: (self.cache_hits[kind], self.cache_misses[kind]) for kind, name in enumerate(SITE_NAMES)}
+
+    @staticmethod
+    def _respecialize(cache):
+        """
+        Return True if the cache can be specialised again (it is not megamorphic)
+        """
+        cache.specializations += 1
+        if cache.specializations <= MAX_SPECIALIZATIONS:
+            return True
+        # the guard never holds again
+        cache.left_type = cache.right_type = None
+        cache.target = NO_TARGET
+        return False
+
+    # VISITOR INTERFACE FOR EXPRESSIONS ---------------------------------------------
+
+    def visit_binary_expression(self, binary_expression):
+        operator = binary_expression.operator
+        cache = binary_expression.inline_cache
+        if cache is None:
+            generic_operation = None
+            if operator.token_type not in LOGICAL_OPERATORS:
+                generic_operation = (
+                    BINARY_OPERATORS[operator.token_type.code] or RuntimeOperators.get_runtime_value_for_binary_operator)
+            cache = binary_expression.inline_cache = InlineCache(generic_operation)
+        if cache.operation is None:
+            return (yield from super().visit_binary_expression(binary_expression))
+
+        left = yield binary_expression.left_operand
+        right = yield binary_expression.right_operand
+        if left.data_type is cache.left_type and right.data_type is cache.right_type:
+            self.cache_hits[BINARY] += 1
+            return cache.operation(left, operator, right)
+
+        self.cache_misses[BINARY] += 1
+        generic_operation = (
+            BINARY_OPERATORS[operator.token_type.code] or RuntimeOperators.get_runtime_value_for_binary_operator)
+        cache.operation = generic_operation
+        if self._respecialize(cache):
+            cache.left_type, cache.right_type = left.data_type, right.data_type
+            cache.operation = SPECIALIZED_BINARY_OPERATIONS.get(
+                (operator.token_type, left.data_type, right.data_type), generic_operation)
+        return cache.operation(left, operator, right)
+
+    def visit_unary_expression(self, unary_expression):
+        operator = unary_expression.operator
+        cache = unary_expression.inline_cache
+        if cache is None:
+            cache = unary_expression.inline_cache = InlineCache(
+                UNARY_OPERATORS[operator.token_type.code] or RuntimeOperators.get_runtime_value_for_unary_operator)
+
+        operand = yield unary_expression.operand
+        if operand.data_type is cache.left_type:
+            self.cache_hits[UNARY] += 1
+            return cache.operation(operator, operand)
+
+        self.cache_misses[UNARY] += 1
+        generic_operation = (
+            UNARY_OPERATORS[operator.token_type.code] or RuntimeOperators.get_runtime_value_for_unary_operator)
+        cache.operation = generic_operation
+        if self._respecialize(cache):
+            cache.left_type = operand.data_type
+            cache.operation = SPECIALIZED_UNARY_OPERATIONS.get((operator.token_type, operand.data_type), generic_operation)
+        return cache.operation(operator, operand)
+
+    def visit_variable_expression(self, variable_expression):
+        binding = variable_expression.binding
+        cache = variable_expression.inline_cache
+        if cache is not None and binding is cache.target:
+            value = cache.operation(self.environment, cache.left_type)
+            if value is not UNDEFINED:
+                self.cache_hits[VARIABLE] += 1
+                return value
+        elif cache is None:
+            cache = variable_expression.inline_cache = InlineCache()
+
+        self.cache_misses[VARIABLE] += 1
+        if binding is not cache.target and self._respecialize(cache):
+            # binding of a shared expression can change (see resolver.DYNAMIC)
+            cache.target = binding
+            cache.operation, cache.left_type = self._variable_accessor(variable_expression.name.lexeme, binding)
+        return super().visit_variable_expression(variable_expression)
+
+    @staticmethod
+    def _variable_accessor(name, binding):
+        """
+        Return (accessor of the variable, its argument)
+        """
+        if binding is GLOBAL:
+            return _global_value, name
+        if binding is None or binding is DYNAMIC:
+            return _dynamic_value, name
+        if binding[0] == 0:
+            return _local_value, binding[1]
+        return _enclosing_value, binding
+
+    def visit_call_expression(self, call_expression):
+        cache = call_expression.inline_cache
+        if cache is None:
+            cache = call_expression.inline_cache = InlineCache()
+
+        callee = yield call_expression.callee
+        arguments = []
+        for arg in call_expression.arguments:
+            arguments.append((yield arg))
+
+        if callee is cache.target:
+            # the callee was checked when the site was specialised (the number of arguments of a site is fixed)
+            self.cache_hits[CALL] += 1
+            return callee.call(self, arguments)
+
+        self.cache_misses[CALL] += 1
+        if not callee.is_function():
+            raise InterpretError(callee, "Expected the callee to be callable")
+
+        if len(arguments) != callee.get_arity():
+            raise InterpretError(
+                call_expression.callee,
+                'Expected {} arguments but got {}'.format(callee.get_arity(), len(arguments))
+            )
+
+        if self._respecialize(cache):
+            cache.target = callee
+        return callee.call(self, arguments)
@@ -0,0 +1,169 @@
+from array import array
+from sys import intern
+from src.tokens import TokenOsu, TokenType, token_mask, token_table
+
+# token types indexed by their codes
+TOKEN_TYPES = list(TokenType)
+
+INTERNED_TOKEN_TYPES = token_mask({
+    TokenType.IDENTIFIER,
+})
+
+LITERAL_FROM_LEXEME = token_table({
+    TokenType.INT: int,
+    TokenType.FLOAT: float,
+    TokenType.STRING: lambda lexeme: lexeme[1: -1],
+})
+
+
+class TokenBuffer:
+    """
+    Compact storage of the scanned tokens (struct of arrays over the original source code).
+    For every token only its type code, start / end offsets and line number are stored.
+    Lexemes and literals are derived from the source code on demand and TokenOsu objects
+    are only built when somebody asks for them. They are not cached - the parser keeps the ones the AST needs
+    """
+    def __init__(self, source=''):
+        self.source = source
+        self.types = array('B')
+        self.starts = array('L')
+        self.ends = array('L')
+        self.lines = array('I')
+        # rare exceptions to the "everything derives from the source" rule (ERROR tokens)
+        self.literals = {}
+        self.lexemes = {}
+
+    def __len__(self):
+        return len(self.types)
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield self[index]
+
+    def __getitem__(self, index):
+        """
+        Return new TokenOsu object of the token
+        """
+        if index < 0:
+            index += len(self.types)
+        if not 0 <= index < len(self.types):
+            raise IndexError('token index out of range')
+        token_type = self.token_type_at(index)
+        lexeme = self.lexeme_at(index)
+        return TokenOsu(token_type, lexeme, self._get_literal(index, token_type, lexeme), self.lines[index])
+
+    def add(self, token_type, start, end, line, literal=None):
+        if literal is not None and LITERAL_FROM_LEXEME[token_type.code] is None:
+            self.literals[len(self.types)] = literal
+        self.types.append(token_type.code)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+
+    def extend(self, other):
+        """
+        Append all tokens of the other buffer (offsets have to be relative to the same source code)
+        """
+        offset = len(self.types)
+        self.types.extend(other.types)
+        self.starts.extend(other.starts)
+        self.ends.extend(other.ends)
+        self.lines.extend(other.lines)
+        self.literals.update({offset + index: literal for index, literal in other.literals.items()})
+        self.lexemes.update({offset + index: lexeme for index, lexeme in other.lexemes.items()})
+
+    def to_token_list(self):
+        """
+        Return list of TokenOsu objects for all the tokens
+        """
+        tokens = []
+        for index, code in enumerate(self.types):
+            token_type = TOKEN_TYPES[code]
+            lexeme = self.lexeme_at(index)
+            tokens.append(TokenOsu(token_type, lexeme, self._get_literal(index, token_type, lexeme), self.lines[index]))
+        return tokens
+
+    def extend_lexeme(self, index, text):
+        """
+        Append text to the lexeme of the token (used by the lexer to merge consecutive unexpected characters)
+        """
+        if index < 0:
+            index += len(self.types)
+        self.lexemes[index] = self.lexeme_at(index) + text
+
+    def token_type_at(self, index):
+        return TOKEN_TYPES[self.types[index]]
+
+    def line_at(self, index):
+        return self.lines[index]
+
+    def lexeme_at(self, index):
+        if index < 0:
+            index += len(self.types)
+        if index in self.lexemes:
+            return self.lexemes[index]
+        lexeme = self._get_source_text(self.starts[index], self.ends[index])
+        return intern(lexeme) if (1 << self.types[index]) & INTERNED_TOKEN_TYPES else lexeme
+
+    def _get_source_text(self, start, end):
+        return self.source[start: end]
+
+    def literal_at(self, index):
+        token_type = self.token_type_at(index)
+        lexeme = self.lexeme_at(index) if LITERAL_FROM_LEXEME[token_type.code] else None
+        return self._get_literal(index, token_type, lexeme)
+
+    def _get_literal(self, index, token_type, lexeme):
+        literal_from_lexeme = LITERAL_FROM_LEXEME[token_type.code]
+        if literal_from_lexeme:
+            return literal_from_lexeme(lexeme)
+        return self.literals.get(index)
+
+    def indices_of_types(self, token_types):
+        """
+        Return indices of the tokens of given types (token_types is a mask, see token_mask)
+        """
+        return array('L', (index for index, code in enumerate(self.types) if (1 << code) & token_types))
+
+    def tokens_of_types(self, token_types):
+        return [self[index] for index in self.indices_of_types(token_types)]
+
+    def without_types(self, token_types):
+        """
+        Return sequence of the tokens with all tokens of given types (mask) left out (tokens are not materialized)
+        """
+        indices = array('L', (index for index, code in enumerate(self.types) if not (1 << code) & token_types))
+        return TokenBufferView(self, indices)
+
+
+# number of the last materialized tokens kept by the TokenBufferView
+RECENT_TOKENS = 4
+
+
+class TokenBufferView:
+    """
+    Read-only sequence of selected tokens from the TokenBuffer. The parser looks at the current and the previous
+    token many times, so the few last materialized tokens are kept (and the same object is returned for them)
+    """
+    def __init__(self, buffer, indices):
+        self.buffer = buffer
+        self.indices = indices
+        self.recent_tokens = {}
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __iter__(self):
+        for index in self.indices:
+            yield self.buffer[index]
+
+    def __getitem__(self, index):
+        recent_tokens = self.recent_tokens
+        token = recent_tokens.get(index)
+        if token is None:
+            token = self.buffer[self.indices[index]]
+            if len(recent_tokens) >= RECENT_TOKENS:
+                # the oldest one
+                del recent_tokens[next(iter(recent_tokens))]
+            recent_tokens[index] = token
+        return token
@@ -113,3 +113,36 @@ class TokenType(Enum):
     EOF = 'EOF'
     ERROR = 'ERROR'
     COMMENT = '//'          # double with DIV
+
+
+def _assign_token_type_codes():
+    """
+    Give every token type a dense integer code (in the order of definition) and a single bit,
+    so that sets of token types can be stored as integer masks and tables indexed by the codes
+    """
+    for code, token_type in enumerate(TokenType):
+        token_type.code = code
+        token_type.bit = 1 << code
+
+
+_assign_token_type_codes()
+
+
+def token_mask(token_types):
+    """
+    Return integer mask of the token types. Membership test: token_type.bit & mask
+    """
+    mask = 0
+    for token_type in token_types:
+        mask |= token_type.bit
+    return mask
+
+
+def token_table(values_by_token_type, default=None):
+    """
+    Return list indexed by the token type codes (token types missing in the mapping get the default value)
+    """
+    table = [default] * len(TokenType)
+    for token_type, value in values_by_token_type.items():
+        table[token_type.code] = value
+    return table
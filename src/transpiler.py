@@ -0,0 +1,679 @@
+"""
+Ahead-of-time compiler of the OLC programs to Python source (see Transpiler), compiled by Python's compile() to a code
+object and executed natively. Compiled programs are cached on disk by the hash of the source (see ProgramCache)
+"""
+import hashlib
+import marshal
+import math
+import os
+from src.ast_cache import AstCache
+from src.ast_intern import absolute_token
+from src.ast_node_statement import LazyBlockStatement
+from src.constants import AppType
+from src.error_handler import ErrorHandler, InterpretError, ResolveError
+from src.interpreter import Interpreter
+from src.logger import Logger as log
+from src.module_cache import ModuleCache, resolve_module_path
+from src.resolver import Resolver
+from src.tokens import TokenType
+from src.transpiler_runtime import RUNTIME_NAMES
+
+# has to be changed whenever the generated code changes (cached programs of older versions are not used)
+TRANSPILER_VERSION = '1'
+
+# kinds of the compiled operands - the code of a constant or of a temporary variable is not affected by the code
+# evaluated after it, the code of a variable or of an expression is (see Transpiler.compile_operands)
+CONSTANT, TEMPORARY, NAME, EXPRESSION = range(4)
+
+# binary operator -> (runtime helper, Python operator of INT operands, the result is BOOL, helper takes the line)
+BINARY_OPERATORS = {
+    TokenType.PLUS: ('_plus', '+', False, True),
+    TokenType.MINUS: ('_minus', '-', False, True),
+    TokenType.ASTERISK: ('_multiply', '*', False, True),
+    TokenType.DIV: ('_divide', None, False, True),
+    TokenType.EXPONENT: ('_power', None, False, True),
+    TokenType.REMAINDER: ('_remainder', '%', False, True),
+    TokenType.LT: ('_less', '<', True, True),
+    TokenType.LTE: ('_less_equal', '<=', True, True),
+    TokenType.GT: ('_greater', '>', True, True),
+    TokenType.GTE: ('_greater_equal', '>=', True, True),
+    TokenType.EQUALITY: ('_equal', '==', True, False),
+    TokenType.INEQUALITY: ('_not_equal', '!=', True, False),
+    TokenType.XOR: ('_xor', None, True, False),
+}
+
+UNARY_OPERATORS = {
+    TokenType.MINUS: '_negative',
+    TokenType.NOT: '_not',
+}
+
+
+class Unsupported(Exception):
+    """
+    Raised by the Transpiler for a program it does not compile (such programs are run by the Interpreter)
+    """
+
+
+class Operand:
+    """
+    Compiled expression - Python code of its value, its kind (CONSTANT, TEMPORARY, NAME or EXPRESSION)
+    and whether the value is a bool
+    """
+    __slots__ = ('code', 'kind', 'boolean', 'value')
+
+    def __init__(self, code, kind=EXPRESSION, boolean=False, value=None):
+        self.code = code
+        self.kind = kind
+        self.boolean = boolean
+        self.value = value
+
+
+class CompiledVariable:
+    """
+    OLC variable of the compiled program - its unique Python name and the function declaring it. Variable is
+    maybe declared if its first declaration is not executed every time its scope is (e.g. var statement
+    in a branch of an if statement), then it holds UNDEFINED until the declaration is executed
+    """
+    __slots__ = ('python_name', 'function', 'index', 'maybe_declared')
+
+    def __init__(self, python_name, function, index, maybe_declared):
+        self.python_name = python_name
+        self.function = function
+        self.index = index
+        self.maybe_declared = maybe_declared
+
+
+class CompiledScope:
+    """
+    Variables of one OLC scope (see resolver.Scope, visible limits a closure to the variables declared
+    before the function)
+    """
+    def __init__(self, identifier, function, visible=None):
+        self.identifier = identifier
+        self.function = function
+        self.variables = {}
+        self.visible = visible
+
+    def declare(self, name, maybe_declared):
+        variable = self.variables.get(name)
+        if variable is None:
+            # OLC identifiers have no digits, '__<scope>' suffix makes the name unique and different from the helpers
+            variable = self.variables[name] = CompiledVariable(
+                '{}__{}'.format(name, self.identifier), self.function, len(self.variables), maybe_declared)
+        return variable
+
+    def lookup(self, name):
+        variable = self.variables.get(name)
+        if variable is None or (self.visible is not None and variable.index >= self.visible):
+            return None
+        return variable
+
+    def closure_view(self):
+        view = CompiledScope(self.identifier, self.function, len(self.variables) if self.visible is None else self.visible)
+        view.variables = self.variables
+        return view
+
+
+class CompiledFunction:
+    """
+    OLC function being compiled - the variables of the enclosing functions it uses (python name -> variable)
+    and the ones of them it assigns
+    """
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.captured = {}
+        self.assigned = set()
+
+
+class TranspiledProgram:
+    """
+    Code object of the compiled program (executing it defines the _program function) and the included modules
+    compiled into it - (path, digest of the file) pairs
+    """
+    def __init__(self, code, dependencies, source=None):
+        self.code = code
+        self.dependencies = dependencies
+        self.source = source
+
+
+def file_digest(path):
+    try:
+        with open(path, 'rb') as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class Transpiler:
+    """
+    Compiler of the resolved statements to Python source. The program becomes the function _program, its global
+    variables are the local variables of the function. OLC blocks do not become Python blocks - every scope gets
+    its own Python names. Closures are copies of the environment (see Function), so an OLC function is created by
+    a factory function getting the current values of the variables the function uses - the function assigns
+    its own copies of them. Expressions are Python expressions; operators call the runtime helpers
+    (see transpiler_runtime) unless both operands are INT. Assignments are statements in Python, expressions
+    containing them are split into statements evaluated in the same order. Included modules are compiled
+    into the program where they are included (only at the top level)
+    """
+    def __init__(self, modules=None, directory='', included_modules=None):
+        self.modules = modules if modules is not None else ModuleCache()
+        self.directory = directory
+        self.included_modules = set(included_modules or [])
+        self.dependencies = []
+        self.lines = []
+        self.indent = 1
+        self.program = CompiledFunction()
+        self.function = self.program
+        self.global_scope = CompiledScope(0, self.program)
+        self.scopes = [self.global_scope]
+        # the statement is a branch of an if or while statement, its declarations are maybe declared
+        self.conditional = False
+        self.expression_line = None
+        self.counter = 0
+
+    def transpile(self, statements):
+        """
+        Return Python source of the program, Unsupported is raised if the program can not be compiled
+        """
+        self._compile_scope_statements(statements, self.global_scope)
+        return 'def _program():\n' + '\n'.join(self.lines or ['    pass']) + '\n'
+
+    def _unique(self, prefix):
+        self.counter += 1
+        return '{}{}'.format(prefix, self.counter)
+
+    def emit(self, line):
+        self.lines.append('    ' * self.indent + line)
+
+    def line_of(self, token):
+        return absolute_token(token, self.expression_line).source_file_line_number
+
+    def _compile_scope_statements(self, statements, scope):
+        """
+        Compile statements of the scope, its maybe declared variables are set to UNDEFINED before them
+        """
+        start = len(self.lines)
+        conditional, self.conditional = self.conditional, False
+        for statement in statements:
+            self.compile_statement(statement)
+        self.conditional = conditional
+        self.lines[start:start] = [
+            '    ' * self.indent + '{} = _UNDEFINED'.format(variable.python_name)
+            for variable in scope.variables.values() if variable.maybe_declared]
+
+    def _compile_nested(self, statement):
+        """
+        Compile branch (or loop body) statement one level deeper
+        """
+        self.indent += 1
+        start = len(self.lines)
+        conditional, self.conditional = self.conditional, True
+        self.compile_statement(statement)
+        self.conditional = conditional
+        if len(self.lines) == start:
+            self.emit('pass')
+        self.indent -= 1
+
+    def _indented(self, start):
+        """
+        Remove the lines emitted since start and return them indented one level deeper
+        """
+        lines = ['    ' + line for line in self.lines[start:]]
+        del self.lines[start:]
+        return lines
+
+    def compile_statement(self, statement):
+        expression_line = getattr(statement, 'expression_line', None)
+        if expression_line is not None:
+            self.expression_line = expression_line
+        statement.accept(self)
+
+    # VARIABLES ---------------------------------------------------------------------
+
+    def _visible_variables(self, name):
+        """
+        Return variables of the name seen from here, from the innermost one to the first one which is surely declared
+        (a maybe declared variable which is UNDEFINED is the variable of the same name from the enclosing scopes)
+        """
+        variables = []
+        for scope in reversed(self.scopes):
+            variable = scope.lookup(name)
+            if variable is not None:
+                variables.append(variable)
+                if not variable.maybe_declared:
+                    break
+        return variables
+
+    def _use(self, variable, assigned=False):
+        function = self.function
+        if variable.function is not function and assigned:
+            function.assigned.add(variable.python_name)
+        while function is not variable.function:
+            function.captured[variable.python_name] = variable
+            function = function.parent
+
+    def _read(self, name_token):
+        name = name_token.lexeme
+        variables = self._visible_variables(name)
+        if len(variables) == 1 and not variables[0].maybe_declared:
+            self._use(variables[0])
+            return Operand(variables[0].python_name, NAME)
+
+        code = '_undefined({!r}, {})'.format(name, self.line_of(name_token))
+        for variable in reversed(variables):
+            self._use(variable)
+            code = '({0} if {0} is not _UNDEFINED else {1})'.format(variable.python_name, code)
+        return Operand(code)
+
+    def _assign(self, variables, value, name_token):
+        if not variables:
+            self.emit('_undefined({!r}, {})'.format(name_token.lexeme, self.line_of(name_token)))
+            return
+
+        variable = variables[0]
+        self._use(variable, assigned=True)
+        if not variable.maybe_declared:
+            self.emit('{} = {}'.format(variable.python_name, value))
+            return
+        self.emit('if {} is not _UNDEFINED:'.format(variable.python_name))
+        self.emit('    {} = {}'.format(variable.python_name, value))
+        self.emit('else:')
+        self.indent += 1
+        self._assign(variables[1:], value, name_token)
+        self.indent -= 1
+
+    def _declare(self, name):
+        variable = self.scopes[-1].declare(name, self.conditional)
+        return variable.python_name
+
+    # VISITOR INTERFACE FOR STATEMENTS ----------------------------------------------
+
+    def visit_var_statement(self, var_statement):
+        value = self.compile_expression(var_statement.initializer).code if var_statement.initializer else 'None'
+        self.emit('{} = {}'.format(self._declare(var_statement.name.lexeme), value))
+
+    def visit_expression_statement(self, expression_statement):
+        operand = self.compile_expression(expression_statement.expression)
+        if operand.kind == EXPRESSION:
+            self.emit(operand.code)
+
+    def visit_print_statement(self, print_statement):
+        operand = self.compile_expression(print_statement.expression)
+        if operand.boolean or operand.kind == CONSTANT:
+            self.emit('print({})'.format(operand.code))
+        else:
+            self.emit('_print({})'.format(operand.code))
+
+    def visit_block_statement(self, block_statement):
+        scope = CompiledScope(self._unique(''), self.function)
+        self.scopes.append(scope)
+        try:
+            self._compile_scope_statements(block_statement.statements, scope)
+        finally:
+            self.scopes.pop()
+
+    def visit_if_statement(self, if_statement):
+        condition = self.compile_expression(if_statement.condition)
+        self.emit('if {}:'.format(self._truth(condition)))
+        self._compile_nested(if_statement.then_branch)
+        if if_statement.else_branch is not None:
+            self.emit('else:')
+            self._compile_nested(if_statement.else_branch)
+
+    def visit_while_statement(self, while_statement):
+        start = len(self.lines)
+        condition = self.compile_expression(while_statement.condition)
+        if len(self.lines) == start:
+            self.emit('while {}:'.format(self._truth(condition)))
+        else:
+            # the condition needs statements, they are evaluated at the start of every iteration
+            lines = self._indented(start)
+            self.emit('while True:')
+            self.lines.extend(lines)
+            self.emit('    if not ({}):'.format(self._truth(condition)))
+            self.emit('        break')
+        self._compile_nested(while_statement.body)
+
+    def visit_function_statement(self, function_statement):
+        body = function_statement.body
+        if isinstance(body, LazyBlockStatement) and body.parsed_statements is None:
+            # parsing the body now would report its errors before the code preceding the first call is executed
+            raise Unsupported('lazily parsed function body')
+
+        # the closure is a copy of the environment before the function is defined (it does not see itself)
+        function = CompiledFunction(self.function)
+        scope = CompiledScope(self._unique(''), function)
+        parameters = [scope.declare(parameter.lexeme, False).python_name for parameter in function_statement.parameters]
+        state = self.lines, self.indent, self.scopes, self.function
+        self.lines, self.indent = [], self.indent + 2
+        self.scopes, self.function = [view.closure_view() for view in self.scopes] + [scope], function
+        try:
+            self._compile_scope_statements(body.statements, scope)
+            body_lines = self.lines
+        finally:
+            self.lines, self.indent, self.scopes, self.function = state
+
+        name = function_statement.name.lexeme
+        factory = self._unique('_make_')
+        captured = list(function.captured)
+        self.emit('def {}(_captured):'.format(factory))
+        if captured:
+            self.emit('    {}, = _captured'.format(', '.join(captured)))
+        # the Python name of the function itself must not hide a helper or a variable
+        self.emit('    def {}__function({}):'.format(name, ', '.join(parameters)))
+        assigned = [python_name for python_name in captured if python_name in function.assigned]
+        if assigned:
+            self.emit('        nonlocal {}'.format(', '.join(assigned)))
+        self.lines.extend(body_lines or ['    ' * (self.indent + 2) + 'pass'])
+        self.emit('    return {}__function'.format(name))
+        for variable in function.captured.values():
+            self._use(variable)
+        self.emit('{} = {}(({}))'.format(
+            self._declare(name), factory, ''.join(python_name + ', ' for python_name in captured)))
+
+    def visit_return_statement(self, return_statement):
+        if self.function is self.program:
+            raise Unsupported('return at the top level')
+        if return_statement.value is None:
+            self.emit('return None')
+            return
+        self.emit('return {}'.format(self.compile_expression(return_statement.value).code))
+
+    def visit_include_statement(self, include_statement):
+        if self.function is not self.program or len(self.scopes) > 1 or self.conditional:
+            raise Unsupported('include which is not at the top level')
+
+        path_token = include_statement.path
+        path = resolve_module_path(path_token.literal, self.directory)
+        if path in self.included_modules:
+            return
+        self.included_modules.add(path)
+        self.dependencies.append((path, file_digest(path)))
+
+        module = self.modules.get(path)
+        if module.errors:
+            self.emit('_include_error({!r}, {}, {!r})'.format(
+                path_token.lexeme, self.line_of(path_token), module.include_error(path_token).message))
+            return
+
+        # definitions of the module are global, as if its code was at the top level of the program
+        directory, self.directory = self.directory, os.path.dirname(path)
+        try:
+            for statement in module.statements:
+                self.compile_statement(statement)
+        finally:
+            self.directory = directory
+
+    def visit_class_statement(self, class_statement):
+        pass
+
+    # EXPRESSIONS -------------------------------------------------------------------
+
+    def compile_expression(self, expression):
+        """
+        Return Operand of the expression, statements evaluating its assignments get emitted
+        """
+        return expression.accept(self)
+
+    def compile_operands(self, expressions):
+        """
+        Return Operands of the expressions evaluated from left to right. If an expression emits statements,
+        the operands before it are stored in temporary variables first (the statements could change them)
+        """
+        operands = []
+        for expression in expressions:
+            start = len(self.lines)
+            operand = self.compile_expression(expression)
+            if len(self.lines) > start:
+                for index, earlier in enumerate(operands):
+                    if earlier.kind in (NAME, EXPRESSION):
+                        operands[index] = self._temporary(earlier, start)
+                        start += 1
+            operands.append(operand)
+        return operands
+
+    def _temporary(self, operand, position=None):
+        temporary = self._unique('_t')
+        line = '    ' * self.indent + '{} = {}'.format(temporary, operand.code)
+        self.lines.insert(len(self.lines) if position is None else position, line)
+        return Operand(temporary, TEMPORARY, operand.boolean)
+
+    @staticmethod
+    def _truth(operand):
+        return operand.code if operand.boolean else '_truthy({})'.format(operand.code)
+
+    def _logical(self, binary_expression, is_and):
+        left = self.compile_expression(binary_expression.left_operand)
+        start = len(self.lines)
+        right = self.compile_expression(binary_expression.right_operand)
+        if len(self.lines) == start:
+            return Operand('({} {} {})'.format(
+                self._truth(left), 'and' if is_and else 'or', self._truth(right)), boolean=True)
+
+        # statements of the right operand are executed only if it gets evaluated
+        lines = self._indented(start)
+        result = self._temporary(Operand(self._truth(left), boolean=True))
+        self.emit('if {}{}:'.format('' if is_and else 'not ', result.code))
+        self.lines.extend(lines)
+        self.emit('    {} = {}'.format(result.code, self._truth(right)))
+        return result
+
+    def visit_binary_expression(self, binary_expression):
+        operator = binary_expression.operator
+        if operator.token_type in (TokenType.AND, TokenType.OR):
+            return self._logical(binary_expression, operator.token_type == TokenType.AND)
+        if operator.token_type not in BINARY_OPERATORS:
+            raise Unsupported('binary operator ' + operator.lexeme)
+
+        left, right = self.compile_operands([binary_expression.left_operand, binary_expression.right_operand])
+        helper, python_operator, boolean, takes_line = BINARY_OPERATORS[operator.token_type]
+        arguments = [left.code, right.code]
+        if takes_line:
+            arguments.append(str(self.line_of(operator)))
+        code = '{}({})'.format(helper, ', '.join(arguments))
+
+        int_checks = [self._int_check(operand) for operand in (left, right)]
+        if python_operator and None not in int_checks:
+            # INT operands are computed inline, the helper is called for the other types
+            int_code = '{} {} {}'.format(left.code, python_operator, right.code)
+            checks = ' and '.join(sorted(set(check for check in int_checks if check), key=int_checks.index))
+            code = '({} if {} else {})'.format(int_code, checks, code) if checks else '({})'.format(int_code)
+        return Operand(code, boolean=boolean)
+
+    @staticmethod
+    def _int_check(operand):
+        """
+        Return condition of the operand being INT ('' if it is an INT constant), None if it can not be checked
+        without evaluating the operand again
+        """
+        if operand.kind == CONSTANT:
+            return '' if operand.value.__class__ is int else None
+        if operand.kind in (NAME, TEMPORARY):
+            return '{}.__class__ is int'.format(operand.code)
+        return None
+
+    def visit_group_expression(self, group_expression):
+        return self.compile_expression(group_expression.expression)
+
+    def visit_literal_expression(self, literal_expression):
+        token = literal_expression.value
+        token_type = token.token_type
+        if token_type == TokenType.INT:
+            value = int(token.lexeme)
+        elif token_type == TokenType.FLOAT:
+            value = float(token.lexeme)
+        elif token_type == TokenType.STRING:
+            value = token.lexeme[1: -1]
+        elif token_type == TokenType.BOOL:
+            value = token.lexeme == 'TRUE'
+        elif token_type == TokenType.NULL:
+            value = None
+        else:
+            raise Unsupported('literal ' + token.lexeme)
+        code = repr(value)
+        if value.__class__ is float and not math.isfinite(value):
+            code = 'float({!r})'.format(code)
+        return Operand(code, CONSTANT, value.__class__ is bool, value)
+
+    def visit_unary_expression(self, unary_expression):
+        operator = unary_expression.operator
+        if operator.token_type not in UNARY_OPERATORS:
+            raise Unsupported('unary operator ' + operator.lexeme)
+        operand = self.compile_expression(unary_expression.operand)
+        return Operand('{}({}, {})'.format(UNARY_OPERATORS[operator.token_type], operand.code, self.line_of(operator)),
+                       boolean=operator.token_type == TokenType.NOT)
+
+    def visit_assign_expression(self, assign_expression):
+        value = self.compile_expression(assign_expression.value)
+        variables = self._visible_variables(assign_expression.name.lexeme)
+        if len(variables) == 1 and not variables[0].maybe_declared:
+            self._assign(variables, value.code, assign_expression.name)
+            return Operand(variables[0].python_name, NAME, value.boolean)
+
+        if value.kind not in (CONSTANT, TEMPORARY):
+            value = self._temporary(value)
+        self._assign(variables, value.code, assign_expression.name)
+        return value
+
+    def visit_variable_expression(self, variable_expression):
+        return self._read(variable_expression.name)
+
+    def visit_call_expression(self, call_expression):
+        callee = call_expression.callee
+        operands = self.compile_operands([callee] + list(call_expression.arguments))
+        # errors point to the name of the called variable (or to the parenthesis)
+        token = getattr(callee, 'name', None) or call_expression.paren
+        where = (self.line_of(token), token.lexeme)
+        return Operand('_call({})'.format(', '.join(
+            [operands[0].code, repr(where)] + [operand.code for operand in operands[1:]])))
+
+    # objects are not implemented yet
+
+    def visit_get_expression(self, get_expression):
+        raise Unsupported('objects')
+
+    def visit_this_expression(self, this_expression):
+        raise Unsupported('objects')
+
+    def visit_set_expression(self, set_expression):
+        raise Unsupported('objects')
+
+    def visit_super_expression(self, super_expression):
+        raise Unsupported('objects')
+
+
+class ProgramCache:
+    """
+    On-disk cache of the compiled programs (see AstCache) - marshalled code object and the dependencies
+    (see TranspiledProgram), keyed by the source code and its directory (included paths are relative to it).
+    Entry is used only if none of the included modules has changed since
+    """
+    def __init__(self, directory=None, max_size=None):
+        kwargs = {} if max_size is None else {'max_size': max_size}
+        self.cache = AstCache(directory, variant='python {}'.format(TRANSPILER_VERSION), **kwargs)
+
+    @staticmethod
+    def _key(source_code, directory):
+        return '{}\0{}'.format(directory, source_code)
+
+    def load(self, source_code, directory):
+        """
+        Return cached TranspiledProgram of the source code, or None
+        """
+        entry = self.cache.load(self._key(source_code, directory))
+        if entry is None:
+            return None
+        try:
+            code, dependencies = entry
+            if any(file_digest(path) != digest for path, digest in dependencies):
+                return None
+            return TranspiledProgram(marshal.loads(code), dependencies)
+        except (ValueError, TypeError, EOFError):
+            return None
+
+    def store(self, source_code, directory, program):
+        return self.cache.store(self._key(source_code, directory), (marshal.dumps(program.code), program.dependencies))
+
+
+class CompiledInterpreter:
+    """
+    Alternative to the Interpreter - statements are resolved, compiled to Python (see Transpiler) and executed
+    natively. Programs the Transpiler does not compile (e.g. with includes inside functions) are run by
+    the Interpreter. Known differences from the Interpreter: INT ** negative INT is FLOAT, !NULL is BOOL and
+    a call of a function which returns nothing is NULL
+    """
+    def __init__(self, statements=None, modules=None, source_file=None):
+        """
+        Included modules are taken from the ModuleCache modules, their paths are relative to the directory
+        of the source_file (current directory if there is no source file)
+        """
+        self.modules = modules if modules is not None else ModuleCache()
+        self.source_file = source_file
+        self.upload_statements(statements)
+
+    def upload_statements(self, statements):
+        self.statements = statements or []
+        self.error_handler = ErrorHandler()
+        self.directory = os.path.dirname(os.path.abspath(self.source_file)) if self.source_file else os.getcwd()
+        self.included_modules = {os.path.abspath(self.source_file)} if self.source_file else set()
+        self.program = None
+
+    def interpret(self, statements=None):
+        """
+        Compile and execute the statements, nothing is executed if they do not resolve. Statements coming
+        from an iterator are compiled all at once
+        """
+        if statements:
+            self.upload_statements(statements)
+        statements = list(self.statements)
+
+        try:
+            self.program = self.compile(statements)
+        except ResolveError as error:
+            self.error_handler.add_error(error)
+            return
+
+        if self.program is None:
+            interpreter = Interpreter(statements, modules=self.modules, source_file=self.source_file)
+            interpreter.interpret()
+            self.error_handler = interpreter.error_handler
+            return
+        self.run(self.program)
+
+    def compile(self, statements):
+        """
+        Return TranspiledProgram of the statements, or None if the Transpiler does not compile them.
+        ResolveError is raised if they do not resolve (the other errors are added to the error_handler)
+        """
+        resolver = Resolver(self.modules, self.directory, self.included_modules)
+        resolver.resolve(statements)
+        errors = resolver.error_handler.errors
+        if errors:
+            for error in errors[:-1]:
+                self.error_handler.add_error(error)
+            raise errors[-1]
+
+        transpiler = Transpiler(self.modules, self.directory, self.included_modules)
+        try:
+            source = transpiler.transpile(statements)
+            code = compile(source, self.source_file or '<program>', 'exec')
+        except (Unsupported, SyntaxError, RecursionError, MemoryError) as error:
+            # e.g. too deeply nested code for the Python compiler
+            if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+                log.info(AppType.INTERPRETER, 'Program is not compiled ({}), running the Interpreter', error)
+            return None
+
+        if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+            log.debug(AppType.INTERPRETER, 'Compiled program:\n{}', source)
+        return TranspiledProgram(code, transpiler.dependencies, source)
+
+    def run(self, program):
+        """
+        Execute the compiled program, InterpretErrors are added to the error_handler
+        """
+        namespace = dict(RUNTIME_NAMES)
+        try:
+            exec(program.code, namespace)
+            namespace['_program']()
+        except InterpretError as error:
+            self.error_handler.add_error(error)
@@ -0,0 +1,205 @@
+"""
+Runtime of the programs compiled to Python (see transpiler.Transpiler). Values are native Python values - INT is int,
+FLOAT float, STRING str, BOOL bool, NULL None and FUNCTION a Python function - and the helpers below implement
+the type rules of the RuntimeOperators on them. Helpers get the line of the operator, so that the errors they raise
+point to the line of the OLC source (the compiled code does not keep the tokens)
+"""
+from types import FunctionType
+from src.error_handler import InterpretError
+from src.tokens import TokenOsu, TokenType
+
+# value of a variable whose declaration has not been executed (e.g. var statement in a branch which was not taken)
+UNDEFINED = object()
+
+NUMBER_TYPES = (int, float)
+
+
+def _error(token_type, line, message='Not implemented for given datatypes'):
+    return InterpretError(token=TokenOsu(token_type, token_type.value, None, line), message=message)
+
+
+def truthy(value):
+    """
+    RuntimeValue.is_truthy of the value - NULL is false, and so are functions (their RuntimeValue.value is None)
+    """
+    return value is not None and value.__class__ is not FunctionType and bool(value)
+
+
+def print_value(value):
+    # print statement prints RuntimeValue.value, which is None for functions
+    print(None if value.__class__ is FunctionType else value)
+
+
+def undefined(name, line):
+    raise InterpretError(
+        token=TokenOsu(TokenType.IDENTIFIER, name, None, line), message='Undefined variable {}.'.format(name))
+
+
+def include_error(lexeme, line, message):
+    raise InterpretError(token=TokenOsu(TokenType.STRING, lexeme, None, line), message=message)
+
+
+def call(function, where, *arguments):
+    """
+    Call the function with the arguments, where is (line, lexeme) of the callee reported by the errors
+    """
+    if function.__class__ is not FunctionType:
+        raise InterpretError(token=TokenOsu(TokenType.IDENTIFIER, where[1], None, where[0]),
+                             message='Expected the callee to be callable')
+    arity = function.__code__.co_argcount
+    if len(arguments) != arity:
+        raise InterpretError(token=TokenOsu(TokenType.IDENTIFIER, where[1], None, where[0]),
+                             message='Expected {} arguments but got {}'.format(arity, len(arguments)))
+    return function(*arguments)
+
+
+# UNARY OPERATORS (see RuntimeOperators._unary_minus and _unary_not) ----------------------------
+
+def negative(operand, line):
+    if operand.__class__ in NUMBER_TYPES:
+        return -operand
+    raise _error(TokenType.MINUS, line, 'Minus operator is only implemented for numbers')
+
+
+def logical_not(operand, line):
+    # RuntimeValue.is_bool is true for NULL only
+    if operand is None:
+        return True
+    raise _error(TokenType.NOT, line, 'Logical NOT is only implemented for booleans')
+
+
+# BINARY OPERATORS (see RuntimeOperators._binary_*) ----------------------------------------------
+# the cases where a RuntimeOperators rule applies the Python operator to None are kept, they raise TypeError
+
+def minus(left, right, line):
+    left_type, right_type = left.__class__, right.__class__
+    if left_type in NUMBER_TYPES and right_type in NUMBER_TYPES:
+        return left - right
+    if left_type is int and right is None:
+        return left - right
+    raise _error(TokenType.MINUS, line)
+
+
+def multiply(left, right, line):
+    left_type, right_type = left.__class__, right.__class__
+    if left is not None and right is None:
+        return left * right
+    if left_type is str and right_type is int:
+        return left * right
+    if left_type in NUMBER_TYPES and right_type in NUMBER_TYPES:
+        return left * right
+    raise _error(TokenType.ASTERISK, line)
+
+
+def divide(left, right, line):
+    left_type, right_type = left.__class__, right.__class__
+    if left_type is int and right_type is int:
+        if not right:
+            raise _error(TokenType.DIV, line, 'Invalid operands for the division')
+        return left // right
+    if left_type in NUMBER_TYPES and right_type in NUMBER_TYPES:
+        try:
+            return left / right
+        except Exception:
+            raise _error(TokenType.DIV, line, 'Invalid operands for the division')
+    raise _error(TokenType.DIV, line)
+
+
+def plus(left, right, line):
+    left_type, right_type = left.__class__, right.__class__
+    if left_type is str and right_type is str:
+        return left + right
+    if left_type in NUMBER_TYPES and right_type in NUMBER_TYPES:
+        return left + right
+    if left_type is int and right is None:
+        return left + right
+    raise _error(TokenType.PLUS, line)
+
+
+def power(left, right, line):
+    if left.__class__ in NUMBER_TYPES and right.__class__ is int:
+        return left ** right
+    raise _error(TokenType.EXPONENT, line)
+
+
+def remainder(left, right, line):
+    if left.__class__ is int and right.__class__ is int:
+        return left % right
+    raise _error(TokenType.REMAINDER, line)
+
+
+def _comparable(left, right):
+    """
+    Strings can only be compared with strings. Numbers and NULL (RuntimeValue.is_bool) among themselves
+    """
+    left_type, right_type = left.__class__, right.__class__
+    if left_type is str:
+        return right_type is str
+    return (left_type in NUMBER_TYPES or left is None) and (right_type in NUMBER_TYPES or right is None)
+
+
+def less(left, right, line):
+    if _comparable(left, right):
+        return left < right
+    raise _error(TokenType.LT, line)
+
+
+def less_equal(left, right, line):
+    if _comparable(left, right):
+        return left <= right
+    raise _error(TokenType.LTE, line)
+
+
+def greater(left, right, line):
+    if _comparable(left, right):
+        return left > right
+    raise _error(TokenType.GT, line)
+
+
+def greater_equal(left, right, line):
+    if _comparable(left, right):
+        return left >= right
+    raise _error(TokenType.GTE, line)
+
+
+def equal(left, right):
+    """
+    RuntimeValue.is_strictly_equal - types and values have to match (values of all functions are None)
+    """
+    if left.__class__ is not right.__class__:
+        return False
+    return left.__class__ is FunctionType or left == right
+
+
+def not_equal(left, right):
+    return not equal(left, right)
+
+
+def logical_xor(left, right):
+    return truthy(left) is not truthy(right)
+
+
+# names of the helpers in the compiled code (they can not clash with the variables, see Transpiler.declare)
+RUNTIME_NAMES = {
+    '_UNDEFINED': UNDEFINED,
+    '_truthy': truthy,
+    '_print': print_value,
+    '_undefined': undefined,
+    '_include_error': include_error,
+    '_call': call,
+    '_negative': negative,
+    '_not': logical_not,
+    '_minus': minus,
+    '_multiply': multiply,
+    '_divide': divide,
+    '_plus': plus,
+    '_power': power,
+    '_remainder': remainder,
+    '_less': less,
+    '_less_equal': less_equal,
+    '_greater': greater,
+    '_greater_equal': greater_equal,
+    '_equal': equal,
+    '_not_equal': not_equal,
+    '_xor': logical_xor,
+}
@@ -0,0 +1,242 @@
+import os
+from src.ast_intern import relocate_error
+from src.bytecode import BytecodeCompiler, OpCode
+from src.constants import AppType
+from src.error_handler import ErrorHandler, InterpretError, ParseError, ResolveError
+from src.interpreter_runtime import Function, Environment, GlobalEnvironment, bool_value
+from src.logger import Logger as log
+from src.module_cache import ModuleCache, resolve_module_path
+from src.resolver import Resolver
+
+
+class CompiledFunction(Function):
+    """
+    Function value of the VirtualMachine - the body is executed from the bytecode of its FunctionPrototype
+    """
+    def __init__(self, prototype, closure):
+        super().__init__(prototype.declaration, closure)
+        self.prototype = prototype
+
+
+class Frame:
+    """
+    Execution of one CodeObject - position in its instructions, operand stack and the current environment.
+    Frame of an included module restores the directory of the including code when it returns
+    """
+    __slots__ = ('code', 'instructions', 'constants', 'pc', 'stack', 'environment', 'globals', 'caller', 'directory')
+
+    def __init__(self, code, environment, caller=None, directory=None):
+        self.code = code
+        self.instructions = code.instructions
+        self.constants = code.constants
+        self.pc = 0
+        self.stack = []
+        self.environment = environment
+        self.globals = environment.globals
+        self.caller = caller
+        self.directory = directory
+
+
+class VirtualMachine:
+    """
+    Alternative to the Interpreter - statements are resolved, compiled to bytecode (see bytecode.OpCode) and executed
+    by a dispatch loop. Calls push a new Frame instead of recursing in Python. Values, environments and operators
+    are the ones of the Interpreter (interpreter_runtime), so the output and the errors are the same
+    """
+    def __init__(self, statements=None, modules=None, source_file=None):
+        """
+        Included modules are taken from the ModuleCache modules, their paths are relative to the directory
+        of the source_file (current directory if there is no source file)
+        """
+        self.modules = modules if modules is not None else ModuleCache()
+        self.source_file = source_file
+        # instruction handlers indexed by the opcodes
+        self.handlers = [getattr(self, '_execute_' + opcode.name.lower()) for opcode in sorted(OpCode)]
+        self.upload_statements(statements)
+
+    def upload_statements(self, statements):
+        self.statements = statements or []
+        self.global_environment = GlobalEnvironment()
+        self.error_handler = ErrorHandler()
+        self.directory = os.path.dirname(os.path.abspath(self.source_file)) if self.source_file else os.getcwd()
+        # every module is executed only once, the first time it is included
+        self.included_modules = {os.path.abspath(self.source_file)} if self.source_file else set()
+        self.resolver = Resolver(self.modules, self.directory, self.included_modules)
+        self.frame = None
+
+    def interpret(self, statements=None):
+        """
+        Resolve, compile and execute the statements. Nothing is executed if the Resolver finds errors, statements
+        coming from an iterator (e.g. StreamingParser.parse_iter) are resolved, compiled and executed one by one
+        """
+        if statements:
+            self.upload_statements(statements)
+
+        try:
+            if isinstance(self.statements, list):
+                self.run(self.compile(self.statements))
+            else:
+                for statement in self.statements:
+                    self.run(self.compile([statement]))
+        except (InterpretError, ParseError, ResolveError) as error:
+            # ParseError and ResolveError come from a lazily parsed function body
+            self.error_handler.add_error(error)
+
+    def compile(self, statements, name='<program>'):
+        """
+        Return CodeObject of the statements, ResolveError is raised if they do not resolve (the other errors
+        are added to the error_handler)
+        """
+        self.resolver.resolve(statements)
+        errors = self.resolver.error_handler.errors
+        if errors:
+            for error in errors[:-1]:
+                self.error_handler.add_error(error)
+            raise errors[-1]
+
+        code = BytecodeCompiler(name).compile(statements)
+        if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+            log.debug(AppType.INTERPRETER, 'Compiled {} instructions:\n{}', len(code), code)
+        return code
+
+    def run(self, code):
+        """
+        Execute the top-level code in the global environment
+        """
+        self.frame = Frame(code, self.global_environment)
+        handlers = self.handlers
+        try:
+            while self.frame is not None:
+                frame = self.frame
+                instructions = frame.instructions
+                # until a call, return or include switches the frame
+                while self.frame is frame:
+                    pc = frame.pc
+                    frame.pc = pc + 2
+                    handlers[instructions[pc]](frame, instructions[pc + 1])
+        except InterpretError as error:
+            relocate_error(error, self.frame.code.expression_lines.get(self.frame.pc - 2))
+            raise
+        finally:
+            self.frame = None
+
+    # INSTRUCTION HANDLERS (see OpCode) ----------------------------------------------
+
+    def _execute_load_const(self, frame, argument):
+        frame.stack.append(frame.constants[argument])
+
+    def _execute_load_global(self, frame, argument):
+        frame.stack.append(frame.globals.get(frame.constants[argument]))
+
+    def _execute_load_local(self, frame, argument):
+        frame.stack.append(frame.environment.get_at(*frame.constants[argument]))
+
+    def _execute_load_name(self, frame, argument):
+        frame.stack.append(frame.environment.get(frame.constants[argument]))
+
+    def _execute_store_global(self, frame, argument):
+        frame.globals.assign(frame.constants[argument], frame.stack[-1])
+
+    def _execute_store_local(self, frame, argument):
+        depth, slot, name = frame.constants[argument]
+        frame.environment.assign_at(depth, slot, name, frame.stack[-1])
+
+    def _execute_store_name(self, frame, argument):
+        frame.environment.assign(frame.constants[argument], frame.stack[-1])
+
+    def _execute_define_name(self, frame, argument):
+        frame.environment.define(frame.constants[argument], frame.stack.pop())
+
+    def _execute_define_local(self, frame, argument):
+        slot, name = frame.constants[argument]
+        frame.environment.define_at(slot, name, frame.stack.pop())
+
+    def _execute_pop(self, frame, argument):
+        frame.stack.pop()
+
+    def _execute_print(self, frame, argument):
+        print(frame.stack.pop().value)
+
+    def _execute_unary(self, frame, argument):
+        unary_operator, operator = frame.constants[argument]
+        stack = frame.stack
+        stack[-1] = unary_operator(operator, stack[-1])
+
+    def _execute_binary(self, frame, argument):
+        binary_operator, operator = frame.constants[argument]
+        stack = frame.stack
+        right = stack.pop()
+        stack[-1] = binary_operator(stack[-1], operator, right)
+
+    def _execute_truth(self, frame, argument):
+        frame.stack[-1] = bool_value(frame.stack[-1].is_truthy())
+
+    def _execute_jump(self, frame, argument):
+        frame.pc = argument
+
+    def _execute_jump_if_false(self, frame, argument):
+        if not frame.stack.pop().is_truthy():
+            frame.pc = argument
+
+    def _execute_jump_if_true(self, frame, argument):
+        if frame.stack.pop().is_truthy():
+            frame.pc = argument
+
+    def _execute_push_environment(self, frame, argument):
+        frame.environment = Environment(enclosing_environment=frame.environment)
+
+    def _execute_pop_environment(self, frame, argument):
+        frame.environment = frame.environment.enclosing_environment
+
+    def _execute_make_function(self, frame, argument):
+        frame.stack.append(CompiledFunction(frame.constants[argument], frame.environment))
+
+    def _execute_call(self, frame, argument):
+        argument_count, callee_expression = frame.constants[argument]
+        stack = frame.stack
+        arguments_start = len(stack) - argument_count
+        arguments = stack[arguments_start:]
+        del stack[arguments_start:]
+        callee = stack.pop()
+
+        if not callee.is_function():
+            raise InterpretError(callee, "Expected the callee to be callable")
+
+        if len(arguments) != callee.get_arity():
+            raise InterpretError(
+                callee_expression,
+                'Expected {} arguments but got {}'.format(callee.get_arity(), len(arguments))
+            )
+
+        # parameters are the first slots of the environment of the call
+        environment = Environment(callee.closure)
+        environment.values = arguments
+        environment.names = list(callee.parameter_names)
+        self.frame = Frame(callee.prototype.compile(), environment, frame)
+
+    def _execute_return(self, frame, argument):
+        value = frame.stack.pop()
+        self.frame = caller = frame.caller
+        if frame.directory is not None:
+            # end of an included module
+            self.directory = frame.directory
+        elif caller is not None:
+            caller.stack.append(value)
+
+    def _execute_include(self, frame, argument):
+        path_token = frame.constants[argument]
+        path = resolve_module_path(path_token.literal, self.directory)
+        if __debug__ and log.INTERPRETER_LOGGER_ENABLED:
+            log.info(AppType.INTERPRETER, 'include: {}', path)
+        if path in self.included_modules:
+            return
+        self.included_modules.add(path)
+
+        module = self.modules.get(path)
+        if module.errors:
+            raise module.include_error(path_token)
+
+        # definitions of the module are global, as if its code was at the top level of the program
+        code = BytecodeCompiler(path).compile(module.statements)
+        self.frame = Frame(code, self.global_environment, frame, directory=self.directory)
+        self.directory = os.path.dirname(path)
@@ -0,0 +1,40 @@
+import unittest
+import io
+from contextlib import contextmanager, redirect_stdout
+from src.logger import Logger
+
+
+@contextmanager
+def switch_logging(enabled):
+    """
+    Switch the parser, interpreter and environment logging on or off, restore the previous settings on exit
+    """
+    logger_settings = (
+        Logger.PARSER_LOGGER_ENABLED, Logger.INTERPRETER_LOGGER_ENABLED, Logger.ENVIRONEMNT_LOGGER_ENABLED)
+    Logger.PARSER_LOGGER_ENABLED = Logger.INTERPRETER_LOGGER_ENABLED = Logger.ENVIRONEMNT_LOGGER_ENABLED = enabled
+    try:
+        yield
+    finally:
+        Logger.PARSER_LOGGER_ENABLED, Logger.INTERPRETER_LOGGER_ENABLED, Logger.ENVIRONEMNT_LOGGER_ENABLED = \
+            logger_settings
+
+
+class LoggingOffTestCase(unittest.TestCase):
+    """
+    Test case running its tests with the logging switched off
+    """
+    def setUp(self):
+        logging = switch_logging(False)
+        logging.__enter__()
+        self.addCleanup(logging.__exit__, None, None, None)
+
+
+def run_statements(engine, statements=None):
+    """
+    Interpret the statements (the engine's own ones when None) and return the printed output and the messages
+    of the errors the engine reported
+    """
+    output = io.StringIO()
+    with redirect_stdout(output):
+        engine.interpret(statements)
+    return output.getvalue(), engine.error_handler.get_messages()
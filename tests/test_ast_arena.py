@@ -0,0 +1,67 @@
+import unittest
+import os
+import pickle
+from copy import deepcopy
+from src.ast_arena import AstArena, BinaryView
+from src.ast_node_statement import LazyBlockStatement
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.parser import Parser
+from src.parser_streaming import StreamingParser
+from tests.helpers import LoggingOffTestCase, run_statements
+
+
+class AstArenaTest(LoggingOffTestCase):
+    @staticmethod
+    def _parse(source_code, lazy_function_bodies=False):
+        return Parser(Lexer(source_code).scan(), lazy_function_bodies=lazy_function_bodies).parse()
+
+    def test_printed_statements_match_ast_files(self):
+        for filename in ('program_01', 'program_02', 'program_03', 'program_04'):
+            full_name = os.path.join(os.path.dirname(__file__), 'olc_programs/{}.olc'.format(filename))
+            with open(full_name, 'r') as input_handle:
+                statements = AstArena.from_statements(self._parse(input_handle.read()))
+            actual_parsed_code = '\n'.join([str(statement) for statement in statements]) + '\n'
+
+            full_name = os.path.join(os.path.dirname(__file__), 'olc_programs/{}.ast'.format(filename))
+            with open(full_name, 'r') as input_handle:
+                self.assertEqual(input_handle.read(), actual_parsed_code)
+
+    def test_interpreted_statements_give_same_output(self):
+        source_codes = ['var a = 1;\nfor (var i = 0; i < 3; i = i + 1) { a = a * 2; }\nprint a;\nprint -a + b;']
+        for filename in ('fibonacci', 'fizzbuzz', 'leap_year'):
+            full_name = os.path.join(os.path.dirname(__file__), '../sample_programs/{}.olc'.format(filename))
+            with open(full_name, 'r') as input_handle:
+                source_codes.append(input_handle.read())
+
+        for source_code in source_codes:
+            for lazy_function_bodies in (False, True):
+                statements = self._parse(source_code, lazy_function_bodies)
+                self.assertEqual(run_statements(Interpreter(AstArena.from_statements(statements))),
+                                 run_statements(Interpreter(statements)))
+
+    def test_nodes_are_stored_in_arrays(self):
+        source_code = 'print 1 + 2 * 3;\nfunction later(x) { return x; }'
+        statements = AstArena.from_statements(StreamingParser(Lexer(source_code).scan_iter(), True).parse_iter())
+        arena = statements[0].arena
+
+        # PRINT, 2x BINARY, 3x LITERAL, FUNCTION and its lazily parsed body (OBJECT)
+        self.assertEqual(len(arena), 8)
+        self.assertIsInstance(statements[0].expression, BinaryView)
+        self.assertFalse(hasattr(statements[0].expression, '__dict__'))
+        self.assertEqual(statements[0].expression.right_operand.operator.lexeme, '*')
+        # tokens are built once, lazily parsed bodies are kept as objects
+        self.assertIs(statements[1].name, statements[1].name)
+        self.assertIsInstance(statements[1].body, LazyBlockStatement)
+
+    def test_views_are_not_copied(self):
+        statements = AstArena.from_statements(self._parse('var a = 1 + 2;'))
+        self.assertIs(deepcopy(statements[0]), statements[0])
+        self.assertEqual(statements[0], statements[0].arena.node(statements[0].index))
+
+        unpickled_statements = pickle.loads(pickle.dumps(statements))
+        self.assertEqual(str(unpickled_statements[0]), str(statements[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
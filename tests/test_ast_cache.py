@@ -0,0 +1,84 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+from src.ast_cache import AstCache, CACHE_FILE_EXTENSION
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.parser import Parser
+from tests.helpers import LoggingOffTestCase, run_statements
+
+
+class AstCacheTest(LoggingOffTestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = AstCache(self.directory.name)
+        full_name = os.path.join(os.path.dirname(__file__), '../sample_programs/fibonacci.olc')
+        with open(full_name, 'r') as input_handle:
+            self.source_code = input_handle.read()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @staticmethod
+    def _parse(source_code, lazy_function_bodies=False):
+        return Parser(Lexer(source_code).scan(), lazy_function_bodies=lazy_function_bodies).parse()
+
+    def _cache_files(self):
+        return sorted(name for name in os.listdir(self.directory.name) if name.endswith(CACHE_FILE_EXTENSION))
+
+    def test_miss_then_hit(self):
+        self.assertIsNone(self.cache.load(self.source_code))
+        statements = self._parse(self.source_code)
+        self.assertTrue(self.cache.store(self.source_code, statements))
+
+        cached_statements = self.cache.load(self.source_code)
+        self.assertEqual([str(statement) for statement in cached_statements],
+                         [str(statement) for statement in statements])
+        self.assertEqual(run_statements(Interpreter(cached_statements)), run_statements(Interpreter(statements)))
+        self.assertIsNone(self.cache.load(self.source_code + '\nprint 1;'))
+
+    def test_lazy_function_bodies_are_cached_unparsed(self):
+        source_code = 'function twice(x) { return 2 * x; }\nprint twice(21);'
+        self.cache.store(source_code, self._parse(source_code, lazy_function_bodies=True))
+
+        with mock.patch('src.lexer.Lexer.scan', side_effect=AssertionError('cached source scanned again')):
+            self.assertEqual(run_statements(Interpreter(self.cache.load(source_code))), ('42\n', []))
+
+    def test_key_depends_on_interpreter_version_and_variant(self):
+        key = self.cache.get_key(self.source_code)
+        self.assertNotEqual(AstCache(self.directory.name, variant='lazy').get_key(self.source_code), key)
+        with mock.patch('src.ast_cache.INTERPRETER_VERSION', 'different version'):
+            self.assertNotEqual(self.cache.get_key(self.source_code), key)
+            self.cache.store(self.source_code, self._parse(self.source_code))
+        self.assertIsNone(self.cache.load(self.source_code))
+
+    def test_corrupted_entry_is_a_miss(self):
+        with open(self.cache.get_path(self.source_code), 'wb') as file:
+            file.write(b'not a pickle')
+        self.assertIsNone(self.cache.load(self.source_code))
+
+        self.cache.store(self.source_code, self._parse(self.source_code))
+        self.assertIsNotNone(self.cache.load(self.source_code))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        source_codes = ['print {};'.format(number) for number in range(3)]
+        for age, source_code in enumerate(source_codes):
+            self.cache.store(source_code, self._parse(source_code))
+            os.utime(self.cache.get_path(source_code), (age, age))
+        entry_size = os.path.getsize(self.cache.get_path(source_codes[0]))
+
+        # hit refreshes the oldest entry, so the second one is the least recently used now
+        self.cache.load(source_codes[0])
+        self.cache.max_size = 3 * entry_size
+        self.cache.store('print 3;', self._parse('print 3;'))
+
+        self.assertEqual(len(self._cache_files()), 3)
+        self.assertIsNone(self.cache.load(source_codes[1]))
+        self.assertIsNotNone(self.cache.load(source_codes[0]))
+        self.assertIsNotNone(self.cache.load(source_codes[2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
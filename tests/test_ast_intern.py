@@ -0,0 +1,52 @@
+import unittest
+import os
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.parser import Parser
+from src.parser_streaming import StreamingParser
+from tests.helpers import LoggingOffTestCase, run_statements
+
+
+class ExpressionInternTableTest(LoggingOffTestCase):
+    def test_same_statements_and_output_as_without_sharing(self):
+        source_codes = []
+        for filename in ('fibonacci', 'fizzbuzz', 'leap_year'):
+            full_name = os.path.join(os.path.dirname(__file__), '../sample_programs/{}.olc'.format(filename))
+            with open(full_name, 'r') as input_handle:
+                source_codes.append(input_handle.read())
+
+        for source_code in source_codes:
+            statements = Parser(Lexer(source_code).scan()).parse()
+            shared_statements = Parser(Lexer(source_code).scan(), share_expressions=True).parse()
+            self.assertEqual([str(statement) for statement in shared_statements],
+                             [str(statement) for statement in statements])
+            self.assertEqual(run_statements(Interpreter(shared_statements)), run_statements(Interpreter(statements)))
+
+    def test_identical_subtrees_are_shared(self):
+        source_code = ''.join('print i % 15 == 0;\nprint i + 1;\n' for _ in range(100))
+        parser = StreamingParser(Lexer(source_code).scan_iter(), share_expressions=True)
+        statements = list(parser.parse_iter())
+
+        self.assertIs(statements[0].expression, statements[198].expression)
+        self.assertIs(statements[1].expression, statements[199].expression)
+        self.assertEqual(statements[198].expression_line, 199)
+        # i, 15, i % 15, 0, i % 15 == 0, 1 and i + 1 (variable i is shared by both expressions)
+        self.assertEqual(len(parser.intern_table), 7)
+
+    def test_errors_are_reported_on_their_lines(self):
+        source_codes = [
+            'var x = 1;\nprint x - 1;\nx = TRUE;\n\nprint x - 1;',
+            'var x = 1;\nprint x - 1;\nprint (x +\n  x - 1) -\n    TRUE;',
+            'var a = 3;\nprint a - 1;\nfunction f(a) {\n  return a - 1;\n}\nprint f(FALSE);',
+        ]
+        for source_code in source_codes:
+            statements = Parser(Lexer(source_code).scan()).parse()
+            shared_statements = Parser(Lexer(source_code).scan(), share_expressions=True).parse()
+            self.assertEqual(run_statements(Interpreter(shared_statements)), run_statements(Interpreter(statements)))
+        # a - 1 in the function body is shared with the one on line 2
+        self.assertEqual(run_statements(Interpreter(shared_statements))[1], [
+            'InterpretError: Not implemented for given datatypes (line 4, around -)'])
+
+
+if __name__ == '__main__':
+    unittest.main()
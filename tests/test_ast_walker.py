@@ -0,0 +1,94 @@
+import unittest
+from src.ast_arena import AstArena
+from src.ast_walker import child_nodes, walk_preorder, walk_postorder, fold
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.parser import Parser
+from src.parser_pratt import PrattParser
+from tests.helpers import LoggingOffTestCase, run_statements
+
+DEEP_TERMS = 10 ** 5
+
+
+class AstWalkerTest(LoggingOffTestCase):
+    @staticmethod
+    def _label(node):
+        for name in ('operator', 'name', 'value'):
+            token = getattr(node, name, None)
+            if hasattr(token, 'lexeme'):
+                return token.lexeme
+        return type(node).__name__.replace('View', '')
+
+    def test_walk_orders(self):
+        statement = Parser(Lexer('if (a < 2) print f(a, -b); else { x = 1; }').scan()).parse()[0]
+
+        self.assertEqual(
+            [self._label(node) for node in walk_preorder(statement)],
+            ['IfStatement', '<', 'a', '2', 'PrintStatement', 'Call', 'f', 'a', '-', 'b', 'BlockStatement',
+             'ExpressionStatement', 'x', '1'])
+        self.assertEqual(
+            [self._label(node) for node in walk_postorder(statement)],
+            ['a', '2', '<', 'f', 'a', 'b', '-', 'Call', 'PrintStatement', '1', 'x', 'ExpressionStatement',
+             'BlockStatement', 'IfStatement'])
+        self.assertEqual(list(walk_preorder(None)), [])
+
+    def test_fold(self):
+        statement = Parser(Lexer('print (1 + 2) * -3 - f(4, 5);').scan()).parse()[0]
+        node_count = fold(statement, lambda node, children: 1 + sum(children))
+        depth = fold(statement, lambda node, children: 1 + max(children, default=0))
+
+        self.assertEqual(node_count, len(list(walk_preorder(statement))))
+        self.assertEqual(node_count, 13)
+        self.assertEqual(depth, 6)
+        self.assertEqual(len(child_nodes(statement.expression.right_operand)), 3)
+
+    def test_arena_views_are_walked_like_nodes(self):
+        statements = Parser(Lexer('var a = 1; while (a < 10) { a = a * (a + 1); print a; }').scan()).parse()
+        views = AstArena.from_statements(statements)
+        for statement, view in zip(statements, views):
+            self.assertEqual([self._label(node) for node in walk_postorder(view)],
+                             [self._label(node) for node in walk_postorder(statement)])
+
+    def test_deep_expressions_are_printed_and_evaluated(self):
+        source_code = (
+            'var a = 1;\n'
+            'print ' + ' + '.join(['a'] * DEEP_TERMS) + ';\n'
+            'print ' + ' || '.join(['FALSE'] * DEEP_TERMS) + ';\n'
+        )
+        statements = Parser(Lexer(source_code).scan()).parse()
+        text = str(statements[1])
+        self.assertTrue(text.startswith('PRINT ' + '[' * (DEEP_TERMS - 1) + 'a + a]'))
+        self.assertEqual(len(text), len('PRINT  ;') + (DEEP_TERMS - 1) * len('[ + ]') + DEEP_TERMS)
+        self.assertEqual(run_statements(Interpreter(statements)), ('{}\nFalse\n'.format(DEEP_TERMS), []))
+
+    def test_deep_expressions_in_arena_and_shared(self):
+        terms = DEEP_TERMS // 10
+        source_code = 'print ' + ' && '.join(['TRUE'] * terms) + ' && FALSE;\nprint -' + ' - -'.join(['1'] * terms) + ';'
+        tokens = Lexer(source_code).scan()
+        for parser_class in (Parser, PrattParser):
+            statements = parser_class(tokens).parse()
+            shared_statements = parser_class(tokens, share_expressions=True).parse()
+            for compiled_statements in (statements, AstArena.from_statements(statements), shared_statements):
+                self.assertEqual(run_statements(Interpreter(compiled_statements)), ('False\n{}\n'.format(terms - 2), []))
+
+    def test_errors_in_deep_expressions(self):
+        source_codes = [
+            'print TRUE - 1' + ' + 1' * DEEP_TERMS + ';',
+            'function f(x) {\n  return x - TRUE;\n}\nprint 1' + ' + f(1)' * (DEEP_TERMS // 10) + ';',
+        ]
+        expected_errors = [
+            ['InterpretError: Not implemented for given datatypes (line 1, around -)'],
+            ['InterpretError: Not implemented for given datatypes (line 2, around -)'],
+        ]
+        for source_code, errors in zip(source_codes, expected_errors):
+            statements = Parser(Lexer(source_code).scan()).parse()
+            self.assertEqual(run_statements(Interpreter(statements)), ('', errors))
+
+    def test_short_circuit_skips_the_right_operand(self):
+        source_code = 'var a = 0;\nprint FALSE && (a = 1);\nprint TRUE || (a = 2);\nprint TRUE && (a = 3);\nprint a;'
+        statements = Parser(Lexer(source_code).scan()).parse()
+        self.assertEqual(run_statements(Interpreter(statements)), ('False\nTrue\nTrue\n3\n', []))
+
+
+if __name__ == '__main__':
+    unittest.main()
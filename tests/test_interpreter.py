@@ -1,7 +1,13 @@
 import unittest
+from src.ast_arena import AstArena
 from src.interpreter import Interpreter
-# from src.ast_node_expression import Binary, Literal, Unary
+from src.interpreter_runtime import RuntimeOperators, RuntimeDataType, TRUE_VALUE, FALSE_VALUE, NULL_VALUE
+from src.ast_node_expression import Binary, Literal
+from src.ast_node_statement import ExpressionStatement
+from src.lexer import Lexer
+from src.parser import Parser
 from src.tokens import TokenOsu, TokenType
+from tests.helpers import run_statements, switch_logging
 
 
 class TestInterpreter(unittest.TestCase):
@@ -29,6 +35,49 @@ class TestInterpreter(unittest.TestCase):
             '!=': TokenOsu(TokenType.INEQUALITY, '!=', '!=', 1)
         }
 
+    def test_literal_values_are_cached(self):
+        literal = Literal(self.ints[3])
+        value = self.interpreter.evaluate_expression(literal)
+        self.assertEqual((value.value, value.data_type), (3, RuntimeDataType.INT))
+        self.assertIs(literal.runtime_value, value)
+        self.assertIs(self.interpreter.evaluate_expression(literal), value)
+
+        statement, = AstArena.from_statements([ExpressionStatement(Literal(TokenOsu(TokenType.FLOAT, '1.5', 1.5, 1)))])
+        value = self.interpreter.evaluate_expression(statement.expression)
+        self.assertIs(self.interpreter.evaluate_expression(statement.expression), value)
+
+    def test_values_are_shared(self):
+        def evaluate(left, operator, right):
+            return self.interpreter.evaluate_expression(Binary(Literal(left), self.operators[operator], Literal(right)))
+
+        self.assertIs(evaluate(self.ints[2], '+', self.ints[3]), evaluate(self.ints[1], '*', self.ints[5]))
+        self.assertIs(evaluate(self.ints[4], '>', self.ints[3]), TRUE_VALUE)
+        self.assertIs(evaluate(self.ints[0], '!=', self.ints[0]), FALSE_VALUE)
+        self.assertIs(self.interpreter.evaluate_expression(Literal(TokenOsu(TokenType.NULL, 'NULL', None, 1))),
+                      NULL_VALUE)
+        # only ints are shared, INT values are not always ints
+        big = TokenOsu(TokenType.INT, '1000', 1000, 1)
+        self.assertIsNot(evaluate(big, '+', self.ints[0]), evaluate(big, '+', self.ints[0]))
+        minus_one = RuntimeOperators.get_runtime_value_for_unary_operator(
+            self.operators['-'], RuntimeOperators.get_runtime_value_for_literal_token(self.ints[1]))
+        value = RuntimeOperators.get_runtime_value_for_binary_operator(
+            RuntimeOperators.get_runtime_value_for_literal_token(self.ints[2]), TokenOsu(TokenType.EXPONENT, '**', None, 1),
+            minus_one)
+        self.assertEqual((value.value, value.data_type), (0.5, RuntimeDataType.INT))
+
+    def test_returns(self):
+        with switch_logging(False):
+            output, errors = run_statements(self.interpreter, Parser(Lexer(
+                'function find(n) { var i = 0; while (TRUE) { { if (i * i >= n) { return i; } } i = i + 1; } }\n'
+                'function sign(x) { if (x < 0) return -1; else if (x == 0) { print "zero"; return; }\n'
+                '  print "positive"; return 1; }\n'
+                'var x = "global";\n'
+                'function shadow() { var x = "local"; { var x = "block"; return x; } }\n'
+                'print find(10);\nprint sign(-5);\nsign(0);\nprint sign(5);\nprint shadow();\nprint x;\n'
+                'return;\nprint "never";').scan()).parse())
+        # environments of the blocks left by return are restored, return at the top level ends the program
+        self.assertEqual((output, errors), ('4\n-1\nzero\npositive\n1\nblock\nglobal\n', []))
+
     # def test_one_plus_one(self):
     #     ast = Binary(
     #         Literal(self.ints[1]),
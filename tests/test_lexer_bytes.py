@@ -0,0 +1,69 @@
+import unittest
+import os
+import tempfile
+from src.lexer import Lexer
+from src.lexer_bytes import BytesLexer, BytesTokenBuffer, map_source_file
+from src.parser import Parser
+from src.tokens import TokenType
+from tests.helpers import switch_logging
+
+
+class BytesLexerTest(unittest.TestCase):
+    def setUp(self):
+        self.source_codes = [
+            '',
+            'var broken = "unterminated\nstring',
+            '@ # & @@ 1. a ** 2 // comment\nprint "multi\nline";',
+            'print "zażółć"; // gęślą jaźń\nvar ä = 1;',
+        ]
+        for filename in ('program_01', 'program_02', 'program_03', 'program_04'):
+            full_name = os.path.join(os.path.dirname(__file__), 'olc_programs/{}.olc'.format(filename))
+            with open(full_name, 'r') as input_handle:
+                self.source_codes.append(input_handle.read())
+
+    @staticmethod
+    def _describe_tokens(tokens):
+        return [(tkn.token_type, tkn.lexeme, tkn.literal, tkn.source_file_line_number) for tkn in tokens]
+
+    def test_parity_with_lexer(self):
+        for source_code in self.source_codes:
+            expected_tokens = self._describe_tokens(Lexer(source_code).scan())
+            actual_tokens = self._describe_tokens(BytesLexer(source_code.encode('utf-8')).scan())
+            self.assertEqual(actual_tokens, expected_tokens)
+
+    def test_memory_mapped_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'program.olc')
+            with open(filename, 'w', encoding='utf-8') as file:
+                file.write(self.source_codes[-1])
+
+            with open(filename, 'rb') as file:
+                source_code = map_source_file(file)
+                tokens = BytesLexer(source_code).scan()
+                statements = [str(statement) for statement in Parser(tokens).parse()]
+                source_code.close()
+
+        expected_statements = [str(statement) for statement in Parser(Lexer(self.source_codes[-1]).scan()).parse()]
+        self.assertEqual(statements, expected_statements)
+
+    def test_comments_are_never_decoded(self):
+        decoded_lexemes = []
+
+        class RecordingTokenBuffer(BytesTokenBuffer):
+            def _get_source_text(self, start, end):
+                text = super()._get_source_text(start, end)
+                decoded_lexemes.append(text)
+                return text
+
+        lexer = BytesLexer(b'// header comment\nvar a = 1;   // trailing comment\n')
+        lexer.tokens = RecordingTokenBuffer(lexer.source)
+        # logging of the tokens would decode them again
+        with switch_logging(False):
+            Parser(lexer.scan()).parse()
+
+        self.assertEqual(decoded_lexemes, ['var', 'a', '=', '1', ';'])
+        self.assertEqual(lexer.tokens.token_type_at(0), TokenType.COMMENT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import os
+from src.lexer import Lexer
+from src.lexer_incremental import IncrementalLexer
+
+
+class IncrementalLexerTest(unittest.TestCase):
+    def setUp(self):
+        self.source_code = ''
+        for filename in ('program_01', 'program_02', 'program_03', 'program_04'):
+            full_name = os.path.join(os.path.dirname(__file__), 'olc_programs/{}.olc'.format(filename))
+            with open(full_name, 'r') as input_handle:
+                self.source_code += input_handle.read() + '\n'
+
+    @staticmethod
+    def _describe_tokens(tokens):
+        return [(tkn.token_type, tkn.lexeme, tkn.literal, tkn.source_file_line_number) for tkn in tokens]
+
+    def _assert_edits_match_lexer(self, source_code, edits, block_size):
+        lexer = IncrementalLexer(source_code, block_size=block_size)
+        lexer.scan()
+        for offset, removed_length, inserted_text in edits:
+            tokens = lexer.edit(offset, removed_length, inserted_text)
+            source_code = source_code[:offset] + inserted_text + source_code[offset + removed_length:]
+            self.assertEqual(lexer.source, source_code)
+            self.assertEqual(self._describe_tokens(tokens), self._describe_tokens(Lexer(source_code).scan()))
+
+    def test_scan_matches_lexer(self):
+        for block_size in (1, 100, 100000):
+            tokens = IncrementalLexer(self.source_code, block_size=block_size).scan()
+            self.assertEqual(self._describe_tokens(tokens), self._describe_tokens(Lexer(self.source_code).scan()))
+
+    def test_edits_match_lexer(self):
+        middle = len(self.source_code) // 2
+        edits = [
+            (0, 0, 'var inserted = 1;\n'),              # new line at the beginning
+            (middle, 0, 'x'),                           # one character typed
+            (middle, 1, ''),                            # ...and deleted again
+            (10, 30, '\n\n'),                           # lines removed
+            (len(self.source_code) - 30, 0, '@ &'),     # unexpected characters near the end
+        ]
+        for block_size in (1, 100, 100000):
+            self._assert_edits_match_lexer(self.source_code, edits, block_size)
+
+    def test_edits_crossing_block_boundaries(self):
+        source_code = 'a;\nprint "x\ny\nz";\nb;\n// comment "\nc;\n'
+        edits = [
+            (2, 1, ''),                                 # newline between the blocks removed
+            (0, 0, '"'),                                # string opened till the end of the file
+            (0, 1, ''),                                 # ...and closed again
+            (len(source_code) - 3, 3, ''),              # last line removed
+            (0, len(source_code) - 3, ''),              # (almost) everything removed
+        ]
+        self._assert_edits_match_lexer(source_code, edits, 1)
+
+    def test_only_damaged_blocks_are_scanned(self):
+        scanned_texts = []
+
+        class RecordingLexer(IncrementalLexer):
+            def _scan_blocks(self, text):
+                scanned_texts.append(text)
+                return super()._scan_blocks(text)
+
+        lexer = RecordingLexer('var a = 1;\n' * 1000, block_size=110)
+        lexer.scan()
+        block_count = len(lexer.blocks)
+        scanned_texts.clear()
+        lexer.edit(5000, 1, 'bb')
+
+        self.assertEqual(len(lexer.blocks), block_count)
+        self.assertEqual(len(scanned_texts), 1)
+        self.assertLessEqual(len(scanned_texts[0]), 2 * 110)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import os
+from src.lexer import Lexer
+from src.lexer_parallel import ParallelLexer, find_split_points
+
+
+class ParallelLexerTest(unittest.TestCase):
+    def setUp(self):
+        self.source_code = ''
+        for filename in ('program_01', 'program_02', 'program_03', 'program_04'):
+            full_name = os.path.join(os.path.dirname(__file__), 'olc_programs/{}.olc'.format(filename))
+            with open(full_name, 'r') as input_handle:
+                self.source_code += input_handle.read() + '\n'
+        self.source_code += 'print "string\n// not a comment\nspanning lines";\n@ & // comment with "quote\n'
+
+    @staticmethod
+    def _describe_tokens(tokens):
+        return [(tkn.token_type, tkn.lexeme, tkn.literal, tkn.source_file_line_number) for tkn in tokens]
+
+    def test_split_points_are_outside_of_strings(self):
+        source_code = 'a;\nprint "x\ny\nz";\nb;\n'
+        self.assertEqual(find_split_points(source_code, 1), [0, 3, 18, 21])
+        self.assertEqual(find_split_points('var s = "unterminated\n\n\n', 1), [0, 24])
+
+    def test_parity_with_lexer(self):
+        expected_tokens = self._describe_tokens(Lexer(self.source_code).scan())
+        for chunk_size in (1, 50, 1000, 100000):
+            tokens = ParallelLexer(self.source_code, workers=1, chunk_size=chunk_size).scan()
+            self.assertEqual(self._describe_tokens(tokens), expected_tokens)
+
+        compact_tokens = ParallelLexer(self.source_code, compact=True, workers=1, chunk_size=50).scan()
+        self.assertEqual(self._describe_tokens(compact_tokens), expected_tokens)
+
+    def test_parity_with_lexer_in_process_pool(self):
+        expected_tokens = self._describe_tokens(Lexer(self.source_code).scan())
+        tokens = ParallelLexer(self.source_code, workers=2, chunk_size=200).scan()
+        self.assertEqual(self._describe_tokens(tokens), expected_tokens)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import os
+from src.lexer import Lexer
+from src.lexer_regex import RegexLexer
+
+
+class RegexLexerTest(unittest.TestCase):
+    @staticmethod
+    def _describe_tokens(tokens):
+        return [(tkn.token_type, tkn.lexeme, tkn.literal, tkn.source_file_line_number) for tkn in tokens]
+
+    def test_with_olc_source_files(self):
+        """
+        Testing with .olc source files. Comparing output with the prepared .lex files
+        """
+        test_programs = (
+            'program_01',
+            'program_02',
+            'program_03',
+            'program_04',
+        )
+
+        for filename in test_programs:
+            full_name = os.path.join(os.path.dirname(__file__), 'olc_programs/{}.olc'.format(filename))
+            with open(full_name, 'r') as input_handle:
+                source_code = input_handle.read()
+                lexer = RegexLexer(source_code)
+                lexer.scan()
+                token_string = lexer.get_tokens_as_string()
+
+            full_name = os.path.join(os.path.dirname(__file__), 'olc_programs/{}.lex'.format(filename))
+            with open(full_name, 'r') as input_handle:
+                expected_token_string = input_handle.read()
+
+            self.assertEqual(token_string, expected_token_string)
+
+    def test_parity_with_lexer(self):
+        """
+        Testing that both lexer engines produce identical tokens (including literals and line numbers)
+        """
+        test_cases = (
+            '',
+            'a ** b * c',
+            '1 == 2 != 3 <= 4 >= 5 < 6 > 7 = !x',
+            'a && b || c & d | e ^ f',
+            'x = 10 / 4.25 % 3; // comment\n',
+            'print "multi\nline\nstring"; var y = 1;',
+            "print 'single' + \"double\";",
+            'var broken = "unterminated\nstring',
+            'abc1 1.a 2. 3.14.15',
+            '@ # $ ~ @@ & @',
+            'function f(a, b) {\n\treturn [a, b];\r\n}\n',
+            'TRUE FALSE NULL include class elif',
+        )
+
+        for source_code in test_cases:
+            expected_tokens = Lexer(source_code).scan()
+            actual_tokens = RegexLexer(source_code).scan()
+            self.assertEqual(self._describe_tokens(actual_tokens), self._describe_tokens(expected_tokens))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import io
+from contextlib import redirect_stdout
+from unittest import mock
+from src.constants import AppType
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.logger import Logger
+from src.parser import Parser
+from tests.helpers import run_statements, switch_logging
+
+
+class FormatCounter:
+    """
+    Argument of the log messages counting how many times it was formatted
+    """
+    def __init__(self):
+        self.count = 0
+
+    def __str__(self):
+        self.count += 1
+        return 'formatted'
+
+
+class LoggerTest(unittest.TestCase):
+    def setUp(self):
+        logging = switch_logging(True)
+        logging.__enter__()
+        self.addCleanup(logging.__exit__, None, None, None)
+        self.levels = Logger.LEVELS
+        Logger.LEVELS = {}
+
+    def tearDown(self):
+        Logger.LEVELS = self.levels
+
+    @staticmethod
+    def _log(caller, level, message, *args):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            Logger.log(caller, level, message, *args)
+        return output.getvalue()
+
+    def test_message_is_formatted_only_when_emitted(self):
+        argument = FormatCounter()
+        self.assertIn('value formatted', self._log(AppType.INTERPRETER, Logger.INFO, 'value {}', argument))
+        self.assertEqual(argument.count, 1)
+
+        Logger.INTERPRETER_LOGGER_ENABLED = False
+        self.assertEqual(self._log(AppType.INTERPRETER, Logger.INFO, 'value {}', argument), '')
+        self.assertEqual(argument.count, 1)
+
+    def test_levels_of_subsystems(self):
+        Logger.LEVELS = {AppType.ENVIRONMENT: Logger.INFO, AppType.PARSER: Logger.OFF}
+        self.assertEqual(self._log(AppType.ENVIRONMENT, Logger.DEBUG, 'debug'), '')
+        self.assertIn('info', self._log(AppType.ENVIRONMENT, Logger.INFO, 'info'))
+        self.assertEqual(self._log(AppType.PARSER, Logger.INFO, 'info'), '')
+        self.assertIn('debug', self._log(AppType.INTERPRETER, Logger.DEBUG, 'debug'))
+
+    def test_message_without_arguments_is_not_formatted(self):
+        self.assertIn('{not a field}', self._log(AppType.PARSER, Logger.INFO, '{not a field}'))
+
+    def test_interpreter_does_not_format_statements_when_logging_is_off(self):
+        statements = Parser(Lexer('var a = 1;\n{ a = a + 1; }\nprint a;').scan()).parse()
+        with switch_logging(False), \
+                mock.patch('src.abstract_syntax_tree.AbstractSyntaxTree.__str__', side_effect=AssertionError):
+            self.assertEqual(run_statements(Interpreter(statements)), ('2\n', []))
+
+
+if __name__ == '__main__':
+    unittest.main()
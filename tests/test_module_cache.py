@@ -0,0 +1,130 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+from src.ast_cache import AstCache
+from src.error_handler import ErrorHandler
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.module_cache import ModuleCache, ModuleCompiler
+from src.parser import Parser
+from tests.helpers import LoggingOffTestCase, run_statements
+
+MODULES = {
+    'lib/math.olc': 'include "util.olc";\nfunction square(x) {\n  return x * x;\n}\n',
+    'lib/util.olc': 'function twice(x) {\n  return x + x;\n}\nprint "util loaded";\n',
+    'lib/strings.olc': 'var greeting = "hello";\ninclude "util.olc";\n',
+    'lib/cycle.olc': 'include "../main.olc";\nprint "cycle loaded";\n',
+    'lib/broken.olc': 'function broken( {\n}\n',
+}
+
+MAIN_PROGRAM = 'include "lib/math.olc";\ninclude "lib/strings.olc";\nprint square(twice(3));\nprint greeting;\n'
+
+
+class ModuleCacheTest(LoggingOffTestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_directory = tempfile.TemporaryDirectory()
+        for path, source_code in MODULES.items():
+            os.makedirs(os.path.dirname(self._path(path)), exist_ok=True)
+            with open(self._path(path), 'w') as output_handle:
+                output_handle.write(source_code)
+
+    def tearDown(self):
+        self.directory.cleanup()
+        self.cache_directory.cleanup()
+
+    def _path(self, path):
+        return os.path.join(self.directory.name, path)
+
+    @staticmethod
+    def _parse(source_code):
+        return Parser(Lexer(source_code).scan()).parse()
+
+    def _interpreter(self, statements, modules):
+        return Interpreter(statements, modules=modules, source_file=self._path('main.olc'))
+
+    def test_modules_are_executed_once_in_global_environment(self):
+        modules = ModuleCache(workers=1)
+        self.assertEqual(run_statements(self._interpreter(self._parse(MAIN_PROGRAM), modules)),
+                         ('util loaded\n36\nhello\n', []))
+        self.assertEqual(sorted(modules.modules), [self._path('lib/math.olc'), self._path('lib/strings.olc'),
+                                                   self._path('lib/util.olc')])
+
+    def test_including_module_which_includes_the_program(self):
+        modules = ModuleCache(workers=1)
+        statements = self._parse('include "lib/cycle.olc";\nprint "main";')
+        self.assertEqual(run_statements(self._interpreter(statements, modules)), ('cycle loaded\nmain\n', []))
+
+    def test_compile_includes_in_parallel(self):
+        statements = self._parse(MAIN_PROGRAM)
+        serial_modules, parallel_modules = ModuleCache(workers=1), ModuleCache(workers=2)
+        self.assertEqual(serial_modules.compile_includes(statements, self.directory.name), [])
+        self.assertEqual(parallel_modules.compile_includes(statements, self.directory.name), [])
+
+        self.assertEqual(len(parallel_modules), 3)
+        for path, module in serial_modules.modules.items():
+            self.assertEqual([str(statement) for statement in parallel_modules.modules[path].statements],
+                             [str(statement) for statement in module.statements])
+        # everything is compiled already, the program runs without lexing or parsing any module
+        with mock.patch('src.lexer.Lexer.scan', side_effect=AssertionError('module scanned again')):
+            self.assertEqual(run_statements(self._interpreter(statements, parallel_modules)), ('util loaded\n36\nhello\n', []))
+
+    def test_modules_are_taken_from_ast_cache(self):
+        compiler = ModuleCompiler(ast_cache=AstCache(self.cache_directory.name))
+        statements = self._parse(MAIN_PROGRAM)
+        ModuleCache(compiler, workers=1).compile_includes(statements, self.directory.name)
+
+        with mock.patch('src.lexer.Lexer.scan', side_effect=AssertionError('cached module scanned again')):
+            modules = ModuleCache(compiler, workers=1)
+            self.assertEqual(modules.compile_includes(statements, self.directory.name), [])
+            self.assertEqual(run_statements(self._interpreter(statements, modules)), ('util loaded\n36\nhello\n', []))
+
+        # cached modules are loaded without the worker processes
+        with mock.patch('src.module_cache.ProcessPoolExecutor', side_effect=AssertionError('worker pool started')):
+            modules = ModuleCache(compiler, workers=2)
+            self.assertEqual(modules.compile_includes(statements, self.directory.name), [])
+            self.assertEqual(run_statements(self._interpreter(statements, modules)), ('util loaded\n36\nhello\n', []))
+
+    def test_modules_with_errors(self):
+        statements = self._parse('include "lib/broken.olc";\ninclude "lib/missing.olc";')
+        failed_modules = ModuleCache(workers=1).compile_includes(statements, self.directory.name)
+
+        self.assertEqual([module.path for module in failed_modules],
+                         [self._path('lib/broken.olc'), self._path('lib/missing.olc')])
+        self.assertEqual(failed_modules[0].errors, ['ParseError: Expected parameter name (line 1, around {)'])
+        self.assertEqual(failed_modules[1].errors, ['Cannot read module: No such file or directory'])
+
+        # errors of the includes are reported as the engines report them when they execute the include
+        with open(self._path('lib/includes_missing.olc'), 'w') as output_handle:
+            output_handle.write('var x = 1;\n\ninclude "missing.olc";\n')
+        statements = self._parse('include "lib/includes_missing.olc";\ninclude "lib/broken.olc";\n'
+                                 'include "lib/broken.olc";')
+        error_handler = ErrorHandler()
+        ModuleCache(workers=1).compile_includes(statements, self.directory.name, error_handler)
+        self.assertEqual(error_handler.get_messages(), [
+            'InterpretError: Cannot include {}. ParseError: Expected parameter name (line 1, around {{) '
+            '(line 2, around "lib/broken.olc")'.format(self._path('lib/broken.olc')),
+            'InterpretError: Cannot include {}. Cannot read module: No such file or directory '
+            '(line 3, around "missing.olc")'.format(self._path('lib/missing.olc'))])
+
+        statements = self._parse('print 1;\ninclude "lib/missing.olc";\nprint 2;')
+        output, errors = run_statements(self._interpreter(statements, ModuleCache(workers=1)))
+        self.assertEqual(output, '1\n')
+        self.assertEqual(errors, [
+            'InterpretError: Cannot include {}. Cannot read module: No such file or directory '
+            '(line 2, around "lib/missing.olc")'.format(self._path('lib/missing.olc'))])
+
+    def test_include_statement(self):
+        statements = self._parse('include "lib/math.olc";')
+        self.assertEqual(str(statements[0]), 'INCLUDE [lib/math.olc] ;')
+
+        parser = Parser(Lexer('include lib;\nprint 1;').scan())
+        parser.parse()
+        self.assertEqual([error.message for error in parser.error_handler.errors],
+                         ["Expect path of the module after 'include'"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import glob
+import os
+from src.ast_node_expression import Binary, Literal
+from src.ast_node_statement import BlockStatement, FunctionStatement, IfStatement, PrintStatement
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.optimizer import Optimizer
+from src.parser import Parser
+from src.resolver import Resolver
+from tests.helpers import LoggingOffTestCase, run_statements
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAMS = sorted(
+    glob.glob(os.path.join(ROOT_DIRECTORY, 'sample_programs', '*.olc')) +
+    glob.glob(os.path.join(ROOT_DIRECTORY, 'tests', 'olc_programs', '*.olc')))
+
+
+class OptimizerTest(LoggingOffTestCase):
+    @staticmethod
+    def _parse(source_code, **kwargs):
+        return Parser(Lexer(source_code).scan(), **kwargs).parse()
+
+    def _optimize(self, source_code, **kwargs):
+        optimizer = Optimizer()
+        return optimizer.optimize(self._parse(source_code, **kwargs)), optimizer
+
+    def _assert_same_as_original(self, source_code, **kwargs):
+        result = run_statements(Interpreter(self._optimize(source_code, **kwargs)[0]))
+        self.assertEqual(result, run_statements(Interpreter(self._parse(source_code, **kwargs))))
+        return result
+
+    def test_programs_produce_the_same_output(self):
+        for path in PROGRAMS:
+            with open(path) as file:
+                source_code = file.read()
+            for options in ({}, {'lazy_function_bodies': True}, {'share_expressions': True}):
+                with self.subTest(program=os.path.basename(path), **options):
+                    statements = self._parse(source_code, **options)
+                    resolver = Resolver()
+                    resolver.resolve(statements)
+                    if not resolver.error_handler.has_errors():
+                        self._assert_same_as_original(source_code, **options)
+
+    def test_constant_folding(self):
+        statements, optimizer = self._optimize(
+            'print 1 + 2 * 3;\nprint (1 + 2) * (3 - 4);\nprint "ab" + "cd";\nprint 7 / 2;\nprint 7.0 / 2;\n'
+            'print TRUE && 0;\nprint FALSE || "x";\nprint 1 == 1.0;\nprint -(2 - 5);\nprint 2 ** 10 > 1000;')
+        self.assertTrue(all(isinstance(statement.expression, Literal) for statement in statements))
+        self.assertEqual(optimizer.folded_expressions, 15)
+        self.assertEqual(run_statements(Interpreter(statements)), ('7\n-3\nabcd\n3\n3.5\nFalse\nTrue\nFalse\n3\nTrue\n', []))
+
+    def test_errors_are_not_folded(self):
+        # operators raising an error are left in place, the error is raised when they are executed
+        statements, _ = self._optimize('print 1;\nprint 1 / (2 - 2);\nprint 2;')
+        self.assertIsInstance(statements[1].expression, Binary)
+        self.assertEqual(run_statements(Interpreter(statements)),
+                         ('1\n', ['InterpretError: Invalid operands for the division (line 2, around /)']))
+        self.assertEqual(self._assert_same_as_original('var s = "a" - 1;')[1],
+                         ['InterpretError: Not implemented for given datatypes (line 1, around -)'])
+        # values no literal evaluates to are not folded
+        statements, optimizer = self._optimize('print 2 ** -1;\nprint !NULL;')
+        self.assertEqual(optimizer.folded_expressions, 1)
+        self.assertEqual(run_statements(Interpreter(statements)), ('0.5\nTrue\n', []))
+
+    def test_dead_branches_are_removed(self):
+        statements, optimizer = self._optimize(
+            'if (FALSE) { print "debug"; } else print "release";\nif (1 > 2) print "never";\n'
+            'while (FALSE) print "never";\nif (TRUE) { print "always"; }\n{ if (FALSE) print "never"; }\n1 + 2;')
+        self.assertEqual([type(statement) for statement in statements], [PrintStatement, BlockStatement])
+        self.assertEqual(optimizer.removed_statements, 7)
+        self.assertEqual(run_statements(Interpreter(statements)), ('release\nalways\n', []))
+
+    def test_declarations_are_kept(self):
+        # declarations in the dead code are kept, the Resolver binds the variables of the rest of the program to them
+        source_code = 'var a = 1;\n{ if (FALSE) var a = 2;\n  print a; }\nif (FALSE) function f() {}\nprint f;'
+        statements, _ = self._optimize(source_code)
+        self.assertIsInstance(statements[1].statements[0], IfStatement)
+        self.assertEqual(self._assert_same_as_original(source_code),
+                         ('1\n', ['InterpretError: Undefined variable f. (line 5, around f)']))
+
+    def test_statements_after_return_are_removed(self):
+        statements, optimizer = self._optimize(
+            'function f(x) { if (x > 0) { return x * (2 + 3); print "never"; } else return 0; print "never"; }\n'
+            'print f(2);\nprint f(-1);')
+        self.assertIsInstance(statements[0], FunctionStatement)
+        self.assertEqual(len(statements[0].body.statements), 1)
+        self.assertEqual(len(statements[0].body.statements[0].then_branch.statements), 1)
+        self.assertEqual(optimizer.removed_statements, 2)
+        self.assertEqual(run_statements(Interpreter(statements)), ('10\n0\n', []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import random
+from src.ast_node_statement import LazyBlockStatement
+from src.error_handler import ParseError
+from src.lexer import Lexer
+from src.logger import Logger
+from src.parser import Parser
+from src.parser_incremental import IncrementalParser
+from src.tokens import TokenOsu
+
+LIBRARY = '''function first(a) {
+    return a + 1;
+}
+function second(a) {
+    if (a > 2) { return a * 2; } else { return a; }
+}
+var value = second(first(1));
+if (value > 3) print value; else print 0;
+function third(a) {
+    function inner(b) { return b - a; }
+    return inner(10);
+}
+print third(value);
+'''
+
+
+class IncrementalParserTest(unittest.TestCase):
+    def setUp(self):
+        self.parser_logger_enabled = Logger.PARSER_LOGGER_ENABLED
+        Logger.PARSER_LOGGER_ENABLED = False
+
+    def tearDown(self):
+        Logger.PARSER_LOGGER_ENABLED = self.parser_logger_enabled
+
+    @classmethod
+    def _describe(cls, node):
+        """
+        Return comparable description of the AST (tokens are compared including their line numbers)
+        """
+        if isinstance(node, TokenOsu):
+            return node.token_type, node.lexeme, node.literal, node.source_file_line_number
+        if isinstance(node, list):
+            return [cls._describe(item) for item in node]
+        if isinstance(node, LazyBlockStatement):
+            try:
+                return cls._describe(node.statements)
+            except ParseError as error:
+                return error.message, cls._describe(error.token)
+        if hasattr(node, '__dict__'):
+            return type(node).__name__, {name: cls._describe(value) for name, value in vars(node).items()}
+        return node
+
+    def _assert_same_as_parser(self, incremental_parser, source_code, lazy_function_bodies=False):
+        parser = Parser(Lexer(source_code).scan(), lazy_function_bodies=lazy_function_bodies)
+        self.assertEqual(self._describe(incremental_parser.get_statements()), self._describe(parser.parse()))
+        self.assertEqual(
+            [(error.message, self._describe(error.token)) for error in incremental_parser.error_handler.errors],
+            [(error.message, self._describe(error.token)) for error in parser.error_handler.errors],
+        )
+
+    def test_random_edits_give_same_statements_as_parser(self):
+        snippets = ['\n', ' ', '1', ';', '}', '{', 'else', 'print 2;\n', 'function f(x) { return x; }', '// note\n']
+        generator = random.Random(11)
+        for lazy_function_bodies in (False, True):
+            source_code = LIBRARY
+            parser = IncrementalParser(Lexer(source_code).scan(), lazy_function_bodies=lazy_function_bodies)
+            parser.parse()
+            for _ in range(150):
+                offset = generator.randrange(len(source_code) + 1)
+                removed_length = generator.choice((0, 0, 1, 3))
+                source_code = source_code[:offset] + generator.choice(snippets) + source_code[offset + removed_length:]
+                parser.reparse(Lexer(source_code).scan())
+                self._assert_same_as_parser(parser, source_code, lazy_function_bodies)
+
+    def test_only_edited_statement_is_reparsed(self):
+        parser = IncrementalParser(Lexer(LIBRARY).scan())
+        previous_statements = parser.parse()
+
+        statements = parser.reparse(Lexer(LIBRARY.replace('a * 2', 'a * 3')).scan())
+        self.assertEqual(parser.get_reparsed_statements(), [statements[1]])
+        for index in (0, 2, 3, 4, 5):
+            self.assertIs(statements[index], previous_statements[index])
+
+    def test_moved_statements_are_reused_with_shifted_lines(self):
+        parser = IncrementalParser(Lexer(LIBRARY).scan())
+        previous_statements = parser.parse()
+
+        source_code = '// header\n\n' + LIBRARY
+        statements = parser.reparse(Lexer(source_code).scan())
+        self.assertEqual(parser.get_reparsed_statements(), [])
+        self.assertEqual(statements, previous_statements)
+        self.assertEqual(statements[0].name.source_file_line_number, 3)
+        self._assert_same_as_parser(parser, source_code)
+
+    def test_function_body_is_reused_after_renaming(self):
+        parser = IncrementalParser(Lexer(LIBRARY).scan())
+        previous_body = parser.parse()[4].body
+
+        source_code = LIBRARY.replace('third', 'fourth')
+        statements = parser.reparse(Lexer(source_code).scan())
+        self.assertEqual(parser.get_reparsed_statements(), [statements[4], statements[5]])
+        self.assertIs(statements[4].body, previous_body)
+        self._assert_same_as_parser(parser, source_code)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import os
+from copy import deepcopy
+from src.ast_node_statement import LazyBlockStatement
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.parser import Parser
+from src.parser_pratt import PrattParser
+from src.parser_streaming import StreamingParser
+from tests.helpers import LoggingOffTestCase, run_statements
+
+
+class LazyFunctionBodiesTest(LoggingOffTestCase):
+    def test_same_result_as_eager_parsing(self):
+        source_codes = ['function add(a, b) { function inner(x) { return x * (a + b); } return inner(2); }\nprint add(1, 2);']
+        for filename in ('fibonacci', 'fizzbuzz', 'leap_year'):
+            full_name = os.path.join(os.path.dirname(__file__), '../sample_programs/{}.olc'.format(filename))
+            with open(full_name, 'r') as input_handle:
+                source_codes.append(input_handle.read())
+
+        for parser_class in (Parser, PrattParser):
+            for source_code in source_codes:
+                eager_statements = parser_class(Lexer(source_code).scan()).parse()
+                lazy_statements = parser_class(Lexer(source_code).scan(), lazy_function_bodies=True).parse()
+                self.assertEqual(run_statements(Interpreter(lazy_statements)), run_statements(Interpreter(eager_statements)))
+                self.assertEqual([str(statement) for statement in lazy_statements],
+                                 [str(statement) for statement in eager_statements])
+
+        for source_code in source_codes:
+            eager_statements = Parser(Lexer(source_code).scan()).parse()
+            streamed_statements = StreamingParser(Lexer(source_code).scan_iter(), lazy_function_bodies=True).parse()
+            self.assertEqual(run_statements(Interpreter(streamed_statements)), run_statements(Interpreter(eager_statements)))
+
+    def test_body_is_parsed_on_first_call_only(self):
+        source_code = 'function used() { print 1; }\nfunction unused() { print 2; }\nused();\nused();'
+        statements = Parser(Lexer(source_code).scan(), lazy_function_bodies=True).parse()
+        used_body, unused_body = statements[0].body, statements[1].body
+        self.assertIsInstance(used_body, LazyBlockStatement)
+        self.assertIsNone(used_body.parsed_statements)
+
+        self.assertEqual(run_statements(Interpreter(statements)), ('1\n1\n', []))
+        self.assertIsNotNone(used_body.parsed_statements)
+        self.assertIsNone(unused_body.parsed_statements)
+        self.assertIs(deepcopy(used_body), used_body)
+
+    def test_syntax_errors(self):
+        # bracket mismatches are found while the body is pre-parsed
+        for source_code in ('function f() { print (1; }', 'function f() { print 1); }', 'function f() { print 1;'):
+            for parser in (Parser(Lexer(source_code).scan(), lazy_function_bodies=True),
+                           StreamingParser(Lexer(source_code).scan_iter(), lazy_function_bodies=True)):
+                parser.parse()
+                self.assertTrue(parser.error_handler.has_errors())
+
+        # other errors in the body are found by its syntax check, also in the functions which are never called.
+        # Body with errors is parsed right away - the errors are the same as without the lazy parsing
+        for source_code in ('function unused() { var = ; print 1 +; }\nprint "ran";',
+                            'function f() { print 1 +; }\nprint 0;\nf();',
+                            'function f() { for (var i = 0; i < 2;) { print i; } }',
+                            'function f() { function g() { (a) = 1; } } print 1;'):
+            for parser_class in (Parser, PrattParser):
+                eager_parser = parser_class(Lexer(source_code).scan())
+                eager_statements = eager_parser.parse()
+                for lazy_parser in (parser_class(Lexer(source_code).scan(), lazy_function_bodies=True),
+                                    StreamingParser(Lexer(source_code).scan_iter(), lazy_function_bodies=True)):
+                    lazy_statements = lazy_parser.parse()
+                    self.assertTrue(lazy_parser.error_handler.has_errors())
+                    self.assertEqual(lazy_parser.error_handler.get_messages(), eager_parser.error_handler.get_messages())
+                    self.assertEqual([type(statement) for statement in lazy_statements],
+                                     [type(statement) for statement in eager_statements])
+        parser = Parser(Lexer('function unused() { var = ; print 1 +; }\nprint "ran";').scan(), lazy_function_bodies=True)
+        parser.parse()
+        self.assertEqual(len(parser.error_handler.errors), 2)
+
+        # bodies without errors stay lazy
+        statements = Parser(Lexer('function f() { for (; i < 2; i = i + 1) { g(a = b, (c)); } }').scan(),
+                            lazy_function_bodies=True).parse()
+        self.assertIsInstance(statements[0].body, LazyBlockStatement)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import os
+from src.lexer import Lexer
+from src.logger import Logger
+from src.parser import Parser
+from src.parser_pratt import PrattParser
+
+
+class PrattParserTest(unittest.TestCase):
+    def setUp(self):
+        self.parser_logger_enabled = Logger.PARSER_LOGGER_ENABLED
+        Logger.PARSER_LOGGER_ENABLED = False
+
+    def tearDown(self):
+        Logger.PARSER_LOGGER_ENABLED = self.parser_logger_enabled
+
+    def _assert_same_as_parser(self, source_code):
+        tokens = Lexer(source_code).scan()
+        parser = Parser(tokens)
+        pratt_parser = PrattParser(tokens)
+        self.assertEqual(pratt_parser.parse(), parser.parse())
+        self.assertEqual(
+            [(error.message, str(error.token)) for error in pratt_parser.error_handler.errors],
+            [(error.message, str(error.token)) for error in parser.error_handler.errors],
+        )
+
+    def test_with_olc_source_files(self):
+        """
+        Testing with .olc source files. Comparing output with the prepared .ast files
+        """
+        for filename in ('program_01', 'program_02', 'program_03', 'program_04'):
+            full_name = os.path.join(os.path.dirname(__file__), 'olc_programs/{}.olc'.format(filename))
+            with open(full_name, 'r') as input_handle:
+                tokens = Lexer(input_handle.read()).scan()
+            actual_parsed_code = '\n'.join([str(statement) for statement in PrattParser(tokens).parse()]) + '\n'
+
+            full_name = os.path.join(os.path.dirname(__file__), 'olc_programs/{}.ast'.format(filename))
+            with open(full_name, 'r') as input_handle:
+                self.assertEqual(input_handle.read(), actual_parsed_code)
+
+    def test_precedence_and_associativity(self):
+        for expression in (
+            'a || b ^ c && d == e < f + g * h ** i',
+            'a ** b * c + d < e == f && g ^ h || i',
+            'a - b - c; a / b % c; a ** b ** c; a == b != c',
+            '-a ** 2; !-a; - - a * b; -f(a)(b) + 1',
+            '(a + b) * (c - d); f(a + b, g(c), (d))',
+        ):
+            self._assert_same_as_parser('x = {};'.format(expression))
+
+    def test_assignment(self):
+        for source_code in ('a = b = c + 1;', 'a = (b = 2) * 3;', 'f(a = 1);', 'print a = 1;'):
+            self._assert_same_as_parser(source_code)
+
+    def test_errors(self):
+        for source_code in (
+            'a + b = c;', '-a = 1;', 'f() = 1;', '(a) = 1;', 'print 1 +;', 'print (1 + 2;', 'f(1, );', 'print * 2;'
+        ):
+            self._assert_same_as_parser(source_code)
+
+
+if __name__ == '__main__':
+    unittest.main()
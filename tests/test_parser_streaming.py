@@ -0,0 +1,70 @@
+import unittest
+import io
+import os
+from contextlib import redirect_stdout
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.lexer_regex import RegexLexer
+from src.parser import Parser
+from src.parser_streaming import StreamingParser
+from tests.helpers import LoggingOffTestCase
+
+
+class StreamingParserTest(LoggingOffTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source_codes = []
+        for filename in ('program_01', 'program_02', 'program_03', 'program_04'):
+            full_name = os.path.join(os.path.dirname(__file__), 'olc_programs/{}.olc'.format(filename))
+            with open(full_name, 'r') as input_handle:
+                self.source_codes.append(input_handle.read())
+
+    @staticmethod
+    def _describe_tokens(tokens):
+        return [(tkn.token_type, tkn.lexeme, tkn.literal, tkn.source_file_line_number) for tkn in tokens]
+
+    def test_scan_iter_matches_scan(self):
+        for lexer_class in (Lexer, RegexLexer):
+            for source_code in self.source_codes + ['@ & @@ "unterminated\n']:
+                expected_tokens = self._describe_tokens(lexer_class(source_code).scan())
+                actual_tokens = self._describe_tokens(lexer_class(source_code).scan_iter())
+                self.assertEqual(actual_tokens, expected_tokens)
+
+    def test_streaming_parser_matches_parser(self):
+        for source_code in self.source_codes + ['var a = ;\nprint 1 +;\nprint 2;']:
+            parser = Parser(Lexer(source_code).scan())
+            streaming_parser = StreamingParser(Lexer(source_code).scan_iter())
+            self.assertEqual(
+                [str(statement) for statement in streaming_parser.parse_iter()],
+                [str(statement) for statement in parser.parse()],
+            )
+            self.assertEqual(
+                [error.message for error in streaming_parser.error_handler.errors],
+                [error.message for error in parser.error_handler.errors],
+            )
+
+    def test_statements_are_executed_as_they_are_parsed(self):
+        pulled_tokens = []
+
+        def token_source():
+            for token in RegexLexer('print 1;\nprint 2;\nprint 3;').scan_iter():
+                pulled_tokens.append(token)
+                yield token
+
+        def printed_lines_after_each_statement():
+            for statement in StreamingParser(token_source()).parse_iter():
+                yield statement
+                outputs.append((output.getvalue().split(), len(pulled_tokens)))
+
+        outputs = []
+        output = io.StringIO()
+        with redirect_stdout(output):
+            Interpreter().interpret(printed_lines_after_each_statement())
+
+        # first statement is printed before the second one is scanned (apart from one token of lookahead)
+        self.assertEqual(outputs[0], (['1'], 5))
+        self.assertEqual(outputs[-1][0], ['1', '2', '3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from src.ast_arena import AstArena
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.parser import Parser
+from src.parser_streaming import StreamingParser
+from src.resolver import Resolver, GLOBAL, DYNAMIC
+from tests.helpers import LoggingOffTestCase, run_statements
+
+
+class ResolverTest(LoggingOffTestCase):
+    @staticmethod
+    def _parse(source_code, **kwargs):
+        return Parser(Lexer(source_code).scan(), **kwargs).parse()
+
+    def test_variables_are_bound_to_slots(self):
+        statements = self._parse('var a = 1;\n{ var b = a;\n  var c = b;\n  { print a + c; c = 2; } }')
+        Resolver().resolve(statements)
+        block = statements[1]
+        inner_block = block.statements[2]
+        sum_expression = inner_block.statements[0].expression
+
+        self.assertEqual(statements[0].binding, GLOBAL)
+        self.assertEqual([statement.binding for statement in block.statements[:2]], [0, 1])
+        self.assertEqual(block.statements[0].initializer.binding, GLOBAL)
+        self.assertEqual(sum_expression.left_operand.binding, GLOBAL)
+        self.assertEqual(sum_expression.right_operand.binding, (1, 1))
+        self.assertEqual(inner_block.statements[1].expression.binding, (1, 1))
+
+    def test_parameters_and_locals_of_functions(self):
+        statements = self._parse('function f(x, y) {\n  var z = x;\n  { return y + z; }\n}')
+        Resolver().resolve(statements)
+        body = statements[0].body.statements
+        sum_expression = body[1].statements[0].value
+
+        self.assertEqual(body[0].binding, 2)
+        self.assertEqual(body[0].initializer.binding, (0, 0))
+        self.assertEqual((sum_expression.left_operand.binding, sum_expression.right_operand.binding), ((1, 1), (1, 2)))
+        statements = self._parse('function f(x, y) { var z = x; { return y + z; } }\nprint f(1, 2);')
+        self.assertEqual(run_statements(Interpreter(statements)), ('3\n', []))
+
+    def test_undefined_variables_are_reported_before_execution(self):
+        self.assertEqual(run_statements(Interpreter(self._parse('print 1;\nprint x;\n{ y = 2; }'))),
+                         ('', ['ResolveError: Undefined variable x. (line 2, around x)',
+                               'ResolveError: Undefined variable y. (line 3, around y)']))
+        # closure is a copy of the environment where the function is declared - it does not see later variables
+        self.assertEqual(run_statements(Interpreter(self._parse('function f() { return g; }\nvar g = 1;\nprint f();'))),
+                         ('', ['ResolveError: Undefined variable g. (line 1, around g)']))
+        self.assertEqual(run_statements(Interpreter(self._parse('function f(n) { return f(n - 1); }'))),
+                         ('', ['ResolveError: Undefined variable f. (line 1, around f)']))
+
+    def test_declarations_which_are_not_executed(self):
+        source_code = 'var a = 1;\n{ if (FALSE) var a = 2;\n  print a;\n  a = 3; }\nprint a;\nif (FALSE) var b = 1;\nprint b;'
+        self.assertEqual(run_statements(Interpreter(self._parse(source_code))),
+                         ('1\n3\n', ['InterpretError: Undefined variable b. (line 7, around b)']))
+
+    def test_closures_copy_the_environment(self):
+        source_code = ('function outer(x) {\n  var y = x * 2;\n  function inner(z) { y = y + z; return x + y; }\n'
+                       '  y = 100;\n  print inner(1);\n  print inner(1);\n  return y;\n}\nprint outer(5);')
+        self.assertEqual(run_statements(Interpreter(self._parse(source_code))), ('16\n17\n100\n', []))
+
+    def test_shared_expressions_resolved_differently_are_looked_up_by_name(self):
+        source_code = 'var a = 3;\nprint a - 1;\nfunction f(a) {\n  return a - 1;\n}\nprint f(10);'
+        statements = self._parse(source_code, share_expressions=True)
+        self.assertIs(statements[1].expression, statements[2].body.statements[0].value)
+        self.assertEqual(run_statements(Interpreter(statements)), ('2\n9\n', []))
+        self.assertEqual(statements[1].expression.left_operand.binding, DYNAMIC)
+
+    def test_errors_in_shared_expressions_report_the_absolute_line(self):
+        source_code = 'var a = 1;\nprint a;\nprint a;\n{\n  print y + 1;\n}\nprint y + 1;'
+        for statements in (self._parse(source_code), self._parse(source_code, share_expressions=True)):
+            resolver = Resolver()
+            resolver.resolve(statements)
+            self.assertEqual(resolver.error_handler.get_messages(), [
+                'ResolveError: Undefined variable y. (line 5, around y)',
+                'ResolveError: Undefined variable y. (line 7, around y)'])
+
+    def test_lazy_function_bodies_are_resolved_when_parsed(self):
+        source_code = 'var a = 1;\nfunction f(x) { return x + a; }\nfunction g() { print nope; }\nprint f(1);\ng();'
+        statements = self._parse(source_code, lazy_function_bodies=True)
+        error = 'ResolveError: Undefined variable nope. (line 3, around nope)'
+        self.assertEqual(run_statements(Interpreter(statements)), ('2\n', [error]))
+        self.assertEqual(statements[1].body.statements[0].value.right_operand.binding, GLOBAL)
+        self.assertEqual(run_statements(Interpreter(self._parse(source_code))), ('', [error]))
+
+    def test_arena_views_are_bound(self):
+        statements = AstArena.from_statements(self._parse('var a = 1;\n{ var b = a;\n  print b; }'))
+        self.assertEqual(run_statements(Interpreter(statements)), ('1\n', []))
+        self.assertEqual(statements[1].statements[1].expression.binding, (0, 0))
+        self.assertEqual(statements[1].statements[0].binding, 0)
+
+    def test_streamed_statements_are_resolved_one_by_one(self):
+        parser = StreamingParser(Lexer('print 1;\nprint x;\nprint 2;').scan_iter())
+        self.assertEqual(run_statements(Interpreter(parser.parse_iter())),
+                         ('1\n', ['ResolveError: Undefined variable x. (line 2, around x)']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import glob
+import os
+from src.ast_arena import AstArena
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.parser import Parser
+from src.specializing_interpreter import MAX_SPECIALIZATIONS, SpecializingInterpreter
+from tests.helpers import LoggingOffTestCase, run_statements
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAMS = sorted(
+    glob.glob(os.path.join(ROOT_DIRECTORY, 'sample_programs', '*.olc')) +
+    glob.glob(os.path.join(ROOT_DIRECTORY, 'tests', 'olc_programs', '*.olc')))
+
+
+class SpecializingInterpreterTest(LoggingOffTestCase):
+    @staticmethod
+    def _parse(source_code, **kwargs):
+        return Parser(Lexer(source_code).scan(), **kwargs).parse()
+
+    def _assert_same_as_interpreter(self, source_code, **kwargs):
+        expected = run_statements(Interpreter(), self._parse(source_code, **kwargs))
+        statements = self._parse(source_code, **kwargs)
+        # second run starts with the inline caches specialised by the first one
+        for statements in (statements, statements, AstArena.from_statements(self._parse(source_code, **kwargs))):
+            self.assertEqual(run_statements(SpecializingInterpreter(), statements), expected)
+        return expected
+
+    def test_programs_produce_the_same_output(self):
+        for path in PROGRAMS:
+            with open(path) as file:
+                source_code = file.read()
+            for options in ({}, {'lazy_function_bodies': True}, {'share_expressions': True}):
+                with self.subTest(program=os.path.basename(path), **options):
+                    self._assert_same_as_interpreter(source_code, **options)
+
+    def test_polymorphic_sites(self):
+        source_code = (
+            'function op(a, b) { print a + b; print a / b; print a < b; print a == b; print -a; }\n'
+            'op(7, 2);\nop(7.0, 2);\nop(7, 2.0);\nop("a", "b");\nop(7, 2);\n'
+            'var s = "ab";\nvar i = 0;\nwhile (i < 3) { s = s * 2 + "c"; i = i + 1; }\nprint s;\n'
+            'print 2 ** -1 + 1;\nprint 1 == 1.0;\n'
+            'function g() { return 1; }\nfunction h() { return 2; }\nvar f = g;\n'
+            'for (var k = 0; k < 4; k = k + 1) { if (k == 2) f = h; print f(); }\n'
+            '{ var x = 1; { if (FALSE) var x = 2; print x; } }\nprint 7 / 0;')
+        self.assertEqual(self._assert_same_as_interpreter(source_code), (
+            '9\n3\nFalse\nFalse\n-7\n9.0\n3.5\nFalse\nFalse\n-7.0\n9.0\n3.5\nFalse\nFalse\n-7\n'
+            'ab\n', ['InterpretError: Not implemented for given datatypes (line 1, around /)']))
+        self.assertEqual(self._assert_same_as_interpreter(source_code.replace('op("a", "b");\n', '')), (
+            '9\n3\nFalse\nFalse\n-7\n9.0\n3.5\nFalse\nFalse\n-7.0\n9.0\n3.5\nFalse\nFalse\n-7\n9\n3\nFalse\nFalse\n-7\n'
+            'ababcababccababcababccc\n1.5\nFalse\n1\n1\n2\n2\n1\n',
+            ['InterpretError: Invalid operands for the division (line 17, around /)']))
+
+    def test_cache_statistics(self):
+        statements = self._parse(
+            'function add(a, b) { return a + b; }\nvar total = 0;\n'
+            'for (var i = 0; i < 10; i = i + 1) { total = add(total, -i); }\nprint total;')
+        engine = SpecializingInterpreter()
+        self.assertEqual(run_statements(engine, statements), ('-45\n', []))
+        statistics = engine.cache_statistics()
+        self.assertEqual(statistics['call'], (9, 1))
+        self.assertEqual(statistics['unary'], (9, 1))
+        # every site misses once, at its first evaluation
+        self.assertEqual(statistics['binary'], (28, 3))
+        self.assertEqual(statistics['variable'], (64, 8))
+
+        # caches stay on the nodes, only the callee is a new function in the new run
+        engine = SpecializingInterpreter()
+        run_statements(engine, statements)
+        statistics = engine.cache_statistics()
+        self.assertEqual((statistics['binary'], statistics['variable'], statistics['call']), ((31, 0), (72, 0), (9, 1)))
+
+    def test_megamorphic_sites_stay_generic(self):
+        values = '1, 1.5, "a", 2, 2.5, "b", 3, 3.5, "c", 4, 4.5, "d"'
+        statements = self._parse('function twice(x) { return x + x; }\n' + ''.join(
+            'print twice({});\n'.format(value) for value in values.split(', ')))
+        engine = SpecializingInterpreter()
+        output, errors = run_statements(engine, statements)
+        self.assertEqual(errors, [])
+        self.assertEqual(output.split('\n')[:3], ['2', '3.0', 'aa'])
+        hits, misses = engine.cache_statistics()['binary']
+        self.assertEqual((hits, misses), (0, 12))
+        self.assertEqual(statements[0].body.statements[0].value.inline_cache.specializations, 12)
+        self.assertGreater(12, MAX_SPECIALIZATIONS)
+
+
+if __name__ == '__main__':
+    unittest.main()
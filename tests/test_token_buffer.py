@@ -0,0 +1,58 @@
+import unittest
+import os
+from unittest import mock
+from src.lexer import Lexer
+from src.lexer_regex import RegexLexer
+from src.parser import Parser
+from src.tokens import TokenOsu, TokenType
+from tests.helpers import switch_logging
+
+
+class TokenBufferTest(unittest.TestCase):
+    def setUp(self):
+        self.source_codes = [
+            '',
+            'var broken = "unterminated\nstring',
+            '@ # & @@ 1. a ** 2 // comment\nprint "multi\nline";',
+        ]
+        for filename in ('program_01', 'program_02', 'program_03', 'program_04'):
+            full_name = os.path.join(os.path.dirname(__file__), 'olc_programs/{}.olc'.format(filename))
+            with open(full_name, 'r') as input_handle:
+                self.source_codes.append(input_handle.read())
+
+    @staticmethod
+    def _describe_tokens(tokens):
+        return [(tkn.token_type, tkn.lexeme, tkn.literal, tkn.source_file_line_number) for tkn in tokens]
+
+    def test_compact_tokens_match_token_list(self):
+        """
+        Testing that tokens materialized from the TokenBuffer are identical to the TokenOsu list
+        """
+        for lexer_class in (Lexer, RegexLexer):
+            for source_code in self.source_codes:
+                expected_tokens = lexer_class(source_code).scan()
+                token_buffer = lexer_class(source_code, compact=True).scan()
+                self.assertEqual(len(token_buffer), len(expected_tokens))
+                self.assertEqual(self._describe_tokens(token_buffer), self._describe_tokens(expected_tokens))
+
+    def test_tokens_are_materialized_lazily(self):
+        token_buffer = RegexLexer('// comment\nvar a = 1;\n', compact=True).scan()
+        with switch_logging(False), mock.patch('src.token_buffer.TokenOsu', wraps=TokenOsu) as token_class:
+            statements = Parser(token_buffer).parse()
+        self.assertEqual(str(statements[0]), 'VAR a = 1 ;')
+        # every token the parser needs is materialized once, comment, EOL and EOF tokens never
+        self.assertEqual([call.args[1] for call in token_class.call_args_list], ['var', 'a', '=', '1', ';'])
+
+        # materialized tokens are not kept by the buffer
+        self.assertIsNot(token_buffer[3], token_buffer[3])
+        self.assertEqual(token_buffer[3].lexeme, 'a')
+
+    def test_parser_accepts_token_buffer(self):
+        for source_code in self.source_codes:
+            expected_statements = [str(statement) for statement in Parser(Lexer(source_code).scan()).parse()]
+            actual_statements = [str(statement) for statement in Parser(Lexer(source_code, compact=True).scan()).parse()]
+            self.assertEqual(actual_statements, expected_statements)
+
+
+if __name__ == '__main__':
+    unittest.main()
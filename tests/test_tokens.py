@@ -1,5 +1,5 @@
 import unittest
-from src.tokens import TokenOsu, TokenType
+from src.tokens import TokenOsu, TokenType, token_mask, token_table
 
 
 class TokenTestCase(unittest.TestCase):
@@ -75,6 +75,22 @@ class TokenTestCase(unittest.TestCase):
         for token, expected_string_representation in test_cases:
             self.assertEqual('{}'.format(token), expected_string_representation)
 
+    def test_token_type_codes_and_masks(self):
+        """
+        Testing that token type codes are dense and token masks / tables work as sets / dicts of token types
+        """
+        self.assertEqual(sorted(token_type.code for token_type in TokenType), list(range(len(TokenType))))
+        self.assertEqual(TokenType.PLUS.bit, 1 << TokenType.PLUS.code)
+
+        mask = token_mask({TokenType.PLUS, TokenType.MINUS})
+        self.assertEqual([token_type for token_type in TokenType if token_type.bit & mask], [TokenType.PLUS, TokenType.MINUS])
+        self.assertEqual(token_mask(()), 0)
+
+        table = token_table({TokenType.INT: 'int'}, default='other')
+        self.assertEqual(len(table), len(TokenType))
+        self.assertEqual(table[TokenType.INT.code], 'int')
+        self.assertEqual(table[TokenType.FLOAT.code], 'other')
+
 
 if __name__ == '__main__':
     unittest.main()
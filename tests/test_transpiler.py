@@ -0,0 +1,127 @@
+import unittest
+import glob
+import io
+import os
+import tempfile
+from contextlib import redirect_stdout
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.parser import Parser
+from src.transpiler import CompiledInterpreter, ProgramCache
+from tests.helpers import LoggingOffTestCase, run_statements
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAMS = sorted(
+    glob.glob(os.path.join(ROOT_DIRECTORY, 'sample_programs', '*.olc')) +
+    glob.glob(os.path.join(ROOT_DIRECTORY, 'tests', 'olc_programs', '*.olc')))
+
+
+class TranspilerTest(LoggingOffTestCase):
+    @staticmethod
+    def _parse(source_code, **kwargs):
+        return Parser(Lexer(source_code).scan(), **kwargs).parse()
+
+    def _assert_same_as_interpreter(self, source_code, **kwargs):
+        result = run_statements(CompiledInterpreter(self._parse(source_code, **kwargs)))
+        self.assertEqual(result, run_statements(Interpreter(self._parse(source_code, **kwargs))))
+        return result
+
+    def _compile(self, source_code):
+        statements = self._parse(source_code)
+        return CompiledInterpreter(statements).compile(statements)
+
+    def test_programs_produce_the_same_output(self):
+        for path in PROGRAMS:
+            with open(path) as file:
+                source_code = file.read()
+            for options in ({}, {'lazy_function_bodies': True}, {'share_expressions': True}):
+                with self.subTest(program=os.path.basename(path), **options):
+                    self._assert_same_as_interpreter(source_code, **options)
+
+    def test_control_flow_and_scopes(self):
+        source_code = (
+            'var a = 1;\n{ if (FALSE) var a = 2;\n  print a;\n  a = 3;\n  if (TRUE) var a = 4;\n  a = 5; }\nprint a;\n'
+            'for (var i = 0; i < 3; i = i + 1) { if (i == 1) print "one"; else print i; }\n'
+            'print FALSE && a / 0 || 2 > 1;\nprint 0 || NULL;\n'
+            'function outer(x) { var y = x * 2; function inner(z) { y = y + z; return x + y; }\n'
+            '  y = 100; print inner(1); print inner(1); return y; }\nprint outer(5);\n'
+            'function fib(self, n) { if (n < 2) return n; return self(self, n - 1) + self(self, n - 2); }\n'
+            'print fib(fib, 10);\n'
+            'var b = 1;\nprint b + (b = 5) + b;\nprint (b = 7) > 6 && (b = 8) > 100 || (b = 9) > 0;\nprint b;\n'
+            'var n = 0;\nwhile ((n = n + 1) < 3) print n;\n'
+            "print 'ab' * 2;\nprint 7 / 2;\nprint 7.0 / 2;\nprint 1 == 1.0;\nprint fib == outer;\nprint fib;\n")
+        self.assertEqual(self._assert_same_as_interpreter(source_code), (
+            '1\n3\n0\none\n2\nTrue\nFalse\n16\n17\n100\n55\n11\nTrue\n9\n1\n2\nabab\n3\n3.5\nFalse\nTrue\nNone\n', []))
+
+    def test_errors_map_to_olc_lines(self):
+        self.assertEqual(self._assert_same_as_interpreter('print 1;\nprint "a" - 1;\nprint 2;'),
+                         ('1\n', ['InterpretError: Not implemented for given datatypes (line 2, around -)']))
+        self.assertEqual(self._assert_same_as_interpreter('var a = 1;\nfunction f() {\n  return a % 2.0;\n}\nf();')[1],
+                         ['InterpretError: Not implemented for given datatypes (line 3, around %)'])
+        self.assertEqual(self._assert_same_as_interpreter('print 1;\nif (FALSE) var z = 1;\nprint z;'),
+                         ('1\n', ['InterpretError: Undefined variable z. (line 3, around z)']))
+        self.assertEqual(self._assert_same_as_interpreter('print 1;\nprint x;')[1],
+                         ['ResolveError: Undefined variable x. (line 2, around x)'])
+        # shared expression reports the line of the statement it is evaluated in
+        source_code = 'var s = "a";\nprint s - 1;\nprint\n  s - 1;'
+        self.assertEqual(self._assert_same_as_interpreter(source_code, share_expressions=True)[1],
+                         ['InterpretError: Not implemented for given datatypes (line 2, around -)'])
+        # the Interpreter can not report these errors (their tokens are not tokens)
+        self.assertEqual(run_statements(CompiledInterpreter(self._parse('function f(x) { return x; }\nprint f(1, 2);')))[1],
+                         ['InterpretError: Expected 1 arguments but got 2 (line 2, around f)'])
+
+    def test_included_modules(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, 'lib'))
+            with open(os.path.join(directory, 'lib', 'util.olc'), 'w') as file:
+                file.write('include "other.olc";\nfunction twice(x) { return x + x; }\nprint "util loaded";\n')
+            with open(os.path.join(directory, 'lib', 'other.olc'), 'w') as file:
+                file.write('var other = 7;\n')
+            source_file = os.path.join(directory, 'main.olc')
+            statements = self._parse('include "lib/util.olc";\ninclude "lib/util.olc";\nprint twice(other);')
+            self.assertEqual(run_statements(CompiledInterpreter(statements, source_file=source_file)),
+                             ('util loaded\n14\n', []))
+
+            # programs which are not compiled are run by the Interpreter
+            statements = self._parse('function f() { include "lib/other.olc"; }\nf();\nprint other;')
+            engine = CompiledInterpreter(source_file=source_file)
+            self.assertIsNone(engine.compile(statements))
+            self.assertEqual(run_statements(CompiledInterpreter(statements, source_file=source_file)), ('7\n', []))
+
+    def test_compiled_program(self):
+        program = self._compile('var a = 1;\nwhile (a < 3) a = a + 1;\nfunction f(x) { return x; }\nprint f(a);')
+        self.assertIn('def _program():', program.source)
+        self.assertIn('while (a__0 < 3 if a__0.__class__ is int else _less(a__0, 3, 2)):', program.source)
+        self.assertEqual(program.dependencies, [])
+        self.assertIsNone(self._compile('var a = 1;\nreturn a;'))
+
+    def test_program_cache(self):
+        source_code = 'include "other.olc";\nprint other + 1;'
+        with tempfile.TemporaryDirectory() as directory:
+            module_path = os.path.join(directory, 'other.olc')
+            with open(module_path, 'w') as file:
+                file.write('var other = 7;\n')
+            cache = ProgramCache(os.path.join(directory, 'cache'))
+            self.assertIsNone(cache.load(source_code, directory))
+
+            engine = CompiledInterpreter(source_file=os.path.join(directory, 'main.olc'))
+            program = engine.compile(self._parse(source_code))
+            self.assertEqual(program.dependencies[0][0], module_path)
+            self.assertTrue(cache.store(source_code, directory, program))
+            self.assertIsNone(cache.load(source_code, os.path.join(directory, 'other')))
+
+            cached_program = cache.load(source_code, directory)
+            output = io.StringIO()
+            with redirect_stdout(output):
+                engine.run(cached_program)
+            self.assertEqual(output.getvalue(), '8\n')
+
+            # changed module invalidates the programs including it
+            with open(module_path, 'w') as file:
+                file.write('var other = 8;\n')
+            self.assertIsNone(cache.load(source_code, directory))
+
+
+if __name__ == '__main__':
+    unittest.main()
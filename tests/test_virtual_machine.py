@@ -0,0 +1,95 @@
+import unittest
+import glob
+import os
+import tempfile
+from src.bytecode import OpCode, disassemble
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.parser import Parser
+from src.parser_streaming import StreamingParser
+from src.virtual_machine import VirtualMachine
+from tests.helpers import LoggingOffTestCase, run_statements
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAMS = sorted(
+    glob.glob(os.path.join(ROOT_DIRECTORY, 'sample_programs', '*.olc')) +
+    glob.glob(os.path.join(ROOT_DIRECTORY, 'tests', 'olc_programs', '*.olc')))
+
+
+class VirtualMachineTest(LoggingOffTestCase):
+    @staticmethod
+    def _parse(source_code, **kwargs):
+        return Parser(Lexer(source_code).scan(), **kwargs).parse()
+
+    def _assert_same_as_interpreter(self, source_code, **kwargs):
+        result = run_statements(VirtualMachine(self._parse(source_code, **kwargs)))
+        self.assertEqual(result, run_statements(Interpreter(self._parse(source_code, **kwargs))))
+        return result
+
+    def test_programs_produce_the_same_output(self):
+        for path in PROGRAMS:
+            with open(path) as file:
+                source_code = file.read()
+            for options in ({}, {'lazy_function_bodies': True}, {'share_expressions': True}):
+                with self.subTest(program=os.path.basename(path), **options):
+                    self._assert_same_as_interpreter(source_code, **options)
+
+    def test_control_flow_and_scopes(self):
+        source_code = (
+            'var a = 1;\n{ if (FALSE) var a = 2;\n  print a;\n  a = 3; }\nprint a;\n'
+            'for (var i = 0; i < 3; i = i + 1) { if (i == 1) print "one"; else print i; }\n'
+            'print FALSE && a / 0 || 2 > 1;\nprint 0 || NULL;\n'
+            'function outer(x) { var y = x * 2; function inner(z) { y = y + z; return x + y; }\n'
+            '  y = 100; print inner(1); print inner(1); return y; }\nprint outer(5);\n'
+            'function nothing() { return; }\nnothing();\n')
+        self.assertEqual(self._assert_same_as_interpreter(source_code),
+                         ('1\n3\n0\none\n2\nTrue\nFalse\n16\n17\n100\n', []))
+
+    def test_errors_are_the_same(self):
+        self.assertEqual(self._assert_same_as_interpreter('print 1;\nprint "a" - 1;\nprint 2;'),
+                         ('1\n', ['InterpretError: Not implemented for given datatypes (line 2, around -)']))
+        self.assertEqual(self._assert_same_as_interpreter('print 1;\nprint x;')[1],
+                         ['ResolveError: Undefined variable x. (line 2, around x)'])
+        # shared expression reports the line of the statement it is evaluated in
+        source_code = 'var s = "a";\nprint s - 1;\nprint\n  s - 1;'
+        self.assertEqual(self._assert_same_as_interpreter(source_code, share_expressions=True)[1],
+                         ['InterpretError: Not implemented for given datatypes (line 2, around -)'])
+        self.assertEqual(self._assert_same_as_interpreter('function f() { print nope; }\nprint 1;\nf();',
+                                                          lazy_function_bodies=True),
+                         ('1\n', ['ResolveError: Undefined variable nope. (line 1, around nope)']))
+
+    def test_included_modules(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, 'lib'))
+            with open(os.path.join(directory, 'lib', 'util.olc'), 'w') as file:
+                file.write('include "other.olc";\nfunction twice(x) { return x + x; }\nprint "util loaded";\n')
+            with open(os.path.join(directory, 'lib', 'other.olc'), 'w') as file:
+                file.write('var other = 7;\n')
+            statements = self._parse('include "lib/util.olc";\ninclude "lib/util.olc";\nprint twice(other);')
+            self.assertEqual(run_statements(VirtualMachine(statements, source_file=os.path.join(directory, 'main.olc'))),
+                             ('util loaded\n14\n', []))
+
+    def test_streamed_statements(self):
+        parser = StreamingParser(Lexer('var a = 1;\nprint a;\nprint b;\nprint 2;').scan_iter())
+        self.assertEqual(run_statements(VirtualMachine(parser.parse_iter())),
+                         ('1\n', ['ResolveError: Undefined variable b. (line 3, around b)']))
+
+    def test_bytecode_and_disassembly(self):
+        statements = self._parse('var a = 1;\nwhile (a < 3) a = a + 1;\nfunction f(x) { return x; }\nprint f(a);')
+        code = VirtualMachine().compile(statements)
+
+        self.assertEqual(len(code), len(code.instructions) // 2)
+        self.assertEqual([OpCode(opcode) for opcode in code.instructions[0::2]][:6], [
+            OpCode.LOAD_CONST, OpCode.DEFINE_NAME, OpCode.LOAD_GLOBAL, OpCode.LOAD_CONST, OpCode.BINARY,
+            OpCode.JUMP_IF_FALSE])
+        listing = disassemble(code).splitlines()
+        self.assertEqual(listing[0], '== <program> ==')
+        self.assertEqual(listing[1].split(), ['0', 'LOAD_CONST', '0', '(INT)1'])
+        self.assertIn('== <function f> ==', listing)
+        self.assertEqual(listing[-4].split(), ['0', 'LOAD_LOCAL', '0', 'x', '(depth', '0,', 'slot', '0)'])
+        self.assertEqual(listing[-1].split()[1], 'RETURN')
+
+
+if __name__ == '__main__':
+    unittest.main()